@@ -0,0 +1,44 @@
+"""Add outlook_delta_states table for Graph delta sync
+
+Revision ID: outlook_delta_states_001
+Revises: e460431d79e9
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "outlook_delta_states_001"
+down_revision = "e460431d79e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create outlook_delta_states table.
+    Stores the Microsoft Graph deltaLink/nextLink per (user, folder).
+    """
+    op.create_table(
+        "outlook_delta_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("folder_id", sa.String(length=255), nullable=False),
+        sa.Column("folder_name", sa.String(length=255), nullable=True),
+        sa.Column("state_link", sa.Text(), nullable=False),
+        sa.Column("is_complete", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "folder_id", name="uq_outlook_delta_user_folder"),
+    )
+    op.create_index(op.f("ix_outlook_delta_states_user_id"), "outlook_delta_states", ["user_id"])
+
+
+def downgrade() -> None:
+    """Remove outlook_delta_states table"""
+    op.drop_index(op.f("ix_outlook_delta_states_user_id"), table_name="outlook_delta_states")
+    op.drop_table("outlook_delta_states")
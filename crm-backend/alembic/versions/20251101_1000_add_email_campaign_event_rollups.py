@@ -0,0 +1,72 @@
+"""Add email_campaign_event_rollups table (pre-aggregated campaign analytics)
+
+Revision ID: email_event_rollups_001
+Revises: outlook_delta_states_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "email_event_rollups_001"
+down_revision = "outlook_delta_states_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create email_campaign_event_rollups table and backfill it from email_events.
+    One row per (campaign, variant, event_type), incremented on webhook ingestion.
+    """
+    op.create_table(
+        "email_campaign_event_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("campaign_id", sa.Integer(), nullable=False),
+        sa.Column("variant", sa.String(length=8), nullable=False, server_default=""),
+        sa.Column(
+            "event_type",
+            postgresql.ENUM(name="emaileventtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("event_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("unique_sends", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["campaign_id"], ["email_campaigns.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "campaign_id", "variant", "event_type", name="uq_email_campaign_event_rollup"
+        ),
+    )
+    op.create_index(
+        op.f("ix_email_campaign_event_rollups_id"), "email_campaign_event_rollups", ["id"]
+    )
+
+    # Backfill (équivalent de scripts/rebuild_email_rollups.py)
+    op.execute(
+        """
+        INSERT INTO email_campaign_event_rollups
+            (campaign_id, variant, event_type, event_count, unique_sends, last_event_at)
+        SELECT s.campaign_id,
+               COALESCE(CAST(s.variant AS VARCHAR), ''),
+               e.event_type,
+               COUNT(e.id),
+               COUNT(DISTINCT e.send_id),
+               MAX(e.event_at)
+        FROM email_events e
+        JOIN email_sends s ON s.id = e.send_id
+        GROUP BY s.campaign_id, COALESCE(CAST(s.variant AS VARCHAR), ''), e.event_type
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop email_campaign_event_rollups table."""
+    op.drop_index(op.f("ix_email_campaign_event_rollups_id"), table_name="email_campaign_event_rollups")
+    op.drop_table("email_campaign_event_rollups")
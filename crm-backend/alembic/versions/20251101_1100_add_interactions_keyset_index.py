@@ -0,0 +1,31 @@
+"""Add (created_at, id) index on crm_interactions for keyset pagination
+
+Revision ID: interactions_keyset_idx_001
+Revises: email_event_rollups_001
+Create Date: 2025-11-01
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "interactions_keyset_idx_001"
+down_revision = "email_event_rollups_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Composite index matching the list ordering (created_at DESC, id DESC).
+    Lets `(created_at, id) < (:created_at, :id)` seek directly to the next page.
+    """
+    op.create_index(
+        "idx_interactions_created_at_id",
+        "crm_interactions",
+        ["created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_interactions_created_at_id", table_name="crm_interactions")
@@ -0,0 +1,120 @@
+"""Add dashboard_daily_stats and dashboard_stat_counters (materialised dashboard statistics)
+
+Revision ID: dashboard_rollups_001
+Revises: interactions_keyset_idx_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "dashboard_rollups_001"
+down_revision = "interactions_keyset_idx_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create the dashboard rollup tables and backfill them from the source tables.
+    Maintained incrementally by core.dashboard_rollups, rebuilt nightly by Celery beat.
+    """
+    op.create_table(
+        "dashboard_daily_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("organisation_id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=True),
+        sa.Column("metric", sa.String(length=64), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["organisation_id"], ["organisations.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["team_id"], ["teams.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "day", "organisation_id", "metric", name="uq_dashboard_daily_stats_day_org_metric"
+        ),
+    )
+    op.create_index(op.f("ix_dashboard_daily_stats_id"), "dashboard_daily_stats", ["id"])
+    op.create_index("idx_dashboard_daily_stats_day_metric", "dashboard_daily_stats", ["day", "metric"])
+    op.create_index(
+        "idx_dashboard_daily_stats_org_day", "dashboard_daily_stats", ["organisation_id", "day"]
+    )
+    op.create_index("idx_dashboard_daily_stats_team_day", "dashboard_daily_stats", ["team_id", "day"])
+
+    op.create_table(
+        "dashboard_stat_counters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("metric", sa.String(length=64), nullable=False),
+        sa.Column("dimension", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("metric", "dimension", name="uq_dashboard_stat_counters_metric_dimension"),
+    )
+    op.create_index(op.f("ix_dashboard_stat_counters_id"), "dashboard_stat_counters", ["id"])
+
+    # Backfill (équivalent de core.dashboard_rollups.rebuild_dashboard_rollups).
+    # Les enums sont stockés par nom de membre; les compteurs utilisent la valeur Python.
+    op.execute(
+        """
+        INSERT INTO dashboard_daily_stats (day, organisation_id, team_id, metric, value)
+        SELECT CAST(timezone('UTC', a.occurred_at) AS DATE),
+               a.organisation_id,
+               u.team_id,
+               LOWER(CAST(a.type AS VARCHAR)),
+               COUNT(a.id)
+        FROM organisation_activities a
+        JOIN organisations o ON o.id = a.organisation_id
+        LEFT JOIN users u ON u.id = o.owner_id
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO dashboard_stat_counters (metric, dimension, value)
+        SELECT 'organisations', '', COUNT(*)
+        FROM organisations WHERE COALESCE(is_active, TRUE)
+        UNION ALL
+        SELECT 'organisations_by_category',
+               CASE CAST(category AS VARCHAR)
+                   WHEN 'SDG' THEN 'SDG'
+                   WHEN 'CGPI' THEN 'CGPI'
+                   ELSE INITCAP(CAST(category AS VARCHAR))
+               END,
+               COUNT(*)
+        FROM organisations
+        WHERE COALESCE(is_active, TRUE) AND category IS NOT NULL
+        GROUP BY 2
+        UNION ALL
+        SELECT 'organisations_by_type', LOWER(CAST(type AS VARCHAR)), COUNT(*)
+        FROM organisations
+        WHERE COALESCE(is_active, TRUE) AND type IS NOT NULL
+        GROUP BY 2
+        UNION ALL
+        SELECT 'tasks', '', COUNT(*) FROM tasks
+        UNION ALL
+        SELECT 'tasks_done', '', COUNT(*) FROM tasks WHERE CAST(status AS VARCHAR) = 'DONE'
+        UNION ALL
+        SELECT 'tasks_open_due', CAST(CAST(timezone('UTC', due_date) AS DATE) AS VARCHAR), COUNT(*)
+        FROM tasks
+        WHERE CAST(status AS VARCHAR) <> 'DONE' AND due_date IS NOT NULL
+        GROUP BY 2
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the dashboard rollup tables."""
+    op.drop_index(op.f("ix_dashboard_stat_counters_id"), table_name="dashboard_stat_counters")
+    op.drop_table("dashboard_stat_counters")
+    op.drop_index("idx_dashboard_daily_stats_team_day", table_name="dashboard_daily_stats")
+    op.drop_index("idx_dashboard_daily_stats_org_day", table_name="dashboard_daily_stats")
+    op.drop_index("idx_dashboard_daily_stats_day_metric", table_name="dashboard_daily_stats")
+    op.drop_index(op.f("ix_dashboard_daily_stats_id"), table_name="dashboard_daily_stats")
+    op.drop_table("dashboard_daily_stats")
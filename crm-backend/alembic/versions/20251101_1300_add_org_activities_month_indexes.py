@@ -0,0 +1,43 @@
+"""Add month expression indexes on organisation_activities for SQL-side KPI aggregation
+
+Revision ID: org_activities_month_idx_001
+Revises: dashboard_rollups_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "org_activities_month_idx_001"
+down_revision = "dashboard_rollups_001"
+branch_labels = None
+depends_on = None
+
+ACTIVITY_MONTH = "date_trunc('month', timezone('UTC', occurred_at))"
+
+
+def upgrade() -> None:
+    """
+    Expression indexes on the UTC month bucket used by the KPI aggregation
+    (GROUP BY organisation_id, month with FILTER aggregates):
+    - month only: monthly aggregate across all organisations
+    - (organisation_id, month): monthly/yearly KPIs of one organisation
+    """
+    op.create_index(
+        "idx_org_activities_month",
+        "organisation_activities",
+        [sa.text(ACTIVITY_MONTH)],
+    )
+    op.create_index(
+        "idx_org_activities_org_month",
+        "organisation_activities",
+        ["organisation_id", sa.text(ACTIVITY_MONTH)],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_org_activities_org_month", table_name="organisation_activities")
+    op.drop_index("idx_org_activities_month", table_name="organisation_activities")
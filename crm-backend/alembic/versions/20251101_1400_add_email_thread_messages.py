@@ -0,0 +1,60 @@
+"""Add email_thread_messages (Message-ID → thread lookup index)
+
+Revision ID: email_thread_messages_001
+Revises: org_activities_month_idx_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "email_thread_messages_001"
+down_revision = "org_activities_month_idx_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create the normalised (team_id, message_id) → thread_id index and backfill it
+    from email_threads.metadata->'message_ids'. Maintained by EmailThreadService.
+    """
+    op.create_table(
+        "email_thread_messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("message_id", sa.String(length=998), nullable=False),
+        sa.Column("thread_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["team_id"], ["teams.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["thread_id"], ["email_threads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("team_id", "message_id", name="uq_email_thread_messages_team_message"),
+    )
+    op.create_index(
+        op.f("ix_email_thread_messages_thread_id"), "email_thread_messages", ["thread_id"]
+    )
+
+    # Backfill (équivalent de EmailThreadService.rebuild_message_index).
+    # Premier thread (plus petit id) conservé si un Message-ID apparaît dans plusieurs threads.
+    op.execute(
+        """
+        INSERT INTO email_thread_messages (team_id, message_id, thread_id)
+        SELECT t.team_id, TRIM(BOTH '<> ' FROM m.message_id), MIN(t.id)
+        FROM email_threads t
+        CROSS JOIN LATERAL json_array_elements_text(t.metadata -> 'message_ids') AS m(message_id)
+        WHERE json_typeof(t.metadata -> 'message_ids') = 'array'
+          AND TRIM(BOTH '<> ' FROM m.message_id) <> ''
+        GROUP BY 1, 2
+        ON CONFLICT (team_id, message_id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the Message-ID lookup index."""
+    op.drop_index(op.f("ix_email_thread_messages_thread_id"), table_name="email_thread_messages")
+    op.drop_table("email_thread_messages")
@@ -0,0 +1,39 @@
+"""Add partial index for pending interaction reminders
+
+Revision ID: interactions_reminders_idx_001
+Revises: email_thread_messages_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "interactions_reminders_idx_001"
+down_revision = "email_thread_messages_001"
+branch_labels = None
+depends_on = None
+
+PENDING_REMINDERS = (
+    "notified_at IS NULL AND assignee_id IS NOT NULL AND status IN ('todo', 'in_progress')"
+)
+
+
+def upgrade() -> None:
+    """
+    Partial index on next_action_at for reminders not yet notified.
+    Used by the reminder worker to claim due rows (FOR UPDATE SKIP LOCKED)
+    and to find the next due time without scanning crm_interactions.
+    """
+    op.create_index(
+        "idx_interactions_pending_reminders",
+        "crm_interactions",
+        ["next_action_at"],
+        postgresql_where=sa.text(PENDING_REMINDERS),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_interactions_pending_reminders", table_name="crm_interactions")
@@ -0,0 +1,51 @@
+"""Add data_quality_scores (persisted per-entity data quality scores)
+
+Revision ID: data_quality_scores_001
+Revises: interactions_reminders_idx_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "data_quality_scores_001"
+down_revision = "interactions_reminders_idx_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create the data quality score table.
+    Filled for the whole population by services.quality_scorer (nightly Celery beat job).
+    """
+    op.create_table(
+        "data_quality_scores",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("tier", sa.String(length=1), nullable=False),
+        sa.Column("completeness", sa.Float(), nullable=False),
+        sa.Column("validity_issues", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("potential_duplicates", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("entity_type", "entity_id", name="uq_data_quality_scores_entity"),
+    )
+    op.create_index(op.f("ix_data_quality_scores_id"), "data_quality_scores", ["id"])
+    op.create_index(
+        "idx_data_quality_scores_type_tier", "data_quality_scores", ["entity_type", "tier"]
+    )
+
+
+def downgrade() -> None:
+    """Drop the data quality score table."""
+    op.drop_index("idx_data_quality_scores_type_tier", table_name="data_quality_scores")
+    op.drop_index(op.f("ix_data_quality_scores_id"), table_name="data_quality_scores")
+    op.drop_table("data_quality_scores")
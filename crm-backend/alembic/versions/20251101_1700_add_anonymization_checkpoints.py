@@ -0,0 +1,41 @@
+"""Add anonymization_checkpoints (resumable batched RGPD anonymisation)
+
+Revision ID: anonymization_checkpoints_001
+Revises: data_quality_scores_001
+Create Date: 2025-11-01
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "anonymization_checkpoints_001"
+down_revision = "data_quality_scores_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the checkpoint table of services.rgpd_anonymizer."""
+    op.create_table(
+        "anonymization_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_key", sa.String(length=100), nullable=False),
+        sa.Column("plan", sa.String(length=50), nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_key", "plan", name="uq_anonymization_checkpoints_run_plan"),
+    )
+    op.create_index(op.f("ix_anonymization_checkpoints_id"), "anonymization_checkpoints", ["id"])
+
+
+def downgrade() -> None:
+    """Drop the checkpoint table."""
+    op.drop_index(op.f("ix_anonymization_checkpoints_id"), table_name="anonymization_checkpoints")
+    op.drop_table("anonymization_checkpoints")
@@ -0,0 +1,150 @@
+"""Partition log tables by month (audit, data access, email events, workflow executions)
+
+Revision ID: log_partitions_001
+Revises: anonymization_checkpoints_001
+Create Date: 2025-11-01
+
+"""
+
+from datetime import date
+from typing import Optional
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "log_partitions_001"
+down_revision = "anonymization_checkpoints_001"
+branch_labels = None
+depends_on = None
+
+# Table -> partition column (kept in sync with core.log_partitions.PARTITIONED_LOG_TABLES)
+LOG_TABLES = {
+    "audit_logs": "created_at",
+    "data_access_logs": "accessed_at",
+    "email_events": "event_at",
+    "workflow_executions": "created_at",
+}
+# Months created ahead of the current one (then maintained by core.log_partitions)
+PARTITIONS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _table_definition(inspector, table: str) -> dict:
+    """Primary key, indexes and foreign keys to recreate on the rebuilt table."""
+    return {
+        "pk": inspector.get_pk_constraint(table),
+        "indexes": [
+            index for index in inspector.get_indexes(table) if None not in index["column_names"]
+        ],
+        "foreign_keys": inspector.get_foreign_keys(table),
+    }
+
+
+def _rebuild(bind, table: str, definition: dict, partition_column: Optional[str] = None) -> None:
+    """
+    Copy `table` into a new table (partitioned by month if partition_column is set),
+    then swap them: rows, id sequence, primary key, indexes and foreign keys are kept.
+    """
+    staging = f"{table}_rebuild"
+    partition_clause = f" PARTITION BY RANGE ({partition_column})" if partition_column else ""
+    op.execute(
+        f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        f"{partition_clause}"
+    )
+
+    if partition_column:
+        oldest = bind.execute(sa.text(f"SELECT MIN({partition_column}) FROM {table}")).scalar()
+        current = _month_start(date.today())
+        month = _month_start(oldest.date()) if oldest else current
+        while month <= _add_months(current, PARTITIONS_AHEAD):
+            next_month = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {staging} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+            )
+            month = next_month
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {staging} DEFAULT")
+
+    op.execute(f"INSERT INTO {staging} SELECT * FROM {table}")
+
+    # The id sequence belongs to the old table: hand it over before dropping it
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {staging}.id")
+
+    op.execute(f"DROP TABLE {table}")
+    op.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+
+    # A partitioned table's primary key and unique indexes must include the partition column
+    pk_columns = [
+        column for column in definition["pk"]["constrained_columns"] if column != partition_column
+    ]
+    if partition_column:
+        pk_columns.append(partition_column)
+    op.create_primary_key(definition["pk"]["name"] or f"{table}_pkey", table, pk_columns)
+
+    for index in definition["indexes"]:
+        columns = list(index["column_names"])
+        if index["unique"] and partition_column and partition_column not in columns:
+            columns.append(partition_column)
+        op.create_index(index["name"], table, columns, unique=index["unique"])
+
+    for fk in definition["foreign_keys"]:
+        op.create_foreign_key(
+            fk["name"],
+            table,
+            fk["referred_table"],
+            fk["constrained_columns"],
+            fk["referred_columns"],
+            ondelete=fk["options"].get("ondelete"),
+        )
+
+
+def upgrade() -> None:
+    """
+    Rebuild the log tables as monthly RANGE-partitioned tables.
+
+    One partition per month from the oldest row to PARTITIONS_AHEAD months ahead,
+    plus a DEFAULT partition. Future months are created by
+    core.log_partitions.ensure_log_partitions (daily Celery beat job); retention
+    drops whole partitions. Rows are copied once (INSERT ... SELECT).
+    PostgreSQL only; tables that do not exist are skipped.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    inspector = sa.inspect(bind)
+    for table, partition_column in LOG_TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        _rebuild(bind, table, _table_definition(inspector, table), partition_column)
+
+
+def downgrade() -> None:
+    """Rebuild the log tables as plain (non-partitioned) tables."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    inspector = sa.inspect(bind)
+    for table, partition_column in LOG_TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        definition = _table_definition(inspector, table)
+        # Back to the original primary key, without the partition column added by upgrade()
+        pk = definition["pk"]
+        pk["constrained_columns"] = [
+            column for column in pk["constrained_columns"] if column != partition_column
+        ]
+        _rebuild(bind, table, definition)
@@ -20,7 +20,6 @@ from core import get_current_user, get_db
 from models.autofill_suggestion import AutofillSuggestion
 from models.email_message import EmailMessage
 from models.person import Person
-from models.user import User
 from services.signature_parser_service import SignatureParserService
 
 logger = logging.getLogger("crm-api")
@@ -68,16 +67,17 @@ async def parse_signature(
     try:
         # Get user context
         user_id = current_user.get("user_id") or current_user.get("sub")
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        # Équipe courante: snapshot utilisateur résolu par get_current_user
+        team_id = current_user.get("team_id")
 
-        if not user or not user.team_id:
+        if not team_id:
             raise HTTPException(403, "User has no team assigned")
 
         # Parse with AI
         service = SignatureParserService(db)
         result = await service.parse_signature(
             email_body=request.email_body,
-            team_id=user.team_id,
+            team_id=team_id,
             email_id=request.email_id
         )
 
@@ -102,14 +102,15 @@ async def list_suggestions(
     """
     try:
         user_id = current_user.get("user_id") or current_user.get("sub")
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        # Équipe courante: snapshot utilisateur résolu par get_current_user
+        team_id = current_user.get("team_id")
 
-        if not user or not user.team_id:
+        if not team_id:
             raise HTTPException(403, "User has no team assigned")
 
         # Get suggestions for team
         suggestions = db.query(AutofillSuggestion).filter(
-            AutofillSuggestion.team_id == user.team_id,
+            AutofillSuggestion.team_id == team_id,
             AutofillSuggestion.status == status
         ).order_by(AutofillSuggestion.created_at.desc()).limit(50).all()
 
@@ -148,15 +149,16 @@ async def approve_suggestion(
     """
     try:
         user_id = current_user.get("user_id") or current_user.get("sub")
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        # Équipe courante: snapshot utilisateur résolu par get_current_user
+        team_id = current_user.get("team_id")
 
-        if not user or not user.team_id:
+        if not team_id:
             raise HTTPException(403, "User has no team assigned")
 
         # Get suggestion
         suggestion = db.query(AutofillSuggestion).filter(
             AutofillSuggestion.id == suggestion_id,
-            AutofillSuggestion.team_id == user.team_id
+            AutofillSuggestion.team_id == team_id
         ).first()
 
         if not suggestion:
@@ -202,15 +204,16 @@ async def reject_suggestion(
     """
     try:
         user_id = current_user.get("user_id") or current_user.get("sub")
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        # Équipe courante: snapshot utilisateur résolu par get_current_user
+        team_id = current_user.get("team_id")
 
-        if not user or not user.team_id:
+        if not team_id:
             raise HTTPException(403, "User has no team assigned")
 
         # Get suggestion
         suggestion = db.query(AutofillSuggestion).filter(
             AutofillSuggestion.id == suggestion_id,
-            AutofillSuggestion.team_id == user.team_id
+            AutofillSuggestion.team_id == team_id
         ).first()
 
         if not suggestion:
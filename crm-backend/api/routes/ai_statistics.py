@@ -17,6 +17,7 @@ from core import get_current_user, get_db
 from models.autofill_decision_log import AutofillDecisionLog
 from models.autofill_log import AutofillLog
 from models.user import User
+from services.ai_parse_cache import get_parse_cache_stats
 
 router = APIRouter(prefix="/ai", tags=["AI Statistics"])
 
@@ -84,6 +85,7 @@ async def get_autofill_statistics(
     - Latence moyenne (avg_latency_ms)
     - Mix de sources (% outlook|rules|db|llm)
     - Confiance moyenne par domaine
+    - Hit ratio du cache de parsing IA (process courant)
     """
 
     # Date de début
@@ -221,6 +223,7 @@ async def get_autofill_statistics(
         "source_mix": source_mix,
         "pattern_confidence_by_domain": pattern_confidence_by_domain,
         "top_fields": top_fields,
+        "parse_cache": get_parse_cache_stats(),
     }
 
 
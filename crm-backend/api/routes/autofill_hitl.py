@@ -19,11 +19,12 @@ from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from core import get_current_user, get_db
+from core.principal_cache import get_user_snapshot
 from models.autofill_decision_log import AutofillDecisionLog
 from models.autofill_suggestion import AutofillSuggestion
 from models.email_blacklist import EmailBlacklist
 from models.email_message import EmailMessage
-from models.user import User
+from services.autofill_matchers import invalidate_blacklist_matcher
 
 logger = logging.getLogger("crm-api")
 
@@ -430,7 +431,7 @@ async def get_audit_trail(
     for log in logs:
         user_email = None
         if log.user_id:
-            user = db.query(User).filter(User.id == log.user_id).first()
+            user = get_user_snapshot(log.user_id, db)
             if user:
                 user_email = user.email
 
@@ -557,6 +558,7 @@ async def blacklist_sender(
                 logger.info(f"🗑️  Deleted {suggestions_deleted} suggestions from blacklisted sender")
 
         db.commit()
+        invalidate_blacklist_matcher(team_id)
 
         return BlacklistSenderResponse(
             success=True,
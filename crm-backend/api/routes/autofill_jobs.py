@@ -3,7 +3,7 @@ Autofill Jobs API
 Launch and monitor batch email autofill jobs
 """
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Dict, Optional, List
 from fastapi import APIRouter, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
@@ -23,6 +23,8 @@ class StartJobRequest(BaseModel):
     max_emails: int = Field(100, ge=1, le=1000, description="Maximum emails to process")
     auto_apply_threshold: float = Field(0.92, ge=0.5, le=1.0, description="Confidence threshold for auto-apply")
     email_ids: Optional[List[int]] = Field(None, description="Optional: specific email IDs to process")
+    parse_concurrency: int = Field(4, ge=1, le=16, description="Concurrent signature parse workers")
+    enrich_concurrency: int = Field(2, ge=1, le=16, description="Concurrent web enrichment workers")
 
 
 class JobMetrics(BaseModel):
@@ -36,6 +38,7 @@ class JobMetrics(BaseModel):
     manual_review: int
     errors: int
     processing_time_ms: int
+    stages: Optional[Dict[str, Dict[str, float]]] = None
 
 
 class StartJobResponse(BaseModel):
@@ -94,7 +97,9 @@ async def start_autofill_job(
                 team_id=team_id,
                 days_back=request.days_back,
                 max_emails=request.max_emails,
-                auto_apply_threshold=request.auto_apply_threshold
+                auto_apply_threshold=request.auto_apply_threshold,
+                parse_concurrency=request.parse_concurrency,
+                enrich_concurrency=request.enrich_concurrency
             )
 
             # TODO: Store result in database for later retrieval
@@ -138,7 +143,9 @@ async def run_autofill_job_now(
         team_id=team_id,
         days_back=request.days_back,
         max_emails=request.max_emails,
-        auto_apply_threshold=request.auto_apply_threshold
+        auto_apply_threshold=request.auto_apply_threshold,
+        parse_concurrency=request.parse_concurrency,
+        enrich_concurrency=request.enrich_concurrency
     )
 
     if not result.get("success"):
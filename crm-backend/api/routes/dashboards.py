@@ -1,3 +1,4 @@
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
@@ -8,6 +9,7 @@ from core.cache import cache_response
 from models.organisation_activity import OrganisationActivityType
 from schemas.base import PaginatedResponse
 from schemas.dashboard_stats import (
+    ActivitySeriesResponse,
     GlobalDashboardStats,
     MonthlyAggregateStats,
     OrganisationMonthlyKPI,
@@ -99,6 +101,32 @@ async def get_organisation_dashboard_stats(
     return await service.get_organisation_stats(organisation_id)
 
 
+@router.get("/stats/activity-series", response_model=ActivitySeriesResponse)
+@cache_response(ttl=60, key_prefix="dashboards:activity_series")
+async def get_activity_series(
+    granularity: str = Query("day", pattern="^(day|week|month|year)$"),
+    start_date: Optional[date] = Query(None, description="Défaut: 30 jours avant end_date"),
+    end_date: Optional[date] = Query(None, description="Défaut: aujourd'hui (UTC)"),
+    organisation_id: Optional[int] = Query(None, gt=0),
+    team_id: Optional[int] = Query(None, gt=0),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Activités par période et par type, depuis les compteurs journaliers matérialisés.
+    Filtrable par organisation ou par équipe (équipe du propriétaire de l'organisation).
+    """
+    end_date = end_date or datetime.now(timezone.utc).date()
+    start_date = start_date or end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    service = DashboardStatsService(db)
+    return await service.get_activity_series(
+        granularity, start_date, end_date, organisation_id=organisation_id, team_id=team_id
+    )
+
+
 # ============= KPI MENSUELS (COMPATIBILITÉ LEGACY) =============
 
 
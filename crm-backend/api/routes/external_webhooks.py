@@ -32,6 +32,7 @@ from schemas.email import (
     UnsubscribeRequest,
     UnsubscribeResponse,
 )
+from services.email_service import EmailEventRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -217,6 +218,7 @@ async def receive_resend_webhook(
         )
         db.add(email_event)
         db.flush()
+        EmailEventRollupService(db).record([(email_send, email_event)])
 
         # 4. Mettre à jour les statistiques de l'EmailSend si nécessaire
         if event_type == EmailEventType.DELIVERED and email_send.status != "DELIVERED":
@@ -545,8 +545,10 @@ async def outlook_sync(
 
     access_token = await outlook_service.get_valid_access_token(user)
 
-    # Récupérer messages de TOUS les dossiers (folder-based, with deduplication)
-    messages = await outlook_service.get_recent_messages_from_all_folders(access_token, limit=limit, days=days)
+    # Récupérer messages de TOUS les dossiers (delta incrémental par dossier, dédupliqué)
+    messages = await outlook_service.get_recent_messages_from_all_folders(
+        access_token, limit=limit, days=days, user_id=user.id
+    )
 
     # Extraire signatures (avec filtre anti-marketing)
     signatures = outlook_service.extract_signatures_from_messages(
@@ -11,13 +11,14 @@ Ceci évite les conflits de routing FastAPI.
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from core import get_current_user, get_db
 from core.cache import invalidate_organisation_cache
 from core.events import EventType, emit_event
+from core.pagination import paginate_keyset
 from models.interaction import Interaction, InteractionParticipant, InteractionStatus, InteractionType
 from models.person import Person
 from schemas.activity_participant import ActivityParticipantResponse, ActivityWithParticipantsResponse
@@ -78,9 +79,13 @@ class SimpleInteractionCreate(BaseModel):
     response_model=List[InteractionOut],
     summary="List interactions with filters",
     operation_id="list_interactions_v2",
-    description="Get all interactions with optional filtering by type, status, date range, etc.",
+    description=(
+        "Get all interactions with optional filtering by type, status, date range, etc. "
+        "Pass the X-Next-Cursor response header back as `cursor` to fetch the next page."
+    ),
 )
 async def list_interactions(
+    response: Response,
     type: Optional[str] = Query(None, description="Filter by interaction type"),
     status: Optional[str] = Query(None, description="Filter by status"),
     org_id: Optional[int] = Query(None, description="Filter by organisation ID"),
@@ -89,13 +94,17 @@ async def list_interactions(
     end_date: Optional[datetime] = Query(None, description="Filter interactions before this date"),
     overdue: Optional[bool] = Query(None, description="Filter overdue interactions"),
     limit: int = Query(50, le=200, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (X-Next-Cursor of previous page)"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
     List all interactions with optional filters.
+
+    Keyset pagination on (created_at, id) DESC: the next page cursor is returned
+    in the X-Next-Cursor header (absent on the last page).
     """
-    query = db.query(Interaction)
+    query = db.query(Interaction).options(selectinload(Interaction.participants))
 
     # Apply filters
     if type:
@@ -123,13 +132,18 @@ async def list_interactions(
                 Interaction.next_action_at.isnot(None), Interaction.next_action_at < now
             )
 
-    # Order by most recent first
-    query = query.order_by(Interaction.created_at.desc())
-
-    # Limit results
-    interactions = query.limit(limit).all()
+    # Most recent first, tie-break on id (keyset)
+    page = paginate_keyset(
+        query,
+        [Interaction.created_at, Interaction.id],
+        cursor=cursor,
+        limit=limit,
+        descending=True,
+    )
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
 
-    return interactions
+    return page.items
 
 
 # 2️⃣ POST /create-v2 - Create interaction V2 (route statique avant dynamiques)
@@ -5,77 +5,68 @@ Endpoints:
 - GET /api/v1/legal/documents/{document_type}/pdf - Télécharger PDF d'un document légal
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
 from typing import Literal
 
-from services.pdf_generator import LegalDocumentPDFGenerator
+from services.pdf_generator import get_legal_document_pdf
 
 router = APIRouter(prefix="/legal", tags=["legal"])
 
+# Les PDFs changent au plus une fois par jour (date affichée) ou à chaque version
+LEGAL_PDF_MAX_AGE = 3600
+
 
 @router.get("/documents/{document_type}/pdf")
 async def download_legal_document_pdf(
-    document_type: Literal["cgu", "cgv", "dpa", "privacy"]
-) -> StreamingResponse:
+    document_type: Literal["cgu", "cgv", "dpa", "privacy"],
+    request: Request,
+) -> Response:
     """
     Télécharge le PDF d'un document légal.
 
+    Servi depuis le cache de rendu (services.pdf_generator.get_legal_document_pdf);
+    répond 304 si l'ETag envoyé dans If-None-Match est toujours valide.
+
     Args:
         document_type: Type de document (cgu, cgv, dpa, privacy)
 
     Returns:
-        StreamingResponse: PDF téléchargeable
+        Response: PDF téléchargeable (ou 304 Not Modified)
 
     Raises:
         HTTPException 400: Type de document invalide
         HTTPException 500: Erreur génération PDF
     """
     try:
-        generator = LegalDocumentPDFGenerator()
-
-        # Génération du PDF selon le type
-        if document_type == "cgu":
-            pdf_buffer = generator.generate_cgu_pdf()
-            filename = "CGU_Alforis_Finance.pdf"
-            title = "Conditions Générales d'Utilisation"
-        elif document_type == "cgv":
-            pdf_buffer = generator.generate_cgv_pdf()
-            filename = "CGV_Alforis_Finance.pdf"
-            title = "Conditions Générales de Vente"
-        elif document_type == "dpa":
-            pdf_buffer = generator.generate_dpa_pdf()
-            filename = "DPA_Alforis_Finance.pdf"
-            title = "Data Processing Agreement"
-        elif document_type == "privacy":
-            pdf_buffer = generator.generate_privacy_pdf()
-            filename = "Privacy_Policy_Alforis_Finance.pdf"
-            title = "Politique de Confidentialité"
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Type de document invalide: {document_type}. Valeurs acceptées: cgu, cgv, dpa, privacy",
-            )
-
-        # Headers pour téléchargement
-        headers = {
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Type": "application/pdf",
-            "X-Document-Title": title,
-        }
-
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers=headers,
+        # Rendu (premier appel du jour) hors de la boucle d'événements
+        document = await run_in_threadpool(get_legal_document_pdf, document_type)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Type de document invalide: {document_type}. Valeurs acceptées: cgu, cgv, dpa, privacy",
         )
-
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la génération du PDF: {str(e)}",
         )
 
+    # Headers pour téléchargement et revalidation
+    headers = {
+        "Content-Disposition": f'attachment; filename="{document.filename}"',
+        "X-Document-Title": document.title,
+        "ETag": document.etag,
+        "Cache-Control": f"public, max-age={LEGAL_PDF_MAX_AGE}",
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if document.etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=document.content, media_type="application/pdf", headers=headers)
+
 
 @router.get("/documents/available")
 async def list_available_legal_documents():
@@ -18,6 +18,7 @@ from sqlalchemy.orm import Session
 
 from core.database import get_db
 from core.auth import get_current_user
+from core.principal_cache import principal_cache
 from models.user import User
 from models.task import Task, TaskStatus
 from models.notification import Notification
@@ -124,6 +125,24 @@ def get_supervisord_status() -> Dict[str, Any]:
         return {"error": str(e), "status": "error"}
 
 
+def get_access_log_metrics() -> Dict[str, Any]:
+    """
+    État du writer des logs d'accès RGPD (file mémoire + flush par lots)
+
+    Returns:
+        Dict avec profondeur de file et latences de flush
+    """
+    try:
+        from middleware.rgpd_logging import access_log_writer
+
+        stats = access_log_writer.stats()
+        backlog = stats["queue_depth"] >= access_log_writer.max_queue // 2
+        stats["status"] = "warning" if backlog or stats["dropped_total"] else "healthy"
+        return stats
+    except Exception as e:
+        return {"error": str(e), "status": "error"}
+
+
 def get_database_metrics(db: Session) -> Dict[str, Any]:
     """
     Collecte les métriques de base de données
@@ -236,6 +255,7 @@ async def monitoring_health(
         system = get_system_metrics()
         database = get_database_metrics(db)
         workers = get_supervisord_status()
+        access_log = get_access_log_metrics()
         errors = get_recent_errors(db, limit=10)
 
         # Déterminer le statut global
@@ -248,6 +268,8 @@ async def monitoring_health(
             statuses.append(database["status"])
         if "status" in workers:
             statuses.append(workers["status"])
+        if "status" in access_log:
+            statuses.append(access_log["status"])
 
         # Statut global : critical > warning > degraded > healthy
         if "critical" in statuses:
@@ -265,6 +287,8 @@ async def monitoring_health(
             "system": system,
             "database": database,
             "workers": workers,
+            "access_log": access_log,
+            "auth_cache": principal_cache.stats(),
             "errors": errors,
             "uptime": "N/A",  # TODO: implémenter uptime tracking
         }
@@ -407,3 +431,22 @@ async def get_gdpr_stats(
             "error": str(e),
             "status": "error"
         }
+
+
+@router.get("/queries")
+async def get_query_fingerprints(
+    limit: int = 50,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Requêtes SQL les plus coûteuses (empreintes normalisées, cumul depuis le démarrage)
+
+    Returns:
+        Liste triée par temps total (count, avg_ms, max_ms, statement)
+    """
+    from core.query_profiler import get_fingerprint_stats
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "fingerprints": get_fingerprint_stats(limit=limit),
+    }
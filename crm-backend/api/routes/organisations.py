@@ -116,6 +116,8 @@ def _extract_user_id(current_user: dict) -> Optional[int]:
 async def list_organisations(
     skip: int = Query(0, ge=0, description="Nombre d'éléments à sauter"),
     limit: int = Query(50, ge=1, le=200, description="Nombre d'éléments par page"),
+    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente"),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$", description="Mode de calcul du total"),
     category: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None, description="Filtrer par statut actif"),
     country_code: Optional[str] = Query(None, min_length=2, max_length=2),
@@ -126,6 +128,11 @@ async def list_organisations(
     """
     Lister toutes les organisations avec pagination et filtres
 
+    Pagination:
+    - skip/limit (offset) ou cursor/limit (keyset, coût constant en profondeur)
+    - next_cursor est renvoyé tant qu'il reste des éléments
+    - count: exact | estimate | none
+
     Filtres disponibles:
     - category: Institution, Wholesale, SDG, CGPI, Autres
     - is_active: true/false
@@ -144,6 +151,17 @@ async def list_organisations(
     if language:
         filters["language"] = language.upper()
 
+    if cursor or count != "exact":
+        page = await service.get_page(cursor=cursor, limit=limit, filters=filters, total=count)
+        return {
+            "items": [OrganisationResponse.model_validate(item) for item in page.items],
+            "total": page.total,
+            "total_is_estimate": page.total_is_estimate,
+            "skip": 0,
+            "limit": limit,
+            "next_cursor": page.next_cursor,
+        }
+
     items, total = await service.get_all(skip=skip, limit=limit, filters=filters)
 
     return {
@@ -151,6 +169,7 @@ async def list_organisations(
         "total": total,
         "skip": skip,
         "limit": limit,
+        "next_cursor": service.cursor_after(items) if skip + len(items) < total else None,
     }
 
 
@@ -113,6 +113,8 @@ def _extract_user_id(current_user: dict) -> Optional[int]:
 async def list_people(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente"),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$", description="Mode de calcul du total"),
     q: Optional[str] = Query(None, description="Recherche par nom, prénom ou email"),
     organization_type: Optional[OrganisationType] = Query(
         None, description="Filtrer par type d'organisation"
@@ -148,14 +150,27 @@ async def list_people(
 
     if q:
         people, total = await service.search(q, skip=skip, limit=limit)
+        next_cursor = None
+    elif cursor or count != "exact":
+        page = await service.get_page(cursor=cursor, limit=limit, total=count)
+        return {
+            "items": [PersonResponse.model_validate(person) for person in page.items],
+            "total": page.total,
+            "total_is_estimate": page.total_is_estimate,
+            "skip": 0,
+            "limit": limit,
+            "next_cursor": page.next_cursor,
+        }
     else:
         people, total = await service.get_all(skip=skip, limit=limit)
+        next_cursor = service.cursor_after(people) if skip + len(people) < total else None
 
     return {
         "items": [PersonResponse.model_validate(person) for person in people],
         "total": total,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
     }
 
 
@@ -9,12 +9,20 @@ Expose des métriques au format OpenMetrics/Prometheus:
 
 Usage:
     GET /metrics -> Format Prometheus (text/plain)
+
+Les métriques HTTP sont alimentées par middleware.http_metrics (par requête).
+Les métriques système/métier sont rafraîchies par un collecteur de fond
+(run_metrics_collector, toutes les METRICS_REFRESH_SECONDS): un scrape ne fait
+que sérialiser le registre.
 """
 
+import asyncio
+import logging
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Response
 from prometheus_client import (
     Counter,
     Gauge,
@@ -25,10 +33,17 @@ from prometheus_client import (
     CollectorRegistry,
     REGISTRY,
 )
-from sqlalchemy import text, func
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from core.database import get_db
+from core.database import SessionLocal
+from core.pagination import estimated_count
+
+logger = logging.getLogger(__name__)
+
+# Période de rafraîchissement des métriques système/métier (secondes)
+METRICS_REFRESH_SECONDS = 60
+_last_collected_at = 0.0
 
 # Import optionnel de psutil
 try:
@@ -63,24 +78,13 @@ system_disk_used_bytes = Gauge('system_disk_used_bytes', 'Disk used in bytes')
 system_disk_total_bytes = Gauge('system_disk_total_bytes', 'Total disk in bytes')
 
 # --- Métriques HTTP (FastAPI) ---
-http_requests_total = Counter(
-    'http_requests_total',
-    'Total HTTP requests',
-    ['method', 'endpoint', 'status']
-)
-http_request_duration_seconds = Histogram(
-    'http_request_duration_seconds',
-    'HTTP request duration',
-    ['method', 'endpoint']
-)
+# Définies et alimentées par le middleware pure ASGI (labels = route template)
+from middleware.http_metrics import http_request_duration_seconds, http_requests_total  # noqa: E402
 
 # --- Métriques Base de Données ---
 db_connections_active = Gauge('db_connections_active', 'Active database connections')
-db_query_duration_seconds = Histogram(
-    'db_query_duration_seconds',
-    'Database query duration',
-    ['query_type']
-)
+# Alimentée par core.query_profiler (listeners SQLAlchemy)
+from core.query_profiler import db_query_duration_seconds  # noqa: E402
 
 # --- Métriques Cache Redis ---
 cache_hits_total = Counter('cache_hits_total', 'Total cache hits')
@@ -88,6 +92,16 @@ cache_misses_total = Counter('cache_misses_total', 'Total cache misses')
 cache_keys_count = Gauge('cache_keys_count', 'Number of keys in cache')
 cache_memory_bytes = Gauge('cache_memory_bytes', 'Cache memory usage in bytes')
 
+# --- Métriques logs d'accès RGPD (writer par lots) ---
+access_log_queue_depth = Gauge('rgpd_access_log_queue_depth', 'RGPD access log rows waiting to be flushed')
+access_log_flushed_rows = Gauge('rgpd_access_log_flushed_rows', 'RGPD access log rows written since startup')
+access_log_dropped_rows = Gauge('rgpd_access_log_dropped_rows', 'RGPD access log rows dropped (queue full)')
+access_log_flush_seconds = Gauge(
+    'rgpd_access_log_flush_seconds',
+    'RGPD access log batch flush duration',
+    ['stat']
+)
+
 # --- Métriques Métier ---
 tasks_total = Gauge('tasks_total', 'Total number of tasks', ['status'])
 tasks_created_24h = Gauge('tasks_created_last_24h', 'Tasks created in last 24 hours')
@@ -141,7 +155,7 @@ def collect_system_metrics():
 def collect_database_metrics(db: Session):
     """Collecte les métriques base de données"""
     try:
-        from models.task import Task, TaskStatus
+        from core.task_stats import get_task_stats
         from models.interaction import Interaction
         from models.organisation import Organisation
         from models.person import Person
@@ -160,35 +174,24 @@ def collect_database_metrics(db: Session):
         now = datetime.now(timezone.utc)
         yesterday = now - timedelta(hours=24)
 
-        # Tasks
-        tasks_by_status = db.query(Task.status, func.count(Task.id)).group_by(Task.status).all()
-        for status, count in tasks_by_status:
-            tasks_total.labels(status=status.value if status else 'unknown').set(count)
-
-        tasks_created_24h.set(
-            db.query(Task).filter(Task.created_at >= yesterday).count()
-        )
-        tasks_completed_24h.set(
-            db.query(Task)
-            .filter(Task.created_at >= yesterday, Task.status == TaskStatus.DONE)
-            .count()
-        )
-        tasks_failed_24h.set(
-            db.query(Task)
-            .filter(Task.created_at >= yesterday, Task.status == TaskStatus.CANCELLED)
-            .count()
-        )
+        # Tasks (même moteur que /tasks/stats: une requête, cache partagé)
+        task_stats = get_task_stats(db)
+        for status, count in task_stats['by_status'].items():
+            tasks_total.labels(status=status).set(count)
+        tasks_created_24h.set(task_stats['created_last_24h'])
+        tasks_completed_24h.set(task_stats['completed_last_24h'])
+        tasks_failed_24h.set(task_stats['cancelled_last_24h'])
 
         # Interactions
-        interactions_total.set(db.query(Interaction).count())
+        interactions_total.set(estimated_count(db, Interaction))
         interactions_created_24h.set(
             db.query(Interaction).filter(Interaction.created_at >= yesterday).count()
         )
 
         # Business entities
-        organisations_total.set(db.query(Organisation).count())
-        people_total.set(db.query(Person).count())
-        users_total.set(db.query(User).count())
+        organisations_total.set(estimated_count(db, Organisation))
+        people_total.set(estimated_count(db, Person))
+        users_total.set(estimated_count(db, User))
 
         # Active users (ayant une activité dans les 24h)
         # Note: nécessiterait un champ last_activity_at sur User
@@ -217,6 +220,23 @@ def collect_cache_metrics():
         pass  # Silent fail
 
 
+def collect_access_log_metrics():
+    """Collecte l'état du writer des logs d'accès RGPD"""
+    try:
+        from middleware.rgpd_logging import access_log_writer
+
+        stats = access_log_writer.stats()
+        access_log_queue_depth.set(stats['queue_depth'])
+        access_log_flushed_rows.set(stats['flushed_total'])
+        access_log_dropped_rows.set(stats['dropped_total'])
+        access_log_flush_seconds.labels(stat='last').set(stats['last_flush_ms'] / 1000)
+        access_log_flush_seconds.labels(stat='avg').set(stats['avg_flush_ms'] / 1000)
+        access_log_flush_seconds.labels(stat='max').set(stats['max_flush_ms'] / 1000)
+
+    except Exception:
+        pass  # Silent fail
+
+
 def collect_celery_metrics():
     """Collecte les métriques Celery"""
     try:
@@ -230,10 +250,33 @@ def collect_celery_metrics():
         pass
 
 
+def collect_all_metrics():
+    """Rafraîchit les métriques système/métier (bloquant: appelé hors event loop)"""
+    global _last_collected_at
+
+    collect_system_metrics()
+    db = SessionLocal()
+    try:
+        collect_database_metrics(db)
+    finally:
+        db.close()
+    collect_cache_metrics()
+    collect_celery_metrics()
+    _last_collected_at = time.monotonic()
+
+
+async def run_metrics_collector(interval: int = METRICS_REFRESH_SECONDS):
+    """Collecteur de fond (lancé dans le lifespan)"""
+    while True:
+        try:
+            await asyncio.to_thread(collect_all_metrics)
+        except Exception as e:
+            logger.warning(f"Metrics collection failed: {e}")
+        await asyncio.sleep(interval)
+
+
 @router.get("/metrics")
-async def metrics_endpoint(
-    db: Session = Depends(get_db),
-):
+async def metrics_endpoint():
     """
     Endpoint Prometheus metrics (format OpenMetrics)
 
@@ -243,11 +286,12 @@ async def metrics_endpoint(
     Returns:
         Response: Métriques au format text/plain (Prometheus)
     """
-    # Collecte de toutes les métriques
-    collect_system_metrics()
-    collect_database_metrics(db)
-    collect_cache_metrics()
-    collect_celery_metrics()
+    # Snapshot périmé (collecteur de fond absent): rafraîchir hors event loop
+    if time.monotonic() - _last_collected_at > 2 * METRICS_REFRESH_SECONDS:
+        await asyncio.to_thread(collect_all_metrics)
+
+    # Métriques en mémoire (coût négligeable)
+    collect_access_log_metrics()
 
     # Génération du format Prometheus
     metrics_output = generate_latest(REGISTRY)
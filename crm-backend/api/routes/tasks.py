@@ -111,12 +111,14 @@ async def list_tasks(
 
 @router.get("/stats", response_model=TaskStatsResponse)
 async def get_task_stats(
+    assigned_to: Optional[int] = Query(None, description="Limiter aux tâches de cet utilisateur"),
+    team_id: Optional[int] = Query(None, description="Limiter aux tâches de cette équipe"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """Obtenir les statistiques des tâches"""
     service = TaskService(db)
-    stats = await service.get_statistics()
+    stats = await service.get_statistics(assigned_to=assigned_to, team_id=team_id)
     return TaskStatsResponse(**stats)
 
 
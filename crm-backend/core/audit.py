@@ -2,19 +2,41 @@
 Audit Trail - Traçabilité automatique des modifications
 
 Decorator et helpers pour logger automatiquement les changements critiques
+
+Moteur par lots:
+- un seul snapshot (colonnes modifiées uniquement) par requête
+- diff de tous les champs en une passe
+- toutes les lignes d'audit écrites en un INSERT multi-lignes
+  * mode "transaction" (défaut): dans la transaction de l'appelant (au commit)
+  * mode "async": mises en file, écrites hors du chemin de la réponse
 """
 
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import Request
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+AUDIT_MODE_TRANSACTION = "transaction"
+AUDIT_MODE_ASYNC = "async"
+
+# Clé de Session.info où sont stockées les lignes d'audit en attente du commit
+_PENDING_KEY = "audit_pending_rows"
+# Clé de Session.info: listeners d'écriture déjà attachés à cette session
+_LISTENING_KEY = "audit_listeners"
+
+_audit_log_writer = None
+
+# Fenêtre par défaut des consultations de l'audit trail: borne la colonne de
+# partition (audit_logs partitionnée par mois) pour ne lire que les mois récents
+AUDIT_HISTORY_DAYS = 365
+
 
 # ============================================================================
 # Création d'entrée d'audit
@@ -122,12 +144,101 @@ def detect_changes(old_obj: Any, new_data: Dict[str, Any]) -> Dict[str, tuple]:
     return changes
 
 
+# ============================================================================
+# Moteur par lots
+# ============================================================================
+
+
+def build_audit_rows(
+    entity_type: str,
+    entity_id: int,
+    action: str,
+    changes: Optional[Dict[str, tuple]] = None,
+    user_id: Optional[int] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Construit les lignes audit_logs d'une action (une par champ modifié pour update)
+
+    Returns:
+        Liste de dicts prêts pour un INSERT multi-lignes
+    """
+    base = {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "user_id": user_id,
+        "ip_address": ip_address,
+        "user_agent": user_agent[:500] if user_agent else None,
+        "created_at": datetime.utcnow(),
+    }
+
+    if action != "update":
+        return [{**base, "field_name": None, "old_value": None, "new_value": None}]
+
+    return [
+        {
+            **base,
+            "field_name": field,
+            "old_value": _serialize_value(old_value),
+            "new_value": _serialize_value(new_value),
+        }
+        for field, (old_value, new_value) in (changes or {}).items()
+    ]
+
+
+def write_audit_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """INSERT multi-lignes dans la transaction courante (sans commit)"""
+    from models.audit_log import AuditLog
+
+    if rows:
+        db.execute(insert(AuditLog.__table__), rows)
+
+
+def stage_audit_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Attache des lignes d'audit à la session: écrites au prochain commit, oubliées au rollback
+
+    Les listeners sont attachés à cette session seulement (pas à la classe Session):
+    les commits des sessions sans audit en attente n'en paient pas le coût.
+    """
+    if not rows:
+        return
+    db.info.setdefault(_PENDING_KEY, []).extend(rows)
+    if not db.info.get(_LISTENING_KEY):
+        event.listen(db, "before_commit", _write_pending_audit_rows)
+        event.listen(db, "after_rollback", _discard_pending_audit_rows)
+        db.info[_LISTENING_KEY] = True
+
+
+def _write_pending_audit_rows(session: Session):
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        write_audit_rows(session, rows)
+
+
+def _discard_pending_audit_rows(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_audit_log_writer():
+    """Writer par lots du mode async (démarré/drainé dans le lifespan)"""
+    global _audit_log_writer
+    if _audit_log_writer is None:
+        from core.batch_writer import BatchedInsertWriter
+        from models.audit_log import AuditLog
+
+        _audit_log_writer = BatchedInsertWriter("audit_log", AuditLog.__table__)
+    return _audit_log_writer
+
+
 # ============================================================================
 # Decorator pour audit automatique
 # ============================================================================
 
 
-def audit_changes(entity_type: str, action: str = "update"):
+def audit_changes(entity_type: str, action: str = "update", mode: str = AUDIT_MODE_TRANSACTION):
     """
     Decorator pour auditer automatiquement les modifications
 
@@ -146,10 +257,12 @@ def audit_changes(entity_type: str, action: str = "update"):
             return person
 
     Le decorator va automatiquement:
-    1. Capturer l'état AVANT
-    2. Laisser la fonction s'exécuter
-    3. Capturer l'état APRÈS
-    4. Logger les différences dans audit_logs
+    1. Capturer l'état AVANT (un snapshot des seuls champs envoyés)
+    2. Calculer le diff de tous les champs en une passe
+    3. Laisser la fonction s'exécuter
+    4. Écrire toutes les lignes en un INSERT multi-lignes:
+       - mode="transaction": au commit de la fonction (même transaction)
+       - mode="async": après la réponse, via le writer par lots
     """
 
     def decorator(func: Callable):
@@ -163,66 +276,60 @@ def audit_changes(entity_type: str, action: str = "update"):
             # Extraire entity_id (premier arg ou dans kwargs)
             entity_id = args[0] if args else kwargs.get("id") or kwargs.get(f"{entity_type}_id")
 
-            # Capturer état AVANT (si update/delete)
-            old_obj = None
-            if action in ("update", "delete") and db and entity_id:
-                old_obj = _get_entity(db, entity_type, entity_id)
-
-            # Exécuter la fonction
-            result = await func(*args, **kwargs)
-
-            # Logger l'audit APRÈS
-            if db and entity_id:
-                user_id = current_user.id if current_user else None
-                ip_address = request.client.host if request else None
-                user_agent = request.headers.get("User-Agent") if request else None
-
-                if action == "create":
-                    # Create: logger juste l'action
-                    create_audit_log(
-                        db=db,
-                        entity_type=entity_type,
-                        entity_id=entity_id,
-                        action="create",
-                        user_id=user_id,
-                        ip_address=ip_address,
-                        user_agent=user_agent,
-                    )
-
-                elif action == "update" and old_obj:
-                    # Update: logger chaque champ modifié
-                    new_data = kwargs.get("data")
-                    if hasattr(new_data, "dict"):
-                        new_data = new_data.dict(exclude_unset=True)
-
-                    if new_data:
-                        changes = detect_changes(old_obj, new_data)
-
-                        for field, (old_val, new_val) in changes.items():
-                            create_audit_log(
-                                db=db,
-                                entity_type=entity_type,
-                                entity_id=entity_id,
-                                action="update",
-                                field_name=field,
-                                old_value=old_val,
-                                new_value=new_val,
-                                user_id=user_id,
-                                ip_address=ip_address,
-                                user_agent=user_agent,
-                            )
-
-                elif action == "delete":
-                    # Delete: logger l'action
-                    create_audit_log(
-                        db=db,
-                        entity_type=entity_type,
-                        entity_id=entity_id,
-                        action="delete",
-                        user_id=user_id,
-                        ip_address=ip_address,
-                        user_agent=user_agent,
-                    )
+            if not (db and entity_id):
+                return await func(*args, **kwargs)
+
+            user_id = current_user.id if current_user else None
+            ip_address = request.client.host if request and request.client else None
+            user_agent = request.headers.get("User-Agent") if request else None
+
+            # Snapshot AVANT + diff (update uniquement)
+            rows: List[Dict[str, Any]] = []
+            if action == "update":
+                new_data = kwargs.get("data")
+                if hasattr(new_data, "dict"):
+                    new_data = new_data.dict(exclude_unset=True)
+
+                if new_data:
+                    snapshot = _snapshot_entity(db, entity_type, entity_id, list(new_data))
+                    if snapshot is not None:
+                        rows = build_audit_rows(
+                            entity_type,
+                            entity_id,
+                            "update",
+                            changes=detect_changes(snapshot, new_data),
+                            user_id=user_id,
+                            ip_address=ip_address,
+                            user_agent=user_agent,
+                        )
+            elif action in ("create", "delete"):
+                rows = build_audit_rows(
+                    entity_type,
+                    entity_id,
+                    action,
+                    user_id=user_id,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                )
+
+            if mode == AUDIT_MODE_ASYNC:
+                result = await func(*args, **kwargs)
+                writer = get_audit_log_writer()
+                for row in rows:
+                    writer.enqueue(row)
+                return result
+
+            # Mode transaction: lignes écrites au commit de la fonction
+            stage_audit_rows(db, rows)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                db.info.pop(_PENDING_KEY, None)
+                raise
+
+            # La fonction n'a pas commité: on écrit et commite nous-mêmes
+            if db.info.get(_PENDING_KEY):
+                db.commit()
 
             return result
 
@@ -231,8 +338,31 @@ def audit_changes(entity_type: str, action: str = "update"):
     return decorator
 
 
-def _get_entity(db: Session, entity_type: str, entity_id: int):
-    """Helper pour récupérer une entité par type"""
+class _Snapshot:
+    """Valeurs AVANT d'une entité (attributs limités aux champs demandés)"""
+
+    def __init__(self, values: Dict[str, Any]):
+        self.__dict__.update(values)
+
+
+def _snapshot_entity(db: Session, entity_type: str, entity_id: int, fields: List[str]):
+    """Lit uniquement les colonnes `fields` de l'entité (une requête), None si introuvable"""
+    model = _get_model(entity_type)
+    if not model:
+        return None
+
+    columns = [getattr(model, field) for field in fields if field in model.__table__.columns]
+    if not columns:
+        return _Snapshot({}) if db.query(model.id).filter(model.id == entity_id).first() else None
+
+    row = db.query(*columns).filter(model.id == entity_id).first()
+    if row is None:
+        return None
+    return _Snapshot(dict(row._mapping))
+
+
+def _get_model(entity_type: str):
+    """Modèle SQLAlchemy associé à un type d'entité"""
     from models.email import EmailCampaign
     from models.organisation import Organisation
     from models.person import Person
@@ -245,7 +375,12 @@ def _get_entity(db: Session, entity_type: str, entity_id: int):
         "campaign": EmailCampaign,
     }
 
-    model = entity_map.get(entity_type)
+    return entity_map.get(entity_type)
+
+
+def _get_entity(db: Session, entity_type: str, entity_id: int):
+    """Helper pour récupérer une entité par type"""
+    model = _get_model(entity_type)
     if not model:
         return None
 
@@ -257,7 +392,29 @@ def _get_entity(db: Session, entity_type: str, entity_id: int):
 # ============================================================================
 
 
-def get_audit_history(db: Session, entity_type: str, entity_id: int, limit: int = 100):
+def _recent_audit_logs(db: Session, criteria: List[Any], limit: int, days: Optional[int]):
+    """Lignes d'audit filtrées, bornées aux `days` derniers jours (partition pruning)"""
+    from models.audit_log import AuditLog
+
+    if days is not None:
+        criteria = [*criteria, AuditLog.created_at >= datetime.utcnow() - timedelta(days=days)]
+
+    return (
+        db.query(AuditLog)
+        .filter(*criteria)
+        .order_by(AuditLog.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def get_audit_history(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    limit: int = 100,
+    days: Optional[int] = AUDIT_HISTORY_DAYS,
+):
     """
     Récupère l'historique d'audit pour une entité
 
@@ -266,24 +423,21 @@ def get_audit_history(db: Session, entity_type: str, entity_id: int, limit: int
         entity_type: Type d'entité
         entity_id: ID de l'entité
         limit: Nombre max d'entrées
+        days: Fenêtre en jours (None = tout l'historique, toutes les partitions)
 
     Returns:
         Liste d'AuditLog triée par date DESC
     """
     from models.audit_log import AuditLog
 
-    logs = (
-        db.query(AuditLog)
-        .filter(AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id)
-        .order_by(AuditLog.created_at.desc())
-        .limit(limit)
-        .all()
+    return _recent_audit_logs(
+        db, [AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id], limit, days
     )
 
-    return logs
-
 
-def get_user_activity(db: Session, user_id: int, limit: int = 100):
+def get_user_activity(
+    db: Session, user_id: int, limit: int = 100, days: Optional[int] = AUDIT_HISTORY_DAYS
+):
     """
     Récupère l'activité d'un utilisateur
 
@@ -291,21 +445,14 @@ def get_user_activity(db: Session, user_id: int, limit: int = 100):
         db: Session SQLAlchemy
         user_id: ID de l'utilisateur
         limit: Nombre max d'entrées
+        days: Fenêtre en jours (None = tout l'historique, toutes les partitions)
 
     Returns:
         Liste d'AuditLog triée par date DESC
     """
     from models.audit_log import AuditLog
 
-    logs = (
-        db.query(AuditLog)
-        .filter(AuditLog.user_id == user_id)
-        .order_by(AuditLog.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-
-    return logs
+    return _recent_audit_logs(db, [AuditLog.user_id == user_id], limit, days)
 
 
 # ============================================================================
@@ -0,0 +1,289 @@
+"""
+Batch Writer - Écriture append-only en lots, hors du chemin de la requête
+
+Les lignes sont mises en file en mémoire (O(1), sans I/O) puis insérées par lots
+(INSERT multi-lignes, une transaction par lot) par une tâche de fond:
+- toutes les `flush_interval` secondes
+- ou dès que `max_batch` lignes sont en attente
+- et une dernière fois au shutdown (drain)
+
+Usage:
+    writer = BatchedInsertWriter("rgpd_access_log", DataAccessLog.__table__)
+
+    # Lifespan
+    await writer.start()
+    ...
+    await writer.stop()
+
+    # Hot path
+    writer.enqueue({"entity_type": "person", "entity_id": 42, ...})
+
+Si la tâche de fond ne tourne pas (scripts, tests sans lifespan), l'appelant
+peut flusher lui-même via `flush()`.
+
+Lignes invalides: un lot rejeté par la base (contrainte, valeur trop longue...)
+est coupé en deux récursivement pour isoler les lignes fautives; les autres sont
+écrites. Une ligne fautive est réessayée aux cycles suivants (en fin de file,
+sans bloquer les autres) puis mise en dead-letter après `max_attempts` échecs.
+Une erreur de connexion (base indisponible) remet le lot entier en tête de file.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 500
+DEFAULT_FLUSH_INTERVAL = 0.25  # secondes
+DEFAULT_MAX_QUEUE = 50000
+DEFAULT_MAX_ATTEMPTS = 3
+DEAD_LETTER_KEEP = 1000
+
+# Erreurs de connexion/base indisponible: tout le lot est réessayé tel quel
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError)
+
+
+class BatchedInsertWriter:
+    """File mémoire + flush par lots vers une table (append-only)"""
+
+    def __init__(
+        self,
+        name: str,
+        table: Table,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.name = name
+        self.table = table
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_attempts = max(1, max_attempts)
+        self._session_factory = session_factory
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        # Échecs par ligne rejetée (clé: id de la ligne en file)
+        self._attempts: Dict[int, int] = {}
+        # Dernières lignes abandonnées, pour diagnostic
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=DEAD_LETTER_KEEP)
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        self.flushed_total = 0
+        self.dropped_total = 0
+        self.failed_flushes = 0
+        self.rejected_total = 0
+        self.dead_lettered_total = 0
+        self.flush_count = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """Met une ligne en file (thread-safe). False si la file est pleine (ligne perdue)."""
+        if len(self._queue) >= self.max_queue:
+            self.dropped_total += 1
+            if self.dropped_total % 1000 == 1:
+                logger.error(f"{self.name}: queue full ({self.max_queue}), dropping rows")
+            return False
+
+        self._queue.append(row)
+
+        if len(self._queue) >= self.max_batch and self._wake is not None and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # Boucle fermée: le drain au shutdown s'en charge
+        return True
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def _open_session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from core.database import SessionLocal
+
+        return SessionLocal()
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        db = self._open_session()
+        try:
+            db.execute(insert(self.table), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_bisect(
+        self, rows: List[Dict[str, Any]]
+    ) -> Tuple[int, List[Tuple[Dict[str, Any], Exception]]]:
+        """
+        Insère `rows`; si la base rejette le lot, le coupe en deux jusqu'à isoler
+        les lignes fautives
+
+        Returns:
+            (lignes écrites, [(ligne rejetée, erreur)])
+
+        Raises:
+            TRANSIENT_ERRORS: base indisponible, rien n'est isolé
+        """
+        try:
+            self._insert(rows)
+            if self._attempts:
+                for row in rows:
+                    self._attempts.pop(id(row), None)
+            return len(rows), []
+        except TRANSIENT_ERRORS:
+            raise
+        except Exception as e:
+            if len(rows) == 1:
+                return 0, [(rows[0], e)]
+
+        middle = len(rows) // 2
+        written_left, rejected_left = self._insert_bisect(rows[:middle])
+        written_right, rejected_right = self._insert_bisect(rows[middle:])
+        return written_left + written_right, rejected_left + rejected_right
+
+    def _reject(self, row: Dict[str, Any], error: Exception, retry: List[Dict[str, Any]]):
+        """Ligne rejetée: réessayée au prochain cycle, dead-letter après max_attempts"""
+        self.rejected_total += 1
+        attempts = self._attempts.pop(id(row), 0) + 1
+        if attempts < self.max_attempts:
+            self._attempts[id(row)] = attempts
+            retry.append(row)
+            return
+
+        self.dead_letters.append(row)
+        self.dead_lettered_total += 1
+        logger.error(
+            f"{self.name}: row dead-lettered after {attempts} attempts: {error} (row={row!r})"
+        )
+
+    def flush(self) -> int:
+        """Insère toutes les lignes en attente (lots de max_batch). Bloquant."""
+        written = 0
+        retry: List[Dict[str, Any]] = []
+        with self._flush_lock:
+            while self._queue:
+                batch: List[Dict[str, Any]] = []
+                while self._queue and len(batch) < self.max_batch:
+                    batch.append(self._queue.popleft())
+
+                start = time.perf_counter()
+                try:
+                    batch_written, rejected = self._insert_bisect(batch)
+                except TRANSIENT_ERRORS as e:
+                    # Remise en tête de file: réessayé au prochain cycle
+                    self._queue.extendleft(reversed(batch))
+                    self.failed_flushes += 1
+                    logger.error(f"{self.name}: flush of {len(batch)} rows failed: {e}")
+                    break
+
+                if rejected:
+                    self.failed_flushes += 1
+                    logger.error(
+                        f"{self.name}: {len(rejected)}/{len(batch)} rows rejected: {rejected[0][1]}"
+                    )
+                    for row, error in rejected:
+                        self._reject(row, error, retry)
+
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.flush_count += 1
+                self.flushed_total += batch_written
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+                written += batch_written
+
+            # Lignes rejetées: en fin de file, réessayées au prochain cycle
+            self._queue.extend(retry)
+
+        return written
+
+    # ------------------------------------------------------------------
+    # Tâche de fond
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=f"batch-writer-{self.name}")
+        logger.info(
+            f"{self.name}: batch writer started "
+            f"(max_batch={self.max_batch}, interval={self.flush_interval}s)"
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            if self._queue:
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    logger.error(f"{self.name}: background flush error: {e}")
+
+    async def stop(self):
+        """Arrête la tâche de fond puis draine la file"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending = len(self._queue)
+        if pending:
+            await asyncio.to_thread(self.flush)
+        logger.info(f"{self.name}: batch writer stopped ({pending} rows drained)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "running": self.running,
+            "queue_depth": len(self._queue),
+            "flushed_total": self.flushed_total,
+            "dropped_total": self.dropped_total,
+            "failed_flushes": self.failed_flushes,
+            "rejected_total": self.rejected_total,
+            "dead_lettered_total": self.dead_lettered_total,
+            "flush_count": self.flush_count,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flush_count, 2) if self.flush_count else 0.0,
+        }
@@ -17,10 +17,18 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./crm_test.db"
     database_echo: bool = False
+    # Instrumentation SQL (core/query_profiler.py)
+    query_profiler_enabled: bool = True
+    slow_query_ms: int = 500  # Seuil slow-query log + capture EXPLAIN
+    n_plus_one_threshold: int = 10  # Même SELECT répété N fois dans une requête HTTP
 
     # JWT
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
+    # Cache des principals authentifiés (token → payload), borné par l'expiration du token
+    principal_cache_enabled: bool = True
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: int = 300
 
     # Frontend
     frontend_url: str = "http://localhost:3000"
@@ -0,0 +1,472 @@
+"""
+Dashboard Rollups - Statistiques dashboard matérialisées, maintenues incrémentalement
+
+Deux tables (models.kpi):
+- dashboard_daily_stats: (jour, organisation, type d'activité) → nombre d'activités,
+  avec l'équipe du propriétaire de l'organisation (dashboards d'équipe)
+- dashboard_stat_counters: (métrique, dimension) → compteur global d'état courant
+  (organisations actives par catégorie/type, tâches, tâches ouvertes par jour d'échéance)
+
+Maintenance:
+- incrémentale, dans la transaction de l'écriture: listener `after_flush` qui calcule
+  les deltas des OrganisationActivity / Organisation / Task insérées, modifiées ou
+  supprimées et les applique par upsert (annulés avec la transaction en cas de rollback)
+- réconciliation: rebuild_dashboard_rollups() (tâche Celery beat nocturne)
+
+Les attributs suivis sont en `active_history`: une modification d'un objet expiré
+(expire_on_commit) recharge d'abord l'ancienne valeur, pour retirer l'ancienne
+contribution. Les objets suivis supprimés sont chargés avant le flush.
+
+Une base sans les tables de rollup (schéma partiel, tests) est ignorée: le
+listener vérifie leur présence une fois par engine.
+
+Usage:
+    from core.dashboard_rollups import rebuild_dashboard_rollups
+
+    rebuild_dashboard_rollups(db)   # backfill / réparation d'une dérive
+"""
+
+import logging
+import time
+import weakref
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Date,
+    String,
+    and_,
+    case,
+    cast,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, attributes
+
+from models.kpi import DashboardDailyStat, DashboardStatCounter
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.organisation_activity import OrganisationActivity, OrganisationActivityType
+from models.task import Task, TaskStatus
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Métriques de dashboard_stat_counters
+ORGANISATIONS_TOTAL = "organisations"
+ORGANISATIONS_BY_CATEGORY = "organisations_by_category"
+ORGANISATIONS_BY_TYPE = "organisations_by_type"
+TASKS_TOTAL = "tasks"
+TASKS_DONE = "tasks_done"
+# dimension = jour d'échéance ISO (YYYY-MM-DD): l'ordre lexicographique suit l'ordre des dates
+TASKS_OPEN_BY_DUE_DAY = "tasks_open_due"
+
+# Attributs dont la modification change la contribution d'un objet aux compteurs
+_TRACKED_ATTRIBUTES = {
+    OrganisationActivity: ("organisation_id", "type", "occurred_at"),
+    Organisation: ("is_active", "category", "type"),
+    Task: ("status", "due_date"),
+}
+
+DailyKey = Tuple[date, int, str]
+CounterKey = Tuple[str, str]
+
+# Tables absentes (flush avant `alembic upgrade`): revérifiées au plus toutes les 60 s
+ROLLUP_TABLES_RECHECK_SECONDS = 60
+
+# engine → True si tables de rollup présentes, sinon instant de la prochaine vérification
+_rollup_tables_present: "weakref.WeakKeyDictionary[Engine, Any]" = weakref.WeakKeyDictionary()
+
+
+def _enum_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return str(getattr(value, "value", value))
+
+
+def utc_day(value: Optional[datetime]) -> Optional[date]:
+    """Jour UTC d'un horodatage (naïf = déjà UTC)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Contributions d'un objet aux compteurs
+# ---------------------------------------------------------------------------
+
+
+def _activity_keys(organisation_id, type_, occurred_at) -> List[DailyKey]:
+    day = utc_day(occurred_at)
+    if organisation_id is None or type_ is None or day is None:
+        return []
+    return [(day, organisation_id, _enum_value(type_))]
+
+
+def _organisation_keys(is_active, category, type_) -> List[CounterKey]:
+    # is_active NULL = défaut True (colonne sans nullable=False)
+    if is_active is False:
+        return []
+    keys = [(ORGANISATIONS_TOTAL, "")]
+    if category is not None:
+        keys.append((ORGANISATIONS_BY_CATEGORY, _enum_value(category)))
+    if type_ is not None:
+        keys.append((ORGANISATIONS_BY_TYPE, _enum_value(type_)))
+    return keys
+
+
+def _task_keys(status, due_date) -> List[CounterKey]:
+    keys = [(TASKS_TOTAL, "")]
+    if _enum_value(status) == TaskStatus.DONE.value:
+        keys.append((TASKS_DONE, ""))
+    elif due_date is not None:
+        keys.append((TASKS_OPEN_BY_DUE_DAY, utc_day(due_date).isoformat()))
+    return keys
+
+
+_KEY_BUILDERS = {
+    OrganisationActivity: _activity_keys,
+    Organisation: _organisation_keys,
+    Task: _task_keys,
+}
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """Listener `set` sans effet: active_history charge `oldvalue` si l'attribut est expiré"""
+
+
+for _model, _attrs in _TRACKED_ATTRIBUTES.items():
+    for _attr in _attrs:
+        event.listen(getattr(_model, _attr), "set", _keep_previous_value, active_history=True)
+
+
+def _previous_value(obj: Any, attr: str) -> Any:
+    """Valeur avant le flush (déjà chargée par active_history / _load_deleted)"""
+    history = attributes.get_history(obj, attr, passive=attributes.PASSIVE_NO_INITIALIZE)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    if history.added:
+        return None
+    return obj.__dict__.get(attr)
+
+
+def _current_values(obj: Any, attrs: Iterable[str]) -> Tuple[Any, ...]:
+    return tuple(getattr(obj, attr) for attr in attrs)
+
+
+def _has_changes(obj: Any, attrs: Iterable[str]) -> bool:
+    return any(
+        attributes.get_history(obj, attr, passive=attributes.PASSIVE_NO_INITIALIZE).has_changes()
+        for attr in attrs
+    )
+
+
+def collect_deltas(session: Session) -> Tuple[Counter, Counter]:
+    """
+    Deltas (journaliers, globaux) du flush en cours
+
+    À appeler pendant after_flush: session.new/dirty/deleted et l'historique des
+    attributs reflètent encore les changements qui viennent d'être écrits.
+    """
+    daily: Counter = Counter()
+    counters: Counter = Counter()
+
+    def add(obj: Any, values: Tuple[Any, ...], sign: int) -> None:
+        model = type(obj)
+        target = daily if model is OrganisationActivity else counters
+        for key in _KEY_BUILDERS[model](*values):
+            target[key] += sign
+
+    for obj in session.new:
+        attrs = _TRACKED_ATTRIBUTES.get(type(obj))
+        if attrs:
+            add(obj, _current_values(obj, attrs), 1)
+
+    for obj in session.deleted:
+        attrs = _TRACKED_ATTRIBUTES.get(type(obj))
+        if attrs:
+            add(obj, tuple(_previous_value(obj, attr) for attr in attrs), -1)
+
+    for obj in session.dirty:
+        attrs = _TRACKED_ATTRIBUTES.get(type(obj))
+        if attrs and _has_changes(obj, attrs):
+            add(obj, tuple(_previous_value(obj, attr) for attr in attrs), -1)
+            add(obj, _current_values(obj, attrs), 1)
+
+    return (
+        Counter({key: delta for key, delta in daily.items() if delta}),
+        Counter({key: delta for key, delta in counters.items() if delta}),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Écriture (upserts atomiques)
+# ---------------------------------------------------------------------------
+
+
+def _dialect_insert(conn: Connection):
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _increment(
+    conn: Connection,
+    table,
+    key_columns: Tuple[str, ...],
+    rows: List[Dict[str, Any]],
+    refresh: Tuple[str, ...] = (),
+) -> None:
+    """
+    Ajoute `value` aux lignes existantes (clé = key_columns), les crée sinon
+
+    `refresh`: colonnes écrasées par la nouvelle valeur en cas de conflit (ex: team_id)
+    """
+    if not rows:
+        return
+
+    dialect_insert = _dialect_insert(conn)
+    if dialect_insert is None:
+        for row in rows:
+            match = and_(*(table.c[name] == row[name] for name in key_columns))
+            values = {"value": table.c.value + row["value"], "updated_at": func.now()}
+            values.update({name: row[name] for name in refresh})
+            if conn.execute(update(table).where(match).values(**values)).rowcount == 0:
+                conn.execute(insert(table).values(**row))
+        return
+
+    # Une seule instruction multi-lignes: les clés sont déjà uniques (deltas agrégés)
+    stmt = dialect_insert(table).values(rows)
+    set_ = {"value": table.c.value + stmt.excluded.value, "updated_at": func.now()}
+    set_.update({name: stmt.excluded[name] for name in refresh})
+    conn.execute(stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_))
+
+
+def _owner_teams(conn: Connection, organisation_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    """organisation_id → team_id du propriétaire (organisations existantes uniquement)"""
+    organisations, users = Organisation.__table__, User.__table__
+    rows = conn.execute(
+        select(organisations.c.id, users.c.team_id)
+        .select_from(organisations.outerjoin(users, users.c.id == organisations.c.owner_id))
+        .where(organisations.c.id.in_(sorted(set(organisation_ids))))
+    )
+    return {organisation_id: team_id for organisation_id, team_id in rows}
+
+
+def apply_deltas(conn: Connection, daily: Counter, counters: Counter) -> None:
+    """Applique des deltas calculés par collect_deltas()"""
+    if daily:
+        # Organisations supprimées dans ce flush: leurs lignes partent en CASCADE
+        teams = _owner_teams(conn, (organisation_id for _, organisation_id, _ in daily))
+        _increment(
+            conn,
+            DashboardDailyStat.__table__,
+            ("day", "organisation_id", "metric"),
+            [
+                {
+                    "day": day,
+                    "organisation_id": organisation_id,
+                    "metric": metric,
+                    "team_id": teams[organisation_id],
+                    "value": delta,
+                }
+                for (day, organisation_id, metric), delta in sorted(daily.items())
+                if organisation_id in teams
+            ],
+            refresh=("team_id",),
+        )
+    if counters:
+        _increment(
+            conn,
+            DashboardStatCounter.__table__,
+            ("metric", "dimension"),
+            [
+                {"metric": metric, "dimension": dimension, "value": delta}
+                for (metric, dimension), delta in sorted(counters.items())
+            ],
+        )
+
+
+def _reassign_teams(session: Session, conn: Connection) -> None:
+    """Propage les changements de propriétaire / d'équipe à team_id des lignes journalières"""
+    table = DashboardDailyStat.__table__
+    organisations, users = Organisation.__table__, User.__table__
+
+    for obj in session.dirty:
+        if isinstance(obj, Organisation) and attributes.get_history(obj, "owner_id").has_changes():
+            owner_team = (
+                select(users.c.team_id).where(users.c.id == obj.owner_id).scalar_subquery()
+            )
+            conn.execute(
+                update(table).where(table.c.organisation_id == obj.id).values(team_id=owner_team)
+            )
+        elif isinstance(obj, User) and attributes.get_history(obj, "team_id").has_changes():
+            owned = select(organisations.c.id).where(organisations.c.owner_id == obj.id)
+            conn.execute(
+                update(table)
+                .where(table.c.organisation_id.in_(owned))
+                .values(team_id=obj.team_id)
+            )
+
+
+def _has_rollup_tables(conn: Connection) -> bool:
+    """Tables de rollup présentes (résultat positif mis en cache, négatif revérifié)"""
+    engine = conn.engine
+    state = _rollup_tables_present.get(engine)
+    if state is True:
+        return True
+    now = time.monotonic()
+    if state is not None and now < state:
+        return False
+
+    inspector = inspect(conn)
+    present = all(
+        inspector.has_table(model.__tablename__)
+        for model in (DashboardDailyStat, DashboardStatCounter)
+    )
+    if present:
+        _rollup_tables_present[engine] = True
+        if state is not None:
+            logger.info("dashboard rollup tables created: incremental maintenance enabled")
+    else:
+        _rollup_tables_present[engine] = now + ROLLUP_TABLES_RECHECK_SECONDS
+        if state is None:
+            logger.warning("dashboard rollup tables missing: incremental maintenance disabled")
+    return present
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted(session: Session, flush_context, instances):
+    """Charge les attributs suivis des objets supprimés (expirés après un commit)"""
+    for obj in session.deleted:
+        attrs = _TRACKED_ATTRIBUTES.get(type(obj))
+        if attrs and attributes.instance_state(obj).expired_attributes.intersection(attrs):
+            for attr in attrs:
+                getattr(obj, attr)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_dashboard_rollups(session: Session, flush_context):
+    if not any(
+        isinstance(obj, (OrganisationActivity, Organisation, Task, User))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        return
+    if not _has_rollup_tables(session.connection()):
+        return
+    # Même transaction que l'écriture métier: un rollback annule aussi les deltas
+    daily, counters = collect_deltas(session)
+    conn = session.connection()
+    apply_deltas(conn, daily, counters)
+    _reassign_teams(session, conn)
+
+
+# ---------------------------------------------------------------------------
+# Reconstruction complète
+# ---------------------------------------------------------------------------
+
+
+def _enum_label_to_value(column, enum_cls) -> Any:
+    """Libellé stocké (nom du membre) → valeur Python de l'enum, côté SQL"""
+    return case(
+        {member.name: member.value for member in enum_cls},
+        value=cast(column, String),
+        else_=cast(column, String),
+    )
+
+
+def utc_day_expr(column, dialect: str):
+    """Expression SQL: jour UTC d'une colonne horodatée"""
+    if dialect == "postgresql":
+        return cast(func.timezone("UTC", column), Date)
+    return func.date(column)
+
+
+def rebuild_dashboard_rollups(db: Session) -> Dict[str, int]:
+    """
+    Recalcule les deux tables depuis les tables sources (INSERT ... SELECT, côté SQL)
+
+    Returns:
+        Nombre de lignes écrites par table
+    """
+    dialect = db.get_bind().dialect.name
+    daily_table = DashboardDailyStat.__table__
+    counter_table = DashboardStatCounter.__table__
+    organisations, users = Organisation.__table__, User.__table__
+
+    db.execute(daily_table.delete())
+    db.execute(counter_table.delete())
+
+    activity_day = utc_day_expr(OrganisationActivity.occurred_at, dialect)
+    activity_metric = _enum_label_to_value(OrganisationActivity.type, OrganisationActivityType)
+    daily_rows = db.execute(
+        insert(daily_table).from_select(
+            ["day", "organisation_id", "team_id", "metric", "value"],
+            select(
+                activity_day,
+                OrganisationActivity.organisation_id,
+                users.c.team_id,
+                activity_metric,
+                func.count(OrganisationActivity.id),
+            )
+            .select_from(OrganisationActivity.__table__)
+            .join(organisations, organisations.c.id == OrganisationActivity.organisation_id)
+            .outerjoin(users, users.c.id == organisations.c.owner_id)
+            .group_by(
+                activity_day,
+                OrganisationActivity.organisation_id,
+                users.c.team_id,
+                activity_metric,
+            ),
+        )
+    ).rowcount
+
+    active = func.coalesce(Organisation.is_active, True) == True  # noqa: E712
+    open_task = Task.status != TaskStatus.DONE
+    due_day = cast(utc_day_expr(Task.due_date, dialect), String)
+    category = _enum_label_to_value(Organisation.category, OrganisationCategory)
+    org_type = _enum_label_to_value(Organisation.type, OrganisationType)
+
+    counter_selects = [
+        select(literal(ORGANISATIONS_TOTAL), literal(""), func.count(Organisation.id)).where(
+            active
+        ),
+        select(literal(ORGANISATIONS_BY_CATEGORY), category, func.count(Organisation.id))
+        .where(active, Organisation.category.isnot(None))
+        .group_by(category),
+        select(literal(ORGANISATIONS_BY_TYPE), org_type, func.count(Organisation.id))
+        .where(active, Organisation.type.isnot(None))
+        .group_by(org_type),
+        select(literal(TASKS_TOTAL), literal(""), func.count(Task.id)),
+        select(literal(TASKS_DONE), literal(""), func.count(Task.id)).where(
+            Task.status == TaskStatus.DONE
+        ),
+        select(literal(TASKS_OPEN_BY_DUE_DAY), due_day, func.count(Task.id))
+        .where(open_task, Task.due_date.isnot(None))
+        .group_by(due_day),
+    ]
+    counter_rows = 0
+    for counter_select in counter_selects:
+        counter_rows += db.execute(
+            insert(counter_table).from_select(["metric", "dimension", "value"], counter_select)
+        ).rowcount
+
+    db.commit()
+    logger.info(f"dashboard rollups rebuilt: {daily_rows} daily rows, {counter_rows} counters")
+    return {"dashboard_daily_stats": daily_rows, "dashboard_stat_counters": counter_rows}
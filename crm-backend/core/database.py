@@ -27,6 +27,12 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Instrumentation SQL (compteurs par requête, slow queries, N+1)
+if settings.query_profiler_enabled:
+    from core.query_profiler import instrument_engine
+
+    instrument_engine(engine)
+
 
 def get_db() -> Session:
     """
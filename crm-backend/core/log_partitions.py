@@ -0,0 +1,199 @@
+"""
+Log Partitions - Partitionnement mensuel des tables de logs (PostgreSQL)
+
+Tables partitionnées par plage mensuelle (migration log_partitions_001):
+- audit_logs (created_at)
+- data_access_logs (accessed_at)
+- email_events (event_at)
+- workflow_executions (created_at)
+
+Une partition par mois, nommée `<table>_pAAAAMM`, plus une partition `<table>_default`
+qui reçoit les lignes hors des mois créés (filet de sécurité, normalement vide).
+
+Maintenance:
+- ensure_log_partitions(): crée les partitions des mois à venir (Celery beat quotidien)
+- drop_partitions_before(): rétention par suppression de partitions entières
+  (DROP TABLE, coût constant quel que soit le volume, sans bloat ni VACUUM)
+
+Les requêtes filtrant sur la colonne de partition ne lisent que les mois concernés
+(partition pruning), ex: core.audit.get_audit_history.
+
+Sur une base non partitionnée (SQLite, migration non appliquée), is_partitioned()
+renvoie False et les appelants gardent leur suppression par requête.
+
+Usage:
+    from core.log_partitions import drop_partitions_before, ensure_log_partitions
+
+    ensure_log_partitions(db)
+    drop_partitions_before(db, "audit_logs", datetime.utcnow() - timedelta(days=90))
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Table → colonne de partition
+PARTITIONED_LOG_TABLES: Dict[str, str] = {
+    "audit_logs": "created_at",
+    "data_access_logs": "accessed_at",
+    "email_events": "event_at",
+    "workflow_executions": "created_at",
+}
+
+# Nombre de mois créés à l'avance (en plus du mois courant)
+PARTITIONS_AHEAD = 3
+
+_LIST_PARTITIONS_SQL = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    ORDER BY child.relname
+    """
+)
+
+
+def month_start(value: date) -> date:
+    """Premier jour du mois de `value`"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Premier jour du mois décalé de `months` (négatif pour reculer)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _partition_month(table: str, name: str) -> Optional[date]:
+    """Mois d'une partition d'après son nom (None pour la partition par défaut)"""
+    suffix = name[len(table) + 2 :]
+    if not name.startswith(f"{table}_p") or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    """True si `table` est une table partitionnée PostgreSQL"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        db.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, date]]:
+    """Partitions mensuelles de `table`: [(nom, premier jour du mois)] par mois croissant"""
+    partitions = []
+    for name in db.execute(_LIST_PARTITIONS_SQL, {"table": table}).scalars():
+        month = _partition_month(table, name)
+        if month is not None:
+            partitions.append((name, month))
+    return partitions
+
+
+def ensure_log_partitions(
+    db: Session,
+    months_ahead: int = PARTITIONS_AHEAD,
+    today: Optional[date] = None,
+    tables: Optional[Iterable[str]] = None,
+) -> List[str]:
+    """
+    Crée les partitions manquantes du mois courant et des `months_ahead` suivants
+
+    Idempotent. Une partition dont la plage contient déjà des lignes dans la
+    partition par défaut ne peut pas être créée: l'erreur est journalisée et les
+    autres partitions sont quand même créées.
+
+    Returns:
+        Noms des partitions créées
+    """
+    current = month_start(today or datetime.utcnow().date())
+    created = []
+
+    for table in tables or PARTITIONED_LOG_TABLES:
+        if not is_partitioned(db, table):
+            continue
+        existing = {name for name, _ in list_partitions(db, table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(
+                        text(
+                            f"CREATE TABLE {name} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{month.isoformat()}') "
+                            f"TO ('{add_months(month, 1).isoformat()}')"
+                        )
+                    )
+            except DBAPIError as exc:
+                logger.error(f"Création partition {name} impossible: {exc}")
+                continue
+            created.append(name)
+
+    db.commit()
+    if created:
+        logger.info(f"Partitions de logs créées: {created}")
+    return created
+
+
+def expired_partitions(db: Session, table: str, cutoff: datetime) -> List[str]:
+    """Partitions dont tout le mois est antérieur à `cutoff`"""
+    limit = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+    return [
+        name for name, month in list_partitions(db, table) if add_months(month, 1) <= limit
+    ]
+
+
+def estimated_rows(db: Session, partitions: List[str]) -> int:
+    """Nombre de lignes estimé (statistiques pg_class, sans parcours des tables)"""
+    if not partitions:
+        return 0
+    return int(
+        db.execute(
+            text(
+                "SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0) FROM pg_class "
+                "WHERE relname = ANY(:names)"
+            ),
+            {"names": partitions},
+        ).scalar()
+    )
+
+
+def drop_partitions_before(db: Session, table: str, cutoff: datetime) -> List[str]:
+    """
+    Rétention: supprime les partitions dont tout le mois est antérieur à `cutoff`
+
+    Les lignes plus anciennes que `cutoff` mais dans le mois de `cutoff` sont
+    conservées jusqu'à la suppression de leur partition le mois suivant.
+
+    Returns:
+        Noms des partitions supprimées
+    """
+    dropped = expired_partitions(db, table, cutoff)
+    for name in dropped:
+        db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    db.commit()
+    if dropped:
+        logger.info(f"{table}: partitions supprimées (avant {cutoff.date()}): {dropped}")
+    return dropped
@@ -0,0 +1,193 @@
+"""
+Pagination - Keyset (curseur) et comptages estimés
+
+Pagination par curseur: au lieu de `OFFSET n` (coût linéaire avec la profondeur),
+on filtre sur la clé de tri de la dernière ligne vue:
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit + 1
+
+La ligne supplémentaire indique s'il existe une page suivante. Le curseur est
+opaque pour le client (base64 url-safe d'un tableau JSON des valeurs de clé).
+
+Comptages:
+- "exact": SELECT count(*) (comportement historique)
+- "estimate": pg_class.reltuples sans filtre, estimation du planner (EXPLAIN) sinon
+- "none": pas de total
+
+Usage:
+    page = paginate_keyset(query, [Interaction.created_at, Interaction.id],
+                           cursor=cursor, limit=50, descending=True)
+    page.items, page.next_cursor
+"""
+
+import base64
+import binascii
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATE = "estimate"
+TOTAL_NONE = "none"
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_ESTIMATE, TOTAL_NONE)
+
+
+@dataclass
+class CursorPage(Generic[T]):
+    """Page issue d'une pagination par curseur"""
+
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+# ---------------------------------------------------------------------------
+# Curseurs
+# ---------------------------------------------------------------------------
+
+
+def _python_type(column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Valeurs de clé → curseur opaque"""
+    payload = [value.isoformat() if isinstance(value, (datetime, date)) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_columns: Sequence[Any]) -> List[Any]:
+    """Curseur opaque → valeurs typées selon les colonnes de clé"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError("cursor arity mismatch")
+
+        decoded = []
+        for column, value in zip(key_columns, values):
+            python_type = _python_type(column)
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise ValidationError("Invalid pagination cursor")
+
+
+def _row_key(item: Any, key_columns: Sequence[Any]) -> List[Any]:
+    return [getattr(item, column.key) for column in key_columns]
+
+
+# ---------------------------------------------------------------------------
+# Comptages
+# ---------------------------------------------------------------------------
+
+
+def estimated_count(db: Session, model) -> int:
+    """
+    Nombre de lignes estimé (pg_class.reltuples, mis à jour par ANALYZE/autovacuum)
+
+    Évite un count(*) full-scan; fallback exact hors PostgreSQL ou si la table
+    n'a jamais été analysée.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": model.__tablename__},
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return db.query(func.count(model.id)).scalar() or 0
+
+
+def estimated_query_count(query: Query) -> Optional[int]:
+    """Estimation du planner PostgreSQL (EXPLAIN, sans exécution) pour une requête filtrée"""
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    try:
+        statement = query.order_by(None).statement.compile(
+            dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = query.session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug(f"Planner estimate unavailable, falling back to count(*): {e}")
+        return None
+
+
+def count_query(query: Query, model, mode: str = TOTAL_EXACT, filtered: bool = True):
+    """
+    Total selon le mode demandé
+
+    Returns:
+        (total, is_estimate) — total None en mode "none"
+    """
+    if mode == TOTAL_NONE:
+        return None, False
+    if mode == TOTAL_ESTIMATE:
+        if not filtered:
+            return estimated_count(query.session, model), True
+        estimate = estimated_query_count(query)
+        if estimate is not None:
+            return estimate, True
+    return query.order_by(None).count(), False
+
+
+# ---------------------------------------------------------------------------
+# Keyset
+# ---------------------------------------------------------------------------
+
+
+def paginate_keyset(
+    query: Query,
+    key_columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+) -> CursorPage:
+    """
+    Applique tri + filtre keyset + LIMIT (limit + 1) et calcule le curseur suivant
+
+    `key_columns` doit se terminer par une colonne unique (id) pour un ordre total.
+    Les colonnes de clé ne doivent pas être NULL.
+    """
+    if cursor:
+        values = decode_cursor(cursor, key_columns)
+        if len(key_columns) == 1:
+            column, value = key_columns[0], values[0]
+            query = query.filter(column < value if descending else column > value)
+        else:
+            key, bound = tuple_(*key_columns), tuple_(*values)
+            query = query.filter(key < bound if descending else key > bound)
+
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    rows = query.order_by(None).order_by(*order).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor(_row_key(items[-1], key_columns)) if has_more and items else None
+    return CursorPage(items=items, next_cursor=next_cursor)
@@ -7,6 +7,10 @@ Ce module fournit:
 - Filtrage des données par équipe/utilisateur
 - Helpers pour gérer les permissions
 
+Les rôles, bitsets de permissions et membres d'équipe sont résolus une fois
+par (utilisateur, rôle, équipe) puis mis en cache (PermissionContext), avec
+invalidation au commit de toute modification de User/Role/Permission.
+
 Usage:
     from core.permissions import require_permission, has_permission
 
@@ -16,10 +20,14 @@ Usage:
         ...
 """
 
+import threading
+import time
+from dataclasses import dataclass
 from functools import wraps
-from typing import Callable, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import event, false, inspect
 from sqlalchemy.orm import Session
 
 from core.database import get_db
@@ -27,6 +35,222 @@ from models.permission import Permission, PermissionAction, PermissionResource
 from models.role import Role, UserRole
 from models.user import User
 
+# ============================================
+# Contexte de Permissions (calculé une fois, mis en cache)
+# ============================================
+
+# Durée de vie d'un contexte et de ses bitsets de rôle / membres d'équipe:
+# borne la fraîcheur entre workers (l'invalidation au commit est locale)
+PERMISSION_CONTEXT_TTL = 60  # secondes
+
+_ACTIONS = [action.value for action in PermissionAction]
+_RESOURCES = [resource.value for resource in PermissionResource]
+_PERMISSION_BITS = {
+    (resource, action): 1 << (resource_index * len(_ACTIONS) + action_index)
+    for resource_index, resource in enumerate(_RESOURCES)
+    for action_index, action in enumerate(_ACTIONS)
+}
+_RESOURCE_MASKS = {
+    resource: sum(_PERMISSION_BITS[(resource, action)] for action in _ACTIONS)
+    for resource in _RESOURCES
+}
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def permission_bit(resource: str, action: str) -> int:
+    """Bit d'une permission (0 si ressource/action inconnue)"""
+    return _PERMISSION_BITS.get((_enum_value(resource), _enum_value(action)), 0)
+
+
+@dataclass(frozen=True)
+class PermissionContext:
+    """
+    Droits résolus d'un utilisateur: rôle, bitset de permissions, membres d'équipe
+
+    team_member_ids n'est renseigné que pour les rôles à portée équipe (MANAGER/VIEWER).
+    """
+
+    user_id: Optional[int]
+    role: Optional[str]
+    team_id: Optional[int]
+    permission_bits: int = 0
+    team_member_ids: FrozenSet[int] = frozenset()
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN
+
+    def allows(self, resource: str, action: str) -> bool:
+        if self.is_admin:
+            return True
+        bit = permission_bit(resource, action)
+        return bool(bit and self.permission_bits & bit)
+
+    def allows_any(self, resource: str) -> bool:
+        if self.is_admin:
+            return True
+        return bool(self.permission_bits & _RESOURCE_MASKS.get(_enum_value(resource), 0))
+
+    def visible_owner_ids(self) -> Optional[FrozenSet[int]]:
+        """Propriétaires dont les données sont visibles (None = pas de restriction)"""
+        if self.is_admin:
+            return None
+        if self.role in (UserRole.MANAGER, UserRole.VIEWER):
+            return self.team_member_ids
+        if self.role == UserRole.USER and self.user_id is not None:
+            return frozenset({self.user_id})
+        return frozenset()
+
+    def can_access_owner(self, owner_id: Optional[int]) -> bool:
+        owner_ids = self.visible_owner_ids()
+        return owner_ids is None or owner_id in owner_ids
+
+    def scope_query(self, query, model_class):
+        """Filtre `owner_id IN (...)` (pas de JOIN users)"""
+        owner_ids = self.visible_owner_ids()
+        if owner_ids is None:
+            return query
+        if not owner_ids:
+            return query.filter(false())
+        return query.filter(model_class.owner_id.in_(sorted(owner_ids)))
+
+
+_context_lock = threading.Lock()
+_context_cache: Dict[Tuple[Any, ...], Tuple[float, PermissionContext]] = {}
+_role_bits_cache: Dict[str, Tuple[float, int]] = {}
+_team_members_cache: Dict[int, Tuple[float, FrozenSet[int]]] = {}
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _identity(user) -> Tuple[Optional[int], Optional[str], Optional[int], Optional[Role]]:
+    """(user_id, rôle, team_id, Role ORM si disponible) depuis un User ou un payload JWT"""
+    if isinstance(user, dict):
+        role = user.get("role")
+        role_name = role.get("name") if isinstance(role, dict) else role
+        # JWT uses 'sub' for user ID, not 'id'
+        user_id = _as_int(user.get("sub") or user.get("id"))
+        return user_id, _enum_value(role_name), _as_int(user.get("team_id")), None
+
+    role = getattr(user, "role", None)
+    role_name = _enum_value(role.name) if role is not None else None
+    return user.id, role_name, user.team_id, role
+
+
+def _role_bits(role_name: Optional[str], role: Optional[Role], db: Optional[Session]) -> int:
+    if role_name is None or role_name == UserRole.ADMIN:
+        return 0
+    now = time.monotonic()
+    with _context_lock:
+        cached = _role_bits_cache.get(role_name)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    if role is None and db is not None:
+        role = db.query(Role).filter(Role.name == role_name).first()
+    bits = 0
+    for permission in role.permissions if role is not None else []:
+        bits |= permission_bit(permission.resource, permission.action)
+
+    with _context_lock:
+        _role_bits_cache[role_name] = (now + PERMISSION_CONTEXT_TTL, bits)
+    return bits
+
+
+def _team_members(team_id: Optional[int], db: Optional[Session]) -> FrozenSet[int]:
+    if team_id is None or db is None:
+        return frozenset()
+    now = time.monotonic()
+    with _context_lock:
+        cached = _team_members_cache.get(team_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    members = frozenset(row[0] for row in db.query(User.id).filter(User.team_id == team_id))
+    with _context_lock:
+        _team_members_cache[team_id] = (now + PERMISSION_CONTEXT_TTL, members)
+    return members
+
+
+def get_permission_context(user, db: Optional[Session] = None) -> PermissionContext:
+    """
+    Contexte de permissions d'un utilisateur (User ORM ou payload JWT), mis en cache
+
+    Clé: (user_id, rôle, team_id) — un nouveau token portant un autre rôle/équipe
+    obtient donc un nouveau contexte sans attendre l'invalidation.
+    """
+    user_id, role_name, team_id, role = _identity(user)
+    key = (user_id, role_name, team_id)
+    now = time.monotonic()
+
+    with _context_lock:
+        cached = _context_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    team_scoped = role_name in (UserRole.MANAGER, UserRole.VIEWER)
+    context = PermissionContext(
+        user_id=user_id,
+        role=role_name,
+        team_id=team_id,
+        permission_bits=_role_bits(role_name, role, db),
+        team_member_ids=_team_members(team_id, db) if team_scoped else frozenset(),
+    )
+    with _context_lock:
+        _context_cache[key] = (now + PERMISSION_CONTEXT_TTL, context)
+    return context
+
+
+def invalidate_permission_context() -> None:
+    """Vide les caches (changement de rôle, d'équipe ou de permissions)"""
+    with _context_lock:
+        _context_cache.clear()
+        _role_bits_cache.clear()
+        _team_members_cache.clear()
+
+
+_INVALIDATE_KEY = "permissions_invalidate"
+_USER_SCOPE_FIELDS = ("role_id", "team_id", "role", "team")
+
+
+def _touches_permissions(obj) -> bool:
+    if isinstance(obj, (Role, Permission)):
+        return True
+    if isinstance(obj, User):
+        state = inspect(obj)
+        if state.pending or state.deleted or state.was_deleted:
+            return True
+        return any(state.attrs[field].history.has_changes() for field in _USER_SCOPE_FIELDS)
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_permission_changes(session: Session, flush_context):
+    if session.info.get(_INVALIDATE_KEY):
+        return
+    if any(_touches_permissions(obj) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_INVALIDATE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    # Invalidation après commit: un contexte recalculé entre-temps verrait l'ancien état
+    if session.info.pop(_INVALIDATE_KEY, False):
+        invalidate_permission_context()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_permission_changes(session: Session):
+    session.info.pop(_INVALIDATE_KEY, None)
+
 # ============================================
 # Vérification des Permissions
 # ============================================
@@ -48,12 +272,8 @@ def has_permission(user: User, resource: str, action: str, db: Session) -> bool:
     if not user or not user.role:
         return False
 
-    # Les admins ont tous les droits
-    if user.role.name == UserRole.ADMIN:
-        return True
-
-    # Vérifier les permissions du rôle
-    return user.role.has_permission(resource, action)
+    # Les admins ont tous les droits; sinon test d'un bit du contexte en cache
+    return get_permission_context(user, db).allows(resource, action)
 
 
 def has_any_permission(user: User, resource: str, db: Session) -> bool:
@@ -71,10 +291,7 @@ def has_any_permission(user: User, resource: str, db: Session) -> bool:
     if not user or not user.role:
         return False
 
-    if user.role.name == UserRole.ADMIN:
-        return True
-
-    return user.role.has_any_permission(resource)
+    return get_permission_context(user, db).allows_any(resource)
 
 
 def get_user_permissions(user: User, db: Session) -> List[dict]:
@@ -229,26 +446,19 @@ def can_access_organisation(user: User, organisation_id: int, db: Session) -> bo
     """
     from models.organisation import Organisation
 
+    context = get_permission_context(user, db)
+
     # Admin a accès à tout
-    if user.role.name == UserRole.ADMIN:
+    if context.is_admin:
         return True
 
-    # Récupérer l'organisation
-    org = db.query(Organisation).filter(Organisation.id == organisation_id).first()
-    if not org:
+    # Seul owner_id est nécessaire (pas de chargement de l'entité ni de son owner)
+    row = db.query(Organisation.owner_id).filter(Organisation.id == organisation_id).first()
+    if not row:
         return False
 
-    # Manager et Viewer: accès à leur équipe
-    if user.role.name in [UserRole.MANAGER, UserRole.VIEWER]:
-        if user.team_id and org.owner:
-            return org.owner.team_id == user.team_id
-        return False
-
-    # USER: accès seulement à ses propres données
-    if user.role.name == UserRole.USER:
-        return org.owner_id == user.id
-
-    return False
+    # MANAGER/VIEWER: owner dans l'équipe; USER: owner = soi-même
+    return context.can_access_owner(row.owner_id)
 
 
 def filter_query_by_team(query, user: User, model_class):
@@ -268,46 +478,8 @@ def filter_query_by_team(query, user: User, model_class):
     Returns:
         Query filtrée
     """
-    # Gérer user comme dict ou objet
-    if isinstance(user, dict):
-        user_role = (
-            user.get("role", {}).get("name")
-            if isinstance(user.get("role"), dict)
-            else user.get("role")
-        )
-        # JWT uses 'sub' for user ID, not 'id'
-        user_id = user.get("sub") or user.get("id")
-        user_team_id = user.get("team_id")
-    else:
-        user_role = user.role.name if hasattr(user.role, "name") else user.role
-        user_id = user.id
-        user_team_id = user.team_id
-
-    # Admin voit tout
-    if user_role == UserRole.ADMIN:
-        return query
-
-    # Manager et Viewer: voir leur équipe
-    if user_role in [UserRole.MANAGER, UserRole.VIEWER]:
-        if user_team_id:
-            # Filtrer par team_id du owner
-            from models.user import User as UserModel
-
-            query = query.join(UserModel, model_class.owner_id == UserModel.id)
-            query = query.filter(UserModel.team_id == user_team_id)
-        else:
-            # Pas d'équipe = pas de données
-            query = query.filter(False)
-
-    # USER: voir seulement ses propres données
-    elif user_role == UserRole.USER:
-        query = query.filter(model_class.owner_id == user_id)
-
-    else:
-        # Rôle inconnu = pas de données
-        query = query.filter(False)
-
-    return query
+    # Rôle, équipe et membres résolus une fois (cache), puis owner_id IN (...)
+    return get_permission_context(user, query.session).scope_query(query, model_class)
 
 
 # ============================================
@@ -0,0 +1,357 @@
+"""
+Principal Cache - Authentification JWT en mémoire sur le chemin chaud
+
+Deux caches process-local:
+- principals: empreinte du token → payload validé (LRU, TTL borné par `exp`)
+- snapshots utilisateur: user_id → UserSnapshot (rôle, équipe, statut) partagé
+  par toutes les sessions/tokens d'un même utilisateur
+
+Le principal ne fait que mémoriser la vérification du JWT: chaque requête
+authentifiée (core.security.authenticate_principal) le complète avec le snapshot
+courant de l'utilisateur. Un utilisateur désactivé ou supprimé est donc refusé
+dès que son snapshot est invalidé, même avec un token encore valide.
+
+Invalidation:
+- locale, au commit de toute modification de User/Role/Permission (listeners Session)
+- inter-workers via Redis Pub/Sub (canal `auth:invalidate`) si redis_enabled
+- à défaut de Redis, les snapshots expirent après principal_cache_ttl_seconds
+
+Usage:
+    from core.principal_cache import principal_cache, get_user_snapshot
+
+    principal = principal_cache.get(token)       # None → décoder puis put()
+    snapshot = get_user_snapshot(user_id, db)    # DB uniquement au premier appel
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "auth:invalidate"
+# Identifiant du worker: ignore ses propres messages Pub/Sub
+_INSTANCE_ID = uuid.uuid4().hex
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+class PrincipalCache:
+    """LRU token → principal (payload JWT validé), TTL ≤ expiration du token"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, Optional[int], Dict[str, Any]]]" = OrderedDict()
+        self._by_user: Dict[Optional[int], Set[bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user_id, principal = entry
+            if expires_at <= time.time():
+                self._remove(key, user_id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Copie: les routes peuvent enrichir leur dict sans polluer le cache
+        return dict(principal)
+
+    def put(self, token: str, principal: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl
+        exp = principal.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= time.time():
+            return
+
+        key = _token_key(token)
+        user_id = _as_int(principal.get("user_id"))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, self._entries[key][1])
+            self._entries[key] = (expires_at, user_id, dict(principal))
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, (_, old_user_id, _) = self._entries.popitem(last=False)
+                self._discard_index(old_key, old_user_id)
+
+    def invalidate_user(self, user_id: int) -> int:
+        with self._lock:
+            keys = self._by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _remove(self, key: bytes, user_id: Optional[int]) -> None:
+        self._entries.pop(key, None)
+        self._discard_index(key, user_id)
+
+    def _discard_index(self, key: bytes, user_id: Optional[int]) -> None:
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+# ---------------------------------------------------------------------------
+# Snapshots utilisateur (partagés entre tokens)
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Vue immuable d'un utilisateur: ce dont l'authentification a besoin, sans ORM"""
+
+    id: int
+    email: str
+    is_active: bool
+    is_superuser: bool
+    role: Optional[str]
+    role_level: int
+    team_id: Optional[int]
+    organisation_id: Optional[int]
+
+    @property
+    def is_admin(self) -> bool:
+        return self.is_superuser or self.role == "admin"
+
+
+_snapshot_lock = threading.Lock()
+_snapshots: Dict[int, Tuple[float, Optional[UserSnapshot]]] = {}
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _build_snapshot(db: Session, user_id: int) -> Optional[UserSnapshot]:
+    from models.user import User
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    role = user.role
+    return UserSnapshot(
+        id=user.id,
+        email=user.email,
+        is_active=bool(user.is_active),
+        is_superuser=bool(user.is_superuser),
+        role=getattr(role.name, "value", role.name) if role is not None else None,
+        role_level=role.level if role is not None else 0,
+        team_id=user.team_id,
+        organisation_id=getattr(user, "organisation_id", None),
+    )
+
+
+def get_user_snapshot(user_id: Any, db: Optional[Session] = None) -> Optional[UserSnapshot]:
+    """Snapshot d'un utilisateur (None si inexistant), chargé une fois puis partagé"""
+    user_id = _as_int(user_id)
+    if user_id is None:
+        return None
+
+    now = time.monotonic()
+    with _snapshot_lock:
+        cached = _snapshots.get(user_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    if db is not None:
+        snapshot = _build_snapshot(db, user_id)
+    else:
+        from core.database import SessionLocal
+
+        session = SessionLocal()
+        try:
+            snapshot = _build_snapshot(session, user_id)
+        finally:
+            session.close()
+
+    with _snapshot_lock:
+        _snapshots[user_id] = (now + settings.principal_cache_ttl_seconds, snapshot)
+    return snapshot
+
+
+# ---------------------------------------------------------------------------
+# Invalidation (locale + Redis Pub/Sub)
+# ---------------------------------------------------------------------------
+
+
+def _invalidate_local(user_ids: Optional[Iterable[int]]) -> None:
+    from core.permissions import invalidate_permission_context
+
+    if user_ids is None:
+        principal_cache.clear()
+        with _snapshot_lock:
+            _snapshots.clear()
+    else:
+        for user_id in user_ids:
+            principal_cache.invalidate_user(user_id)
+            with _snapshot_lock:
+                _snapshots.pop(user_id, None)
+    invalidate_permission_context()
+
+
+def _broadcast(user_ids: Optional[Iterable[int]]) -> None:
+    if not settings.redis_enabled:
+        return
+    from core.cache import RedisClient
+
+    message = json.dumps(
+        {
+            "origin": _INSTANCE_ID,
+            "user_ids": sorted(user_ids) if user_ids is not None else None,
+        }
+    )
+    try:
+        RedisClient.get_client().publish(INVALIDATION_CHANNEL, message)
+    except Exception as e:
+        logger.warning(f"auth invalidation broadcast failed: {e}")
+
+
+def invalidate_principals(user_ids: Optional[Iterable[int]] = None, broadcast: bool = True) -> None:
+    """
+    Invalide principals, snapshots et contextes de permissions
+
+    Args:
+        user_ids: utilisateurs concernés (None = tous, ex: changement de rôle)
+        broadcast: propager aux autres workers via Redis
+    """
+    user_ids = set(user_ids) if user_ids is not None else None
+    _invalidate_local(user_ids)
+    if broadcast:
+        _broadcast(user_ids)
+
+
+def handle_invalidation_message(raw: Any) -> bool:
+    """Applique un message Pub/Sub (ignore ceux émis par ce worker)"""
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError):
+        return False
+    if message.get("origin") == _INSTANCE_ID:
+        return False
+    user_ids = message.get("user_ids")
+    _invalidate_local(set(user_ids) if user_ids is not None else None)
+    return True
+
+
+async def listen_for_invalidations() -> None:
+    """Tâche de fond (lifespan): applique les invalidations publiées par les autres workers"""
+    if not settings.redis_enabled:
+        return
+    import redis.asyncio as aioredis
+
+    while True:
+        client = None
+        try:
+            client = aioredis.Redis(
+                host=settings.redis_host,
+                port=settings.redis_port,
+                password=settings.redis_password or None,
+                db=settings.redis_db,
+                decode_responses=True,
+            )
+            pubsub = client.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    handle_invalidation_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Messages manqués pendant la coupure: repli sur un cache vide
+            logger.warning(f"auth invalidation listener error, reconnecting: {e}")
+            _invalidate_local(None)
+            await asyncio.sleep(5)
+        finally:
+            if client is not None:
+                await client.close()
+
+
+_CHANGED_USERS_KEY = "principal_cache_users"
+_ALL_USERS = "*"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_auth_changes(session: Session, flush_context):
+    from models.permission import Permission
+    from models.role import Role
+    from models.user import User
+
+    changed = session.info.get(_CHANGED_USERS_KEY)
+    if changed == _ALL_USERS:
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Role, Permission)):
+            session.info[_CHANGED_USERS_KEY] = _ALL_USERS
+            return
+        if isinstance(obj, User) and obj.id is not None and session.is_modified(obj):
+            session.info.setdefault(_CHANGED_USERS_KEY, set()).add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            session.info.setdefault(_CHANGED_USERS_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_auth_changes(session: Session):
+    changed = session.info.pop(_CHANGED_USERS_KEY, None)
+    if changed == _ALL_USERS:
+        invalidate_principals()
+    elif changed:
+        invalidate_principals(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_auth_changes(session: Session):
+    session.info.pop(_CHANGED_USERS_KEY, None)
@@ -0,0 +1,80 @@
+"""
+Projection - Sparse fieldsets (`?fields=id,name,email`) pour les listes
+
+Au lieu d'hydrater des entités ORM complètes (toutes les colonnes + identity map)
+puis de les sérialiser, on ne sélectionne en SQL que les colonnes demandées et
+on construit les dicts de réponse directement depuis les tuples:
+
+    available = model_fields(Organisation)
+    names = parse_fields("name,email", available)          # → ["id", "name", "email"]
+    rows = db.query(*select_columns(available, names)).all()
+    items = [row_to_dict(row, names) for row in rows]
+
+Sans `fields`, les appelants gardent leur chemin ORM habituel.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import inspect
+
+from core.exceptions import ValidationError
+
+# Champs toujours renvoyés (identifiant stable côté frontend)
+DEFAULT_REQUIRED_FIELDS = ("id",)
+
+
+def model_fields(model) -> Dict[str, Any]:
+    """Colonnes projetables d'un modèle: {clé d'attribut: attribut SQL} (mêmes clés que to_dict)"""
+    return {attr.key: getattr(model, attr.key) for attr in inspect(model).column_attrs}
+
+
+def parse_fields(
+    fields: Optional[str],
+    available: Mapping[str, Any],
+    required: Iterable[str] = DEFAULT_REQUIRED_FIELDS,
+) -> Optional[List[str]]:
+    """
+    Paramètre `fields` (séparé par virgules) → liste ordonnée et validée
+
+    Returns:
+        None si `fields` est absent (réponse complète)
+
+    Raises:
+        ValidationError: champ inconnu
+    """
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted({name for name in requested if name not in available})
+    if unknown:
+        raise ValidationError(
+            f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(sorted(available))}"
+        )
+    return list(dict.fromkeys([*(name for name in required if name in available), *requested]))
+
+
+def select_columns(available: Mapping[str, Any], names: Iterable[str]) -> List[Any]:
+    """Colonnes étiquetées par nom de champ, à passer à db.query(*columns)"""
+    return [available[name].label(name) for name in names]
+
+
+def projection_targets(model, fields: Optional[List[str]]) -> List[Any]:
+    """Cibles de db.query(): l'entité complète, ou seulement les colonnes demandées"""
+    if fields is None:
+        return [model]
+    return select_columns(model_fields(model), fields)
+
+
+def row_to_dict(row: Any, fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Ligne de résultat → dict
+
+    - fields None: entité ORM (ou tuple dont l'entité est en tête) → to_dict()
+    - sinon: ligne projetée → {champ: valeur} sans hydratation ORM
+    """
+    if fields is None:
+        entity = row if hasattr(row, "to_dict") else row[0]
+        return entity.to_dict()
+    mapping = row._mapping
+    return {name: mapping[name] for name in fields}
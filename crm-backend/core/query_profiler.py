@@ -0,0 +1,278 @@
+"""
+Query Profiler - Instrumentation SQLAlchemy (before/after_cursor_execute)
+
+Fonctionnalités:
+- Empreinte normalisée des requêtes (littéraux → ?, listes IN compactées)
+- Histogrammes Prometheus par type de requête et par empreinte
+- Compteurs par requête HTTP (nombre de requêtes, temps total) via ContextVar
+- Slow-query log au-delà de settings.slow_query_ms, avec capture EXPLAIN (PostgreSQL)
+- Détection N+1: même SELECT répété ≥ settings.n_plus_one_threshold fois dans une requête
+
+Usage:
+    from core.query_profiler import instrument_engine, start_request_profile
+
+    instrument_engine(engine)           # une fois, au chargement de core.database
+
+    token = start_request_profile("GET /api/v1/people/{person_id}")
+    ...
+    profile = end_request_profile(token)  # → QueryProfile (count, total_ms, n_plus_one)
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Nombre max d'empreintes distinctes exposées en label Prometheus (au-delà: "other")
+MAX_TRACKED_FINGERPRINTS = 500
+# Empreintes mémorisées par texte SQL (les mêmes statements reviennent sans cesse)
+FINGERPRINT_CACHE_SIZE = 4096
+# Un même EXPLAIN n'est capturé qu'une fois par fenêtre (secondes)
+EXPLAIN_COOLDOWN_SECONDS = 600
+
+db_query_duration_seconds = Histogram(
+    'db_query_duration_seconds',
+    'Database query duration',
+    ['query_type']
+)
+db_statement_duration_seconds = Histogram(
+    'db_statement_duration_seconds',
+    'Database query duration per normalised statement fingerprint',
+    ['fingerprint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_PLACEHOLDER = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(\s*__\[POSTCOMPILE_\w+\]\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_statement(statement: str) -> str:
+    """SQL sans littéraux ni paramètres: deux exécutions de la même requête → même texte"""
+    normalised = _STRING_LITERAL.sub("?", statement)
+    normalised = _POSTCOMPILE.sub("(?)", normalised)
+    normalised = _PARAM_PLACEHOLDER.sub("?", normalised)
+    normalised = _NUMBER_LITERAL.sub("?", normalised)
+    normalised = _IN_LIST.sub("IN (...)", normalised)
+    return _WHITESPACE.sub(" ", normalised).strip()
+
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def fingerprint(statement: str) -> str:
+    """Empreinte courte (12 hex) du SQL normalisé, mémorisée par texte de statement"""
+    return hashlib.sha1(normalise_statement(statement).encode()).hexdigest()[:12]
+
+
+def _query_type(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+class QueryProfile:
+    """Compteurs SQL d'une requête HTTP"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints: Counter = Counter()
+        self.statements: Dict[str, str] = {}
+        self._lock = threading.Lock()  # Routes sync: requêtes depuis le threadpool
+
+    def record(self, fp: str, statement: str, elapsed_ms: float, query_type: str):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if query_type == "SELECT":
+                self.fingerprints[fp] += 1
+                self.statements.setdefault(fp, statement)
+
+    def n_plus_one(self, threshold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """SELECT identiques (même empreinte) répétés au moins `threshold` fois"""
+        threshold = threshold or settings.n_plus_one_threshold
+        return [
+            {
+                "fingerprint": fp,
+                "count": count,
+                "statement": normalise_statement(self.statements[fp])[:500],
+            }
+            for fp, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        """Valeur d'en-tête Server-Timing"""
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+_registry_lock = threading.Lock()
+_fingerprint_stats: Dict[str, Dict[str, Any]] = {}
+_explained_at: Dict[str, float] = {}
+
+
+def start_request_profile(name: str) -> Token:
+    return _current_profile.set(QueryProfile(name))
+
+
+def end_request_profile(token: Token) -> Optional[QueryProfile]:
+    profile = _current_profile.get()
+    _current_profile.reset(token)
+    if profile is not None:
+        suspects = profile.n_plus_one()
+        if suspects:
+            logger.warning(
+                "n_plus_one_detected",
+                extra={
+                    "request": profile.name,
+                    "queries": profile.count,
+                    "suspects": suspects,
+                },
+            )
+    return profile
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+def _track_fingerprint(fp: str, statement: str, elapsed_ms: float) -> str:
+    """Agrégats process-wide par empreinte; retourne le label Prometheus"""
+    with _registry_lock:
+        stats = _fingerprint_stats.get(fp)
+        if stats is None:
+            if len(_fingerprint_stats) >= MAX_TRACKED_FINGERPRINTS:
+                return "other"
+            stats = _fingerprint_stats[fp] = {
+                "statement": normalise_statement(statement)[:1000],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+            }
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    return fp
+
+
+def get_fingerprint_stats(limit: int = 50) -> List[Dict[str, Any]]:
+    """Empreintes triées par temps cumulé (les plus coûteuses d'abord)"""
+    with _registry_lock:
+        rows = [
+            {
+                "fingerprint": fp,
+                "statement": stats["statement"],
+                "count": stats["count"],
+                "total_ms": round(stats["total_ms"], 2),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                "max_ms": round(stats["max_ms"], 2),
+            }
+            for fp, stats in _fingerprint_stats.items()
+        ]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """
+    EXPLAIN (sans ANALYZE: pas de ré-exécution) sur un curseur séparé
+
+    Exécuté dans un SAVEPOINT: un échec ne doit pas invalider la transaction de l'appelant.
+    """
+    if conn.dialect.name != "postgresql" or not conn.in_transaction():
+        return None
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT query_profiler_explain")
+            try:
+                cursor.execute(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                cursor.execute("RELEASE SAVEPOINT query_profiler_explain")
+                return plan
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+                raise
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    query_type = _query_type(statement)
+    fp = fingerprint(statement)
+
+    db_query_duration_seconds.labels(query_type=query_type).observe(elapsed_ms / 1000)
+    label = _track_fingerprint(fp, statement, elapsed_ms)
+    db_statement_duration_seconds.labels(fingerprint=label).observe(elapsed_ms / 1000)
+
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(fp, statement, elapsed_ms, query_type)
+
+    if elapsed_ms >= settings.slow_query_ms:
+        plan = None
+        now = time.monotonic()
+        if query_type == "SELECT" and not executemany:
+            with _registry_lock:
+                due = now - _explained_at.get(fp, 0.0) > EXPLAIN_COOLDOWN_SECONDS
+                if due:
+                    _explained_at[fp] = now
+            if due:
+                plan = _explain(conn, statement, parameters)
+
+        logger.warning(
+            "slow_query",
+            extra={
+                "duration_ms": round(elapsed_ms, 1),
+                "fingerprint": fp,
+                "statement": normalise_statement(statement)[:1000],
+                "request": profile.name if profile else None,
+                "plan": plan,
+            },
+        )
+
+
+def _handle_error(exception_context):
+    # Requête en échec: after_cursor_execute n'est pas appelé, on dépile le chrono
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Branche les listeners sur un engine (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
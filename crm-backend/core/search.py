@@ -34,6 +34,7 @@ from sqlalchemy import and_, func, or_, text
 from sqlalchemy.orm import Session
 
 from core.permissions import filter_query_by_team
+from core.projection import projection_targets, row_to_dict
 from models.mandat import Mandat
 from models.organisation import Organisation, OrganisationCategory
 from models.person import Person
@@ -55,6 +56,7 @@ class SearchService:
         filters: Optional[Dict] = None,
         limit: int = 20,
         offset: int = 0,
+        fields: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
         Recherche d'organisations avec Full-Text Search
@@ -66,6 +68,7 @@ class SearchService:
             filters: Filtres additionnels (category, type, etc.)
             limit: Nombre max de résultats
             offset: Pagination offset
+            fields: Colonnes à retourner (projection SQL, sans hydratation ORM)
 
         Returns:
             Dict avec results et metadata
@@ -78,10 +81,13 @@ class SearchService:
             and query
         )
 
+        # Entité complète, ou seulement les colonnes demandées (sparse fieldset)
+        selected = projection_targets(Organisation, fields)
+
         if use_postgres and query:  # Utiliser pg_trgm
             # Fuzzy matching avec pg_trgm
             base_query = db.query(
-                Organisation,
+                *selected,
                 func.similarity(Organisation.name, query).label("rank"),
             )
 
@@ -95,7 +101,7 @@ class SearchService:
                 )
             )
         else:
-            base_query = db.query(Organisation)
+            base_query = db.query(*selected)
             like_pattern = f"%{query}%" if query else None
             if like_pattern:
                 base_query = base_query.filter(
@@ -137,20 +143,20 @@ class SearchService:
         if use_postgres and query:
             items = [
                 {
-                    **org.to_dict(),
-                    "relevance": float(rank),
+                    **row_to_dict(row, fields),
+                    "relevance": float(row.rank),
                     "match_type": "fuzzy" if not use_fulltext else "full_text",
                 }
-                for org, rank in results
+                for row in results
             ]
         else:
             items = [
                 {
-                    **org.to_dict(),
+                    **row_to_dict(row, fields),
                     "relevance": None,
                     "match_type": "fallback",
                 }
-                for org in results
+                for row in results
             ]
 
         return {
@@ -170,6 +176,7 @@ class SearchService:
         filters: Optional[Dict] = None,
         limit: int = 20,
         offset: int = 0,
+        fields: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
         Recherche de personnes avec fuzzy matching
@@ -180,10 +187,13 @@ class SearchService:
         dialect = getattr(getattr(db, "bind", None), "dialect", None)
         use_fuzzy = dialect is not None and dialect.name.lower().startswith("postgres")
 
+        # Entité complète, ou seulement les colonnes demandées (sparse fieldset)
+        selected = projection_targets(Person, fields)
+
         if use_fuzzy:
             # Utiliser similarité trigramme pour fuzzy matching
             base_query = db.query(
-                Person,
+                *selected,
                 (
                     func.greatest(
                         func.similarity(Person.first_name, query),
@@ -205,7 +215,7 @@ class SearchService:
             )
         else:
             # Fallback sur ILIKE simple
-            base_query = db.query(Person)
+            base_query = db.query(*selected)
             search_filter = or_(
                 Person.first_name.ilike(f"%{query}%"),
                 Person.last_name.ilike(f"%{query}%"),
@@ -237,19 +247,19 @@ class SearchService:
         if use_fuzzy:
             items = [
                 {
-                    **person.to_dict(),
+                    **row_to_dict(row, fields),
                     "match_type": "fuzzy",
-                    "similarity": float(score) if score else 0,
+                    "similarity": float(row.similarity_score) if row.similarity_score else 0,
                 }
-                for person, score in results
+                for row in results
             ]
         else:
             items = [
                 {
-                    **person.to_dict(),
+                    **row_to_dict(row, fields),
                     "match_type": "name_email",
                 }
-                for person in results
+                for row in results
             ]
 
         return {
@@ -269,6 +279,7 @@ class SearchService:
         filters: Optional[Dict] = None,
         limit: int = 20,
         offset: int = 0,
+        fields: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
         Recherche de mandats avec fuzzy matching
@@ -279,10 +290,13 @@ class SearchService:
         dialect = getattr(getattr(db, "bind", None), "dialect", None)
         use_fuzzy = dialect is not None and dialect.name.lower().startswith("postgres")
 
+        # Entité complète, ou seulement les colonnes demandées (sparse fieldset)
+        selected = projection_targets(Mandat, fields)
+
         if use_fuzzy:
             # Utiliser similarité trigramme pour fuzzy matching
             base_query = db.query(
-                Mandat,
+                *selected,
                 func.similarity(Mandat.number, query).label("similarity_score"),
             )
 
@@ -293,7 +307,7 @@ class SearchService:
             )
         else:
             # Fallback sur ILIKE simple
-            base_query = db.query(Mandat)
+            base_query = db.query(*selected)
             search_filter = or_(
                 Mandat.number.ilike(f"%{query}%"),
                 Mandat.type.ilike(f"%{query}%"),
@@ -326,19 +340,19 @@ class SearchService:
         if use_fuzzy:
             items = [
                 {
-                    **mandat.to_dict(),
+                    **row_to_dict(row, fields),
                     "match_type": "fuzzy",
-                    "similarity": float(score) if score else 0,
+                    "similarity": float(row.similarity_score) if row.similarity_score else 0,
                 }
-                for mandat, score in results
+                for row in results
             ]
         else:
             items = [
                 {
-                    **mandat.to_dict(),
+                    **row_to_dict(row, fields),
                     "match_type": "number_type",
                 }
-                for mandat in results
+                for row in results
             ]
 
         return {
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.orm import Session
 
 from core.config import settings
+from core.database import get_db
 from core.exceptions import ForbiddenError, UnauthorizedError
+from core.principal_cache import get_user_snapshot, principal_cache
 
 # Configuration du hachage des mots de passe
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
@@ -52,16 +56,73 @@ def decode_token(token: str) -> dict:
         raise UnauthorizedError(f"Invalid token: {str(e)}")
 
 
+def resolve_principal(token: str) -> dict:
+    """
+    Token → principal {'user_id': sub, **payload}
+
+    Chemin chaud en mémoire: le payload validé est mis en cache (LRU, TTL borné
+    par `exp`); la signature n'est vérifiée qu'au premier usage du token.
+
+    Raises:
+        UnauthorizedError: token invalide ou expiré
+    """
+    if settings.principal_cache_enabled:
+        principal = principal_cache.get(token)
+        if principal is not None:
+            return principal
+
+    payload = decode_token(token)
+    principal = {"user_id": payload.get("sub"), **payload}
+    if settings.principal_cache_enabled and principal["user_id"] is not None:
+        principal_cache.put(token, principal)
+    return principal
+
+
+def authenticate_principal(token: str, db: Optional[Session] = None) -> dict:
+    """
+    Token → principal complété par le snapshot courant de l'utilisateur
+
+    Email, rôle, équipe et statut admin viennent du snapshot (état en base, partagé
+    et invalidé au commit) et non des claims du token: get_permission_context()
+    et les routes n'ont pas à recharger le User.
+
+    Raises:
+        UnauthorizedError: token invalide, utilisateur inexistant ou désactivé
+    """
+    principal = resolve_principal(token)
+    snapshot = get_user_snapshot(principal["user_id"], db)
+    if snapshot is None or not snapshot.is_active:
+        raise UnauthorizedError("User not found or inactive")
+
+    principal.update(
+        email=snapshot.email,
+        team_id=snapshot.team_id,
+        role=(
+            {"name": snapshot.role, "level": snapshot.role_level}
+            if snapshot.role is not None
+            else None
+        ),
+        is_admin=snapshot.is_admin,
+    )
+    return principal
+
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 security = HTTPBearer(auto_error=False)  # auto_error=False pour rendre l'auth optionnelle
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> dict:
     """
     Dependency pour vérifier le token et obtenir l'utilisateur
 
+    Rôle, équipe et statut viennent du snapshot utilisateur en cache
+    (authenticate_principal): pas de requête User sur le chemin chaud.
+
     Usage:
         def my_endpoint(current_user: dict = Depends(get_current_user)):
             print(current_user)  # {'user_id': '...', 'email': '...', ...}
@@ -82,7 +143,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
     token = credentials.credentials
     try:
-        payload = decode_token(token)
+        principal = authenticate_principal(token, db)
     except UnauthorizedError:
         if settings.debug:
             return {
@@ -92,18 +153,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 "environment": "debug",
             }
         raise
-    user_id: str = payload.get("sub")
 
-    if user_id is None:
+    if principal["user_id"] is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
         )
 
-    return {"user_id": user_id, **payload}
+    return principal
 
 
 async def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
 ) -> dict:
     """
     Dependency pour authentification OPTIONNELLE
@@ -124,8 +185,7 @@ async def get_current_user_optional(
         )
 
     try:
-        payload = decode_token(credentials.credentials)
-        return {"user_id": payload.get("sub"), **payload}
+        return authenticate_principal(credentials.credentials, db)
     except Exception:
         return (
             {
@@ -0,0 +1,204 @@
+"""
+Task Stats - Statistiques des tâches en une requête, cache invalidé par événements
+
+Toutes les tranches (total, en retard, aujourd'hui, 7 prochains jours, par statut,
+par priorité, créées sur 24h) sont calculées en un seul SELECT à agrégats
+conditionnels (COUNT(*) FILTER (WHERE ...)), pour tout le CRM, un assignee ou
+une équipe (assignees membres de l'équipe).
+
+Cache:
+- Redis (core.cache), par périmètre et par jour, TTL court
+- clés versionnées (task_stats:version): le commit de toute écriture sur Task
+  (création, mise à jour, snooze, mark_done, suppression) ou sur l'équipe d'un
+  utilisateur incrémente la version (un INCR, pas de KEYS); les anciennes clés
+  expirent avec leur TTL
+
+Usage:
+    from core.task_stats import get_task_stats
+
+    stats = get_task_stats(db)                      # sidebar tâches, /metrics
+    stats = get_task_stats(db, assigned_to=user_id) # "mes tâches"
+    stats = get_task_stats(db, team_id=team_id)     # tâches de l'équipe
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.orm import Session, attributes
+
+from core.cache import RedisClient, get_cache, set_cache
+from models.task import Task, TaskPriority, TaskStatus
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "task_stats"
+CACHE_TTL_SECONDS = 300
+VERSION_KEY = f"{CACHE_PREFIX}:version"
+
+ACTIVE_STATUSES = (TaskStatus.TODO, TaskStatus.DOING)
+
+
+def _scope_key(assigned_to: Optional[int], team_id: Optional[int]) -> str:
+    if assigned_to is not None:
+        return f"user:{assigned_to}"
+    if team_id is not None:
+        return f"team:{team_id}"
+    return "all"
+
+
+def due_day_bounds(today: date) -> Tuple[datetime, datetime, datetime]:
+    """
+    Bornes des tranches d'échéance: début du jour, de demain, et fin des 7 jours suivants
+
+    En retard: due_date < début du jour; aujourd'hui: [début du jour, demain[;
+    7 prochains jours: [demain, début du jour + 8[.
+    """
+    start = datetime.combine(today, time.min)
+    return start, start + timedelta(days=1), start + timedelta(days=8)
+
+
+def compute_task_stats(
+    db: Session,
+    *,
+    assigned_to: Optional[int] = None,
+    team_id: Optional[int] = None,
+    today: Optional[date] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Calcule toutes les statistiques des tâches en un seul SELECT (sans cache)
+
+    Args:
+        assigned_to: limiter aux tâches assignées à cet utilisateur
+        team_id: limiter aux tâches assignées aux membres de cette équipe
+        today: jour de référence des tranches d'échéance (défaut: date.today())
+        now: instant de référence des compteurs 24h (défaut: maintenant, UTC)
+    """
+    today = today or date.today()
+    now = now or datetime.now(timezone.utc)
+    yesterday = now - timedelta(hours=24)
+    day_start, tomorrow, week_end = due_day_bounds(today)
+    active = Task.status.in_(ACTIVE_STATUSES)
+    created_24h = Task.created_at >= yesterday
+
+    columns = [
+        func.count().label("total"),
+        func.count().filter(and_(Task.due_date < day_start, active)).label("overdue"),
+        func.count()
+        .filter(and_(Task.due_date >= day_start, Task.due_date < tomorrow, active))
+        .label("today"),
+        func.count()
+        .filter(and_(Task.due_date >= tomorrow, Task.due_date < week_end, active))
+        .label("next_7_days"),
+        func.count().filter(created_24h).label("created_last_24h"),
+        func.count()
+        .filter(and_(created_24h, Task.status == TaskStatus.DONE))
+        .label("completed_last_24h"),
+        func.count()
+        .filter(and_(created_24h, Task.status == TaskStatus.CANCELLED))
+        .label("cancelled_last_24h"),
+    ]
+    columns += [
+        func.count().filter(Task.status == status).label(f"status_{status.name}")
+        for status in TaskStatus
+    ]
+    columns += [
+        func.count().filter(Task.priority == priority).label(f"priority_{priority.name}")
+        for priority in TaskPriority
+    ]
+
+    query = select(*columns).select_from(Task)
+    if assigned_to is not None:
+        query = query.where(Task.assigned_to == assigned_to)
+    if team_id is not None:
+        query = query.where(Task.assigned_to.in_(select(User.id).where(User.team_id == team_id)))
+
+    row = db.execute(query).one()._mapping
+
+    return {
+        "total": row["total"],
+        "overdue": row["overdue"],
+        "today": row["today"],
+        "next_7_days": row["next_7_days"],
+        "by_status": {status.value: row[f"status_{status.name}"] for status in TaskStatus},
+        "by_priority": {
+            priority.value: row[f"priority_{priority.name}"] for priority in TaskPriority
+        },
+        "created_last_24h": row["created_last_24h"],
+        "completed_last_24h": row["completed_last_24h"],
+        "cancelled_last_24h": row["cancelled_last_24h"],
+    }
+
+
+def get_task_stats(
+    db: Session,
+    *,
+    assigned_to: Optional[int] = None,
+    team_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Statistiques des tâches d'un périmètre, servies depuis le cache si possible"""
+    today = date.today()
+    version = _cache_version()
+    if version is None:
+        return compute_task_stats(db, assigned_to=assigned_to, team_id=team_id, today=today)
+
+    key = f"{CACHE_PREFIX}:v{version}:{_scope_key(assigned_to, team_id)}:{today.isoformat()}"
+    cached = get_cache(key)
+    if cached is not None:
+        return cached
+
+    stats = compute_task_stats(db, assigned_to=assigned_to, team_id=team_id, today=today)
+    set_cache(key, stats, ttl=CACHE_TTL_SECONDS)
+    return stats
+
+
+def _cache_version() -> Optional[int]:
+    """Version courante des statistiques en cache (None si Redis est indisponible)"""
+    try:
+        return int(RedisClient.get_client().get(VERSION_KEY) or 0)
+    except (redis.RedisError, ValueError):
+        return None
+
+
+def invalidate_task_stats() -> Optional[int]:
+    """Invalide les statistiques en cache (tous périmètres) en changeant de version"""
+    try:
+        return RedisClient.get_client().incr(VERSION_KEY)
+    except redis.RedisError as exc:
+        logger.warning(f"Task stats cache invalidation failed: {exc}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Invalidation événementielle (listeners Session)
+# ---------------------------------------------------------------------------
+
+_TASKS_CHANGED_KEY = "task_stats_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_task_changes(session: Session, flush_context):
+    if session.info.get(_TASKS_CHANGED_KEY):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        # Changement d'équipe d'un utilisateur: périmètre "équipe" modifié
+        if isinstance(obj, Task) or (
+            isinstance(obj, User) and attributes.get_history(obj, "team_id").has_changes()
+        ):
+            session.info[_TASKS_CHANGED_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_task_changes(session: Session):
+    if session.info.pop(_TASKS_CHANGED_KEY, None):
+        invalidate_task_stats()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_task_changes(session: Session):
+    session.info.pop(_TASKS_CHANGED_KEY, None)
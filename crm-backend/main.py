@@ -1,7 +1,7 @@
+import asyncio
 import json
 import logging
 import os
-import time
 import traceback
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Optional
@@ -115,8 +115,32 @@ async def _check_redis() -> bool:
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     _init_sentry_if_available()
     # Ici tu peux init tes pools (optionnels et non-bloquants)
+    from core.audit import get_audit_log_writer
+    from middleware.rgpd_logging import access_log_writer
+
+    from core.principal_cache import listen_for_invalidations
+    from services.pdf_generator import keep_legal_documents_rendered
+
+    await access_log_writer.start()
+    await get_audit_log_writer().start()
+    auth_invalidation_listener = asyncio.create_task(listen_for_invalidations())
+    legal_documents_prerender = asyncio.create_task(keep_legal_documents_rendered())
+    metrics_collector = None
+    if ENABLE_METRICS_MIDDLEWARE:
+        from api.routes.prometheus_metrics import run_metrics_collector
+
+        metrics_collector = asyncio.create_task(run_metrics_collector())
     yield
     # Ici tu peux fermer proprement tes pools
+    from services.outlook.graph_client import close_graph_http_client
+
+    if metrics_collector is not None:
+        metrics_collector.cancel()
+    auth_invalidation_listener.cancel()
+    legal_documents_prerender.cancel()
+    await access_log_writer.stop()  # drain des logs RGPD en attente
+    await get_audit_log_writer().stop()
+    await close_graph_http_client()
 
 
 # ============================================================
@@ -176,11 +200,10 @@ except ImportError:
 except Exception as e:
     logger.warning(f"Rate limiting setup failed: {e}")
 
-# --- Metrics simple (temps de réponse) ---
+# --- Erreurs non gérées (réponse JSON contrôlée) ---
 if ENABLE_METRICS_MIDDLEWARE:
     @app.middleware("http")
     async def add_process_time_header(request: Request, call_next):
-        start = time.perf_counter()
         try:
             response = await call_next(request)
         except Exception as exc:
@@ -217,11 +240,30 @@ if ENABLE_METRICS_MIDDLEWARE:
                 status_code=500,
                 content={"detail": "Internal Server Error", "error": error_detail},
             )
-        finally:
-            process_time = time.perf_counter() - start
-            # Tu peux loguer si tu veux
         return response
 
+    # --- Profiling SQL par requête (Server-Timing, détection N+1) ---
+    from core.config import settings
+
+    if settings.query_profiler_enabled:
+        try:
+            from middleware.query_profiling import QueryProfilingMiddleware
+
+            app.add_middleware(QueryProfilingMiddleware)
+            logger.info("Query profiling middleware enabled")
+        except Exception as e:
+            logger.warning(f"Query profiling middleware setup failed: {e}")
+
+    # --- Metrics HTTP (latence par route template, pure ASGI) ---
+    # Ajouté en dernier = couche la plus externe: mesure aussi les autres middlewares
+    try:
+        from middleware.http_metrics import HTTPMetricsMiddleware
+
+        app.add_middleware(HTTPMetricsMiddleware)
+        logger.info("HTTP metrics middleware enabled")
+    except Exception as e:
+        logger.warning(f"HTTP metrics middleware setup failed: {e}")
+
 
 # ============================================================
 # ✅ Health & Ready
@@ -267,9 +309,10 @@ except Exception as e:
 try:
     from fastapi import Query, WebSocket, WebSocketDisconnect
 
-    from core.database import get_db
     from core.notifications import websocket_endpoint
-    from core.security import decode_token
+    from core.exceptions import UnauthorizedError
+    from core.principal_cache import get_user_snapshot
+    from core.security import authenticate_principal
 
     @app.websocket("/ws/notifications")
     async def notifications_websocket(
@@ -278,34 +321,29 @@ try:
     ):
         """Endpoint WebSocket pour les notifications temps réel (multi-tenant)"""
         try:
-            # Décoder le token pour obtenir l'utilisateur
-            payload = decode_token(token)
+            # Principal en cache + snapshot (utilisateur actif), DB au premier usage seulement
+            try:
+                payload = await asyncio.to_thread(authenticate_principal, token)
+            except UnauthorizedError:
+                await websocket.close(code=1008, reason="Invalid token or inactive user")
+                return
             user_id = payload.get("sub")
 
             if not user_id:
                 await websocket.close(code=1008, reason="Invalid token: missing user_id")
                 return
 
-            # Récupérer l'org_id depuis le token ou la DB
+            # Récupérer l'org_id depuis le token ou le snapshot utilisateur
             org_id = payload.get("org_id")
 
-            # Fallback: si pas dans le token, récupérer depuis la DB
+            # Fallback: snapshot partagé (DB uniquement au premier handshake de l'utilisateur)
             if not org_id:
-                from models.user import User
-                db_gen = get_db()
-                db = next(db_gen)
-                try:
-                    user = db.query(User).filter(User.id == int(user_id)).first()
-                    if user and hasattr(user, "organisation_id"):
-                        org_id = user.organisation_id
-                    elif user:
-                        # Fallback: organisation par défaut (1) si pas d'org_id
-                        org_id = 1
-                    else:
-                        await websocket.close(code=1008, reason="User not found")
-                        return
-                finally:
-                    db.close()
+                snapshot = await asyncio.to_thread(get_user_snapshot, user_id)
+                if snapshot is None:
+                    await websocket.close(code=1008, reason="User not found")
+                    return
+                # Fallback: organisation par défaut (1) si pas d'org_id
+                org_id = snapshot.organisation_id or 1
 
             if not org_id:
                 await websocket.close(code=1008, reason="Invalid token: missing org_id")
@@ -0,0 +1,66 @@
+"""
+HTTP Metrics Middleware (pure ASGI)
+
+Records http_requests_total / http_request_duration_seconds for every request.
+The endpoint label is the route template (e.g. /api/v1/people/{person_id}),
+never the raw path, so label cardinality stays bounded by the number of routes.
+Requests that match no route are grouped under "unmatched".
+"""
+
+import time
+
+from prometheus_client import Counter, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "unmatched"
+
+http_requests_total = Counter(
+    'http_requests_total',
+    'Total HTTP requests',
+    ['method', 'endpoint', 'status']
+)
+http_request_duration_seconds = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request duration',
+    ['method', 'endpoint'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def get_route_template(scope: Scope) -> str:
+    """Route template set by the router on the scope (FastAPI APIRoute.path)"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+class HTTPMetricsMiddleware:
+    """Pure ASGI middleware: latency histogram + request counter per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            method = scope["method"]
+            endpoint = get_route_template(scope)
+            http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(elapsed)
+            http_requests_total.labels(
+                method=method, endpoint=endpoint, status=str(status_code)
+            ).inc()
@@ -0,0 +1,48 @@
+"""
+Query Profiling Middleware (pure ASGI)
+
+Opens a per-request SQL profile (core.query_profiler) and attaches the totals
+to the response as a Server-Timing header, e.g.:
+
+    Server-Timing: db;dur=12.4;desc="7 queries"
+
+At the end of the request the N+1 detector logs SELECT fingerprints repeated
+more than settings.n_plus_one_threshold times.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.query_profiler import current_profile, end_request_profile, start_request_profile
+from middleware.http_metrics import get_route_template
+
+
+class QueryProfilingMiddleware:
+    """Pure ASGI middleware: per-request query count/time + Server-Timing header"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request_profile(f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                profile = current_profile()
+                if profile is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Nom stable pour les logs N+1: route template plutôt que chemin brut
+            profile = current_profile()
+            if profile is not None:
+                profile.name = f"{scope['method']} {get_route_template(scope)}"
+            end_request_profile(token)
@@ -3,23 +3,30 @@ RGPD Data Access Logging Middleware
 
 Automatically logs all access to personal data endpoints.
 Compliant with CNIL requirements for data access traceability.
+
+Log entries are enqueued in memory and written in batches by
+`access_log_writer` (started/drained in the app lifespan), so the request
+path never waits on a DB transaction.
 """
 
+import asyncio
 import json
 import logging
 import re
 from datetime import datetime
 from typing import Optional
 
-from fastapi import Request
-from sqlalchemy.orm import Session
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from database import SessionLocal
+from core.batch_writer import BatchedInsertWriter
 from models.data_access_log import DataAccessLog
 
 logger = logging.getLogger(__name__)
 
+# Append-only writer for data_access_logs (flush every 250 ms or 500 rows)
+access_log_writer = BatchedInsertWriter("rgpd_access_log", DataAccessLog.__table__)
+
 # Sensitive variables to mask in logs
 SENSITIVE_ENV_VARS = {
     "DATABASE_URL",
@@ -90,9 +97,9 @@ def get_access_type(method: str, path: str) -> Optional[str]:
     return None
 
 
-class RGPDLoggingMiddleware(BaseHTTPMiddleware):
+class RGPDLoggingMiddleware:
     """
-    Middleware that logs all access to personal data endpoints.
+    Middleware that logs all access to personal data endpoints (pure ASGI).
 
     Automatically creates DataAccessLog entries for:
     - GET requests to sensitive entities (people, organisations, users, etc.)
@@ -100,68 +107,88 @@ class RGPDLoggingMiddleware(BaseHTTPMiddleware):
     - Export requests
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp, writer: Optional[BatchedInsertWriter] = None):
+        self.app = app
+        self.writer = writer or access_log_writer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        method = scope["method"]
+
+        # Determine access type / entity before the request: untracked routes pass straight through
+        access_type = get_access_type(method, path)
+        entity_type, entity_id = extract_entity_from_path(path) if access_type else (None, None)
+        if not (entity_type and entity_id and access_type):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         # Process request
-        response = await call_next(request)
+        await self.app(scope, receive, send_wrapper)
 
         # Only log successful requests (2xx status codes)
-        if 200 <= response.status_code < 300:
-            # Extract entity info from path
-            entity_type, entity_id = extract_entity_from_path(request.url.path)
-
-            # Determine access type
-            access_type = get_access_type(request.method, request.url.path)
-
-            # Only log if we have entity info and it's a tracked access type
-            if entity_type and entity_id and access_type:
-                # Get user info from request state (set by auth middleware)
-                user_id = getattr(request.state, "user_id", None)
-
-                # Get client IP
-                ip_address = None
-                if request.client:
-                    ip_address = request.client.host
-                # Check for X-Forwarded-For header (proxy/load balancer)
-                if "x-forwarded-for" in request.headers:
-                    ip_address = request.headers["x-forwarded-for"].split(",")[0].strip()
-
-                # Get User-Agent
-                user_agent = request.headers.get("user-agent", "")
-
-                # Determine purpose based on endpoint
-                purpose = self._get_purpose(access_type, entity_type, request.url.path)
-
-                # Create log entry
-                try:
-                    db: Session = SessionLocal()
-                    try:
-                        log_entry = DataAccessLog(
-                            entity_type=entity_type,
-                            entity_id=entity_id,
-                            access_type=access_type,
-                            endpoint=request.url.path,
-                            purpose=purpose,
-                            user_id=user_id,
-                            ip_address=ip_address,
-                            user_agent=user_agent[:500] if user_agent else None,
-                            extra_data=json.dumps(
-                                {"method": request.method, "query_params": dict(request.query_params)}
-                            ),
-                            accessed_at=datetime.utcnow(),
-                        )
-                        db.add(log_entry)
-                        db.commit()
-
-                        logger.debug(
-                            f"RGPD Access logged: {access_type} {entity_type}:{entity_id} by user:{user_id}"
-                        )
-                    finally:
-                        db.close()
-                except Exception as e:
-                    # Never fail the request due to logging errors
-                    logger.error(f"Failed to create RGPD access log: {e}", exc_info=True)
-
-        return response
+        if not 200 <= status_code < 300:
+            return
+
+        try:
+            headers = Headers(scope=scope)
+
+            # Get user info from request state (set by auth middleware)
+            user_id = (scope.get("state") or {}).get("user_id")
+
+            # Get client IP
+            ip_address = None
+            client = scope.get("client")
+            if client:
+                ip_address = client[0]
+            # Check for X-Forwarded-For header (proxy/load balancer)
+            if "x-forwarded-for" in headers:
+                ip_address = headers["x-forwarded-for"].split(",")[0].strip()
+
+            # Get User-Agent
+            user_agent = headers.get("user-agent", "")
+
+            self.writer.enqueue(
+                {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "access_type": access_type,
+                    "endpoint": path,
+                    "purpose": self._get_purpose(access_type, entity_type, path),
+                    "user_id": user_id,
+                    "ip_address": ip_address,
+                    "user_agent": user_agent[:500] if user_agent else None,
+                    "extra_data": json.dumps(
+                        {
+                            "method": method,
+                            "query_params": dict(QueryParams(scope.get("query_string", b""))),
+                        }
+                    ),
+                    "accessed_at": datetime.utcnow(),
+                }
+            )
+
+            # No background writer (e.g. app used without lifespan): flush inline off the loop
+            if not self.writer.running:
+                await asyncio.to_thread(self.writer.flush)
+
+            logger.debug(
+                f"RGPD Access logged: {access_type} {entity_type}:{entity_id} by user:{user_id}"
+            )
+        except Exception as e:
+            # Never fail the request due to logging errors
+            logger.error(f"Failed to create RGPD access log: {e}", exc_info=True)
 
     def _get_purpose(self, access_type: str, entity_type: str, path: str) -> str:
         """
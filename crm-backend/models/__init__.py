@@ -13,6 +13,7 @@ from models.base import Base, BaseModel
 from models.email import (
     CampaignSubscription,
     EmailCampaign,
+    EmailCampaignEventRollup,
     EmailCampaignStatus,
     EmailCampaignStep,
     EmailEvent,
@@ -35,7 +36,9 @@ from models.interaction import (
 )
 from models.known_company import KnownCompany
 from models.autofill_decision_log import AutofillDecisionLog
-from models.kpi import DashboardKPI
+from models.kpi import DashboardDailyStat, DashboardKPI, DashboardStatCounter
+from models.data_quality import DataQualityScore
+from models.anonymization_checkpoint import AnonymizationCheckpoint
 from models.mailing_list import MailingList
 from models.mandat import Mandat, MandatStatus, MandatType
 from models.notification import Notification, NotificationPriority, NotificationType
@@ -64,12 +67,13 @@ from models.team import Team
 from models.user import User
 from models.user_email_account import UserEmailAccount
 from models.outlook_signature_pending import OutlookSignaturePending
+from models.outlook_delta_state import OutlookDeltaState
 from models.email_message import EmailMessage
 from models.email_attachment import EmailAttachment
 from models.autofill_suggestion import AutofillSuggestion
 from models.ai_memory import AIMemory
 from models.ai_user_preference import AIUserPreference
-from models.email_thread import EmailThread
+from models.email_thread import EmailThread, EmailThreadMessage
 from models.email_blacklist import EmailBlacklist
 from models.push_subscription import PushSubscription
 from models.webhook import Webhook
@@ -111,6 +115,10 @@ __all__ = [
     "OrganisationActivity",
     "OrganisationActivityType",
     "DashboardKPI",
+    "DashboardDailyStat",
+    "DashboardStatCounter",
+    "DataQualityScore",
+    "AnonymizationCheckpoint",
     # People
     "Person",
     "PersonOrganizationLink",
@@ -118,6 +126,7 @@ __all__ = [
     "User",
     "UserEmailAccount",
     "OutlookSignaturePending",
+    "OutlookDeltaState",
     "EmailMessage",
     "EmailAttachment",
     "AutofillSuggestion",
@@ -125,6 +134,7 @@ __all__ = [
     "AIUserPreference",
     "EmailBlacklist",
     "EmailThread",
+    "EmailThreadMessage",
     "PushSubscription",
     "Team",
     # Tasks
@@ -154,6 +164,7 @@ __all__ = [
     "EmailCampaignStep",
     "EmailSend",
     "EmailEvent",
+    "EmailCampaignEventRollup",
     "CampaignSubscription",
     "MailingList",
     "EmailTemplateCategory",
@@ -0,0 +1,29 @@
+"""Modèle AnonymizationCheckpoint - Reprise des passes d'anonymisation RGPD."""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+
+from models.base import BaseModel
+
+
+class AnonymizationCheckpoint(BaseModel):
+    """
+    Avancement d'une passe d'anonymisation par lots (services.rgpd_anonymizer).
+
+    Une ligne par (run_key, plan): dernier id traité (parcours par id croissant),
+    nombre de lignes anonymisées, date de fin. Une passe interrompue reprend
+    après `last_id`; les lignes d'une passe sont supprimées une fois tous ses
+    plans terminés (une nouvelle passe avec la même run_key repart de zéro).
+    """
+
+    __tablename__ = "anonymization_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("run_key", "plan", name="uq_anonymization_checkpoints_run_plan"),
+    )
+
+    run_key = Column(String(100), nullable=False)  # ex: "retention:2025-11-01", "user:42"
+    plan = Column(String(50), nullable=False)  # ex: "people", "email_messages"
+    last_id = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -6,6 +6,9 @@ Trace tous les changements sur:
 - Organisations (status, owner)
 - Users (roles, permissions)
 - Email campaigns (status)
+
+PostgreSQL: table partitionnée par mois sur created_at (core.log_partitions),
+clé primaire (id, created_at).
 """
 
 from datetime import datetime
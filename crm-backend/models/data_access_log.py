@@ -5,6 +5,9 @@ Conforme CNIL:
 - Trace tous les accès en lecture aux données sensibles
 - Trace toutes les suppressions/anonymisations
 - Conserve les logs pendant 3 ans minimum
+
+PostgreSQL: table partitionnée par mois sur accessed_at (core.log_partitions),
+clé primaire (id, accessed_at).
 """
 
 from datetime import datetime
@@ -0,0 +1,31 @@
+"""Modèle DataQualityScore - Score qualité persisté par personne / organisation."""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, UniqueConstraint
+
+from models.base import BaseModel
+
+
+class DataQualityScore(BaseModel):
+    """
+    Score qualité (0-100) d'une fiche Person ou Organisation.
+
+    Une ligne par (entity_type, entity_id), recalculée sur toute la population
+    par services.quality_scorer.QualityScorer.refresh_quality_scores (Celery beat).
+    """
+
+    __tablename__ = "data_quality_scores"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_data_quality_scores_entity"),
+        Index("idx_data_quality_scores_type_tier", "entity_type", "tier"),
+    )
+
+    entity_type = Column(String(20), nullable=False)  # "person" | "organisation"
+    entity_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    tier = Column(String(1), nullable=False)  # A / B / C / D
+    completeness = Column(Float, nullable=False)
+    validity_issues = Column(Integer, nullable=False, default=0)
+    potential_duplicates = Column(Integer, nullable=False, default=0)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
@@ -13,6 +13,7 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -376,7 +377,11 @@ class EmailSend(BaseModel):
 
 
 class EmailEvent(BaseModel):
-    """Événements renvoyés par SendGrid/Mailgun."""
+    """
+    Événements renvoyés par SendGrid/Mailgun.
+
+    PostgreSQL: table partitionnée par mois sur event_at (core.log_partitions).
+    """
 
     __tablename__ = "email_events"
     __table_args__ = (
@@ -404,6 +409,36 @@ class EmailEvent(BaseModel):
         return f"<EmailEvent id={self.id} send_id={self.send_id} type={self.event_type}>"
 
 
+class EmailCampaignEventRollup(BaseModel):
+    """Compteurs pré-agrégés campagne × variante × type d'événement (maintenus à l'ingestion)."""
+
+    __tablename__ = "email_campaign_event_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "campaign_id", "variant", "event_type", name="uq_email_campaign_event_rollup"
+        ),
+    )
+
+    campaign_id = Column(
+        Integer, ForeignKey("email_campaigns.id", ondelete="CASCADE"), nullable=False
+    )
+    # "" = envoi sans variante (NULL casserait la contrainte d'unicité)
+    variant = Column(String(8), nullable=False, default="")
+    event_type = Column(
+        Enum(EmailEventType, name="emaileventtype"),
+        nullable=False,
+    )
+    event_count = Column(Integer, nullable=False, default=0)
+    unique_sends = Column(Integer, nullable=False, default=0)
+    last_event_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<EmailCampaignEventRollup campaign_id={self.campaign_id} "
+            f"variant={self.variant!r} type={self.event_type} count={self.event_count}>"
+        )
+
+
 class CampaignSubscription(BaseModel):
     """Abonnement manuel d'une personne ou organisation à une campagne."""
 
@@ -5,7 +5,17 @@ Un thread regroupe plusieurs Interactions (emails) qui font partie
 de la même conversation (basé sur headers References, In-Reply-To, Message-ID).
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    ForeignKey,
+    JSON,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -151,6 +161,42 @@ class EmailThread(Base):
         return subject
 
 
+class EmailThreadMessage(Base):
+    """
+    Index normalisé Message-ID → thread, par équipe.
+
+    Résout References / In-Reply-To en une requête indexée (IN) au lieu de
+    parcourir metadata["message_ids"] de chaque thread.
+    """
+
+    __tablename__ = "email_thread_messages"
+    __table_args__ = (
+        UniqueConstraint("team_id", "message_id", name="uq_email_thread_messages_team_message"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+
+    # Message-ID sans chevrons (ex: "CAF=abc@mail.gmail.com")
+    message_id = Column(String(998), nullable=False)
+
+    thread_id = Column(
+        Integer,
+        ForeignKey("email_threads.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<EmailThreadMessage(team_id={self.team_id}, "
+            f"message_id='{self.message_id[:50]}', thread_id={self.thread_id})>"
+        )
+
+
 # Index composites pour performance
 Index(
     "ix_email_threads_team_subject",
@@ -17,7 +17,7 @@ from datetime import datetime
 
 from sqlalchemy import JSON, Boolean, CheckConstraint, Column, DateTime
 from sqlalchemy import Enum as SAEnum
-from sqlalchemy import ForeignKey, Index, Integer, String, Text
+from sqlalchemy import ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from models.base import Base, BaseModel
@@ -106,6 +106,12 @@ class InteractionParticipant(Base):
         )
 
 
+# Rappels non notifiés (index partiel, cf. workers/reminder_worker.py)
+PENDING_REMINDERS_SQL = (
+    "notified_at IS NULL AND assignee_id IS NOT NULL AND status IN ('todo', 'in_progress')"
+)
+
+
 class Interaction(BaseModel):
     """
     Interaction = communication ou activité liée à une organisation/personne.
@@ -132,6 +138,13 @@ class Interaction(BaseModel):
         Index("idx_interactions_org_created_at", "org_id", "created_at"),
         Index("idx_interactions_person_created_at", "person_id", "created_at"),
         Index("idx_interactions_created_at", "created_at"),
+        Index("idx_interactions_created_at_id", "created_at", "id"),  # Pagination keyset
+        # Rappels en attente (workers/reminder_worker.py): réclamation + prochaine échéance
+        Index(
+            "idx_interactions_pending_reminders",
+            "next_action_at",
+            postgresql_where=text(PENDING_REMINDERS_SQL),
+        ),
     )
 
     # Relations avec Organisation/Personne (nullable)
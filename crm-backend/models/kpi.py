@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from models.base import BaseModel
@@ -58,3 +68,54 @@ class DashboardKPI(BaseModel):
         """Convenience helper pour marquer le KPI comme saisi manuellement."""
         self.auto_generated = False
         self.data_source = "manual"
+
+
+class DashboardDailyStat(BaseModel):
+    """
+    Compteur journalier pré-agrégé par organisation (et équipe du propriétaire).
+
+    Une ligne par (jour, organisation, métrique) — métrique = type d'activité.
+    Maintenu incrémentalement par core.dashboard_rollups, reconstruit chaque nuit.
+    """
+
+    __tablename__ = "dashboard_daily_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "organisation_id",
+            "metric",
+            name="uq_dashboard_daily_stats_day_org_metric",
+        ),
+        Index("idx_dashboard_daily_stats_day_metric", "day", "metric"),
+        Index("idx_dashboard_daily_stats_org_day", "organisation_id", "day"),
+        Index("idx_dashboard_daily_stats_team_day", "team_id", "day"),
+    )
+
+    day = Column(Date, nullable=False)
+    organisation_id = Column(
+        Integer,
+        ForeignKey("organisations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Équipe du propriétaire de l'organisation (dénormalisée pour les dashboards d'équipe)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
+    metric = Column(String(64), nullable=False)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class DashboardStatCounter(BaseModel):
+    """
+    Compteur global pré-agrégé (état courant): organisations par catégorie/type,
+    tâches par statut et par jour d'échéance.
+
+    `dimension` = "" pour les totaux (NULL casserait la contrainte d'unicité).
+    """
+
+    __tablename__ = "dashboard_stat_counters"
+    __table_args__ = (
+        UniqueConstraint("metric", "dimension", name="uq_dashboard_stat_counters_metric_dimension"),
+    )
+
+    metric = Column(String(64), nullable=False)
+    dimension = Column(String(64), nullable=False, default="")
+    value = Column(Integer, nullable=False, default=0)
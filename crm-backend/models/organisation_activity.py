@@ -10,13 +10,28 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from models.base import BaseModel
 from models.constants import FK_ORGANISATIONS_ID, FK_USERS_ID, ONDELETE_CASCADE, ONDELETE_SET_NULL
 
 
+# Mois UTC de l'activité: expression immuable, donc indexable (PostgreSQL)
+_ACTIVITY_MONTH_SQL = "date_trunc('month', timezone('UTC', occurred_at))"
+
+
 class OrganisationActivityType(str, enum.Enum):
     """Types d'activités supportés dans la timeline unifiée."""
 
@@ -48,6 +63,11 @@ class OrganisationActivity(BaseModel):
         Index("idx_org_activities_org", "organisation_id"),
         Index("idx_org_activities_type", "type"),
         Index("idx_org_activities_created", "created_at"),
+        # Agrégation KPI mensuelle (DashboardStatsService._aggregate_kpis_from_activities)
+        Index("idx_org_activities_month", text(_ACTIVITY_MONTH_SQL)).ddl_if(dialect="postgresql"),
+        Index(
+            "idx_org_activities_org_month", "organisation_id", text(_ACTIVITY_MONTH_SQL)
+        ).ddl_if(dialect="postgresql"),
     )
 
     organisation_id = Column(
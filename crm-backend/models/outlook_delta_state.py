@@ -0,0 +1,36 @@
+"""
+Modèle pour l'état de synchronisation delta Outlook (Microsoft Graph)
+
+Un lien d'état par (utilisateur, dossier): deltaLink après une synchro complète,
+nextLink si la synchro a été interrompue (limite atteinte) et doit reprendre.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+
+from models.base import Base
+
+
+class OutlookDeltaState(Base):
+    """Lien delta Graph stocké par dossier pour ne récupérer que les changements"""
+
+    __tablename__ = "outlook_delta_states"
+    __table_args__ = (
+        UniqueConstraint("user_id", "folder_id", name="uq_outlook_delta_user_folder"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    folder_id = Column(String(255), nullable=False)
+    folder_name = Column(String(255), nullable=True)
+
+    # deltaLink (synchro complète) ou nextLink (reprise)
+    state_link = Column(Text, nullable=False)
+    is_complete = Column(Boolean, default=True, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<OutlookDeltaState user={self.user_id} folder={self.folder_name or self.folder_id}>"
@@ -139,6 +139,8 @@ class WorkflowExecution(BaseModel):
     - Logs d'exécution
     - Entité déclencheur (organisation, deal, etc.)
     - Durée d'exécution
+
+    PostgreSQL: table partitionnée par mois sur created_at (core.log_partitions).
     """
 
     __tablename__ = "workflow_executions"
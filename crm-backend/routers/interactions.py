@@ -21,14 +21,18 @@ Permissions:
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy import desc
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from core import get_current_user, get_db
+from core.pagination import paginate_keyset
+from core.projection import parse_fields, select_columns
 from models.interaction import Interaction, InteractionParticipant, InteractionStatus
 from schemas.interaction import (
     InteractionAssigneeUpdate,
@@ -120,11 +124,51 @@ def _build_interaction_out(interaction: Interaction) -> InteractionOut:
     return InteractionOut(**data)
 
 
+# Champs projetables de la liste (?fields=...): nom API → colonne
+INTERACTION_LIST_FIELDS = {
+    "id": Interaction.id,
+    "org_id": Interaction.org_id,
+    "person_id": Interaction.person_id,
+    "type": Interaction.type,
+    "title": Interaction.title,
+    "body": Interaction.description,
+    "created_by": Interaction.created_by,
+    "created_at": Interaction.created_at,
+    "updated_at": Interaction.updated_at,
+    "attachments": Interaction.attachments,
+    "external_participants": Interaction.external_participants,
+    "status": Interaction.status,
+    "assignee_id": Interaction.assignee_id,
+    "next_action_at": Interaction.next_action_at,
+}
+# id + created_at: clé keyset, toujours sélectionnés
+INTERACTION_KEY_FIELDS = ("id", "created_at")
+
+
+def _load_participants(db: Session, interaction_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Participants internes de plusieurs interactions en une seule requête (colonnes seules)"""
+    participants: Dict[int, List[Dict[str, Any]]] = {id_: [] for id_ in interaction_ids}
+    if not interaction_ids:
+        return participants
+    rows = db.query(
+        InteractionParticipant.interaction_id,
+        InteractionParticipant.person_id,
+        InteractionParticipant.role,
+        InteractionParticipant.present,
+    ).filter(InteractionParticipant.interaction_id.in_(interaction_ids))
+    for row in rows:
+        participants[row.interaction_id].append(
+            {"person_id": row.person_id, "role": row.role, "present": row.present}
+        )
+    return participants
+
+
 # ==================== V2 ENDPOINTS (for tests) ====================
 
 
 @router.get("", response_model=List[InteractionOut])
 async def list_interactions(
+    response: Response,
     type: Optional[str] = Query(None, description="Filter by type"),
     status: Optional[str] = Query(None, description="Filter by status"),
     org_id: Optional[int] = Query(None, description="Filter by org_id"),
@@ -133,11 +177,32 @@ async def list_interactions(
     end_date: Optional[str] = Query(None, description="End date (ISO format)"),
     overdue: Optional[bool] = Query(None, description="Overdue interactions only"),
     limit: int = Query(50, le=200),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (X-Next-Cursor of previous page)"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return (e.g. id,title,status,created_at)"
+    ),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    """List interactions with filters (V2 for tests)"""
-    query = db.query(Interaction)
+    """
+    List interactions with filters (V2 for tests)
+
+    Keyset pagination on (created_at, id) DESC: the next page cursor is returned
+    in the X-Next-Cursor header (absent on the last page).
+
+    `fields` selects only the requested columns in SQL and returns plain dicts
+    (id and created_at are always included).
+    """
+    selected = parse_fields(
+        fields,
+        {**INTERACTION_LIST_FIELDS, "participants": None},
+        required=INTERACTION_KEY_FIELDS,
+    )
+    if selected is None:
+        query = db.query(Interaction).options(selectinload(Interaction.participants))
+    else:
+        columns = [name for name in selected if name in INTERACTION_LIST_FIELDS]
+        query = db.query(*select_columns(INTERACTION_LIST_FIELDS, columns))
 
     if type:
         query = query.filter(Interaction.type == type)
@@ -168,8 +233,26 @@ async def list_interactions(
                 Interaction.next_action_at < now
             )
 
-    interactions = query.order_by(desc(Interaction.created_at)).limit(limit).all()
-    return [_build_interaction_out(i) for i in interactions]
+    page = paginate_keyset(
+        query,
+        [Interaction.created_at, Interaction.id],
+        cursor=cursor,
+        limit=limit,
+        descending=True,
+    )
+    if selected is not None:
+        items = [dict(row._mapping) for row in page.items]
+        if "participants" in selected:
+            participants = _load_participants(db, [item["id"] for item in items])
+            for item in items:
+                item["participants"] = participants[item["id"]]
+        headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else None
+        return JSONResponse(content=jsonable_encoder(items), headers=headers)
+
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    return [_build_interaction_out(i) for i in page.items]
 
 
 @router.post("/create-v2", response_model=InteractionOut, status_code=status.HTTP_201_CREATED)
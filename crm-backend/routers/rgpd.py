@@ -9,18 +9,20 @@ Compliant with:
 """
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
-from core.database import get_db
+from core.database import SessionLocal, get_db
 from models.data_access_log import DataAccessLog
 from models.user import User
-from services.rgpd_service import RGPDService
+from services.rgpd_service import RGPDService, get_export_job, save_export_job
 
 router = APIRouter(prefix="/rgpd", tags=["rgpd"])
 
@@ -46,6 +48,17 @@ class ExportResponse(BaseModel):
     data: Dict[str, Any]
 
 
+class ExportJobResponse(BaseModel):
+    """Response model for a background export job"""
+
+    job_id: str
+    status: str
+    section: Optional[str] = None
+    exported_rows: int = 0
+    total_rows: int = 0
+    error: Optional[str] = None
+
+
 class DeleteRequest(BaseModel):
     """Request model for data deletion/anonymization"""
 
@@ -145,6 +158,134 @@ async def export_my_data(
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
+def _log_export(db: Session, request: Request, user: User, purpose: str) -> None:
+    """Log an export request in data_access_logs"""
+    db.add(
+        DataAccessLog(
+            entity_type="user",
+            entity_id=user.id,
+            access_type="export",
+            endpoint=request.url.path,
+            purpose=purpose,
+            user_id=user.id,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent", "")[:500],
+            accessed_at=datetime.utcnow(),
+        )
+    )
+    db.commit()
+
+
+def _stream_export(user_id: int, include_access_logs: bool) -> Iterator[bytes]:
+    """Export stream with its own session, open for the whole response"""
+    db = SessionLocal()
+    try:
+        yield from RGPDService(db).stream_user_export(
+            user_id, include_access_logs=include_access_logs
+        )
+    finally:
+        db.close()
+
+
+@router.get("/export/stream", summary="Download my personal data as a zip stream (RGPD)")
+async def stream_my_data(
+    request: Request,
+    include_access_logs: bool = Query(False, description="Include access logs (admin only)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream all personal data for the current user as a zip archive.
+
+    Same content as /export without any limit (all email messages, stored attachments),
+    sent while it is produced: one JSON-lines file per section, attachments,
+    and a manifest with row counts.
+    """
+    if include_access_logs and not current_user.is_admin:
+        include_access_logs = False
+
+    _log_export(db, request, current_user, "Export RGPD (stream) - User request")
+
+    filename = f"rgpd_export_{current_user.id}_{datetime.utcnow():%Y%m%d_%H%M%S}.zip"
+    return StreamingResponse(
+        _stream_export(current_user.id, include_access_logs),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/export/jobs",
+    response_model=ExportJobResponse,
+    status_code=202,
+    summary="Start a background export of my personal data (RGPD)",
+)
+async def start_export_job(
+    request: Request,
+    include_access_logs: bool = Query(False, description="Include access logs (admin only)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Start a background export (Celery) of all personal data for the current user.
+
+    Poll /export/jobs/{job_id} for progress, then download the archive from
+    /export/jobs/{job_id}/download. Answers 503 when job statuses cannot be stored
+    (the job could never be polled); /export/stream remains available.
+    """
+    from tasks.rgpd_tasks import export_user_data
+
+    if include_access_logs and not current_user.is_admin:
+        include_access_logs = False
+
+    job = {"job_id": uuid4().hex, "user_id": current_user.id, "status": "pending"}
+    if not save_export_job(job):
+        raise HTTPException(
+            status_code=503,
+            detail="Background exports are temporarily unavailable, use /rgpd/export/stream",
+        )
+
+    _log_export(db, request, current_user, "Export RGPD (background job) - User request")
+    export_user_data.delay(current_user.id, job["job_id"], include_access_logs)
+
+    return ExportJobResponse(**job)
+
+
+def _get_own_export_job(job_id: str, user: User) -> Dict[str, Any]:
+    job = get_export_job(job_id)
+    if not job or job.get("user_id") != user.id:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@router.get("/export/jobs/{job_id}", response_model=ExportJobResponse, summary="Export job progress")
+async def get_export_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Status and progress (rows exported so far) of one of my export jobs."""
+    return ExportJobResponse(**_get_own_export_job(job_id, current_user))
+
+
+@router.get("/export/jobs/{job_id}/download", summary="Download a completed export")
+async def download_export_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Download the archive of one of my completed export jobs."""
+    job = _get_own_export_job(job_id, current_user)
+    if job.get("status") != "completed" or not job.get("file_path"):
+        raise HTTPException(status_code=409, detail="Export not completed yet")
+
+    path = Path(job["file_path"])
+    if not path.is_file():
+        raise HTTPException(status_code=410, detail="Export archive expired")
+
+    return FileResponse(
+        path, media_type="application/zip", filename=f"rgpd_export_{current_user.id}.zip"
+    )
+
+
 @router.delete("/delete", response_model=DeleteResponse, summary="Delete my personal data (RGPD)")
 async def delete_my_data(
     request: Request,
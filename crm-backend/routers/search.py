@@ -16,8 +16,11 @@ from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
 from core.database import get_db
+from core.projection import model_fields, parse_fields
 from core.search import SearchService, autocomplete, search_all
-from models.organisation import OrganisationCategory
+from models.mandat import Mandat
+from models.organisation import Organisation, OrganisationCategory
+from models.person import Person
 from models.user import User
 
 router = APIRouter(prefix="/search", tags=["search"])
@@ -83,6 +86,9 @@ async def search_organisations(
     pipeline_stage: Optional[str] = Query(None, description="Filtrer par stage pipeline"),
     limit: int = Query(20, ge=1, le=100, description="Nombre max de résultats"),
     offset: int = Query(0, ge=0, description="Offset pour pagination"),
+    fields: Optional[str] = Query(
+        None, description="Champs à retourner, séparés par virgule (ex: id,name,email)"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -100,6 +106,7 @@ async def search_organisations(
     - `/search/organisations?q=finance`
     - `/search/organisations?q=banque&category=institution&city=Paris`
     - `/search/organisations?q=startup&is_active=true&limit=50`
+    - `/search/organisations?q=finance&fields=name,email,category` (colonnes seules)
 
     **Returns:**
     {
@@ -128,6 +135,7 @@ async def search_organisations(
         filters=filters if filters else None,
         limit=limit,
         offset=offset,
+        fields=parse_fields(fields, model_fields(Organisation)),
     )
 
     return results
@@ -138,6 +146,9 @@ async def search_people(
     q: str = Query(..., min_length=2, description="Texte de recherche"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(
+        None, description="Champs à retourner, séparés par virgule (ex: id,name,email)"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -163,6 +174,7 @@ async def search_people(
         current_user=current_user,
         limit=limit,
         offset=offset,
+        fields=parse_fields(fields, model_fields(Person)),
     )
 
     return results
@@ -173,6 +185,9 @@ async def search_mandats(
     q: str = Query(..., min_length=2, description="Texte de recherche"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(
+        None, description="Champs à retourner, séparés par virgule (ex: id,name,email)"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -198,6 +213,7 @@ async def search_mandats(
         current_user=current_user,
         limit=limit,
         offset=offset,
+        fields=parse_fields(fields, model_fields(Mandat)),
     )
 
     return results
@@ -29,15 +29,19 @@ class PaginationParams(BaseSchema):
 
 
 class PaginatedResponse(BaseSchema, Generic[T]):
-    """Réponse paginée générique"""
+    """Réponse paginée générique (offset, ou curseur via next_cursor)"""
 
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
     items: list[T]
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
     @property
     def total_pages(self) -> int:
+        if self.total is None:
+            return 0
         return (self.total + self.limit - 1) // self.limit
 
     @property
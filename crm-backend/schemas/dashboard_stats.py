@@ -3,7 +3,8 @@ Schémas pour les statistiques Dashboard
 Remplace progressivement les endpoints KPI legacy
 """
 
-from typing import List, Optional
+from datetime import date
+from typing import Dict, List, Optional
 
 from pydantic import Field
 
@@ -136,6 +137,25 @@ class YearlyAggregateStats(BaseSchema):
     months_recorded: int = 0
 
 
+class ActivitySeriesPoint(BaseSchema):
+    """Activités d'une période (jour, semaine, mois ou année)"""
+
+    period: date
+    total: int = 0
+    by_type: Dict[str, int] = {}  # {"reunion": 4, "email": 12, ...}
+
+
+class ActivitySeriesResponse(BaseSchema):
+    """Série temporelle d'activités, lue depuis les compteurs journaliers"""
+
+    granularity: str
+    start_date: date
+    end_date: date
+    organisation_id: Optional[int] = None
+    team_id: Optional[int] = None
+    points: List[ActivitySeriesPoint] = []
+
+
 # ============= FILTRES ET PARAMÈTRES =============
 
 
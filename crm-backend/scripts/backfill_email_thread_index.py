@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Backfill de l'index Message-ID → thread (email_thread_messages)
+
+Réindexe metadata["message_ids"] des threads existants. Idempotent: les
+Message-IDs déjà indexés sont ignorés. À lancer après la migration sur une
+base restaurée, ou pour réparer un index incomplet.
+
+Usage:
+    # Toutes les équipes
+    python scripts/backfill_email_thread_index.py
+
+    # Une seule équipe
+    python scripts/backfill_email_thread_index.py --team-id 3
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.database import SessionLocal
+from services.email_thread_service import EmailThreadService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill de l'index Message-ID des threads email")
+    parser.add_argument(
+        "--team-id",
+        type=int,
+        default=None,
+        help="Limiter le backfill à une équipe (défaut: toutes)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Message-IDs insérés par lot (défaut: 500)",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        scope = f"équipe {args.team_id}" if args.team_id else "toutes les équipes"
+        logger.info(f"🔄 Backfill de l'index Message-ID ({scope})...")
+        total = EmailThreadService(db).rebuild_message_index(args.team_id, args.batch_size)
+        logger.info(f"✅ {total} Message-IDs indexés")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Erreur lors du backfill: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@
 Script de maintenance DB - Nettoyage automatique
 
 Fonctionnalités:
-1. Purge logs anciens (> 90 jours)
+1. Purge logs anciens (> 90 jours), par suppression de partitions mensuelles
+   (création des partitions à venir)
 2. Nettoyage sessions expirées
 3. Purge notifications lues (> 30 jours)
 4. VACUUM PostgreSQL
@@ -38,6 +39,13 @@ from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 
 from core.database import SessionLocal
+from core.log_partitions import (
+    drop_partitions_before,
+    ensure_log_partitions,
+    estimated_rows,
+    expired_partitions,
+    is_partitioned,
+)
 from models.audit_log import AuditLog
 
 # Configuration logging
@@ -79,6 +87,20 @@ def cleanup_old_audit_logs(
     """
     cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
 
+    # Table partitionnée par mois: suppression des partitions entières expirées
+    # (coût constant quel que soit le volume, pas de bloat ni de VACUUM)
+    if is_partitioned(db, "audit_logs"):
+        partitions = expired_partitions(db, "audit_logs", cutoff_date)
+        count = estimated_rows(db, partitions)
+        logger.info(
+            f"{'[DRY-RUN] ' if dry_run else ''}Partitions audit logs à supprimer: "
+            f"{partitions or 'aucune'} (~{count} lignes, avant {cutoff_date.date()})"
+        )
+        if not dry_run and partitions:
+            drop_partitions_before(db, "audit_logs", cutoff_date)
+            logger.info(f"✅ Partitions audit logs supprimées: {len(partitions)}")
+        return count
+
     # Compter
     count = (
         db.query(AuditLog)
@@ -89,7 +111,7 @@ def cleanup_old_audit_logs(
     logger.info(f"{'[DRY-RUN] ' if dry_run else ''}Audit logs à supprimer: {count} (avant {cutoff_date.date()})")
 
     if not dry_run and count > 0:
-        # Supprimer par batch de 1000 pour éviter de bloquer la DB
+        # Table non partitionnée: suppression par batch de 1000 pour éviter de bloquer la DB
         deleted = 0
         batch_size = 1000
 
@@ -120,6 +142,22 @@ def cleanup_old_audit_logs(
     return count
 
 
+def ensure_future_partitions(db: Session, dry_run: bool = True) -> None:
+    """
+    Crée les partitions mensuelles à venir des tables de logs
+
+    Args:
+        db: Session SQLAlchemy
+        dry_run: Si True, simule sans créer
+    """
+    if dry_run:
+        logger.info("[DRY-RUN] Création des partitions de logs skippée en mode dry-run")
+        return
+
+    created = ensure_log_partitions(db)
+    logger.info(f"✅ Partitions de logs créées: {created or 'aucune (déjà à jour)'}")
+
+
 def cleanup_expired_sessions(
     db: Session,
     retention_days: int,
@@ -355,6 +393,7 @@ def main():
         total_deleted = 0
 
         logger.info("🗑️  Nettoyage en cours...")
+        ensure_future_partitions(db, dry_run)
         total_deleted += cleanup_old_audit_logs(db, args.logs_days, dry_run)
         total_deleted += cleanup_expired_sessions(db, args.sessions_days, dry_run)
         total_deleted += cleanup_old_notifications(db, args.notifications_days, dry_run)
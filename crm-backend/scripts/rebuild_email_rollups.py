@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Reconstruction des rollups analytics email (email_campaign_event_rollups)
+
+Recalcule les compteurs campagne × variante × type d'événement depuis email_events.
+À lancer après un import massif d'événements ou pour réparer une dérive
+(ex: deux webhooks concurrents sur le même envoi → unique_sends surestimé).
+
+Usage:
+    # Toutes les campagnes
+    python scripts/rebuild_email_rollups.py
+
+    # Une seule campagne
+    python scripts/rebuild_email_rollups.py --campaign-id 42
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.database import SessionLocal
+from services.email_service import EmailEventRollupService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruit les rollups analytics email")
+    parser.add_argument(
+        "--campaign-id",
+        type=int,
+        default=None,
+        help="Limiter la reconstruction à une campagne (défaut: toutes)",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        scope = f"campagne {args.campaign_id}" if args.campaign_id else "toutes les campagnes"
+        logger.info(f"🔄 Reconstruction des rollups ({scope})...")
+        rows = EmailEventRollupService(db).rebuild(args.campaign_id)
+        logger.info(f"✅ {rows} lignes de rollup écrites")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Erreur lors de la reconstruction: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
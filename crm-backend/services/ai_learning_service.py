@@ -3,11 +3,19 @@ AI Learning Service - Phase 3: AI Memory & Learning System
 
 Apprentissage des préférences utilisateur depuis le Context Menu.
 Améliore les suggestions au fil du temps basé sur les choix users.
+
+Boost des suggestions: modèle de préférences en mémoire par utilisateur
+(acceptations par (champ, valeur) sur 90 jours glissants), chargé en une requête,
+mis à jour par track_choice, partagé par le process (LRU + TTL).
 """
 
 import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc
 
@@ -15,6 +23,118 @@ from models.ai_user_preference import AIUserPreference
 
 logger = logging.getLogger(__name__)
 
+# Fenêtre d'apprentissage (alignée sur la rétention RGPD)
+PREFERENCE_WINDOW_DAYS = 90
+
+
+def _boosted_score(base_score: float, accept_count: int) -> float:
+    """Boost: +10% par accept, max +50%"""
+    if accept_count <= 0:
+        return base_score
+    return min(base_score + min(accept_count * 0.1, 0.5), 1.0)
+
+
+class UserPreferenceModel:
+    """
+    Préférences apprises d'un utilisateur: dates d'acceptation par (champ, valeur)
+
+    Les acceptations sorties de la fenêtre glissante sont élaguées à la lecture.
+    """
+
+    def __init__(self, user_id: int, window_days: int = PREFERENCE_WINDOW_DAYS):
+        self.user_id = user_id
+        self.window = timedelta(days=window_days)
+        self._accepts: Dict[Tuple[str, str], List[datetime]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        user_id: int,
+        now: Optional[datetime] = None,
+    ) -> "UserPreferenceModel":
+        """Charge les acceptations de la fenêtre en une requête"""
+        model = cls(user_id)
+        cutoff = (now or datetime.utcnow()) - model.window
+        rows = (
+            db.query(
+                AIUserPreference.field_name,
+                AIUserPreference.final_value,
+                AIUserPreference.created_at,
+            )
+            .filter(
+                AIUserPreference.user_id == user_id,
+                AIUserPreference.action == "accept",
+                AIUserPreference.final_value.isnot(None),
+                AIUserPreference.created_at >= cutoff,
+            )
+            .order_by(AIUserPreference.created_at)
+        )
+        for field_name, value, created_at in rows:
+            model._accepts.setdefault((field_name, value), []).append(created_at)
+        return model
+
+    def record(self, field_name: str, value: str, accepted_at: datetime) -> None:
+        with self._lock:
+            insort(self._accepts.setdefault((field_name, value), []), accepted_at)
+
+    def accept_count(self, field_name: str, value: str, now: Optional[datetime] = None) -> int:
+        key = (field_name, value)
+        cutoff = (now or datetime.utcnow()) - self.window
+        with self._lock:
+            accepted = self._accepts.get(key)
+            if not accepted:
+                return 0
+            expired = bisect_left(accepted, cutoff)
+            if expired:
+                del accepted[:expired]
+                if not accepted:
+                    del self._accepts[key]
+            return len(accepted)
+
+
+class PreferenceModelCache:
+    """LRU user_id → UserPreferenceModel (process-local, TTL: écritures des autres workers)"""
+
+    def __init__(self, max_users: int = 1000, ttl: float = 300):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._models: "OrderedDict[int, Tuple[float, UserPreferenceModel]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> UserPreferenceModel:
+        with self._lock:
+            entry = self._models.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._models.move_to_end(user_id)
+                return entry[1]
+
+        model = UserPreferenceModel.load(db, user_id)
+        with self._lock:
+            self._models[user_id] = (time.monotonic() + self.ttl, model)
+            self._models.move_to_end(user_id)
+            while len(self._models) > self.max_users:
+                self._models.popitem(last=False)
+        return model
+
+    def record(self, user_id: int, field_name: str, value: str, accepted_at: datetime) -> None:
+        """Mise à jour incrémentale (sans effet si le modèle n'est pas chargé)"""
+        with self._lock:
+            entry = self._models.get(user_id)
+        if entry is not None:
+            entry[1].record(field_name, value, accepted_at)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._models.clear()
+            else:
+                self._models.pop(user_id, None)
+
+
+preference_models = PreferenceModelCache()
+
 
 class AILearningService:
     """
@@ -87,6 +207,9 @@ class AILearningService:
             self.db.commit()
             self.db.refresh(preference)
 
+            if action == "accept" and final_value is not None:
+                preference_models.record(user_id, field_name, final_value, preference.created_at)
+
             logger.info(
                 f"[AILearning] Tracked choice: user={user_id}, field={field_name}, "
                 f"action={action}, value={final_value[:20] if final_value else None}"
@@ -250,39 +373,47 @@ class AILearningService:
         Returns:
             Score boosté (0-1)
         """
+        return self.boost_suggestion_scores(
+            user_id, [(field_name, suggested_value, base_score)]
+        )[0]
+
+    def boost_suggestion_scores(
+        self,
+        user_id: int,
+        suggestions: Iterable[Tuple[str, str, float]],
+    ) -> List[float]:
+        """
+        Boost un ensemble de suggestions (ex: brouillon autofill complet) en un appel
+
+        Le modèle de préférences de l'utilisateur est chargé au plus une fois
+        (puis servi depuis le cache process); aucune requête par valeur.
+
+        Args:
+            user_id: ID utilisateur
+            suggestions: Triplets (champ, valeur suggérée, score de base 0-1)
+
+        Returns:
+            Scores boostés (0-1), dans l'ordre des suggestions
+        """
+        suggestions = list(suggestions)
         try:
-            # Count combien de fois cette valeur a été acceptée
-            accept_count = (
-                self.db.query(func.count(AIUserPreference.id))
-                .filter(
-                    and_(
-                        AIUserPreference.user_id == user_id,
-                        AIUserPreference.field_name == field_name,
-                        AIUserPreference.action == "accept",
-                        AIUserPreference.final_value == suggested_value,
-                        AIUserPreference.created_at >= datetime.utcnow() - timedelta(days=90),
-                    )
-                )
-                .scalar()
-            )
+            model = preference_models.get(self.db, user_id)
+        except Exception as e:
+            logger.error(f"[AILearning] Error boosting score: {e}")
+            return [base_score for _, _, base_score in suggestions]
 
+        now = datetime.utcnow()
+        scores = []
+        for field_name, suggested_value, base_score in suggestions:
+            accept_count = model.accept_count(field_name, suggested_value, now)
+            boosted_score = _boosted_score(base_score, accept_count)
             if accept_count > 0:
-                # Boost: +10% par accept, max +50%
-                boost = min(accept_count * 0.1, 0.5)
-                boosted_score = min(base_score + boost, 1.0)
-
                 logger.debug(
                     f"[AILearning] Boosted score for '{suggested_value}': "
                     f"{base_score:.2f} -> {boosted_score:.2f} (accept_count={accept_count})"
                 )
-
-                return boosted_score
-
-            return base_score
-
-        except Exception as e:
-            logger.error(f"[AILearning] Error boosting score: {e}")
-            return base_score
+            scores.append(boosted_score)
+        return scores
 
     def cleanup_expired_preferences(self) -> int:
         """
@@ -327,6 +458,7 @@ class AILearningService:
             )
 
             self.db.commit()
+            preference_models.invalidate(user_id)
 
             logger.info(f"[AILearning] RGPD: deleted {deleted_count} preferences for user={user_id}")
 
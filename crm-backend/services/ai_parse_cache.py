@@ -0,0 +1,239 @@
+"""
+AI Parse Cache - Cache content-addressed des parsings IA (signatures, intentions)
+
+Clé = SHA256 du texte normalisé (zone de signature, pas le corps complet):
+la même signature corporate vue dans des milliers d'emails n'est parsée qu'une fois.
+
+Deux niveaux:
+1. Exact: content_key → résultat (dict en mémoire, puis AIMemory.prompt_hash en DB)
+2. Quasi-doublons: SimHash 64 bits, index par bandes (8 × 8 bits).
+   Deux textes à distance de Hamming ≤ 7 partagent forcément une bande,
+   la recherche ne compare donc qu'une fraction des entrées. L'appelant peut
+   refuser un candidat (ex: email extrait absent du nouveau texte).
+
+Partage inter-équipes: activé pour les signatures (données de contact publiques
+de l'expéditeur), désactivé pour les intentions (contenu privé des emails).
+
+Quasi-doublons: activés pour les signatures seulement. Pour les intentions, un
+mot suffit à inverser le sens ("nous acceptons" / "nous n'acceptons pas") pour
+une distance SimHash minime: seul le niveau exact est utilisé.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8
+SIMHASH_MAX_DISTANCE = SIMHASH_BANDS - 1
+DEFAULT_MAX_ENTRIES = 20000
+
+_QUOTE_PREFIX = re.compile(r'^\s*>+\s?', re.MULTILINE)
+_WHITESPACE = re.compile(r'\s+')
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def normalise_text(text: str) -> str:
+    """
+    Normalise un texte pour le cache: NFKC, minuscules, sans marqueurs de citation
+    ('>'), espaces compactés.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = _QUOTE_PREFIX.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def content_key(normalised: str) -> str:
+    """Clé exacte (SHA256 hex, 64 caractères comme AIMemory.prompt_hash)"""
+    return hashlib.sha256(normalised.encode()).hexdigest()
+
+
+def simhash(normalised: str, bits: int = SIMHASH_BITS) -> int:
+    """SimHash sur les tokens du texte"""
+    tokens = _TOKEN.findall(normalised)
+    if not tokens:
+        return 0
+
+    weights = [0] * bits
+    for feature in tokens:
+        digest = int.from_bytes(
+            hashlib.blake2b(feature.encode(), digest_size=bits // 8).digest(), "big"
+        )
+        for i in range(bits):
+            weights[i] += 1 if digest >> i & 1 else -1
+
+    fingerprint = 0
+    for i, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ParseCache:
+    """
+    Cache LRU mémoire (exact + quasi-doublons) avec compteurs de hits
+
+    Les clés sont éventuellement préfixées par l'équipe quand le partage
+    inter-équipes est désactivé.
+    """
+
+    def __init__(
+        self,
+        task_type: str,
+        share_across_teams: bool,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_distance: int = SIMHASH_MAX_DISTANCE,
+        near_duplicates: bool = True
+    ):
+        self.task_type = task_type
+        self.share_across_teams = share_across_teams
+        self.near_duplicates = near_duplicates
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+
+        self._entries: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._bands: Dict[Tuple[str, int, int], set] = {}
+        self._lock = threading.Lock()
+        self.warmed = False
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.backing_hits = 0  # Trouvé en DB (AIMemory) après un miss mémoire
+        self.misses = 0
+
+    def _scope(self, team_id: int) -> str:
+        return "*" if self.share_across_teams else str(team_id)
+
+    @staticmethod
+    def _band_keys(fingerprint: int, scope: str) -> List[Tuple[str, int, int]]:
+        width = SIMHASH_BITS // SIMHASH_BANDS
+        mask = (1 << width) - 1
+        return [(scope, band, fingerprint >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+    def lookup(
+        self,
+        normalised: str,
+        team_id: int,
+        accept: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """
+        Cherche en mémoire (exact puis quasi-doublon). Un échec n'est pas compté:
+        l'appelant consulte la DB puis appelle record_backing_hit() ou record_miss().
+
+        Args:
+            accept: filtre optionnel des quasi-doublons (le plus proche accepté gagne)
+
+        Returns:
+            (résultat, exact) si trouvé, None sinon
+        """
+        scope = self._scope(team_id)
+        key = f"{scope}:{content_key(normalised)}"
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return dict(entry[1]), True
+
+            if not self.near_duplicates:
+                return None
+
+            fingerprint = simhash(normalised)
+            candidates = set()
+            for band_key in self._band_keys(fingerprint, scope):
+                candidates |= self._bands.get(band_key, set())
+
+            ranked = sorted(
+                (hamming_distance(fingerprint, self._entries[candidate][0]), candidate)
+                for candidate in candidates
+            )
+            for distance, candidate in ranked:
+                if distance > self.max_distance:
+                    break
+                result = self._entries[candidate][1]
+                if accept is not None and not accept(result):
+                    continue
+                self._entries.move_to_end(candidate)
+                self.near_hits += 1
+                return dict(result), False
+
+            return None
+
+    def record_backing_hit(self):
+        with self._lock:
+            self.backing_hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def store(self, normalised: str, team_id: int, result: Dict[str, Any]):
+        scope = self._scope(team_id)
+        key = f"{scope}:{content_key(normalised)}"
+        fingerprint = simhash(normalised)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._entries[key] = (fingerprint, dict(result))
+                return
+
+            self._entries[key] = (fingerprint, dict(result))
+            if self.near_duplicates:
+                for band_key in self._band_keys(fingerprint, scope):
+                    self._bands.setdefault(band_key, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                old_key, (old_fingerprint, _) = self._entries.popitem(last=False)
+                old_scope = old_key.split(":", 1)[0]
+                for band_key in self._band_keys(old_fingerprint, old_scope):
+                    members = self._bands.get(band_key)
+                    if members is not None:
+                        members.discard(old_key)
+                        if not members:
+                            del self._bands[band_key]
+
+    def warm(self, rows: Iterable[Tuple[str, int, Dict[str, Any]]]):
+        """Précharge (texte normalisé, team_id, résultat) sans toucher aux compteurs"""
+        for normalised, team_id, result in rows:
+            if normalised:
+                self.store(normalised, team_id, result)
+        self.warmed = True
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.exact_hits + self.near_hits + self.backing_hits
+        lookups = hits + self.misses
+        return {
+            "task_type": self.task_type,
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "backing_hits": self.backing_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_caches: Dict[str, ParseCache] = {
+    "signature_parse": ParseCache("signature_parse", share_across_teams=True),
+    "intent_detection": ParseCache(
+        "intent_detection", share_across_teams=False, near_duplicates=False
+    ),
+}
+
+
+def get_parse_cache(task_type: str) -> ParseCache:
+    return _caches[task_type]
+
+
+def get_parse_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {task_type: cache.stats() for task_type, cache in _caches.items()}
@@ -0,0 +1,278 @@
+"""
+Autofill Matchers - Index mémoire pour le hot path de l'autofill
+
+Sort du chemin "par email" les lookups qui tapaient la DB (ou le réseau) à chaque appel:
+1. SenderBlacklistMatcher : blacklist statique + email_blacklist compilées par équipe
+   (set d'emails exacts + trie de préfixes + trie de suffixes)
+2. KnownCompanyIndex : hash map domaine → entreprise (known_companies), chargée une fois
+3. ProbeNegativeCache : domaines déjà sondés en HTTP sans succès (TTL)
+
+Invalidation:
+- invalidate_blacklist_matcher(team_id) après ajout/suppression d'un pattern
+- KnownCompanyIndex.upsert() après découverte d'une entreprise
+- TTL de rafraîchissement pour capter les changements faits par d'autres process
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.email_blacklist import EmailBlacklist
+from models.known_company import KnownCompany
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie des index compilés (secondes) avant rechargement depuis la DB
+MATCHER_REFRESH_SECONDS = 300
+# Durée de vie d'un échec de HTTP probe
+PROBE_NEGATIVE_TTL_SECONDS = 24 * 3600
+PROBE_NEGATIVE_MAX_ENTRIES = 10000
+
+_END = ""  # Marqueur de fin de clé dans le trie (les clés sont des caractères)
+
+
+class _PrefixTrie:
+    """
+    Trie de caractères : trouve le premier pattern inséré qui préfixe une chaîne
+
+    La clé vide (wildcard "*") est portée par la racine et préfixe toute chaîne.
+    """
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self.size = 0
+
+    def insert(self, key: str, label: Optional[str] = None):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = label or key
+
+    def match(self, value: str) -> Optional[str]:
+        """Retourne le label du plus court pattern préfixe de `value`, None sinon"""
+        node = self._root
+        if _END in node:
+            return node[_END]
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+
+class SenderBlacklistMatcher:
+    """
+    Blacklist expéditeurs compilée (statique + email_blacklist d'une équipe)
+
+    Sémantique identique à EmailBlacklist.matches():
+    - email    → égalité exacte
+    - domain   → endswith("@domaine") (trie sur la chaîne inversée)
+    - wildcard → startswith(pattern sans '*')
+    Patterns statiques: "@..." = domaine, sinon préfixe.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, str]] = (),
+        static_patterns: Iterable[str] = ()
+    ):
+        self._exact: Dict[str, str] = {}
+        self._prefixes = _PrefixTrie()
+        self._suffixes = _PrefixTrie()
+
+        for pattern in static_patterns:
+            pattern_lower = pattern.lower()
+            if pattern_lower.startswith('@'):
+                self._suffixes.insert(pattern_lower[::-1], f"static domain {pattern_lower}")
+            else:
+                self._prefixes.insert(pattern_lower, f"static prefix {pattern_lower}")
+
+        for pattern, pattern_type in entries:
+            pattern_lower = pattern.lower()
+            if pattern_type == "email":
+                self._exact[pattern_lower] = f"email {pattern_lower}"
+            elif pattern_type == "domain":
+                if not pattern_lower.startswith('@'):
+                    pattern_lower = '@' + pattern_lower
+                self._suffixes.insert(pattern_lower[::-1], f"domain {pattern_lower}")
+            elif pattern_type == "wildcard":
+                self._prefixes.insert(pattern_lower.replace('*', ''), f"wildcard {pattern_lower}")
+
+    def __len__(self) -> int:
+        return len(self._exact) + self._prefixes.size + self._suffixes.size
+
+    def match(self, sender_email: str) -> Optional[str]:
+        """Retourne la règle qui bloque l'expéditeur (pour les logs), None sinon"""
+        if sender_email is None:
+            return None
+
+        sender_lower = sender_email.lower()
+
+        return (
+            self._exact.get(sender_lower)
+            or self._prefixes.match(sender_lower)
+            or self._suffixes.match(sender_lower[::-1])
+        )
+
+    def is_blacklisted(self, sender_email: str) -> bool:
+        return self.match(sender_email) is not None
+
+
+class KnownCompanyIndex:
+    """Hash map domaine → résultat de résolution (même format que CompanyResolver)"""
+
+    def __init__(self, companies: Iterable[KnownCompany] = ()):
+        self._by_domain: Dict[str, Dict[str, Any]] = {}
+        for company in companies:
+            self.upsert(company)
+
+    def __len__(self) -> int:
+        return len(self._by_domain)
+
+    @staticmethod
+    def _to_result(company: KnownCompany) -> Dict[str, Any]:
+        # Domaine personnel blacklisté
+        if company.is_personal_domain:
+            return {
+                'company_name': None,
+                'company_website': None,
+                'company_linkedin': None,
+                'confidence': 0.0,
+                'source': 'known_companies_blacklist',
+                'skip_company_autofill': True,  # Flag pour ne pas proposer company_name
+            }
+
+        return {
+            'company_name': company.company_name,
+            'company_website': company.company_website,
+            'company_linkedin': company.company_linkedin,
+            'confidence': company.confidence_score,
+            'source': f'known_companies_{company.source}',
+            'industry': company.industry,
+            'country_code': company.country_code,
+        }
+
+    def upsert(self, company: KnownCompany):
+        self._by_domain[company.domain.lower()] = self._to_result(company)
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Copie du résultat (les appelants peuvent le modifier), None si inconnu"""
+        result = self._by_domain.get(domain.lower())
+        return dict(result) if result is not None else None
+
+
+class ProbeNegativeCache:
+    """Domaines dont le HTTP probe a échoué récemment (TTL, taille bornée)"""
+
+    def __init__(
+        self,
+        ttl_seconds: int = PROBE_NEGATIVE_TTL_SECONDS,
+        max_entries: int = PROBE_NEGATIVE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._expires_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, domain: str) -> bool:
+        key = domain.lower()
+        with self._lock:
+            expires_at = self._expires_at.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._expires_at[key]
+                return False
+            return True
+
+    def add(self, domain: str):
+        with self._lock:
+            if len(self._expires_at) >= self.max_entries:
+                # Éviction de la plus ancienne entrée (ordre d'insertion du dict)
+                self._expires_at.pop(next(iter(self._expires_at)))
+            self._expires_at[domain.lower()] = time.monotonic() + self.ttl_seconds
+
+    def discard(self, domain: str):
+        with self._lock:
+            self._expires_at.pop(domain.lower(), None)
+
+    def clear(self):
+        with self._lock:
+            self._expires_at.clear()
+
+
+# ============================================================================
+# Registres process-wide
+# ============================================================================
+
+_lock = threading.Lock()
+_blacklist_matchers: Dict[int, Tuple[float, SenderBlacklistMatcher]] = {}
+_known_company_index: Optional[Tuple[float, KnownCompanyIndex]] = None
+_probe_negative_cache = ProbeNegativeCache()
+
+
+def get_blacklist_matcher(
+    db: Session,
+    team_id: int,
+    static_patterns: Iterable[str] = ()
+) -> SenderBlacklistMatcher:
+    """Matcher compilé pour une équipe (1 requête DB par équipe et par période de refresh)"""
+    now = time.monotonic()
+    cached = _blacklist_matchers.get(team_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    rows = db.query(EmailBlacklist.pattern, EmailBlacklist.pattern_type).filter(
+        EmailBlacklist.team_id == team_id
+    ).all()
+    matcher = SenderBlacklistMatcher(rows, static_patterns)
+
+    with _lock:
+        _blacklist_matchers[team_id] = (now + MATCHER_REFRESH_SECONDS, matcher)
+
+    logger.debug(f"Compiled blacklist matcher for team {team_id}: {len(matcher)} patterns")
+    return matcher
+
+
+def invalidate_blacklist_matcher(team_id: Optional[int] = None):
+    """Force la recompilation (une équipe, ou toutes si team_id=None)"""
+    with _lock:
+        if team_id is None:
+            _blacklist_matchers.clear()
+        else:
+            _blacklist_matchers.pop(team_id, None)
+
+
+def get_known_company_index(db: Session) -> KnownCompanyIndex:
+    """Index known_companies (1 requête DB par période de refresh)"""
+    global _known_company_index
+
+    now = time.monotonic()
+    cached = _known_company_index
+    if cached and cached[0] > now:
+        return cached[1]
+
+    index = KnownCompanyIndex(db.query(KnownCompany).all())
+
+    with _lock:
+        _known_company_index = (now + MATCHER_REFRESH_SECONDS, index)
+
+    logger.debug(f"Loaded known company index: {len(index)} domains")
+    return index
+
+
+def invalidate_known_company_index():
+    """Force le rechargement de l'index known_companies"""
+    global _known_company_index
+    with _lock:
+        _known_company_index = None
+
+
+def get_probe_negative_cache() -> ProbeNegativeCache:
+    return _probe_negative_cache
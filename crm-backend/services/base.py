@@ -5,6 +5,7 @@ from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from core.exceptions import DatabaseError, ResourceNotFound, ValidationError
+from core.pagination import TOTAL_NONE, CursorPage, count_query, encode_cursor, paginate_keyset
 
 logger = logging.getLogger(__name__)
 
@@ -35,22 +36,86 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             (liste d'objets, total_count)
         """
         try:
-            query = self.db.query(self.model)
-
-            # Appliquer les filtres
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(self.model, key) and value is not None:
-                        query = query.filter(getattr(self.model, key) == value)
+            query = self._apply_filters(self._list_query(), filters)
 
             total = query.count()
-            items = query.offset(skip).limit(limit).all()
+            items = query.order_by(*self._keyset_order()).offset(skip).limit(limit).all()
 
             return items, total
         except Exception as e:
             logger.error(f"Error fetching {self.model_name}: {e}")
             raise DatabaseError(f"Failed to fetch {self.model_name}")
 
+    async def get_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: dict = None,
+        total: str = TOTAL_NONE,
+    ) -> CursorPage:
+        """
+        Récupérer une page par curseur (keyset): coût constant quelle que soit la profondeur
+
+        Args:
+            cursor: Curseur opaque renvoyé par la page précédente (None = première page)
+            limit: Nombre d'enregistrements à retourner
+            filters: Dictionnaire de filtres {column_name: value}
+            total: "exact", "estimate" (reltuples / planner) ou "none"
+
+        Returns:
+            CursorPage(items, next_cursor, total, total_is_estimate)
+        """
+        try:
+            query = self._apply_filters(self._list_query(), filters)
+            page = paginate_keyset(
+                query,
+                self._keyset_columns(),
+                cursor=cursor,
+                limit=limit,
+                descending=self.keyset_descending,
+            )
+            page.total, page.total_is_estimate = count_query(
+                query,
+                self.model,
+                mode=total,
+                filtered=any(value is not None for value in (filters or {}).values()),
+            )
+            return page
+        except ValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching {self.model_name} page: {e}")
+            raise DatabaseError(f"Failed to fetch {self.model_name}")
+
+    # Clé de tri keyset: surchargée par les services triant autrement que par id
+    keyset_descending = False
+
+    def _keyset_columns(self) -> list:
+        return [self.model.id]
+
+    def _keyset_order(self) -> list:
+        return [
+            column.desc() if self.keyset_descending else column.asc()
+            for column in self._keyset_columns()
+        ]
+
+    def cursor_after(self, items: List[ModelType]) -> Optional[str]:
+        """Curseur reprenant après le dernier élément (passage offset → keyset)"""
+        if not items:
+            return None
+        return encode_cursor([getattr(items[-1], column.key) for column in self._keyset_columns()])
+
+    def _list_query(self):
+        """Requête de base des listes (les services y ajoutent leurs options de chargement)"""
+        return self.db.query(self.model)
+
+    def _apply_filters(self, query, filters: Optional[dict]):
+        if filters:
+            for key, value in filters.items():
+                if hasattr(self.model, key) and value is not None:
+                    query = query.filter(getattr(self.model, key) == value)
+        return query
+
     async def get_by_id(self, id: int) -> ModelType:
         """Récupérer un enregistrement par son ID"""
         try:
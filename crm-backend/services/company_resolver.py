@@ -24,6 +24,7 @@ except ImportError:
     httpx = None  # Fallback si httpx non installé
 
 from models.known_company import KnownCompany
+from services.autofill_matchers import get_known_company_index, get_probe_negative_cache
 
 
 class CompanyResolver:
@@ -80,44 +81,19 @@ class CompanyResolver:
 
     def lookup_known_company(self, domain: str) -> Optional[Dict[str, Any]]:
         """
-        Recherche dans la table known_companies
+        Recherche dans la table known_companies (index mémoire, rechargé périodiquement)
 
         Returns:
             Dict avec {company_name, company_website, company_linkedin, confidence, source}
             ou None si non trouvé
         """
-        company = self.db.query(KnownCompany).filter(
-            KnownCompany.domain == domain.lower()
-        ).first()
-
-        if not company:
-            return None
-
-        # Domaine personnel blacklisté
-        if company.is_personal_domain:
-            return {
-                'company_name': None,
-                'company_website': None,
-                'company_linkedin': None,
-                'confidence': 0.0,
-                'source': 'known_companies_blacklist',
-                'skip_company_autofill': True,  # Flag pour ne pas proposer company_name
-            }
-
-        return {
-            'company_name': company.company_name,
-            'company_website': company.company_website,
-            'company_linkedin': company.company_linkedin,
-            'confidence': company.confidence_score,
-            'source': f'known_companies_{company.source}',
-            'industry': company.industry,
-            'country_code': company.country_code,
-        }
+        return get_known_company_index(self.db).get(domain)
 
     def http_probe_domain(self, domain: str) -> Optional[Dict[str, Any]]:
         """
         Vérifie si le domaine a un site web accessible
         Essaie https://{domain} puis https://www.{domain}
+        Les domaines en échec récent (cache négatif) ne sont pas re-sondés.
 
         Returns:
             Dict avec {company_website, confidence, source} si trouvé, None sinon
@@ -125,6 +101,10 @@ class CompanyResolver:
         if not self.http_client or not httpx:
             return None  # HTTP probe désactivé
 
+        negative_cache = get_probe_negative_cache()
+        if domain in negative_cache:
+            return None
+
         variants = [
             f'https://{domain}',
             f'https://www.{domain}',
@@ -148,6 +128,7 @@ class CompanyResolver:
             except (httpx.TimeoutException, httpx.ConnectError, httpx.HTTPError):
                 continue
 
+        negative_cache.add(domain)
         return None
 
     def _domain_to_company_name(self, domain: str) -> str:
@@ -250,6 +231,7 @@ class CompanyResolver:
                 )
                 self.db.add(new_company)
                 self.db.commit()
+                get_known_company_index(self.db).upsert(new_company)
                 print(f"[CompanyResolver] Saved new company: {domain} → {info['company_name']}")
         except Exception as e:
             print(f"[CompanyResolver] Error saving company {domain}: {e}")
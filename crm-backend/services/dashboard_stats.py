@@ -5,18 +5,41 @@ Remplace progressivement le système KPI legacy
 
 import logging
 from collections import defaultdict
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import and_, func
+from sqlalchemy import (
+    Date,
+    Float,
+    Text,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    union_all,
+)
 from sqlalchemy.orm import Session
 
-from models.kpi import DashboardKPI
+from core.dashboard_rollups import (
+    ORGANISATIONS_BY_CATEGORY,
+    ORGANISATIONS_BY_TYPE,
+    ORGANISATIONS_TOTAL,
+    TASKS_DONE,
+    TASKS_OPEN_BY_DUE_DAY,
+    TASKS_TOTAL,
+)
+from models.kpi import DashboardDailyStat, DashboardKPI, DashboardStatCounter
 from models.kpi import DashboardKPI as OrganisationKPI
 from models.organisation import Organisation
 from models.organisation_activity import OrganisationActivity, OrganisationActivityType
 from models.task import Task, TaskStatus
 from schemas.dashboard_stats import (
+    ActivitySeriesPoint,
+    ActivitySeriesResponse,
     GlobalDashboardStats,
     MonthlyAggregateStats,
     OrganisationMonthlyKPI,
@@ -73,48 +96,107 @@ class DashboardStatsService:
 
     # ---------- Helpers ----------
 
-    @staticmethod
-    def _get_period_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
-        start = datetime(year, month, 1, tzinfo=timezone.utc)
-        if month == 12:
-            end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
-        return start, end
-
-    @classmethod
-    def _infer_kpi_field(cls, activity: OrganisationActivity) -> Optional[str]:
-        metadata = activity.activity_metadata or {}
-
-        # 1. Métadonnées explicites
-        raw_category = metadata.get("kpi_category") or metadata.get("category")
-        if isinstance(raw_category, str):
-            key = raw_category.lower().strip()
-            if key in cls.ACTIVITY_METADATA_FIELD_MAPPING:
-                return cls.ACTIVITY_METADATA_FIELD_MAPPING[key]
-
-        # 2. Type d'activité
-        mapped = cls.ACTIVITY_TYPE_FIELD_MAPPING.get(activity.type)
-        if mapped:
-            return mapped
-
-        # 3. Tenter via metadata flags (boolean)
-        for meta_key, field in cls.ACTIVITY_METADATA_FIELD_MAPPING.items():
-            value = metadata.get(meta_key)
-            if isinstance(value, bool) and value:
-                return field
-
-        return None
-
-    @classmethod
-    def _extract_numeric(cls, metadata: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[float]:
-        for key in keys:
-            if key in metadata and metadata[key] is not None:
-                try:
-                    return float(metadata[key])
-                except (TypeError, ValueError):
-                    continue
-        return None
+    KPI_COUNT_FIELDS = ("rdv_count", "pitchs", "due_diligences", "closings")
+
+    # Nombre décimal tel qu'accepté par float() (hors inf/nan): garde avant CAST
+    NUMERIC_TEXT_PATTERN = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+
+    # ---------- Expressions SQL (agrégation KPI côté base) ----------
+
+    @property
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _kpi_month_expr(self):
+        """
+        Premier jour du mois UTC de l'activité
+
+        PostgreSQL: expression immuable, couverte par les index d'expression
+        idx_org_activities_month / idx_org_activities_org_month.
+        """
+        occurred_at = OrganisationActivity.occurred_at
+        if self._dialect == "postgresql":
+            # Constantes en littéraux SQL: l'expression doit être identique à celle de l'index
+            return func.date_trunc(
+                literal_column("'month'"), func.timezone(literal_column("'UTC'"), occurred_at)
+            )
+        return func.strftime("%Y-%m-01", occurred_at)
+
+    def _kpi_month_bound(self, year: int, month: int):
+        """Borne comparable à _kpi_month_expr()"""
+        if month > 12:
+            year, month = year + 1, month - 12
+        if self._dialect == "postgresql":
+            return datetime(year, month, 1)
+        return f"{year:04d}-{month:02d}-01"
+
+    def _metadata_flag_expr(self, key: str):
+        """Métadonnée booléenne JSON `true` (pas la chaîne "true")"""
+        metadata = OrganisationActivity.activity_metadata
+        if self._dialect == "postgresql":
+            return cast(metadata[key], Text) == "true"
+        return func.json_type(metadata, f'$."{key}"') == "true"
+
+    def _metadata_number_expr(self, key: str):
+        """Valeur numérique d'une métadonnée, NULL si absente ou non numérique"""
+        metadata = OrganisationActivity.activity_metadata
+        if self._dialect == "postgresql":
+            raw = metadata[key].as_string()
+            return case(
+                (raw.op("~")(self.NUMERIC_TEXT_PATTERN), cast(raw, Float)),
+                else_=null(),
+            )
+        # SQLite (tests): pas de regex, filtre GLOB approché sur les chaînes
+        json_type = func.json_type(metadata, f'$."{key}"')
+        raw = func.trim(metadata[key].as_string())
+        return case(
+            (json_type.in_(("integer", "real")), cast(metadata[key].as_float(), Float)),
+            (
+                and_(json_type == "text", raw != "", raw.op("NOT GLOB")("*[^0-9.eE+-]*")),
+                cast(raw, Float),
+            ),
+            else_=null(),
+        )
+
+    def _first_number_expr(self, keys: Tuple[str, ...]):
+        """Première clé numérique parmi `keys` (même priorité que la saisie côté métier)"""
+        return func.coalesce(*(self._metadata_number_expr(key) for key in keys))
+
+    def _kpi_field_expr(self):
+        """
+        Champ KPI déduit d'une activité, par ordre de priorité:
+        1. métadonnée explicite `kpi_category` (ou `category`)
+        2. type d'activité
+        3. drapeaux booléens dans les métadonnées
+        """
+        metadata = OrganisationActivity.activity_metadata
+        raw_category = func.lower(
+            func.trim(
+                func.coalesce(
+                    func.nullif(metadata["kpi_category"].as_string(), ""),
+                    metadata["category"].as_string(),
+                )
+            )
+        )
+
+        whens = []
+        by_category: Dict[str, List[str]] = defaultdict(list)
+        for key, field in self.ACTIVITY_METADATA_FIELD_MAPPING.items():
+            by_category[field].append(key)
+        whens.extend((raw_category.in_(keys), field) for field, keys in by_category.items())
+
+        by_type: Dict[str, List[OrganisationActivityType]] = defaultdict(list)
+        for activity_type, field in self.ACTIVITY_TYPE_FIELD_MAPPING.items():
+            by_type[field].append(activity_type)
+        whens.extend(
+            (OrganisationActivity.type.in_(types), field) for field, types in by_type.items()
+        )
+
+        whens.extend(
+            (self._metadata_flag_expr(key), field)
+            for key, field in self.ACTIVITY_METADATA_FIELD_MAPPING.items()
+        )
+        return case(*whens, else_=null())
 
     def _aggregate_kpis_from_activities(
         self,
@@ -125,180 +207,219 @@ class DashboardStatsService:
         """
         Agrège les activités pour suggérer des KPI automatiquement.
 
+        Une requête GROUP BY organisation_id, mois avec des agrégats FILTER: la mémoire
+        dépend du nombre de couples (organisation, mois), pas du volume d'activités.
+
         Retourne un dict { (organisation_id, year, month): {metrics...} }
         """
-        query = self.db.query(OrganisationActivity)
+        month_bucket = self._kpi_month_expr()
+        per_activity = select(
+            OrganisationActivity.organisation_id.label("organisation_id"),
+            month_bucket.label("month"),
+            self._kpi_field_expr().label("field"),
+            self._first_number_expr(self.REVENUE_METADATA_KEYS).label("revenue"),
+            self._first_number_expr(self.COMMISSION_METADATA_KEYS).label("commission"),
+        )
         if organisation_id:
-            query = query.filter(OrganisationActivity.organisation_id == organisation_id)
+            per_activity = per_activity.where(
+                OrganisationActivity.organisation_id == organisation_id
+            )
 
-        # Filtre par période
+        # Filtre sur l'expression indexée (et non sur occurred_at)
         if year and month:
-            start, end = self._get_period_bounds(year, month)
-            query = query.filter(
-                and_(
-                    OrganisationActivity.occurred_at >= start,
-                    OrganisationActivity.occurred_at < end,
-                )
-            )
+            per_activity = per_activity.where(month_bucket == self._kpi_month_bound(year, month))
         elif year:
-            start = datetime(year, 1, 1, tzinfo=timezone.utc)
-            end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-            query = query.filter(
-                and_(
-                    OrganisationActivity.occurred_at >= start,
-                    OrganisationActivity.occurred_at < end,
-                )
+            per_activity = per_activity.where(
+                month_bucket >= self._kpi_month_bound(year, 1),
+                month_bucket < self._kpi_month_bound(year, 13),
             )
 
-        activities = query.all()
-        buckets: Dict[Tuple[int, int, int], Dict[str, Any]] = defaultdict(
-            lambda: {
-                "rdv_count": 0,
-                "pitchs": 0,
-                "due_diligences": 0,
-                "closings": 0,
-                "revenue": 0.0,
-                "commission_values": [],
+        activities = per_activity.subquery()
+        query = select(
+            activities.c.organisation_id,
+            activities.c.month,
+            *(
+                func.count().filter(activities.c.field == field).label(field)
+                for field in self.KPI_COUNT_FIELDS
+            ),
+            func.coalesce(func.sum(activities.c.revenue), 0.0).label("revenue"),
+            func.avg(activities.c.commission).label("commission_rate"),
+        ).group_by(activities.c.organisation_id, activities.c.month)
+
+        buckets: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        for row in self.db.execute(query):
+            bucket_month = row.month
+            if isinstance(bucket_month, str):
+                bucket_month = datetime.strptime(bucket_month, "%Y-%m-%d")
+            buckets[(row.organisation_id, bucket_month.year, bucket_month.month)] = {
+                **{field: int(getattr(row, field) or 0) for field in self.KPI_COUNT_FIELDS},
+                "revenue": float(row.revenue or 0.0),
+                "commission_rate": (
+                    float(row.commission_rate) if row.commission_rate is not None else None
+                ),
             }
-        )
-
-        for activity in activities:
-            occurred_at = activity.occurred_at or activity.created_at
-            if not occurred_at:
-                continue
-
-            # Normalise timezone
-            if occurred_at.tzinfo is None:
-                occurred_at = occurred_at.replace(tzinfo=timezone.utc)
-
-            bucket_key = (
-                activity.organisation_id,
-                occurred_at.year,
-                occurred_at.month,
-            )
-            bucket = buckets[bucket_key]
 
-            field = self._infer_kpi_field(activity)
-            if field:
-                bucket[field] += 1
-
-            metadata = activity.activity_metadata or {}
+        return buckets
 
-            revenue_value = self._extract_numeric(metadata, self.REVENUE_METADATA_KEYS)
-            if revenue_value:
-                bucket["revenue"] += revenue_value
+    # ============= STATISTIQUES GLOBALES =============
 
-            commission = self._extract_numeric(metadata, self.COMMISSION_METADATA_KEYS)
-            if commission is not None:
-                bucket["commission_values"].append(commission)
+    def _global_stats_query(self, today: date):
+        """
+        Une seule requête (UNION ALL) sur les compteurs matérialisés
 
-        # Finalise commission rate
-        for bucket in buckets.values():
-            if bucket["commission_values"]:
-                bucket["commission_rate"] = sum(bucket["commission_values"]) / len(
-                    bucket["commission_values"]
+        Lignes (metric, dimension, value): compteurs d'état courant tels quels, plus les
+        agrégats dépendant de la date du jour (tâches en retard / du jour, activités récentes).
+        """
+        counters = DashboardStatCounter
+        daily = DashboardDailyStat
+        today_key = today.isoformat()
+
+        def total(name: str, column, *criteria):
+            return select(
+                literal(name).label("metric"),
+                literal("").label("dimension"),
+                func.coalesce(func.sum(column), 0).label("value"),
+            ).where(*criteria)
+
+        return union_all(
+            select(counters.metric, counters.dimension, counters.value).where(
+                counters.metric.in_(
+                    (
+                        ORGANISATIONS_TOTAL,
+                        ORGANISATIONS_BY_CATEGORY,
+                        ORGANISATIONS_BY_TYPE,
+                        TASKS_TOTAL,
+                        TASKS_DONE,
+                    )
                 )
-            else:
-                bucket["commission_rate"] = None
-            bucket.pop("commission_values", None)
-
-        return buckets
-
-    # ============= STATISTIQUES GLOBALES =============
+            ),
+            total(
+                "overdue_tasks",
+                counters.value,
+                counters.metric == TASKS_OPEN_BY_DUE_DAY,
+                counters.dimension < today_key,
+            ),
+            total(
+                "tasks_due_today",
+                counters.value,
+                counters.metric == TASKS_OPEN_BY_DUE_DAY,
+                counters.dimension == today_key,
+            ),
+            # Fenêtres en jours calendaires UTC (jour courant inclus)
+            total("activities_7d", daily.value, daily.day > today - timedelta(days=7)),
+            total("activities_30d", daily.value, daily.day > today - timedelta(days=30)),
+        )
 
     async def get_global_stats(self) -> GlobalDashboardStats:
         """
         Calcule les statistiques globales pour le dashboard principal
+
+        Lecture des compteurs pré-agrégés (core.dashboard_rollups) en une requête.
         """
         try:
-            # Compter les organisations
-            total_orgs = (
-                self.db.query(func.count(Organisation.id))
-                .filter(Organisation.is_active == True)
-                .scalar()
-                or 0
-            )
-
-            # Organisations par catégorie
-            orgs_by_category_raw = (
-                self.db.query(Organisation.category, func.count(Organisation.id))
-                .filter(Organisation.is_active == True)
-                .group_by(Organisation.category)
-                .all()
-            )
-            orgs_by_category = {str(cat): count for cat, count in orgs_by_category_raw if cat}
-
-            # Organisations par type (pipeline)
-            orgs_by_type_raw = (
-                self.db.query(Organisation.type, func.count(Organisation.id))
-                .filter(Organisation.is_active == True)
-                .group_by(Organisation.type)
-                .all()
-            )
-            orgs_by_pipeline = {str(type_): count for type_, count in orgs_by_type_raw if type_}
-
-            # Tâches
-            total_tasks = self.db.query(func.count(Task.id)).scalar() or 0
-
-            completed_tasks = (
-                self.db.query(func.count(Task.id)).filter(Task.status == TaskStatus.DONE).scalar()
-                or 0
-            )
-
-            today = datetime.now().date()
-            overdue_tasks = (
-                self.db.query(func.count(Task.id))
-                .filter(and_(Task.status != TaskStatus.DONE, Task.due_date < today))
-                .scalar()
-                or 0
-            )
-
-            tasks_due_today = (
-                self.db.query(func.count(Task.id))
-                .filter(and_(Task.status != TaskStatus.DONE, Task.due_date == today))
-                .scalar()
-                or 0
-            )
-
-            # Activités récentes
-            seven_days_ago = datetime.now() - timedelta(days=7)
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-
-            activities_7d = (
-                self.db.query(func.count(OrganisationActivity.id))
-                .filter(OrganisationActivity.occurred_at >= seven_days_ago)
-                .scalar()
-                or 0
-            )
-
-            activities_30d = (
-                self.db.query(func.count(OrganisationActivity.id))
-                .filter(OrganisationActivity.occurred_at >= thirty_days_ago)
-                .scalar()
-                or 0
-            )
+            today = datetime.now(timezone.utc).date()
+            totals: Dict[str, int] = defaultdict(int)
+            orgs_by_category: Dict[str, int] = {}
+            orgs_by_pipeline: Dict[str, int] = {}
+
+            for metric, dimension, value in self.db.execute(self._global_stats_query(today)):
+                value = int(value or 0)
+                if metric == ORGANISATIONS_BY_CATEGORY:
+                    if value:
+                        orgs_by_category[dimension] = value
+                elif metric == ORGANISATIONS_BY_TYPE:
+                    if value:
+                        orgs_by_pipeline[dimension] = value
+                else:
+                    totals[metric] += value
 
             return GlobalDashboardStats(
-                total_organisations=total_orgs,
+                total_organisations=totals[ORGANISATIONS_TOTAL],
                 organisations_by_category=orgs_by_category,
                 organisations_by_pipeline=orgs_by_pipeline,
                 total_people=0,  # À implémenter si besoin
-                total_tasks=total_tasks,
-                completed_tasks=completed_tasks,
-                overdue_tasks=overdue_tasks,
-                tasks_due_today=tasks_due_today,
+                total_tasks=totals[TASKS_TOTAL],
+                completed_tasks=totals[TASKS_DONE],
+                overdue_tasks=totals["overdue_tasks"],
+                tasks_due_today=totals["tasks_due_today"],
                 total_mandats=0,  # À implémenter si besoin
                 active_mandats=0,
                 expiring_soon_mandats=0,
                 total_revenue=0.0,  # À implémenter avec KPI
-                activities_last_7_days=activities_7d,
-                activities_last_30_days=activities_30d,
+                activities_last_7_days=totals["activities_7d"],
+                activities_last_30_days=totals["activities_30d"],
             )
 
         except Exception as e:
             logger.error(f"Error calculating global stats: {e}")
             raise
 
+    # ============= SÉRIES D'ACTIVITÉ (PÉRIODES AD HOC) =============
+
+    ACTIVITY_SERIES_GRANULARITIES = ("day", "week", "month", "year")
+
+    def _period_expr(self, granularity: str):
+        """Début de période d'un jour de dashboard_daily_stats, calculé en SQL"""
+        day = DashboardDailyStat.day
+        if self.db.get_bind().dialect.name == "postgresql":
+            return cast(func.date_trunc(granularity, day), Date)
+        if granularity == "day":
+            return day
+        if granularity == "week":
+            # SQLite: lundi de la semaine ISO
+            return func.date(day, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01" if granularity == "month" else "%Y-01-01", day)
+
+    async def get_activity_series(
+        self,
+        granularity: str,
+        start_date: date,
+        end_date: date,
+        organisation_id: Optional[int] = None,
+        team_id: Optional[int] = None,
+    ) -> ActivitySeriesResponse:
+        """
+        Activités par période (jour/semaine/mois/année) et par type, bornes incluses
+
+        GROUP BY côté SQL sur les compteurs journaliers: le coût dépend du nombre de
+        jours × types, pas du volume d'activités.
+        """
+        if granularity not in self.ACTIVITY_SERIES_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        period = self._period_expr(granularity).label("period")
+        query = (
+            select(period, DashboardDailyStat.metric, func.sum(DashboardDailyStat.value))
+            .where(DashboardDailyStat.day >= start_date, DashboardDailyStat.day <= end_date)
+            .group_by(period, DashboardDailyStat.metric)
+            .order_by(period)
+        )
+        if organisation_id is not None:
+            query = query.where(DashboardDailyStat.organisation_id == organisation_id)
+        if team_id is not None:
+            query = query.where(DashboardDailyStat.team_id == team_id)
+
+        points: Dict[date, ActivitySeriesPoint] = {}
+        for period_start, metric, value in self.db.execute(query):
+            if isinstance(period_start, str):
+                period_start = date.fromisoformat(period_start)
+            elif isinstance(period_start, datetime):
+                period_start = period_start.date()
+            if not value:
+                continue
+            point = points.setdefault(period_start, ActivitySeriesPoint(period=period_start))
+            point.by_type[metric] = int(value)
+            point.total += int(value)
+
+        return ActivitySeriesResponse(
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+            organisation_id=organisation_id,
+            team_id=team_id,
+            points=list(points.values()),
+        )
+
     # ============= STATISTIQUES PAR ORGANISATION =============
 
     async def get_organisation_stats(self, organisation_id: int) -> OrganisationStatsResponse:
@@ -330,8 +451,8 @@ class DashboardStatsService:
             pending_tasks = total_tasks - completed_tasks
 
             total_interactions = (
-                self.db.query(func.count(OrganisationActivity.id))
-                .filter(OrganisationActivity.organisation_id == organisation_id)
+                self.db.query(func.sum(DashboardDailyStat.value))
+                .filter(DashboardDailyStat.organisation_id == organisation_id)
                 .scalar()
                 or 0
             )
@@ -5,10 +5,11 @@ Orchestrate batch email processing: sync → parse → detect intent → auto-ap
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, or_, select
 
 from models import (
     EmailMessage,
@@ -17,14 +18,84 @@ from models import (
     Person,
     Organisation,
     AIMemory,
-    EmailBlacklist
+    User,
 )
+from services.ai_parse_cache import get_parse_cache
+from services.autofill_matchers import SenderBlacklistMatcher, get_blacklist_matcher
 from services.signature_parser_service import SignatureParserService
 from services.intent_detection_service import IntentDetectionService
 from services.web_enrichment_service import get_enrichment_service
 
 logger = logging.getLogger(__name__)
 
+# Sentinelle de fin de flux entre stages
+_STOP = object()
+
+
+class StageStats:
+    """Débit et latence d'un stage du pipeline"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.latencies_ms: List[float] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def record(self, started: float, items: int = 1):
+        now = time.perf_counter()
+        if self.started_at is None or started < self.started_at:
+            self.started_at = started
+        self.finished_at = now if self.finished_at is None else max(self.finished_at, now)
+        self.items += items
+        self.latencies_ms.append((now - started) * 1000)
+
+    def to_dict(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies_ms)
+        wall_s = (
+            (self.finished_at - self.started_at)
+            if self.started_at is not None and self.finished_at is not None
+            else 0.0
+        )
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            idx = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return round(latencies[idx], 1)
+
+        return {
+            "items": self.items,
+            "throughput_per_s": round(self.items / wall_s, 2) if wall_s > 0 else 0.0,
+            "latency_p50_ms": percentile(0.5),
+            "latency_p95_ms": percentile(0.95),
+            "latency_max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        }
+
+
+class RateLimiter:
+    """
+    Espacement minimal entre deux appels LLM, partagé par tous les workers parse
+
+    Chaque appel réserve le créneau suivant sous verrou : avec N workers le débit
+    global reste de 1 appel / `interval_s` (et non N fois ce débit). Attendu par
+    SignatureParserService juste avant l'appel au provider (jamais sur un hit cache).
+    """
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+
+    async def wait(self):
+        if not self.interval_s:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_at > now:
+                await asyncio.sleep(self._next_at - now)
+            self._next_at = max(now, self._next_at) + self.interval_s
+
 
 class EmailAutofillPipeline:
     """
@@ -53,18 +124,28 @@ class EmailAutofillPipeline:
         db: Session,
         auto_apply_threshold: float = 0.92,
         rate_limit_seconds: float = 2.0,
-        max_emails: int = 100
+        max_emails: int = 100,
+        parse_concurrency: int = 4,
+        enrich_concurrency: int = 2,
+        persist_batch_size: int = 20,
+        queue_size: int = 20
     ):
         self.db = db
         self.auto_apply_threshold = auto_apply_threshold
         self.rate_limit_seconds = rate_limit_seconds
         self.max_emails = max_emails
+        self.parse_concurrency = max(1, parse_concurrency)
+        self.enrich_concurrency = max(1, enrich_concurrency)
+        self.persist_batch_size = max(1, persist_batch_size)
+        self.queue_size = max(1, queue_size)
 
-        self.signature_parser = SignatureParserService(db)
-        self.intent_detector = IntentDetectionService(db)
+        # Services du stage parse : créés par run() sur la session dédiée au stage
+        self.signature_parser: Optional[SignatureParserService] = None
+        self.intent_detector: Optional[IntentDetectionService] = None
+        self.rate_limiter: Optional[RateLimiter] = None
 
-        # Cache blacklist DB pour éviter requêtes répétées
-        self.blacklist_cache: Optional[List[EmailBlacklist]] = None
+        # Matcher blacklist compilé (statique + DB) pour l'équipe
+        self.blacklist_matcher: Optional[SenderBlacklistMatcher] = None
 
         # Metrics
         self.metrics = {
@@ -81,6 +162,12 @@ class EmailAutofillPipeline:
             "errors": 0,
             "processing_time_ms": 0
         }
+        self.stage_stats: Dict[str, StageStats] = {
+            "prefilter": StageStats("prefilter"),
+            "parse": StageStats("parse"),
+            "enrich": StageStats("enrich"),
+            "persist": StageStats("persist"),
+        }
 
     async def run(
         self,
@@ -91,6 +178,17 @@ class EmailAutofillPipeline:
         """
         Run the autofill pipeline
 
+        Stages (reliés par des asyncio.Queue bornées):
+            prefilter (batch) → parse (N workers) → enrich (M workers) → persist (1 worker)
+
+        Chaque stage qui écrit a sa propre Session : le stage parse (cache des
+        signatures et des intents, avec commit) utilise une session dédiée,
+        partagée par ses workers ; le stage persist (suggestions, Person,
+        Organisation) utilise `self.db` et reste mono-worker. Les opérations DB
+        étant synchrones dans la boucle asyncio, une session n'est jamais
+        utilisée par deux coroutines au milieu d'une même opération.
+        Un seul RateLimiter est partagé par tous les workers parse.
+
         Args:
             team_id: Team ID for multi-tenant filtering
             days_back: How many days back to fetch emails
@@ -101,27 +199,44 @@ class EmailAutofillPipeline:
         """
         start_time = datetime.now(timezone.utc)
 
+        parse_db = Session(bind=self.db.get_bind())
+        self.rate_limiter = RateLimiter(self.rate_limit_seconds)
+        self.signature_parser = SignatureParserService(parse_db, rate_limiter=self.rate_limiter)
+        self.intent_detector = IntentDetectionService(parse_db)
+
         try:
             # 1. Fetch emails to process
             emails = self._fetch_emails(team_id, days_back, email_ids)
             logger.info(f"📧 Fetched {len(emails)} emails to process")
 
-            # 2. Process each email
-            for idx, email in enumerate(emails):
-                try:
-                    await self._process_email(email, team_id)
-
-                    # Rate limiting (skip for cached results)
-                    if idx < len(emails) - 1:
-                        await asyncio.sleep(self.rate_limit_seconds)
-
-                except Exception as e:
-                    logger.error(f"❌ Error processing email {email.id}: {e}")
-                    self.metrics["errors"] += 1
+            # 2. Batch prefilter (blacklist + existing suggestions) for the whole page
+            to_parse = self._prefilter_emails(emails, team_id)
+
+            # 3. Staged processing
+            parse_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            enrich_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            persist_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+            await asyncio.gather(
+                self._feed(to_parse, parse_queue, self.parse_concurrency),
+                self._run_stage(
+                    "parse", self._parse_stage, parse_queue, enrich_queue,
+                    self.parse_concurrency, self.enrich_concurrency, team_id
+                ),
+                self._run_stage(
+                    "enrich", self._enrich_stage, enrich_queue, persist_queue,
+                    self.enrich_concurrency, 1, team_id
+                ),
+                self._persist_stage(persist_queue, team_id),
+            )
 
-            # 3. Calculate final metrics
+            # 4. Calculate final metrics
             end_time = datetime.now(timezone.utc)
             self.metrics["processing_time_ms"] = int((end_time - start_time).total_seconds() * 1000)
+            self.metrics["stages"] = {
+                name: stats.to_dict() for name, stats in self.stage_stats.items()
+            }
+            self.metrics["signature_cache"] = get_parse_cache("signature_parse").stats()
 
             return {
                 "success": True,
@@ -136,6 +251,8 @@ class EmailAutofillPipeline:
                 "error": str(e),
                 "metrics": self.metrics
             }
+        finally:
+            parse_db.close()
 
     def _fetch_emails(
         self,
@@ -170,55 +287,243 @@ class EmailAutofillPipeline:
 
         return emails
 
-    async def _process_email(self, email: EmailMessage, team_id: int):
-        """Process a single email: parse signature + detect intent"""
+    def _prefilter_emails(self, emails: List[EmailMessage], team_id: int) -> List[EmailMessage]:
+        """
+        Stage prefilter (batch) : blacklist + suggestions existantes pour toute la page
+
+        Une seule requête blacklist (cache) et une seule requête IN sur les
+        suggestions, au lieu d'un aller-retour DB par email.
+        """
+        started = time.perf_counter()
+
+        if not emails:
+            return []
+
+        already_parsed = {
+            row.email_id
+            for row in self.db.query(AutofillSuggestion.email_id).filter(
+                AutofillSuggestion.email_id.in_([email.id for email in emails])
+            ).distinct()
+        }
 
-        self.metrics["emails_processed"] += 1
+        to_parse = []
+        for email in emails:
+            self.metrics["emails_processed"] += 1
 
+            if self._is_blacklisted(email.sender_email, team_id):
+                logger.info(f"⛔ Skipping blacklisted sender: {email.sender_email}")
+                self.metrics["blacklisted"] += 1
+                continue
+
+            if email.id in already_parsed:
+                logger.debug(f"⏭️  Email {email.id} already has suggestion")
+                continue
+
+            to_parse.append(email)
+
+        self.stage_stats["prefilter"].record(started, items=len(emails))
+        return to_parse
+
+    async def _feed(self, emails: List[EmailMessage], queue: asyncio.Queue, workers: int):
+        """Alimente le premier stage puis signale la fin du flux"""
+        for email in emails:
+            await queue.put(email)
+        for _ in range(workers):
+            await queue.put(_STOP)
+
+    async def _run_stage(
+        self,
+        name: str,
+        handler,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        workers: int,
+        downstream_workers: int,
+        team_id: int
+    ):
+        """
+        Exécute `workers` consommateurs concurrents sur `inbox`
+
+        Le handler retourne l'item à transmettre au stage suivant (ou None pour
+        l'abandonner). Les erreurs sont comptées par item sans arrêter le stage.
+        """
+        stats = self.stage_stats[name]
+
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _STOP:
+                    return
+
+                started = time.perf_counter()
+                try:
+                    result = await handler(item, team_id)
+                except Exception as e:
+                    email = item[0] if isinstance(item, tuple) else item
+                    logger.error(f"❌ Error in stage '{name}' for email {email.id}: {e}")
+                    self.metrics["errors"] += 1
+                    result = None
+                stats.record(started)
+
+                if result is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        for _ in range(downstream_workers):
+            await outbox.put(_STOP)
+
+    async def _parse_stage(self, email: EmailMessage, team_id: int) -> Optional[tuple]:
+        """Stage parse : signature (LLM) + intent"""
         email_body = email.body_text or email.body_html or ""
 
-        # 1. Parse signature
-        await self._parse_signature(email, email_body, team_id)
+        result = await self.signature_parser.parse_signature(
+            email_body=email_body,
+            team_id=team_id
+        )
 
-        # 2. Detect intent
         await self._detect_intent(email, email_body, team_id)
 
+        if not result.get("success"):
+            return None
+
+        # Track cache hit
+        if result.get("from_cache"):
+            self.metrics["signatures_cached"] += 1
+        else:
+            self.metrics["signatures_parsed"] += 1
+
+        return email, result
+
+    async def _enrich_stage(self, item: tuple, team_id: int) -> tuple:
+        """Stage enrich : web enrichment (Acte V) si une entreprise est trouvée"""
+        email, result = item
+        data = result.get("data", {}) or {}
+
+        if data.get("company"):
+            await self._enrich_organisation_data(data)
+
+        return email, result
+
+    async def _persist_stage(self, inbox: asyncio.Queue, team_id: int):
+        """
+        Stage persist (mono-worker) : écrit les suggestions par micro-batch
+
+        Les Person/Organisation de chaque micro-batch sont préchargées en une
+        requête chacune avant l'écriture. Une erreur sur un micro-batch est
+        comptée et annulée (rollback) sans arrêter le stage : les stages amont
+        ne restent jamais bloqués sur leur queue.
+        """
+        stats = self.stage_stats["persist"]
+        done = False
+
+        while not done:
+            item = await inbox.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            while len(batch) < self.persist_batch_size:
+                try:
+                    item = inbox.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _STOP:
+                    done = True
+                    break
+                batch.append(item)
+
+            started = time.perf_counter()
+            try:
+                persons, organisations = self._prefetch_entities(batch, team_id)
+            except Exception as e:
+                logger.error(f"❌ Error prefetching entities for batch of {len(batch)} emails: {e}")
+                self.db.rollback()
+                self.metrics["errors"] += len(batch)
+                stats.record(started, items=len(batch))
+                continue
+
+            for email, result in batch:
+                try:
+                    await self._persist_suggestions(email, result, team_id, persons, organisations)
+                except Exception as e:
+                    logger.error(f"❌ Error persisting suggestions for email {email.id}: {e}")
+                    self.db.rollback()
+                    self.metrics["errors"] += 1
+
+            stats.record(started, items=len(batch))
+
+    def _prefetch_entities(self, batch: List[tuple], team_id: int) -> Tuple[Dict, Dict]:
+        """
+        Précharge en batch les Person (par email) et Organisation (par nom)
+
+        Organisation n'a pas de team_id : le périmètre équipe passe par
+        owner_id → User.team_id.
+
+        Returns:
+            (persons par email, organisations par nom d'entreprise en minuscules)
+        """
+        emails_wanted = set()
+        companies_wanted = set()
+        for _, result in batch:
+            data = result.get("data", {}) or {}
+            if data.get("email"):
+                emails_wanted.add(data["email"])
+            if data.get("company"):
+                companies_wanted.add(data["company"])
+
+        persons: Dict[str, Person] = {}
+        if emails_wanted:
+            person_query = self.db.query(Person).filter(Person.email.in_(emails_wanted))
+            if hasattr(Person, "team_id"):
+                person_query = person_query.filter(Person.team_id == team_id)
+            for person in person_query:
+                persons.setdefault(person.email, person)
+
+        organisations: Dict[str, Organisation] = {}
+        if companies_wanted:
+            candidates = self.db.query(Organisation).filter(
+                or_(*(Organisation.name.ilike(f"%{company}%") for company in companies_wanted)),
+                Organisation.owner_id.in_(select(User.id).where(User.team_id == team_id))
+            ).all()
+            for company in companies_wanted:
+                match = self._match_organisation(company, candidates)
+                if match:
+                    organisations[company.lower()] = match
+
+        return persons, organisations
+
+    @staticmethod
+    def _match_organisation(company_name: str, candidates: List[Organisation]) -> Optional[Organisation]:
+        """Équivalent Python de `name ILIKE '%company%'` sur les candidats préchargés"""
+        needle = company_name.lower()
+        for org in candidates:
+            if org.name and needle in org.name.lower():
+                return org
+        return None
+
     def _is_blacklisted(self, sender_email: str, team_id: int) -> bool:
         """
         Vérifie si l'expéditeur est blacklisté (statique + DB)
 
+        Utilise le matcher compilé de l'équipe (tries en mémoire) au lieu
+        d'itérer les patterns un par un.
+
         Returns:
             True si l'email doit être ignoré
         """
         if not sender_email:
             return False
 
-        sender_lower = sender_email.lower()
-
-        # 1. Check static blacklist
-        for pattern in self.STATIC_BLACKLIST:
-            pattern_lower = pattern.lower()
-            if pattern_lower.startswith('@'):
-                # Domain pattern
-                if sender_lower.endswith(pattern_lower):
-                    logger.debug(f"⛔ Blacklisted (static domain): {sender_email}")
-                    return True
-            else:
-                # Prefix pattern
-                if sender_lower.startswith(pattern_lower):
-                    logger.debug(f"⛔ Blacklisted (static prefix): {sender_email}")
-                    return True
-
-        # 2. Check DB blacklist (with cache)
-        if self.blacklist_cache is None:
-            self.blacklist_cache = self.db.query(EmailBlacklist).filter(
-                EmailBlacklist.team_id == team_id
-            ).all()
+        if self.blacklist_matcher is None:
+            self.blacklist_matcher = get_blacklist_matcher(
+                self.db, team_id, static_patterns=self.STATIC_BLACKLIST
+            )
 
-        for blacklist_entry in self.blacklist_cache:
-            if blacklist_entry.matches(sender_email):
-                logger.debug(f"⛔ Blacklisted (DB {blacklist_entry.pattern_type}): {sender_email}")
-                return True
+        rule = self.blacklist_matcher.match(sender_email)
+        if rule:
+            logger.debug(f"⛔ Blacklisted ({rule}): {sender_email}")
+            return True
 
         return False
 
@@ -237,9 +542,10 @@ class EmailAutofillPipeline:
             if not company_name:
                 return
 
-            # Call enrichment service
+            # Call enrichment service (bloquant → thread pour ne pas geler les autres stages)
             enrichment_service = get_enrichment_service()
-            result = enrichment_service.enrich_organisation(
+            result = await asyncio.to_thread(
+                enrichment_service.enrich_organisation,
                 name=company_name,
                 country="FR",  # TODO: detect country from email domain
                 force_refresh=False
@@ -266,60 +572,26 @@ class EmailAutofillPipeline:
             logger.warning(f"⚠️  Web enrichment failed: {e}")
             # Don't fail the whole pipeline for enrichment errors
 
-    async def _parse_signature(self, email: EmailMessage, email_body: str, team_id: int):
-        """Parse email signature and create/apply suggestions"""
-
-        # Check blacklist
-        if self._is_blacklisted(email.sender_email, team_id):
-            logger.info(f"⛔ Skipping blacklisted sender: {email.sender_email}")
-            self.metrics["blacklisted"] += 1
-            return
-
-        # Check if already parsed
-        existing = self.db.query(AutofillSuggestion).filter(
-            AutofillSuggestion.email_id == email.id
-        ).first()
-
-        if existing:
-            logger.debug(f"⏭️  Email {email.id} already has suggestion")
-            return
+    async def _persist_suggestions(
+        self,
+        email: EmailMessage,
+        result: Dict,
+        team_id: int,
+        persons: Dict[str, Person],
+        organisations: Dict[str, Organisation]
+    ):
+        """Create/apply suggestions from a parsed signature"""
 
         try:
-            # Parse signature
-            result = await self.signature_parser.parse_signature(
-                email_body=email_body,
-                team_id=team_id
-            )
-
-            if not result.get("success"):
-                return
-
-            # Track cache hit
-            if result.get("from_cache"):
-                self.metrics["signatures_cached"] += 1
-            else:
-                self.metrics["signatures_parsed"] += 1
-
             data = result.get("data", {})
             confidence = result.get("confidence", 0.0)
 
-            # 🌐 Web enrichment (Acte V) - Enrich organisation data if company found
-            if data.get("company"):
-                await self._enrich_organisation_data(data)
-
             # Define field categories
             PERSON_FIELDS = {'first_name', 'last_name', 'name', 'email', 'phone', 'mobile', 'job_title', 'linkedin'}
             ORG_FIELDS = {'company', 'website', 'address'}
 
-            # Find or match person by email
-            person = None
-            if data.get("email"):
-                person_query = self.db.query(Person).filter(
-                    Person.email == data["email"]
-                )
-                if hasattr(Person, "team_id"):
-                    person_query = person_query.filter(Person.team_id == team_id)
-                person = person_query.first()
+            # Find or match person by email (préchargé par batch)
+            person = persons.get(data["email"]) if data.get("email") else None
 
             # Find or match organisation by company name
             # NOTE: Organisation model doesn't have team_id (legacy model)
@@ -379,7 +651,9 @@ class EmailAutofillPipeline:
 
             # Auto-apply if high confidence + safe fields
             if confidence >= self.auto_apply_threshold:
-                await self._auto_apply_suggestions(suggestions_created, data, email, team_id)
+                await self._auto_apply_suggestions(
+                    suggestions_created, data, email, team_id, persons, organisations
+                )
                 self.metrics["auto_applied"] += len(suggestions_created)
             else:
                 self.metrics["manual_review"] += len(suggestions_created)
@@ -388,6 +662,7 @@ class EmailAutofillPipeline:
 
         except Exception as e:
             logger.error(f"❌ Error parsing signature for email {email.id}: {e}")
+            self.db.rollback()
             self.metrics["errors"] += 1
 
     async def _detect_intent(self, email: EmailMessage, email_body: str, team_id: int):
@@ -405,7 +680,9 @@ class EmailAutofillPipeline:
         suggestions: List[AutofillSuggestion],
         data: Dict,
         email: EmailMessage,
-        team_id: int
+        team_id: int,
+        persons: Dict[str, Person],
+        organisations: Dict[str, Organisation]
     ):
         """Auto-apply high-confidence suggestions to database"""
 
@@ -416,10 +693,7 @@ class EmailAutofillPipeline:
                 return
 
             # Find or create Person
-            person = self.db.query(Person).filter(
-                Person.email == email_addr,
-                Person.team_id == team_id
-            ).first()
+            person = persons.get(email_addr)
 
             if not person:
                 # Create new person
@@ -436,6 +710,7 @@ class EmailAutofillPipeline:
                 )
                 self.db.add(person)
                 self.db.flush()
+                persons[email_addr] = person
 
                 logger.info(f"✅ Auto-created Person: {email_addr}")
             else:
@@ -456,10 +731,9 @@ class EmailAutofillPipeline:
             # Handle company if present
             company_name = data.get("company")
             if company_name:
-                org = self.db.query(Organisation).filter(
-                    Organisation.name.ilike(f"%{company_name}%"),
-                    Organisation.team_id == team_id
-                ).first()
+                org = organisations.get(company_name.lower()) or self._match_organisation(
+                    company_name, list(organisations.values())
+                )
 
                 if not org:
                     org = Organisation(
@@ -471,6 +745,7 @@ class EmailAutofillPipeline:
                     )
                     self.db.add(org)
                     self.db.flush()
+                    organisations[company_name.lower()] = org
                     logger.info(f"✅ Auto-created Organisation: {company_name}")
 
                 # Link person to organisation
@@ -495,13 +770,14 @@ class EmailAutofillPipeline:
         """Generate human-readable summary"""
 
         m = self.metrics
+        cache_stats = get_parse_cache("signature_parse").stats()
 
         summary = f"""
 📊 Batch Autofill Pipeline - Summary
 
 📧 Emails processed: {m['emails_processed']}
 ⛔ Blacklisted (skipped): {m['blacklisted']}
-✍️  Signatures parsed: {m['signatures_parsed']} (+ {m['signatures_cached']} cached)
+✍️  Signatures parsed: {m['signatures_parsed']} (+ {m['signatures_cached']} cached, hit ratio {cache_stats['hit_ratio']:.0%})
 🌐 Web enriched: {m['web_enriched']}
 🎯 Intents detected: {m['intents_detected']} (+ {m['intents_cached']} cached)
 💡 Suggestions created: {m['suggestions_created']}
@@ -511,7 +787,17 @@ class EmailAutofillPipeline:
 ⏱️  Total time: {m['processing_time_ms'] / 1000:.1f}s
 """
 
-        return summary.strip()
+        stage_lines = []
+        for name, stats in self.stage_stats.items():
+            s = stats.to_dict()
+            stage_lines.append(
+                f"   {name:<9} {s['items']:>4} items | {s['throughput_per_s']:.2f}/s | "
+                f"p50 {s['latency_p50_ms']:.0f}ms | p95 {s['latency_p95_ms']:.0f}ms"
+            )
+
+        summary = summary.strip() + "\n\n🔀 Stages:\n" + "\n".join(stage_lines)
+
+        return summary
 
 
 
@@ -520,7 +806,9 @@ async def run_autofill_pipeline(
     team_id: int,
     days_back: int = 7,
     max_emails: int = 100,
-    auto_apply_threshold: float = 0.92
+    auto_apply_threshold: float = 0.92,
+    parse_concurrency: int = 4,
+    enrich_concurrency: int = 2
 ) -> Dict:
     """
     Convenience function to run the pipeline
@@ -532,7 +820,9 @@ async def run_autofill_pipeline(
     pipeline = EmailAutofillPipeline(
         db=db,
         auto_apply_threshold=auto_apply_threshold,
-        max_emails=max_emails
+        max_emails=max_emails,
+        parse_concurrency=parse_concurrency,
+        enrich_concurrency=enrich_concurrency
     )
 
     return await pipeline.run(team_id=team_id, days_back=days_back)
@@ -11,6 +11,7 @@ from core.config import settings
 from core.exceptions import DatabaseError, ResourceNotFound, ValidationError
 from models.email import (
     EmailCampaign,
+    EmailCampaignEventRollup,
     EmailCampaignStatus,
     EmailCampaignStep,
     EmailEvent,
@@ -900,8 +901,185 @@ class EmailDeliveryService:
             return {"error": str(exc)}
 
 
+class EmailEventRollupService:
+    """Maintien incrémental de email_campaign_event_rollups."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, items: Sequence[Tuple[EmailSend, EmailEvent]]) -> None:
+        """Ajoute des événements fraîchement ingérés aux rollups (avant commit).
+
+        `unique_sends` n'est incrémenté que si l'envoi n'avait encore aucun
+        événement de ce type (hors événements du lot courant).
+        """
+        if not items:
+            return
+
+        new_event_ids = [event.id for _, event in items if event.id is not None]
+        send_ids = {send.id for send, _ in items}
+
+        with self.db.no_autoflush:
+            query = self.db.query(EmailEvent.send_id, EmailEvent.event_type).filter(
+                EmailEvent.send_id.in_(send_ids)
+            )
+            if new_event_ids:
+                query = query.filter(EmailEvent.id.notin_(new_event_ids))
+            already_seen = set(query.distinct().all())
+
+        deltas: Dict[Tuple[int, str, EmailEventType], Dict[str, Any]] = {}
+        for send, event in items:
+            key = (send.campaign_id, _variant_key(send.variant), event.event_type)
+            delta = deltas.setdefault(key, {"count": 0, "sends": set(), "last_event_at": None})
+            delta["count"] += 1
+            if (send.id, event.event_type) not in already_seen:
+                delta["sends"].add(send.id)
+            event_at = _as_aware(event.event_at)
+            if event_at and (delta["last_event_at"] is None or event_at > delta["last_event_at"]):
+                delta["last_event_at"] = event_at
+
+        for (campaign_id, variant, event_type), delta in deltas.items():
+            self._increment(
+                campaign_id,
+                variant,
+                event_type,
+                delta["count"],
+                len(delta["sends"]),
+                delta["last_event_at"],
+            )
+
+    def _increment(
+        self,
+        campaign_id: int,
+        variant: str,
+        event_type: EmailEventType,
+        count: int,
+        unique_sends: int,
+        last_event_at: Optional[datetime],
+    ) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        if insert is None:
+            rollup = (
+                self.db.query(EmailCampaignEventRollup)
+                .filter(
+                    EmailCampaignEventRollup.campaign_id == campaign_id,
+                    EmailCampaignEventRollup.variant == variant,
+                    EmailCampaignEventRollup.event_type == event_type,
+                )
+                .with_for_update()
+                .first()
+            )
+            if rollup is None:
+                rollup = EmailCampaignEventRollup(
+                    campaign_id=campaign_id,
+                    variant=variant,
+                    event_type=event_type,
+                    event_count=0,
+                    unique_sends=0,
+                )
+                self.db.add(rollup)
+            rollup.event_count = (rollup.event_count or 0) + count
+            rollup.unique_sends = (rollup.unique_sends or 0) + unique_sends
+            current = _as_aware(rollup.last_event_at)
+            if last_event_at and (current is None or last_event_at > current):
+                rollup.last_event_at = last_event_at
+            return
+
+        # Upsert atomique: plusieurs webhooks peuvent incrémenter la même ligne
+        table = EmailCampaignEventRollup.__table__
+        stmt = insert(table).values(
+            campaign_id=campaign_id,
+            variant=variant,
+            event_type=event_type,
+            event_count=count,
+            unique_sends=unique_sends,
+            last_event_at=last_event_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["campaign_id", "variant", "event_type"],
+            set_={
+                "event_count": table.c.event_count + stmt.excluded.event_count,
+                "unique_sends": table.c.unique_sends + stmt.excluded.unique_sends,
+                "last_event_at": case(
+                    (table.c.last_event_at.is_(None), stmt.excluded.last_event_at),
+                    (
+                        stmt.excluded.last_event_at > table.c.last_event_at,
+                        stmt.excluded.last_event_at,
+                    ),
+                    else_=table.c.last_event_at,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt)
+
+    def rebuild(self, campaign_id: Optional[int] = None) -> int:
+        """Recalcule les rollups depuis email_events (backfill / réparation).
+
+        Returns:
+            Nombre de lignes de rollup écrites.
+        """
+        delete_query = self.db.query(EmailCampaignEventRollup)
+        if campaign_id is not None:
+            delete_query = delete_query.filter(EmailCampaignEventRollup.campaign_id == campaign_id)
+        delete_query.delete(synchronize_session=False)
+
+        query = (
+            self.db.query(
+                EmailSend.campaign_id,
+                EmailSend.variant,
+                EmailEvent.event_type,
+                func.count(EmailEvent.id).label("event_count"),
+                func.count(distinct(EmailEvent.send_id)).label("unique_sends"),
+                func.max(EmailEvent.event_at).label("last_event_at"),
+            )
+            .join(EmailSend, EmailSend.id == EmailEvent.send_id)
+            .group_by(EmailSend.campaign_id, EmailSend.variant, EmailEvent.event_type)
+        )
+        if campaign_id is not None:
+            query = query.filter(EmailSend.campaign_id == campaign_id)
+
+        rollups = [
+            EmailCampaignEventRollup(
+                campaign_id=row.campaign_id,
+                variant=_variant_key(row.variant),
+                event_type=row.event_type,
+                event_count=row.event_count,
+                unique_sends=row.unique_sends,
+                last_event_at=row.last_event_at,
+            )
+            for row in query.all()
+        ]
+        self.db.add_all(rollups)
+        self.db.commit()
+        logger.info(
+            "email_rollups_rebuilt",
+            extra={"campaign_id": campaign_id, "rows": len(rollups)},
+        )
+        return len(rollups)
+
+
+def _variant_key(variant: Optional[EmailVariant]) -> str:
+    if variant is None:
+        return ""
+    return variant.value if isinstance(variant, EmailVariant) else str(variant)
+
+
+def _as_aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
 class EmailAnalyticsService:
-    """Calcul des KPIs email."""
+    """Calcul des KPIs email (lus depuis email_campaign_event_rollups)."""
 
     def __init__(self, db: Session):
         self.db = db
@@ -911,28 +1089,43 @@ class EmailAnalyticsService:
         if not campaign:
             raise ResourceNotFound("EmailCampaign", campaign_id)
 
-        total_sent = (
-            self.db.query(func.count(EmailSend.id))
+        sent_by_variant = dict(
+            self.db.query(EmailSend.variant, func.count(EmailSend.id))
             .filter(EmailSend.campaign_id == campaign_id)
-            .scalar()
-        ) or 0
-
-        delivered = self._count_events(campaign_id, EmailEventType.DELIVERED)
-        opens = self._count_events(campaign_id, EmailEventType.OPENED)
-        unique_opens = self._count_distinct_events(campaign_id, EmailEventType.OPENED)
-        clicks = self._count_events(campaign_id, EmailEventType.CLICKED)
-        unique_clicks = self._count_distinct_events(campaign_id, EmailEventType.CLICKED)
-        bounces = self._count_events(campaign_id, EmailEventType.BOUNCED)
-        unsubscribes = self._count_events(campaign_id, EmailEventType.UNSUBSCRIBED)
-        complaints = self._count_events(campaign_id, EmailEventType.SPAM_REPORT)
-        last_event_at = (
-            self.db.query(func.max(EmailEvent.event_at))
-            .join(EmailSend, EmailSend.id == EmailEvent.send_id)
-            .filter(EmailSend.campaign_id == campaign_id)
-            .scalar()
+            .group_by(EmailSend.variant)
+            .all()
+        )
+        rollups = (
+            self.db.query(EmailCampaignEventRollup)
+            .filter(EmailCampaignEventRollup.campaign_id == campaign_id)
+            .all()
         )
 
-        per_variant = self._stats_by_variant(campaign_id)
+        total_sent = sum(sent_by_variant.values())
+        counts: Dict[EmailEventType, int] = {}
+        uniques: Dict[EmailEventType, int] = {}
+        by_variant: Dict[str, Dict[EmailEventType, int]] = {}
+        last_event_at = None
+        for rollup in rollups:
+            counts[rollup.event_type] = counts.get(rollup.event_type, 0) + rollup.event_count
+            uniques[rollup.event_type] = uniques.get(rollup.event_type, 0) + rollup.unique_sends
+            if rollup.variant:
+                variant_counts = by_variant.setdefault(rollup.variant, {})
+                variant_counts[rollup.event_type] = rollup.event_count
+            event_at = _as_aware(rollup.last_event_at)
+            if event_at and (last_event_at is None or event_at > last_event_at):
+                last_event_at = event_at
+
+        delivered = counts.get(EmailEventType.DELIVERED, 0)
+        opens = counts.get(EmailEventType.OPENED, 0)
+        unique_opens = uniques.get(EmailEventType.OPENED, 0)
+        clicks = counts.get(EmailEventType.CLICKED, 0)
+        unique_clicks = uniques.get(EmailEventType.CLICKED, 0)
+        bounces = counts.get(EmailEventType.BOUNCED, 0)
+        unsubscribes = counts.get(EmailEventType.UNSUBSCRIBED, 0)
+        complaints = counts.get(EmailEventType.SPAM_REPORT, 0)
+
+        per_variant = self._stats_by_variant(sent_by_variant, by_variant)
 
         open_rate = (unique_opens / total_sent * 100) if total_sent else 0.0
         click_rate = (unique_clicks / total_sent * 100) if total_sent else 0.0
@@ -959,69 +1152,32 @@ class EmailAnalyticsService:
             per_variant=per_variant,
         )
 
-    def _count_events(self, campaign_id: int, event_type: EmailEventType) -> int:
-        return (
-            self.db.query(func.count(EmailEvent.id))
-            .join(EmailSend, EmailSend.id == EmailEvent.send_id)
-            .filter(
-                EmailSend.campaign_id == campaign_id,
-                EmailEvent.event_type == event_type,
-            )
-            .scalar()
-        ) or 0
-
-    def _count_distinct_events(self, campaign_id: int, event_type: EmailEventType) -> int:
-        return (
-            self.db.query(func.count(distinct(EmailEvent.send_id)))
-            .join(EmailSend, EmailSend.id == EmailEvent.send_id)
-            .filter(
-                EmailSend.campaign_id == campaign_id,
-                EmailEvent.event_type == event_type,
-            )
-            .scalar()
-        ) or 0
-
-    def _stats_by_variant(self, campaign_id: int) -> List[Dict[str, Any]]:
-        rows = (
-            self.db.query(
-                EmailSend.variant,
-                func.count(EmailSend.id).label("total_sent"),
-                func.sum(case((EmailEvent.event_type == EmailEventType.OPENED, 1), else_=0)).label(
-                    "opens"
-                ),
-                func.sum(case((EmailEvent.event_type == EmailEventType.CLICKED, 1), else_=0)).label(
-                    "clicks"
-                ),
-                func.sum(case((EmailEvent.event_type == EmailEventType.BOUNCED, 1), else_=0)).label(
-                    "bounces"
-                ),
-                func.sum(
-                    case((EmailEvent.event_type == EmailEventType.UNSUBSCRIBED, 1), else_=0)
-                ).label("unsubs"),
-            )
-            .outerjoin(EmailEvent, EmailEvent.send_id == EmailSend.id)
-            .filter(
-                EmailSend.campaign_id == campaign_id,
-                EmailSend.variant.isnot(None),
-            )
-            .group_by(EmailSend.variant)
-            .all()
-        )
+    def rebuild_rollups(self, campaign_id: Optional[int] = None) -> int:
+        return EmailEventRollupService(self.db).rebuild(campaign_id)
 
+    def _stats_by_variant(
+        self,
+        sent_by_variant: Dict[Optional[EmailVariant], int],
+        events_by_variant: Dict[str, Dict[EmailEventType, int]],
+    ) -> List[Dict[str, Any]]:
         result = []
-        for row in rows:
-            total_sent = row.total_sent or 0
-            variant = row.variant or EmailVariant.A
-            open_rate = (row.opens or 0) / total_sent * 100 if total_sent else 0
-            click_rate = (row.clicks or 0) / total_sent * 100 if total_sent else 0
+        for variant, total_sent in sorted(
+            ((variant, sent) for variant, sent in sent_by_variant.items() if variant is not None),
+            key=lambda item: _variant_key(item[0]),
+        ):
+            events = events_by_variant.get(_variant_key(variant), {})
+            opens = events.get(EmailEventType.OPENED, 0)
+            clicks = events.get(EmailEventType.CLICKED, 0)
+            open_rate = opens / total_sent * 100 if total_sent else 0
+            click_rate = clicks / total_sent * 100 if total_sent else 0
             result.append(
                 {
                     "variant": variant,
                     "total_sent": total_sent,
-                    "opens": row.opens or 0,
-                    "clicks": row.clicks or 0,
-                    "bounces": row.bounces or 0,
-                    "unsubscribes": row.unsubs or 0,
+                    "opens": opens,
+                    "clicks": clicks,
+                    "bounces": events.get(EmailEventType.BOUNCED, 0),
+                    "unsubscribes": events.get(EmailEventType.UNSUBSCRIBED, 0),
                     "open_rate": round(open_rate, 2),
                     "click_rate": round(click_rate, 2),
                 }
@@ -1037,6 +1193,7 @@ class EmailEventIngestionService:
 
     def ingest_sendgrid_events(self, events: Iterable[Dict[str, Any]]) -> int:
         processed = 0
+        ingested: List[Tuple[EmailSend, EmailEvent]] = []
         for payload in events:
             try:
                 event_type = self._map_sendgrid_event(payload.get("event"))
@@ -1069,11 +1226,13 @@ class EmailEventIngestionService:
                 )
                 self.db.add(emailevent)
                 self._update_send_status(send, event_type)
+                ingested.append((send, emailevent))
                 processed += 1
             except Exception as exc:
                 logger.exception("email_event_ingestion_failed: %s", exc)
         try:
             if processed:
+                EmailEventRollupService(self.db).record(ingested)
                 self.db.commit()
             return processed
         except Exception as exc:
@@ -1159,6 +1318,7 @@ __all__ = [
     "EmailCampaignService",
     "EmailDeliveryService",
     "EmailAnalyticsService",
+    "EmailEventRollupService",
     "EmailEventIngestionService",
     "render_dynamic_content",
 ]
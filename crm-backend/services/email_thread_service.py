@@ -10,13 +10,13 @@ Groupe les emails en conversations basées sur:
 import logging
 import re
 import hashlib
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
-from models.email_thread import EmailThread
+from models.email_thread import EmailThread, EmailThreadMessage
 from models.interaction import Interaction
 
 logger = logging.getLogger(__name__)
@@ -79,6 +79,18 @@ class EmailThreadService:
 
         return thread_id
 
+    @staticmethod
+    def normalize_message_id(value: Optional[str]) -> Optional[str]:
+        """
+        Message-ID sans chevrons ni espaces ("<abc@host>" → "abc@host").
+
+        Même forme que les References / In-Reply-To extraits des headers.
+        """
+        if not value:
+            return None
+        normalized = value.strip().strip('<>').strip()
+        return normalized or None
+
     def extract_message_ids(self, headers: Dict[str, str]) -> Dict[str, Any]:
         """
         Extrait les Message-ID, References, In-Reply-To depuis les headers.
@@ -89,7 +101,9 @@ class EmailThreadService:
         Returns:
             Dict avec message_id, references, in_reply_to
         """
-        message_id = headers.get('Message-ID') or headers.get('Message-Id')
+        message_id = self.normalize_message_id(
+            headers.get('Message-ID') or headers.get('Message-Id')
+        )
         references = headers.get('References')
         in_reply_to = headers.get('In-Reply-To')
 
@@ -133,6 +147,142 @@ class EmailThreadService:
         Returns:
             EmailThread trouvé ou créé
         """
+        normalized_subject, participants, thread_id = self._subject_key(
+            subject, from_email, to_email, cc_emails
+        )
+        msg_ids = self.extract_message_ids(headers) if headers else None
+
+        # Essayer de trouver via Message-ID/References (si headers fournis)
+        if msg_ids and (msg_ids['references'] or msg_ids['in_reply_to']):
+            existing = self._find_thread_by_message_ids(
+                team_id,
+                msg_ids['references'],
+                msg_ids['in_reply_to'],
+            )
+
+            if existing:
+                # Mettre à jour les métadonnées
+                self._update_thread_metadata(existing, msg_ids)
+                return existing
+
+        # Chercher un thread via sujet + participants
+        thread = (
+            self.db.query(EmailThread)
+            .filter(
+                EmailThread.team_id == team_id,
+                EmailThread.thread_id == thread_id,
+            )
+            .first()
+        )
+
+        if thread:
+            logger.debug(f"Thread existant trouvé: {thread.subject}")
+        else:
+            thread = self._new_thread(
+                team_id, thread_id, normalized_subject, subject, participants
+            )
+            self.db.commit()
+            self.db.refresh(thread)
+            logger.info(f"✅ Nouveau thread créé: {thread.subject}")
+
+        # Indexer le Message-ID de cet email: ses réponses retrouveront le thread
+        if msg_ids:
+            self._update_thread_metadata(thread, msg_ids)
+
+        return thread
+
+    def thread_emails(
+        self,
+        team_id: int,
+        emails: Sequence[Dict[str, Any]],
+    ) -> List[EmailThread]:
+        """
+        Rattache une page d'emails synchronisés à leurs threads (API batch).
+
+        Chaque email est un dict: subject, from_email, to_email, headers, cc_emails.
+        Une requête résout tous les References/In-Reply-To de la page, une autre
+        les threads par sujet + participants; l'index Message-ID est écrit en un
+        INSERT multi-lignes et le tout est validé en un seul commit. Un email peut
+        répondre à un email précédent de la même page.
+
+        Args:
+            team_id: ID de l'équipe
+            emails: Emails, dans l'ordre chronologique
+
+        Returns:
+            Thread de chaque email, dans l'ordre de `emails`
+        """
+        parsed = [self.extract_message_ids(email.get('headers') or {}) for email in emails]
+        keys = [
+            self._subject_key(
+                email.get('subject'),
+                email.get('from_email'),
+                email.get('to_email'),
+                email.get('cc_emails'),
+            )
+            for email in emails
+        ]
+
+        referenced = set()
+        for msg_ids in parsed:
+            referenced.update(self._referenced_ids(msg_ids))
+        by_message_id = self._lookup_threads(team_id, referenced)
+
+        thread_keys = {thread_id for _, _, thread_id in keys}
+        by_key = {
+            thread.thread_id: thread
+            for thread in self.db.query(EmailThread).filter(
+                EmailThread.team_id == team_id,
+                EmailThread.thread_id.in_(thread_keys),
+            )
+        } if thread_keys else {}
+
+        threads: List[EmailThread] = []
+        pending: Dict[int, Tuple[EmailThread, List[Dict[str, Any]]]] = {}
+        for email, msg_ids, (normalized_subject, participants, thread_id) in zip(
+            emails, parsed, keys
+        ):
+            thread = self._pick_thread(msg_ids, by_message_id)
+            if thread is None:
+                thread = by_key.get(thread_id)
+            if thread is None:
+                thread = self._new_thread(
+                    team_id,
+                    thread_id,
+                    normalized_subject,
+                    email.get('subject'),
+                    participants,
+                )
+                by_key[thread_id] = thread
+
+            for message_id in self._own_ids(msg_ids):
+                by_message_id.setdefault(message_id, thread)
+            pending.setdefault(id(thread), (thread, []))[1].append(msg_ids)
+            threads.append(thread)
+
+        # IDs des nouveaux threads, nécessaires pour l'index
+        self.db.flush()
+
+        rows: Dict[str, int] = {}
+        for thread, msg_ids_list in pending.values():
+            for msg_ids in msg_ids_list:
+                for message_id in self._append_message_ids(thread, msg_ids):
+                    rows.setdefault(message_id, thread.id)
+        self._index_message_ids(team_id, rows)
+        self.db.commit()
+
+        return threads
+
+    # ---------- Index Message-ID → thread ----------
+
+    def _subject_key(
+        self,
+        subject: Optional[str],
+        from_email: Optional[str],
+        to_email: Optional[str],
+        cc_emails: Optional[List[str]] = None,
+    ) -> Tuple[str, List[str], str]:
+        """(sujet normalisé, participants, thread_id) pour le regroupement par sujet."""
         # Normaliser le sujet
         normalized_subject = self.normalize_subject(subject)
 
@@ -147,40 +297,21 @@ class EmailThreadService:
         # Dédupliquer et nettoyer
         participants = list(set([p.strip().lower() for p in participants if p]))
 
-        # Essayer de trouver via Message-ID/References (si headers fournis)
-        if headers:
-            msg_ids = self.extract_message_ids(headers)
-
-            # Chercher un thread existant via References
-            if msg_ids['references'] or msg_ids['in_reply_to']:
-                existing = self._find_thread_by_message_ids(
-                    team_id,
-                    msg_ids['references'],
-                    msg_ids['in_reply_to'],
-                )
-
-                if existing:
-                    # Mettre à jour les métadonnées
-                    self._update_thread_metadata(existing, msg_ids)
-                    return existing
-
-        # Chercher un thread via sujet + participants
-        thread_id = self.generate_thread_id(normalized_subject, participants)
-
-        existing = (
-            self.db.query(EmailThread)
-            .filter(
-                EmailThread.team_id == team_id,
-                EmailThread.thread_id == thread_id,
-            )
-            .first()
+        return (
+            normalized_subject,
+            participants,
+            self.generate_thread_id(normalized_subject, participants),
         )
 
-        if existing:
-            logger.debug(f"Thread existant trouvé: {existing.subject}")
-            return existing
-
-        # Créer un nouveau thread
+    def _new_thread(
+        self,
+        team_id: int,
+        thread_id: str,
+        normalized_subject: str,
+        subject: Optional[str],
+        participants: List[str],
+    ) -> EmailThread:
+        """Crée un thread (ajouté à la session, sans commit)."""
         new_thread = EmailThread(
             team_id=team_id,
             thread_id=thread_id,
@@ -188,19 +319,100 @@ class EmailThreadService:
             original_subject=subject,
             participants=participants,
             email_count=0,
-            metadata={
+            thread_metadata={
                 "message_ids": [],
                 "created_from": "subject_matching",
             },
         )
-
         self.db.add(new_thread)
-        self.db.commit()
-        self.db.refresh(new_thread)
+        return new_thread
 
-        logger.info(f"✅ Nouveau thread créé: {new_thread.subject}")
+    @staticmethod
+    def _referenced_ids(msg_ids: Dict[str, Any]) -> List[str]:
+        """Message-IDs parents, du plus proche (In-Reply-To) au plus ancien."""
+        candidates = []
+        if msg_ids.get('in_reply_to'):
+            candidates.append(msg_ids['in_reply_to'])
+        candidates.extend(reversed(msg_ids.get('references') or []))
+        return candidates
+
+    @staticmethod
+    def _own_ids(msg_ids: Dict[str, Any]) -> List[str]:
+        """Message-IDs à indexer pour un email: le sien puis ses References."""
+        ids = [msg_ids['message_id']] if msg_ids.get('message_id') else []
+        ids.extend(msg_ids.get('references') or [])
+        return ids
+
+    def _lookup_threads(self, team_id: int, message_ids: Iterable[str]) -> Dict[str, EmailThread]:
+        """Message-ID → thread en une requête indexée (team_id, message_id IN (...))."""
+        message_ids = sorted({message_id for message_id in message_ids if message_id})
+        if not message_ids:
+            return {}
+
+        rows = (
+            self.db.query(EmailThreadMessage.message_id, EmailThread)
+            .join(EmailThread, EmailThread.id == EmailThreadMessage.thread_id)
+            .filter(
+                EmailThreadMessage.team_id == team_id,
+                EmailThreadMessage.message_id.in_(message_ids),
+            )
+            .all()
+        )
+        return {message_id: thread for message_id, thread in rows}
 
-        return new_thread
+    def _pick_thread(
+        self,
+        msg_ids: Dict[str, Any],
+        by_message_id: Dict[str, EmailThread],
+    ) -> Optional[EmailThread]:
+        """Thread du parent le plus proche connu (In-Reply-To, puis References récentes)."""
+        for message_id in self._referenced_ids(msg_ids):
+            thread = by_message_id.get(message_id)
+            if thread is not None:
+                logger.debug(f"Thread trouvé via Message-ID: {message_id}")
+                return thread
+        return None
+
+    def _index_message_ids(self, team_id: int, rows: Dict[str, int]):
+        """
+        Ajoute des entrées message_id → thread à l'index (sans commit).
+
+        Un Message-ID déjà indexé garde son thread (premier rattachement).
+        """
+        if not rows:
+            return
+
+        values = [
+            {"team_id": team_id, "message_id": message_id, "thread_id": thread_id}
+            for message_id, thread_id in rows.items()
+        ]
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        if insert is None:
+            existing = {
+                message_id
+                for (message_id,) in self.db.query(EmailThreadMessage.message_id).filter(
+                    EmailThreadMessage.team_id == team_id,
+                    EmailThreadMessage.message_id.in_(list(rows)),
+                )
+            }
+            self.db.add_all(
+                EmailThreadMessage(**value)
+                for value in values
+                if value["message_id"] not in existing
+            )
+            return
+
+        stmt = insert(EmailThreadMessage.__table__).values(values)
+        self.db.execute(
+            stmt.on_conflict_do_nothing(index_elements=["team_id", "message_id"])
+        )
 
     def _find_thread_by_message_ids(
         self,
@@ -219,34 +431,12 @@ class EmailThreadService:
         Returns:
             EmailThread ou None
         """
-        # Construire la liste de tous les Message-IDs à chercher
-        all_message_ids = []
-        if references:
-            all_message_ids.extend(references)
-        if in_reply_to:
-            all_message_ids.append(in_reply_to)
-
-        if not all_message_ids:
+        msg_ids = {"references": references or [], "in_reply_to": in_reply_to}
+        candidates = self._referenced_ids(msg_ids)
+        if not candidates:
             return None
 
-        # Chercher un thread qui contient un de ces Message-IDs
-        # dans ses métadonnées
-        threads = (
-            self.db.query(EmailThread)
-            .filter(EmailThread.team_id == team_id)
-            .all()
-        )
-
-        for thread in threads:
-            metadata_message_ids = thread.metadata.get("message_ids", [])
-
-            # Vérifier si un des Message-IDs correspond
-            for msg_id in all_message_ids:
-                if msg_id in metadata_message_ids:
-                    logger.debug(f"Thread trouvé via Message-ID: {msg_id}")
-                    return thread
-
-        return None
+        return self._pick_thread(msg_ids, self._lookup_threads(team_id, candidates))
 
     def _update_thread_metadata(
         self,
@@ -256,32 +446,40 @@ class EmailThreadService:
         """
         Met à jour les métadonnées d'un thread avec nouveaux Message-IDs.
 
+        Les nouveaux Message-IDs sont aussi ajoutés à l'index email_thread_messages.
+
         Args:
             thread: EmailThread
             msg_ids: Dict avec message_id, references, in_reply_to
         """
-        if not thread.metadata:
-            thread.metadata = {"message_ids": []}
-
-        message_ids = thread.metadata.get("message_ids", [])
-
-        # Ajouter le nouveau Message-ID
-        if msg_ids['message_id'] and msg_ids['message_id'] not in message_ids:
-            message_ids.append(msg_ids['message_id'])
-
-        # Ajouter les References
-        if msg_ids['references']:
-            for ref in msg_ids['references']:
-                if ref not in message_ids:
-                    message_ids.append(ref)
-
-        thread.metadata["message_ids"] = message_ids
+        added = self._append_message_ids(thread, msg_ids)
+        self._index_message_ids(thread.team_id, {message_id: thread.id for message_id in added})
         self.db.commit()
 
+    def _append_message_ids(self, thread: EmailThread, msg_ids: Dict[str, Any]) -> List[str]:
+        """Ajoute les Message-IDs de l'email à metadata["message_ids"]; retourne les nouveaux."""
+        metadata = dict(thread.thread_metadata or {})
+        message_ids = list(metadata.get("message_ids") or [])
+        known = set(message_ids)
+
+        added = []
+        for message_id in self._own_ids(msg_ids):
+            if message_id not in known:
+                known.add(message_id)
+                message_ids.append(message_id)
+                added.append(message_id)
+
+        if added:
+            # Nouveau dict: la colonne JSON n'est pas suivie en mutation
+            metadata["message_ids"] = message_ids
+            thread.thread_metadata = metadata
+        return added
+
     def add_email_to_thread(
         self,
         thread: EmailThread,
         interaction: Interaction,
+        headers: Optional[Dict[str, str]] = None,
     ):
         """
         Ajoute un email à un thread.
@@ -291,6 +489,7 @@ class EmailThreadService:
         Args:
             thread: EmailThread
             interaction: Interaction (email)
+            headers: Headers email (optionnel): Message-ID/References indexés
         """
         # Lier l'interaction au thread
         interaction.email_thread_id = thread.id
@@ -311,6 +510,13 @@ class EmailThreadService:
 
         thread.updated_at = datetime.now()
 
+        if headers:
+            msg_ids = self.extract_message_ids(headers)
+            added = self._append_message_ids(thread, msg_ids)
+            self._index_message_ids(
+                thread.team_id, {message_id: thread.id for message_id in added}
+            )
+
         self.db.commit()
 
         logger.debug(
@@ -435,3 +641,45 @@ class EmailThreadService:
             f"✅ Thread {thread_id} reconstruit: "
             f"{thread.email_count} emails, {len(thread.participants)} participants"
         )
+
+    def rebuild_message_index(self, team_id: Optional[int] = None, batch_size: int = 500) -> int:
+        """
+        Reconstruit l'index Message-ID → thread depuis metadata["message_ids"].
+
+        Backfill des threads existants (idempotent: entrées déjà présentes ignorées).
+
+        Args:
+            team_id: Limiter à une équipe (défaut: toutes)
+            batch_size: Message-IDs insérés par lot
+
+        Returns:
+            Nombre de Message-IDs lus
+        """
+        query = self.db.query(
+            EmailThread.id, EmailThread.team_id, EmailThread.thread_metadata
+        ).order_by(EmailThread.id)
+        if team_id is not None:
+            query = query.filter(EmailThread.team_id == team_id)
+
+        total = 0
+        batch: Dict[int, Dict[str, int]] = {}
+        for thread_pk, thread_team_id, metadata in query.yield_per(batch_size):
+            rows = batch.setdefault(thread_team_id, {})
+            for message_id in (metadata or {}).get("message_ids") or []:
+                message_id = self.normalize_message_id(message_id)
+                if message_id:
+                    rows.setdefault(message_id, thread_pk)
+                    total += 1
+            if sum(len(rows) for rows in batch.values()) >= batch_size:
+                self._flush_index_batch(batch)
+
+        self._flush_index_batch(batch)
+        self.db.commit()
+
+        logger.info(f"✅ Index Message-ID reconstruit: {total} Message-IDs")
+        return total
+
+    def _flush_index_batch(self, batch: Dict[int, Dict[str, int]]):
+        for batch_team_id, rows in batch.items():
+            self._index_message_ids(batch_team_id, rows)
+        batch.clear()
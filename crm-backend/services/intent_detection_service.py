@@ -3,12 +3,12 @@ Service de détection d'intention d'emails avec IA
 Détecte automatiquement l'intention d'un email: meeting_request, info_request, follow_up, etc.
 """
 import time
-import hashlib
 import logging
 from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from models import AIMemory
 from services.ai_config_loader import get_ai_config_loader
+from services.ai_parse_cache import content_key, get_parse_cache, normalise_text
 
 logger = logging.getLogger(__name__)
 
@@ -322,30 +322,54 @@ Si aucune intention claire n'est détectée, utilise "other" avec une confiance
             return {"success": False, "error": str(e)}
 
     def _check_cache(self, email_body: str, subject: Optional[str], team_id: int) -> Optional[Dict]:
-        """Check if we have a cached intent detection for this email"""
-        cache_input = f"{subject or ''}\n{email_body}"
-        prompt_hash = hashlib.sha256(cache_input.encode()).hexdigest()
+        """
+        Check if we have a cached intent detection for this email
+
+        Clé = sujet + corps normalisés, correspondance exacte uniquement: deux
+        emails quasi identiques peuvent avoir des intentions opposées.
+        Pas de partage inter-équipes (contenu privé).
+        """
+        normalised = normalise_text(f"{subject or ''}\n{email_body}")
+        cache = get_parse_cache("intent_detection")
+
+        found = cache.lookup(normalised, team_id)
+        if found:
+            entry, _ = found
+            return self._cached_response(entry)
 
         cached = self.db.query(AIMemory).filter(
             AIMemory.team_id == team_id,
-            AIMemory.prompt_hash == prompt_hash,
+            AIMemory.prompt_hash == content_key(normalised),
             AIMemory.task_type == "intent_detection",
             AIMemory.success == True
         ).order_by(AIMemory.created_at.desc()).first()
 
         if cached:
-            return {
-                "success": True,
+            cache.record_backing_hit()
+            entry = {
                 "intent": cached.response_json.get("intent"),
-                "confidence": cached.confidence_score,
                 "reasoning": cached.response_json.get("reasoning", ""),
-                "model_used": f"{cached.model_used} (cached)",
-                "processing_time_ms": 0,
-                "from_cache": True
+                "confidence": cached.confidence_score,
+                "model_used": cached.model_used,
             }
+            cache.store(normalised, team_id, entry)
+            return self._cached_response(entry)
 
+        cache.record_miss()
         return None
 
+    @staticmethod
+    def _cached_response(entry: Dict) -> Dict:
+        return {
+            "success": True,
+            "intent": entry["intent"],
+            "confidence": entry["confidence"],
+            "reasoning": entry["reasoning"],
+            "model_used": f"{entry['model_used']} (cached)",
+            "processing_time_ms": 0,
+            "from_cache": True
+        }
+
     def _save_to_cache(
         self,
         team_id: int,
@@ -358,13 +382,13 @@ Si aucune intention claire n'est détectée, utilise "other" avec une confiance
         """Save intent detection result to cache"""
         try:
             cache_input = f"{subject or ''}\n{email_body}"
-            prompt_hash = hashlib.sha256(cache_input.encode()).hexdigest()
+            normalised = normalise_text(cache_input)
 
             memory = AIMemory(
                 team_id=team_id,
                 model_used=result.get("model_used", "unknown"),
                 provider=result.get("provider", "unknown"),
-                prompt_hash=prompt_hash,
+                prompt_hash=content_key(normalised),
                 prompt_text=cache_input[:1000],
                 response_json={
                     "intent": result.get("intent"),
@@ -381,6 +405,17 @@ Si aucune intention claire n'est détectée, utilise "other" avec une confiance
             self.db.add(memory)
             self.db.commit()
 
+            get_parse_cache("intent_detection").store(
+                normalised,
+                team_id,
+                {
+                    "intent": result.get("intent"),
+                    "reasoning": result.get("reasoning", ""),
+                    "confidence": result.get("confidence"),
+                    "model_used": result.get("model_used", "unknown"),
+                },
+            )
+
         except Exception as e:
             logger.error(f"Failed to save intent detection to cache: {e}")
             self.db.rollback()
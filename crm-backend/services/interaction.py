@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import List, Optional, Tuple
 
 from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from core.exceptions import ResourceNotFound, ValidationError
 from models.interaction import Interaction
@@ -23,9 +23,18 @@ def get_automation_service(db):
 class InteractionService(BaseService[Interaction, InteractionCreate, InteractionUpdate]):
     """Service métier pour les interactions"""
 
+    # Listes: plus récentes d'abord, départage par id (pagination keyset)
+    keyset_descending = True
+
     def __init__(self, db: Session):
         super().__init__(Interaction, db)
 
+    def _keyset_columns(self) -> list:
+        return [Interaction.created_at, Interaction.id]
+
+    def _list_query(self):
+        return self.db.query(Interaction).options(selectinload(Interaction.participants))
+
     async def create_for_investor(self, investor_id: int, schema: InteractionCreate) -> Interaction:
         """Créer une interaction pour un investisseur + auto-créer une tâche de suivi"""
         try:
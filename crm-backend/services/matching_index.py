@@ -0,0 +1,364 @@
+"""
+Matching Index - Index mémoire des candidats Person/Organisation pour MatchingScorer
+
+Remplace les 3-4 requêtes par brouillon (dont LIKE '%nom%' et LIKE '%téléphone%',
+qui ne peuvent pas utiliser d'index) par un index compilé par process:
+- hash maps exactes: email, domaine email, 8 derniers chiffres du téléphone,
+  prénom / nom (minuscules)
+- index inversé de trigrammes sur les noms normalisés (candidats fuzzy et
+  recherche par sous-chaîne)
+- valeurs pré-normalisées: le scorer classe des milliers de candidats en une passe
+  sans requête ni re-normalisation
+
+Fraîcheur:
+- listeners Session: Person / Organisation créées, modifiées ou supprimées sont
+  appliquées aux index chargés au commit
+- TTL de rechargement pour capter les écritures des autres process
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.organisation import Organisation
+from models.person import Person
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie des index compilés (secondes) avant rechargement depuis la DB
+MATCHING_INDEX_REFRESH_SECONDS = 300
+# Chiffres de fin de numéro utilisés pour le rapprochement téléphone
+PHONE_SUFFIX_DIGITS = 8
+# Candidats fuzzy retenus par nom (triés par similarité de trigrammes)
+NAME_CANDIDATES_LIMIT = 200
+NAME_MIN_SIMILARITY = 0.3
+
+
+def normalize_key(value: Optional[str]) -> str:
+    """Forme de comparaison fuzzy: minuscules, alphanumérique uniquement"""
+    if not value:
+        return ""
+    return re.sub(r'[^a-z0-9]', '', value.lower().strip())
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Chiffres uniquement"""
+    if not phone:
+        return ""
+    return re.sub(r'\D', '', phone)
+
+
+def email_domain(email: Optional[str]) -> Optional[str]:
+    """Domaine d'un email (sans www.)"""
+    if not email or '@' not in email:
+        return None
+    domain = email.split('@')[1].strip().lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain or None
+
+
+def trigrams(key: str) -> Set[str]:
+    """Trigrammes d'une clé normalisée (la clé entière si plus courte)"""
+    if len(key) < 3:
+        return {key} if key else set()
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+@dataclass(frozen=True)
+class MatchEntry:
+    """Valeurs pré-normalisées d'un candidat (Person ou Organisation)"""
+
+    id: int
+    email: str = ""  # minuscules, sans espaces
+    phone: str = ""  # chiffres uniquement
+    first_name: str = ""  # normalize_key
+    last_name: str = ""
+    first_lower: str = ""  # lower(), égalité façon SQL lower(x) = ...
+    last_lower: str = ""
+    name: str = ""  # normalize_key du nom complet / de la raison sociale
+    name_lower: str = ""  # lower(), recherche par sous-chaîne
+    title: str = ""  # normalize_key
+    website: str = ""  # sans schéma, www. ni / final
+
+    @property
+    def domain(self) -> Optional[str]:
+        return email_domain(self.email)
+
+    @property
+    def phone_suffix(self) -> str:
+        return self.phone[-PHONE_SUFFIX_DIGITS:]
+
+
+def clean_website(website: Optional[str]) -> str:
+    """URL comparable: sans http(s)://, www. ni / final"""
+    website = (website or "").lower().strip()
+    return re.sub(r'https?://(www\.)?', '', website).strip('/')
+
+
+def person_entry(person: Person) -> MatchEntry:
+    return MatchEntry(
+        id=person.id,
+        email=(person.personal_email or "").lower().strip(),
+        phone=normalize_phone(person.phone),
+        first_name=normalize_key(person.first_name),
+        last_name=normalize_key(person.last_name),
+        first_lower=(person.first_name or "").lower(),
+        last_lower=(person.last_name or "").lower(),
+        name=normalize_key(f"{person.first_name or ''}{person.last_name or ''}"),
+        title=normalize_key(person.job_title),
+    )
+
+
+def organisation_entry(organisation: Organisation) -> MatchEntry:
+    return MatchEntry(
+        id=organisation.id,
+        email=(organisation.email or "").lower().strip(),
+        phone=normalize_phone(organisation.phone),
+        name=normalize_key(organisation.name),
+        name_lower=(organisation.name or "").lower(),
+        website=clean_website(organisation.website),
+    )
+
+
+class CandidateIndex:
+    """Hash maps exactes + index inversé de trigrammes sur les noms"""
+
+    _KEYS = ("email", "domain", "phone_suffix", "first_lower", "last_lower")
+
+    def __init__(self, entries: Iterable[MatchEntry] = ()):
+        self._entries: Dict[int, MatchEntry] = {}
+        self._keys: Dict[str, Dict[str, Set[int]]] = {key: {} for key in self._KEYS}
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._gram_counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        for entry in entries:
+            self._add(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, entry: MatchEntry):
+        self._entries[entry.id] = entry
+        for key in self._KEYS:
+            value = getattr(entry, key)
+            if value:
+                self._keys[key].setdefault(value, set()).add(entry.id)
+        grams = trigrams(entry.name)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(entry.id)
+        self._gram_counts[entry.id] = len(grams)
+
+    def _remove(self, entity_id: int):
+        entry = self._entries.pop(entity_id, None)
+        if entry is None:
+            return
+        self._gram_counts.pop(entity_id, None)
+        for key in self._KEYS:
+            value = getattr(entry, key)
+            ids = self._keys[key].get(value) if value else None
+            if ids is not None:
+                ids.discard(entity_id)
+                if not ids:
+                    del self._keys[key][value]
+        for gram in trigrams(entry.name):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(entity_id)
+                if not ids:
+                    del self._trigrams[gram]
+
+    def upsert(self, entry: MatchEntry):
+        with self._lock:
+            self._remove(entry.id)
+            self._add(entry)
+
+    def remove(self, entity_id: int):
+        with self._lock:
+            self._remove(entity_id)
+
+    def get(self, entity_id: int) -> Optional[MatchEntry]:
+        return self._entries.get(entity_id)
+
+    def lookup(self, key: str, value: Optional[str]) -> Set[int]:
+        """IDs dont la clé exacte `key` vaut `value`"""
+        if not value:
+            return set()
+        with self._lock:
+            return set(self._keys[key].get(value, ()))
+
+    def similar_names(
+        self,
+        name: str,
+        limit: int = NAME_CANDIDATES_LIMIT,
+        min_similarity: float = NAME_MIN_SIMILARITY,
+    ) -> List[int]:
+        """IDs aux noms proches (coefficient de Dice sur les trigrammes), du plus proche"""
+        grams = trigrams(name)
+        if not grams:
+            return []
+        shared: Counter = Counter()
+        with self._lock:
+            for gram in grams:
+                shared.update(self._trigrams.get(gram, ()))
+            scored = [
+                (2 * count / (len(grams) + self._gram_counts[entity_id]), entity_id)
+                for entity_id, count in shared.items()
+            ]
+        scored = [item for item in scored if item[0] >= min_similarity]
+        scored.sort(reverse=True)
+        return [entity_id for _, entity_id in scored[:limit]]
+
+    def names_containing(self, text: str) -> Set[int]:
+        """IDs dont le nom (minuscules) contient `text` (sémantique LIKE '%text%')"""
+        text = text.lower()
+        grams = trigrams(normalize_key(text))
+        with self._lock:
+            if grams:
+                postings = [self._trigrams.get(gram, set()) for gram in grams]
+                candidates = set.intersection(*postings) if all(postings) else set()
+            else:
+                candidates = set(self._entries)
+            return {
+                entity_id
+                for entity_id in candidates
+                if text in self._entries[entity_id].name_lower
+            }
+
+
+# ============================================================================
+# Registres process-wide
+# ============================================================================
+
+_lock = threading.Lock()
+_indexes: Dict[str, Tuple[float, CandidateIndex]] = {}
+
+_LOADERS = {
+    "person": (
+        Person,
+        (
+            Person.id,
+            Person.first_name,
+            Person.last_name,
+            Person.personal_email,
+            Person.phone,
+            Person.job_title,
+        ),
+        person_entry,
+    ),
+    "organisation": (
+        Organisation,
+        (
+            Organisation.id,
+            Organisation.name,
+            Organisation.email,
+            Organisation.phone,
+            Organisation.website,
+        ),
+        organisation_entry,
+    ),
+}
+
+
+# Un seul rechargement à la fois par type d'entité (single-flight)
+_load_locks = {entity_type: threading.Lock() for entity_type in _LOADERS}
+
+
+def _get_index(db: Session, entity_type: str) -> CandidateIndex:
+    """
+    Index en cache, rechargé par un seul appelant à l'expiration du TTL
+
+    Pendant un rechargement, les autres appelants servent l'index expiré; sans
+    index (premier chargement, invalidation) ils attendent le chargement en cours.
+    """
+    cached = _indexes.get(entity_type)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    load_lock = _load_locks[entity_type]
+    if not load_lock.acquire(blocking=cached is None):
+        return cached[1]
+    try:
+        # Re-vérification: un autre appelant a pu recharger pendant l'attente
+        current = _indexes.get(entity_type)
+        if current and current[0] > time.monotonic():
+            return current[1]
+
+        _, columns, build_entry = _LOADERS[entity_type]
+        rows = db.query(*columns).yield_per(5000)
+        index = CandidateIndex(build_entry(row) for row in rows)
+
+        with _lock:
+            _indexes[entity_type] = (time.monotonic() + MATCHING_INDEX_REFRESH_SECONDS, index)
+    finally:
+        load_lock.release()
+
+    logger.debug(f"Loaded {entity_type} matching index: {len(index)} candidates")
+    return index
+
+
+def get_person_index(db: Session) -> CandidateIndex:
+    """Index des Person (1 requête DB par période de refresh)"""
+    return _get_index(db, "person")
+
+
+def get_organisation_index(db: Session) -> CandidateIndex:
+    """Index des Organisation (1 requête DB par période de refresh)"""
+    return _get_index(db, "organisation")
+
+
+def invalidate_matching_indexes():
+    """Force le rechargement des index de matching"""
+    with _lock:
+        _indexes.clear()
+
+
+# ============================================================================
+# Maintenance incrémentale (listeners Session)
+# ============================================================================
+
+_CHANGES_KEY = "matching_index_changes"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_matching_changes(session: Session, flush_context):
+    if not _indexes:
+        return
+    changes = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Person):
+            entity_type, build_entry = "person", person_entry
+        elif isinstance(obj, Organisation):
+            entity_type, build_entry = "organisation", organisation_entry
+        else:
+            continue
+        if changes is None:
+            changes = session.info.setdefault(_CHANGES_KEY, {})
+        entry = None if obj in session.deleted else build_entry(obj)
+        changes[(entity_type, obj.id)] = entry
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_matching_changes(session: Session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    for (entity_type, entity_id), entry in changes.items():
+        cached = _indexes.get(entity_type)
+        if cached is None:
+            continue
+        if entry is None:
+            cached[1].remove(entity_id)
+        else:
+            cached[1].upsert(entry)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_matching_changes(session: Session):
+    session.info.pop(_CHANGES_KEY, None)
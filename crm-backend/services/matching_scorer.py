@@ -13,22 +13,34 @@ Décision:
 - score ≥ 100 → Match automatique (apply)
 - 60 ≤ score < 100 → Validation humaine (preview)
 - score < 60 → Création nouvelle fiche (create_new)
+
+Recherche des candidats: index mémoire (services.matching_index), classement de tous
+les candidats en une passe sur valeurs pré-normalisées, puis une seule requête par
+clé primaire pour les fiches retenues.
 """
-import re
 from typing import Dict, List, Optional, Tuple
-from sqlalchemy import or_, func
 from sqlalchemy.orm import Session
 from difflib import SequenceMatcher
 
 from models.person import Person
 from models.organisation import Organisation
+from services.matching_index import (
+    CandidateIndex,
+    MatchEntry,
+    clean_website,
+    email_domain,
+    get_organisation_index,
+    get_person_index,
+    normalize_key,
+    normalize_phone,
+    organisation_entry,
+    person_entry,
+)
 
 
 def normalize_string(s: str) -> str:
     """Normalise une chaîne pour comparaison fuzzy"""
-    if not s:
-        return ""
-    return re.sub(r'[^a-z0-9]', '', s.lower().strip())
+    return normalize_key(s)
 
 
 def fuzzy_match(s1: str, s2: str, threshold: float = 0.85) -> bool:
@@ -36,14 +48,29 @@ def fuzzy_match(s1: str, s2: str, threshold: float = 0.85) -> bool:
     if not s1 or not s2:
         return False
 
-    norm1 = normalize_string(s1)
-    norm2 = normalize_string(s2)
+    return _similar(normalize_string(s1), normalize_string(s2), threshold)
+
 
+def _similar(norm1: str, norm2: str, threshold: float) -> bool:
+    """SequenceMatcher.ratio() >= threshold sur chaînes déjà normalisées"""
     if not norm1 or not norm2:
         return False
 
-    ratio = SequenceMatcher(None, norm1, norm2).ratio()
-    return ratio >= threshold
+    # real_quick_ratio / quick_ratio majorent ratio(): rejet sans calcul complet
+    matcher = SequenceMatcher(None, norm1, norm2)
+    return (
+        matcher.real_quick_ratio() >= threshold
+        and matcher.quick_ratio() >= threshold
+        and matcher.ratio() >= threshold
+    )
+
+
+def _decide(score: int) -> str:
+    if score >= 100:
+        return "apply"
+    if score >= 60:
+        return "preview"
+    return "create_new"
 
 
 class MatchingScorer:
@@ -70,82 +97,82 @@ class MatchingScorer:
                 "candidate": Person (serialized)
             }
         """
+        score, details = self._score_person(
+            self._prepare_person_draft(draft), person_entry(candidate)
+        )
+
+        return {
+            "score": score,
+            "details": details,
+            "action": _decide(score),
+            "candidate": candidate.to_dict() if hasattr(candidate, 'to_dict') else {
+                "id": candidate.id,
+                "first_name": candidate.first_name,
+                "last_name": candidate.last_name,
+                "personal_email": candidate.personal_email,
+                "phone": candidate.phone,
+                "job_title": candidate.job_title,
+                "company_name": getattr(candidate, 'company_name', None),
+            }
+        }
+
+    @staticmethod
+    def _prepare_person_draft(draft: Dict) -> Dict:
+        """Valeurs du brouillon normalisées une fois pour tout le classement"""
+        first_name = (draft.get("first_name") or "").strip()
+        last_name = (draft.get("last_name") or "").strip()
+        title = draft.get("title") or draft.get("job_title") or ""
+        return {
+            "email": (draft.get("personal_email") or "").lower().strip(),
+            "first_name": first_name,
+            "last_name": last_name,
+            "first_key": normalize_key(first_name),
+            "last_key": normalize_key(last_name),
+            "phone": normalize_phone(draft.get("phone")),
+            "title_key": normalize_key(title),
+        }
+
+    @staticmethod
+    def _score_person(prepared: Dict, entry: MatchEntry) -> Tuple[int, Dict[str, int]]:
         score = 0
         details = {}
 
         # 1. Email exact (+100)
-        draft_email = draft.get("personal_email", "").lower().strip()
-        candidate_email = (candidate.personal_email or "").lower().strip()
-
-        if draft_email and candidate_email and draft_email == candidate_email:
+        draft_email = prepared["email"]
+        if draft_email and entry.email and draft_email == entry.email:
             score += 100
             details["email_exact"] = 100
 
         # 2. Domaine email match société (+40)
-        if not details.get("email_exact") and draft_email and candidate_email:
-            draft_domain = self._extract_domain(draft_email)
-            candidate_domain = self._extract_domain(candidate_email)
-
-            if draft_domain and candidate_domain and draft_domain == candidate_domain:
+        if not details.get("email_exact") and draft_email and entry.email:
+            draft_domain = email_domain(draft_email)
+            if draft_domain and draft_domain == entry.domain:
                 score += 40
                 details["email_domain"] = 40
 
         # 3. Nom + Prénom match (+75 si exact, +50 si fuzzy)
-        draft_first = draft.get("first_name", "")
-        draft_last = draft.get("last_name", "")
-        candidate_first = candidate.first_name or ""
-        candidate_last = candidate.last_name or ""
-
-        if draft_first and draft_last:
+        if prepared["first_name"] and prepared["last_name"]:
             # Match exact nom+prénom
-            if (normalize_string(draft_first) == normalize_string(candidate_first) and
-                normalize_string(draft_last) == normalize_string(candidate_last)):
+            if prepared["first_key"] == entry.first_name and prepared["last_key"] == entry.last_name:
                 score += 75
                 details["name_exact"] = 75
             # Fuzzy match nom+prénom
-            elif (fuzzy_match(draft_first, candidate_first, 0.8) and
-                  fuzzy_match(draft_last, candidate_last, 0.8)):
+            elif (_similar(prepared["first_key"], entry.first_name, 0.8) and
+                  _similar(prepared["last_key"], entry.last_name, 0.8)):
                 score += 50
                 details["name_fuzzy"] = 50
 
         # 4. Téléphone match (+50)
-        draft_phone = self._normalize_phone(draft.get("phone"))
-        candidate_phone = self._normalize_phone(candidate.phone)
-
-        if draft_phone and candidate_phone and draft_phone == candidate_phone:
+        if prepared["phone"] and entry.phone and prepared["phone"] == entry.phone:
             score += 50
             details["phone"] = 50
 
         # 5. Titre/Poste match (+20)
-        draft_title = draft.get("title") or draft.get("job_title") or ""
-        candidate_title = candidate.job_title or ""
-
-        if draft_title and candidate_title and fuzzy_match(draft_title, candidate_title, 0.7):
+        if _similar(prepared["title_key"], entry.title, 0.7):
             score += 20
             details["job_title"] = 20
 
-        # Décision
-        if score >= 100:
-            action = "apply"
-        elif score >= 60:
-            action = "preview"
-        else:
-            action = "create_new"
-
-        return {
-            "score": score,
-            "details": details,
-            "action": action,
-            "candidate": candidate.to_dict() if hasattr(candidate, 'to_dict') else {
-                "id": candidate.id,
-                "first_name": candidate.first_name,
-                "last_name": candidate.last_name,
-                "personal_email": candidate.personal_email,
-                "phone": candidate.phone,
-                "job_title": candidate.job_title,
-                "company_name": getattr(candidate, 'company_name', None),
-            }
-        }
+        return score, details
 
     def find_person_candidates(
         self,
@@ -158,52 +185,25 @@ class MatchingScorer:
         Returns:
             Liste de matches triés par score décroissant
         """
-        candidates = []
-
-        # Recherche par email
-        email = draft.get("personal_email", "").strip()
-        if email:
-            by_email = self.db.query(Person).filter(
-                func.lower(Person.personal_email) == email.lower()
-            ).all()
-            candidates.extend(by_email)
-
-        # Recherche par nom+prénom
-        first_name = draft.get("first_name", "").strip()
-        last_name = draft.get("last_name", "").strip()
-
-        if first_name and last_name:
-            by_name = self.db.query(Person).filter(
-                or_(
-                    func.lower(Person.first_name) == first_name.lower(),
-                    func.lower(Person.last_name) == last_name.lower()
-                )
-            ).limit(10).all()
-            candidates.extend(by_name)
-
-        # Recherche par téléphone
-        phone = self._normalize_phone(draft.get("phone"))
-        if phone:
-            # Chercher avec LIKE car formats peuvent varier
-            phone_pattern = f"%{phone[-8:]}%"  # 8 derniers chiffres
-            by_phone = self.db.query(Person).filter(
-                Person.phone.like(phone_pattern)
-            ).limit(5).all()
-            candidates.extend(by_phone)
-
-        # Dédupliquer par ID
-        unique_candidates = {c.id: c for c in candidates}.values()
-
-        # Scorer chaque candidat
-        scored = []
-        for candidate in unique_candidates:
-            match_result = self.score_person_match(draft, candidate)
-            scored.append(match_result)
-
-        # Trier par score décroissant
-        scored.sort(key=lambda x: x["score"], reverse=True)
-
-        return scored[:limit]
+        index = get_person_index(self.db)
+        prepared = self._prepare_person_draft(draft)
+
+        # Candidats par clés exactes: email, prénom ou nom, fin de numéro
+        candidate_ids = index.lookup("email", prepared["email"])
+        if prepared["first_name"] and prepared["last_name"]:
+            candidate_ids |= index.lookup("first_lower", prepared["first_name"].lower())
+            candidate_ids |= index.lookup("last_lower", prepared["last_name"].lower())
+        if prepared["phone"]:
+            candidate_ids |= index.lookup("phone_suffix", prepared["phone"][-8:])
+
+        # Candidats fuzzy (trigrammes du nom complet): retenus s'ils marquent des points
+        fuzzy_ids = []
+        if prepared["first_name"] and prepared["last_name"]:
+            fuzzy_ids = index.similar_names(prepared["first_key"] + prepared["last_key"])
+
+        ranked = self._rank(index, candidate_ids, fuzzy_ids, prepared, self._score_person, limit)
+        persons = self._load(Person, ranked)
+        return self._rescore(ranked, persons, draft, self.score_person_match)
 
     def score_organisation_match(
         self,
@@ -221,79 +221,73 @@ class MatchingScorer:
                 "candidate": Organisation (serialized)
             }
         """
+        score, details = self._score_organisation(
+            self._prepare_organisation_draft(draft), organisation_entry(candidate)
+        )
+
+        return {
+            "score": score,
+            "details": details,
+            "action": _decide(score),
+            "candidate": candidate.to_dict() if hasattr(candidate, 'to_dict') else {
+                "id": candidate.id,
+                "nom": candidate.nom,
+                "email": candidate.email,
+                "phone": candidate.phone,
+                "website": candidate.website,
+            }
+        }
+
+    @staticmethod
+    def _prepare_organisation_draft(draft: Dict) -> Dict:
+        """Valeurs du brouillon normalisées une fois pour tout le classement"""
+        name = (draft.get("nom") or draft.get("name") or "").strip()
+        return {
+            "email": (draft.get("email") or "").lower().strip(),
+            "name": name,
+            "name_key": normalize_key(name),
+            "website": clean_website(draft.get("website")),
+            "phone": normalize_phone(draft.get("phone")),
+        }
+
+    @staticmethod
+    def _score_organisation(prepared: Dict, entry: MatchEntry) -> Tuple[int, Dict[str, int]]:
         score = 0
         details = {}
 
         # 1. Email exact (+100)
-        draft_email = draft.get("email", "").lower().strip()
-        candidate_email = (candidate.email or "").lower().strip()
-
-        if draft_email and candidate_email and draft_email == candidate_email:
+        draft_email = prepared["email"]
+        if draft_email and entry.email and draft_email == entry.email:
             score += 100
             details["email_exact"] = 100
 
         # 2. Domaine email match (+40)
         if not details.get("email_exact") and draft_email:
-            draft_domain = self._extract_domain(draft_email)
-            candidate_domain = self._extract_domain(candidate_email) if candidate_email else None
-
-            if draft_domain and candidate_domain and draft_domain == candidate_domain:
+            draft_domain = email_domain(draft_email)
+            if draft_domain and draft_domain == entry.domain:
                 score += 40
                 details["email_domain"] = 40
 
         # 3. Nom société match (+75 si exact, +50 si fuzzy)
-        draft_name = draft.get("nom") or draft.get("name") or ""
-        candidate_name = candidate.name or ""
-
-        if draft_name and candidate_name:
-            if normalize_string(draft_name) == normalize_string(candidate_name):
+        if prepared["name"] and entry.name_lower:
+            if prepared["name_key"] == entry.name:
                 score += 75
                 details["name_exact"] = 75
-            elif fuzzy_match(draft_name, candidate_name, 0.8):
+            elif _similar(prepared["name_key"], entry.name, 0.8):
                 score += 50
                 details["name_fuzzy"] = 50
 
-        # 4. Site web match (+30)
-        draft_website = draft.get("website", "").lower().strip()
-        candidate_website = (candidate.website or "").lower().strip()
-
-        if draft_website and candidate_website:
-            # Normaliser URLs (retirer http://, https://, www.)
-            draft_clean = re.sub(r'https?://(www\.)?', '', draft_website).strip('/')
-            candidate_clean = re.sub(r'https?://(www\.)?', '', candidate_website).strip('/')
-
-            if draft_clean == candidate_clean:
-                score += 30
-                details["website"] = 30
+        # 4. Site web match (+30), URLs sans http(s):// ni www.
+        if prepared["website"] and entry.website and prepared["website"] == entry.website:
+            score += 30
+            details["website"] = 30
 
         # 5. Téléphone match (+50)
-        draft_phone = self._normalize_phone(draft.get("phone"))
-        candidate_phone = self._normalize_phone(candidate.phone)
-
-        if draft_phone and candidate_phone and draft_phone == candidate_phone:
+        if prepared["phone"] and entry.phone and prepared["phone"] == entry.phone:
             score += 50
             details["phone"] = 50
 
-        # Décision
-        if score >= 100:
-            action = "apply"
-        elif score >= 60:
-            action = "preview"
-        else:
-            action = "create_new"
-
-        return {
-            "score": score,
-            "details": details,
-            "action": action,
-            "candidate": candidate.to_dict() if hasattr(candidate, 'to_dict') else {
-                "id": candidate.id,
-                "nom": candidate.nom,
-                "email": candidate.email,
-                "phone": candidate.phone,
-                "website": candidate.website,
-            }
-        }
+        return score, details
 
     def find_organisation_candidates(
         self,
@@ -306,64 +300,79 @@ class MatchingScorer:
         Returns:
             Liste de matches triés par score décroissant
         """
-        candidates = []
-
-        # Recherche par email
-        email = draft.get("email", "").strip()
-        if email:
-            by_email = self.db.query(Organisation).filter(
-                func.lower(Organisation.email) == email.lower()
-            ).all()
-            candidates.extend(by_email)
-
-        # Recherche par nom
-        nom = draft.get("nom") or draft.get("name") or ""
-        nom = nom.strip()
-        if nom:
-            by_name = self.db.query(Organisation).filter(
-                func.lower(Organisation.name).like(f"%{nom.lower()}%")
-            ).limit(10).all()
-            candidates.extend(by_name)
-
-        # Recherche par domaine email (via known_companies)
-        if email:
-            domain = self._extract_domain(email)
-            if domain:
-                by_domain = self.db.query(Organisation).filter(
-                    func.lower(Organisation.email).like(f"%@{domain}")
-                ).limit(5).all()
-                candidates.extend(by_domain)
-
-        # Dédupliquer
-        unique_candidates = {c.id: c for c in candidates}.values()
-
-        # Scorer
-        scored = []
-        for candidate in unique_candidates:
-            match_result = self.score_organisation_match(draft, candidate)
-            scored.append(match_result)
-
-        # Trier par score
-        scored.sort(key=lambda x: x["score"], reverse=True)
+        index = get_organisation_index(self.db)
+        prepared = self._prepare_organisation_draft(draft)
+
+        # Candidats par clés exactes: email, domaine email, nom contenant le brouillon
+        candidate_ids = index.lookup("email", prepared["email"])
+        candidate_ids |= index.lookup("domain", email_domain(prepared["email"]))
+        fuzzy_ids = []
+        if prepared["name"]:
+            candidate_ids |= index.names_containing(prepared["name"])
+            fuzzy_ids = index.similar_names(prepared["name_key"])
+        if prepared["phone"]:
+            candidate_ids |= index.lookup("phone_suffix", prepared["phone"][-8:])
+
+        ranked = self._rank(
+            index, candidate_ids, fuzzy_ids, prepared, self._score_organisation, limit
+        )
+        organisations = self._load(Organisation, ranked)
+        return self._rescore(ranked, organisations, draft, self.score_organisation_match)
+
+    # ========== Classement ==========
+
+    @staticmethod
+    def _rank(
+        index: CandidateIndex,
+        candidate_ids,
+        fuzzy_ids,
+        prepared: Dict,
+        score_entry,
+        limit: int,
+    ) -> List[int]:
+        """
+        Classe tous les candidats de l'index en une passe (sans requête DB)
 
-        return scored[:limit]
+        Les candidats par clé exacte sont toujours retenus; les candidats fuzzy
+        seulement s'ils marquent des points.
+        """
+        scores = {}
+        for entity_id in candidate_ids:
+            entry = index.get(entity_id)
+            if entry is not None:
+                scores[entity_id] = score_entry(prepared, entry)[0]
+        for entity_id in fuzzy_ids:
+            if entity_id in scores:
+                continue
+            entry = index.get(entity_id)
+            if entry is not None:
+                score = score_entry(prepared, entry)[0]
+                if score > 0:
+                    scores[entity_id] = score
+
+        return sorted(scores, key=lambda entity_id: (-scores[entity_id], entity_id))[:limit]
+
+    def _load(self, model, ids: List[int]) -> Dict[int, object]:
+        """Fiches retenues en une requête par clé primaire"""
+        if not ids:
+            return {}
+        return {row.id: row for row in self.db.query(model).filter(model.id.in_(ids))}
+
+    @staticmethod
+    def _rescore(ranked: List[int], rows: Dict[int, object], draft: Dict, score_match) -> List[Dict]:
+        """Score final sur les fiches à jour (l'index peut avoir un temps de retard)"""
+        scored = [score_match(draft, rows[entity_id]) for entity_id in ranked if entity_id in rows]
+        scored.sort(key=lambda x: x["score"], reverse=True)
+        return scored
 
     # ========== Helpers ==========
 
     def _extract_domain(self, email: str) -> Optional[str]:
         """Extrait le domaine d'un email"""
-        if not email or '@' not in email:
-            return None
-        try:
-            domain = email.split('@')[1].strip().lower()
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            return domain
-        except IndexError:
-            return None
+        return email_domain(email)
 
     def _normalize_phone(self, phone: Optional[str]) -> Optional[str]:
         """Normalise un numéro de téléphone (garde que les chiffres)"""
         if not phone:
             return None
-        return re.sub(r'\D', '', phone)
+        return normalize_phone(phone)
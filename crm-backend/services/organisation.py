@@ -3,7 +3,7 @@ from datetime import UTC, datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from core.exceptions import DatabaseError, ResourceNotFound, ValidationError
 from models.organisation import (
@@ -136,29 +136,29 @@ class OrganisationService(BaseService[Organisation, OrganisationCreate, Organisa
 
         return organisation
 
-    async def get_all(
-        self, skip: int = 0, limit: int = 100, filters: Optional[dict] = None
-    ) -> Tuple[List[Organisation], int]:
+    def _list_query(self):
         """
-        Récupérer les organisations avec leurs relations clés préchargées pour éviter le N+1.
+        Organisations avec leurs relations clés préchargées pour éviter le N+1.
 
-        P1 Optimization: Eager load owner, mandats, contacts
+        owner (many-to-one) en JOIN; mandats/contacts (collections) en selectin:
+        un JOIN sur deux collections multiplie les lignes (produit cartésien
+        dédupliqué en Python) et fausse LIMIT/OFFSET.
         """
-        try:
-            query = self.db.query(Organisation).options(
-                joinedload(Organisation.owner),  # P1: Eager load owner
-                joinedload(Organisation.mandats),
-                joinedload(Organisation.contacts),
-            )
+        return self.db.query(Organisation).options(
+            joinedload(Organisation.owner),
+            selectinload(Organisation.mandats),
+            selectinload(Organisation.contacts),
+        )
 
-            if filters:
-                for key, value in filters.items():
-                    column = getattr(Organisation, key, None)
-                    if column is not None and value is not None:
-                        query = query.filter(column == value)
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, filters: Optional[dict] = None
+    ) -> Tuple[List[Organisation], int]:
+        """Récupérer les organisations (pagination offset) avec relations préchargées."""
+        try:
+            query = self._apply_filters(self._list_query(), filters)
 
-            total = query.count()
-            items = query.offset(skip).limit(limit).all()
+            total = query.order_by(None).count()
+            items = query.order_by(*self._keyset_order()).offset(skip).limit(limit).all()
             return items, total
         except Exception as e:
             logger.error(f"Error fetching organisations with relations: {e}")
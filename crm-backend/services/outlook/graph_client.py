@@ -0,0 +1,290 @@
+"""
+Microsoft Graph Client - Couche HTTP partagée pour l'intégration Outlook
+
+Fonctionnalités:
+- httpx.AsyncClient unique (pool de connexions keep-alive) partagé par le process
+- Backoff sur 429/503 en respectant Retry-After (requêtes simples et sous-requêtes $batch)
+- JSON $batch (20 sous-requêtes max par appel Graph)
+- Delta queries (/mailFolders/{id}/messages/delta) avec lien d'état persistant
+
+Usage:
+    graph = GraphClient(access_token)
+    responses = await graph.batch([{"id": "1", "method": "GET", "url": "/me/messages/..."}])
+    page = await graph.delta_messages(folder_id, state_link=None, start_date="2025-01-01T00:00:00Z")
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+GRAPH_BATCH_LIMIT = 20  # Limite Graph: 20 sous-requêtes par $batch
+RETRYABLE_STATUS = (429, 503, 504)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_graph_http_client() -> httpx.AsyncClient:
+    """Client httpx partagé (créé à la demande, fermé au shutdown)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=GRAPH_BASE_URL,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+async def close_graph_http_client():
+    """Ferme le pool de connexions Graph (lifespan shutdown)"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+def parse_retry_after(value: Optional[str], default: float = 2.0) -> float:
+    """Retry-After en secondes (entier) ou date HTTP → secondes d'attente"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class GraphSyncStateExpired(Exception):
+    """Le lien delta n'est plus valide (410 Gone) → resynchronisation complète"""
+
+
+@dataclass
+class DeltaPage:
+    """Résultat d'une synchro delta d'un dossier"""
+
+    messages: List[Dict] = field(default_factory=list)
+    removed_ids: List[str] = field(default_factory=list)
+    # deltaLink si la synchro est complète, sinon nextLink pour reprendre plus tard
+    state_link: Optional[str] = None
+    complete: bool = False
+
+
+class GraphClient:
+    """Client Microsoft Graph (un par access token, pool HTTP partagé)"""
+
+    def __init__(
+        self,
+        access_token: str,
+        max_retries: int = 3,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.access_token = access_token
+        self.max_retries = max_retries
+        self.client = client or get_graph_http_client()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        json: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """
+        Requête Graph avec backoff sur 429/503/504 (Retry-After) et timeouts
+
+        `url` peut être relatif (/me/...) ou absolu (nextLink/deltaLink).
+        """
+        request_headers = {**self.headers, **(headers or {})}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.request(
+                    method, url, params=params, json=json, headers=request_headers
+                )
+            except httpx.TimeoutException:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            if response.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                wait_time = parse_retry_after(response.headers.get("Retry-After"), default=2 ** attempt)
+                logger.warning(
+                    f"Graph {response.status_code}, waiting {wait_time:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                await asyncio.sleep(wait_time)
+                continue
+
+            response.raise_for_status()
+            return response
+
+    async def get_json(self, url: str, params: Optional[Dict] = None, **kwargs) -> Dict:
+        response = await self.request("GET", url, params=params, **kwargs)
+        return response.json()
+
+    async def post_json(self, url: str, payload: Dict) -> Dict:
+        response = await self.request(
+            "POST", url, json=payload, headers={"Content-Type": "application/json"}
+        )
+        return response.json()
+
+    async def get_all_pages(
+        self, url: str, params: Optional[Dict] = None, limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Suit @odata.nextLink jusqu'à épuisement (ou `limit` éléments)"""
+        collected: List[Dict] = []
+        while url:
+            data = await self.get_json(url, params=params)
+            collected.extend(data.get("value", []))
+            if limit and len(collected) >= limit:
+                return collected[:limit]
+            url = data.get("@odata.nextLink")
+            params = None  # nextLink contient déjà les params
+        return collected
+
+    async def batch(self, requests: List[Dict]) -> Dict[str, Dict]:
+        """
+        Exécute des sous-requêtes via JSON $batch (découpées par 20)
+
+        Args:
+            requests: [{"id": "1", "method": "GET", "url": "/me/messages/..."}]
+                      (url relative à /v1.0, sans le préfixe)
+
+        Returns:
+            {id: {"status": int, "headers": dict, "body": dict}}
+            Les sous-requêtes en 429/503 sont rejouées après Retry-After.
+        """
+        results: Dict[str, Dict] = {}
+        pending = list(requests)
+
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+
+            retry: List[Dict] = []
+            wait_time = 0.0
+
+            for start in range(0, len(pending), GRAPH_BATCH_LIMIT):
+                chunk = pending[start:start + GRAPH_BATCH_LIMIT]
+                by_id = {sub["id"]: sub for sub in chunk}
+                data = await self.post_json("/$batch", {"requests": chunk})
+
+                for sub_response in data.get("responses", []):
+                    sub_id = str(sub_response.get("id"))
+                    status = sub_response.get("status", 0)
+                    if status in RETRYABLE_STATUS and attempt < self.max_retries and sub_id in by_id:
+                        retry.append(by_id[sub_id])
+                        wait_time = max(
+                            wait_time,
+                            parse_retry_after(
+                                (sub_response.get("headers") or {}).get("Retry-After"),
+                                default=2 ** attempt,
+                            ),
+                        )
+                        continue
+                    results[sub_id] = sub_response
+
+            if retry:
+                logger.warning(
+                    f"Graph $batch: {len(retry)} throttled sub-requests, waiting {wait_time:.1f}s"
+                )
+                await asyncio.sleep(wait_time)
+            pending = retry
+
+        return results
+
+    async def get_many(self, urls: Dict[str, str]) -> Dict[str, Dict]:
+        """GET de plusieurs ressources via $batch → {id: body} (succès uniquement)"""
+        responses = await self.batch(
+            [{"id": sub_id, "method": "GET", "url": url} for sub_id, url in urls.items()]
+        )
+        bodies = {}
+        for sub_id, sub_response in responses.items():
+            if 200 <= sub_response.get("status", 0) < 300:
+                bodies[sub_id] = sub_response.get("body") or {}
+            else:
+                logger.warning(
+                    f"Graph $batch sub-request {sub_id} failed with {sub_response.get('status')}"
+                )
+        return bodies
+
+    async def delta_messages(
+        self,
+        folder_id: str,
+        state_link: Optional[str] = None,
+        select: Optional[str] = None,
+        start_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        page_size: int = 100,
+    ) -> DeltaPage:
+        """
+        Synchro delta d'un dossier: premier appel = état initial, ensuite seulement les changements
+
+        Args:
+            folder_id: ID du dossier
+            state_link: deltaLink/nextLink stocké lors de la synchro précédente
+            select: Champs $select (premier appel uniquement, conservés dans le lien)
+            start_date: Filtre receivedDateTime ge (premier appel uniquement)
+            limit: Arrêt anticipé; le nextLink courant est retourné pour reprendre
+
+        Raises:
+            GraphSyncStateExpired: lien d'état invalide (410), à effacer par l'appelant
+        """
+        page = DeltaPage()
+        headers = {"Prefer": f"odata.maxpagesize={page_size}"}
+
+        if state_link:
+            url, params = state_link, None
+        else:
+            url = f"/me/mailFolders/{folder_id}/messages/delta"
+            params = {}
+            if select:
+                params["$select"] = select
+            if start_date:
+                params["$filter"] = f"receivedDateTime ge {start_date}"
+
+        while url:
+            try:
+                data = await self.get_json(url, params=params, headers=headers)
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code == 410:
+                    raise GraphSyncStateExpired(folder_id) from exc
+                raise
+            params = None
+
+            for item in data.get("value", []):
+                if "@removed" in item:
+                    page.removed_ids.append(item.get("id"))
+                else:
+                    page.messages.append(item)
+
+            if data.get("@odata.deltaLink"):
+                page.state_link = data["@odata.deltaLink"]
+                page.complete = True
+                break
+
+            url = data.get("@odata.nextLink")
+            page.state_link = url
+
+            if limit and len(page.messages) >= limit:
+                break
+
+        return page
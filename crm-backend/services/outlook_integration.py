@@ -13,11 +13,15 @@ Scopes requis:
 """
 
 import base64
+import hashlib
 import json
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote
 
 import httpx
@@ -28,7 +32,55 @@ from fastapi import HTTPException
 
 from core.config import settings
 from core.encryption import decrypt_value, encrypt_value
+from models.outlook_delta_state import OutlookDeltaState
 from models.user import User
+from services.outlook.graph_client import GraphClient, GraphSyncStateExpired
+
+FOLDER_MESSAGE_SELECT = (
+    "id,subject,from,toRecipients,receivedDateTime,body,uniqueBody,parentFolderId,hasAttachments"
+)
+# Arborescence des dossiers: relistée au plus toutes les 15 min par utilisateur
+FOLDER_CACHE_TTL = 900
+FOLDER_CACHE_MAX_ENTRIES = 1000
+
+
+class FolderCache:
+    """
+    LRU borné clé → dossiers, avec TTL
+
+    Sans user_id la clé est le hash du token: chaque rafraîchissement de token
+    crée une entrée, évincée par l'expiration ou la taille maximale.
+    """
+
+    def __init__(self, max_entries: int = FOLDER_CACHE_MAX_ENTRIES, ttl: float = FOLDER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return list(entry[1])
+
+    def put(self, key: str, folders: List[Dict]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, list(folders))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_folder_cache = FolderCache()
 
 
 class OutlookIntegration:
@@ -641,31 +693,26 @@ class OutlookIntegration:
 
         logger = logging.getLogger(__name__)
 
-        messages_detailed = []
-
         # Limiter le nombre de fetches pour éviter le rate limiting Graph
         if max_fetch > 0:
             message_ids = message_ids[:max_fetch]
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for msg_id in message_ids:
-                try:
-                    url = f"{self.GRAPH_BASE_URL}/me/messages/{msg_id}"
-                    params = {
-                        "$select": "id,subject,from,toRecipients,sentDateTime,body,uniqueBody"
-                    }
-                    headers = {"Authorization": f"Bearer {access_token}"}
-
-                    response = await client.get(url, params=params, headers=headers)
-                    response.raise_for_status()
-
-                    messages_detailed.append(response.json())
-
-                except Exception as e:
-                    logger.warning(f"Failed to fetch message {msg_id}: {e}")
-                    continue
+        # Un seul aller-retour $batch par tranche de 20 messages
+        select = "id,subject,from,toRecipients,sentDateTime,body,uniqueBody"
+        graph = GraphClient(access_token)
+        try:
+            bodies = await graph.get_many(
+                {
+                    str(index): f"/me/messages/{msg_id}?$select={select}"
+                    for index, msg_id in enumerate(message_ids)
+                }
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to batch-fetch message details: {e}")
+            return []
 
-        return messages_detailed
+        # Conserver l'ordre d'entrée
+        return [bodies[str(index)] for index in range(len(message_ids)) if str(index) in bodies]
 
     async def search_messages_by_query(
         self, access_token: str, query: str, limit: int = 10
@@ -847,39 +894,51 @@ class OutlookIntegration:
             return collected
 
     async def _list_child_folders(
-        self, client: httpx.AsyncClient, folder_id: str, headers: dict
-    ) -> List[Dict]:
+        self, graph: GraphClient, parents: List[Dict]
+    ) -> Dict[str, List[Dict]]:
         """
-        Liste récursivement les sous-dossiers d'un dossier
+        Liste les sous-dossiers d'un niveau entier de dossiers via $batch
 
         Args:
-            client: Client httpx
-            folder_id: ID du dossier parent
-            headers: Headers avec Authorization
+            graph: Client Graph
+            parents: Dossiers parents (même niveau)
 
         Returns:
-            Liste de sous-dossiers
+            {parent_id: [sous-dossiers]}
         """
-        url = f"{self.GRAPH_BASE_URL}/me/mailFolders/{folder_id}/childFolders"
-        folders = []
-        params = {"$top": 100}
+        parents = [parent for parent in parents if parent.get("childFolderCount", 1)]
+        first_pages = await graph.get_many(
+            {
+                str(index): f"/me/mailFolders/{parent['id']}/childFolders?$top=100"
+                for index, parent in enumerate(parents)
+            }
+        )
 
-        while url:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            folders.extend(data.get("value", []))
-            url = data.get("@odata.nextLink")
-            params = None  # nextLink contient déjà les params
+        children: Dict[str, List[Dict]] = {}
+        for index, parent in enumerate(parents):
+            page = first_pages.get(str(index))
+            if page is None:
+                continue
+            folders = list(page.get("value", []))
+            # Rare: plus de 100 sous-dossiers → pages suivantes
+            if page.get("@odata.nextLink"):
+                folders.extend(await graph.get_all_pages(page["@odata.nextLink"]))
+            children[parent["id"]] = folders
 
-        return folders
+        return children
 
-    async def list_all_primary_folders(self, access_token: str) -> List[Dict]:
+    async def list_all_primary_folders(
+        self, access_token: str, cache_key: Optional[str] = None
+    ) -> List[Dict]:
         """
         Liste TOUS les dossiers de la boîte primaire (récursif, sans archives)
 
+        Un niveau de l'arborescence = un appel $batch. Le résultat est mis en
+        cache FOLDER_CACHE_TTL secondes (par utilisateur, ou par token).
+
         Args:
             access_token: Token d'accès Microsoft
+            cache_key: Clé de cache (ex: user_id); défaut = hash du token
 
         Returns:
             Liste complète de dossiers (racine + enfants)
@@ -888,55 +947,46 @@ class OutlookIntegration:
 
         logger = logging.getLogger(__name__)
 
-        headers = {"Authorization": f"Bearer {access_token}"}
-        root_url = f"{self.GRAPH_BASE_URL}/me/mailFolders"
+        cache_key = cache_key or hashlib.sha256(access_token.encode()).hexdigest()
+        cached = _folder_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        def is_archive(folder: Dict) -> bool:
+            well_known = (folder.get("wellKnownName") or "").lower()
+            return well_known in {"archivemsgfolderroot", "archive"}
+
+        graph = GraphClient(access_token)
+
+        # 1. Récupérer dossiers racine
         folders = []
-        params = {"$top": 100}
+        for folder in await graph.get_all_pages("/me/mailFolders", params={"$top": 100}):
+            # Exclure archives
+            if is_archive(folder):
+                logger.info(f"Skipping archive folder: {folder.get('displayName')}")
+                continue
+            folders.append(folder)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # 1. Récupérer dossiers racine
-            url = root_url
-            while url:
-                response = await client.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                data = response.json()
+        # 2. Descendre niveau par niveau dans les sous-dossiers
+        all_folders = []
+        level = folders
 
-                for folder in data.get("value", []):
-                    # Exclure archives
-                    well_known = (folder.get("wellKnownName") or "").lower()
-                    if well_known in {"archivemsgfolderroot", "archive"}:
-                        logger.info(f"Skipping archive folder: {folder.get('displayName')}")
-                        continue
-                    folders.append(folder)
-
-                url = data.get("@odata.nextLink")
-                params = None
-
-            # 2. Descendre récursivement dans les sous-dossiers
-            all_folders = []
-            queue = folders[:]
-
-            while queue:
-                parent = queue.pop(0)
-                all_folders.append(parent)
-
-                # Récupérer enfants
-                try:
-                    children = await self._list_child_folders(
-                        client, parent["id"], headers
-                    )
+        while level:
+            all_folders.extend(level)
+            try:
+                children = await self._list_child_folders(graph, level)
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to list child folders: {e}")
+                break
 
-                    for child in children:
-                        well_known = (child.get("wellKnownName") or "").lower()
-                        if well_known in {"archivemsgfolderroot", "archive"}:
-                            continue
-                        queue.append(child)
+            level = [
+                child
+                for parent in level
+                for child in children.get(parent["id"], [])
+                if not is_archive(child)
+            ]
 
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to list children of {parent.get('displayName')}: {e}"
-                    )
-                    continue
+        _folder_cache.put(cache_key, all_folders)
 
         logger.info(f"Found {len(all_folders)} primary folders")
         return all_folders
@@ -960,77 +1010,116 @@ class OutlookIntegration:
         Returns:
             Liste de messages
         """
-        import asyncio
-        import logging
-
-        logger = logging.getLogger(__name__)
-
-        headers = {"Authorization": f"Bearer {access_token}"}
-        url = f"{self.GRAPH_BASE_URL}/me/mailFolders/{folder_id}/messages"
         params = {
             "$top": 100,
-            "$select": "id,subject,from,toRecipients,receivedDateTime,body,uniqueBody,parentFolderId,hasAttachments",
+            "$select": FOLDER_MESSAGE_SELECT,
             "$filter": f"receivedDateTime ge {start_date}",
             "$orderby": "receivedDateTime desc",
         }
 
-        collected = []
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            while url:
-                # Retry logic
-                for attempt in range(3):
-                    try:
-                        if params is not None:
-                            response = await client.get(url, headers=headers, params=params)
-                        else:
-                            response = await client.get(url, headers=headers)
-
-                        if response.status_code in (429, 503):
-                            retry_after = int(response.headers.get("Retry-After", 2))
-                            wait_time = retry_after * (attempt + 1)
-                            logger.warning(
-                                f"Rate limit, waiting {wait_time}s (attempt {attempt + 1}/3)"
-                            )
-                            await asyncio.sleep(wait_time)
-                            continue
-
-                        response.raise_for_status()
-                        break
+        # Backoff 429/503 (Retry-After) géré par GraphClient
+        graph = GraphClient(access_token)
+        return await graph.get_all_pages(
+            f"/me/mailFolders/{folder_id}/messages", params=params, limit=limit
+        )
 
-                    except httpx.TimeoutException:
-                        if attempt == 2:
-                            raise
-                        await asyncio.sleep(2)
+    async def _sync_folder_delta(
+        self,
+        access_token: str,
+        user_id: int,
+        folder: Dict,
+        start_date: str,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Synchro delta d'un dossier: seuls les messages nouveaux/modifiés depuis le dernier sync
+
+        Le deltaLink (ou nextLink si interrompu par `limit`) est stocké dans
+        outlook_delta_states. Un lien expiré (410) est effacé puis le dossier
+        est resynchronisé depuis `start_date`.
+
+        Tous les messages récupérés sont retournés, même au-delà de `limit`
+        (au plus une page de plus) : le lien stocké pointe après la dernière
+        page lue, un message non retourné ne serait jamais relu.
+        Si Graph ne renvoie ni deltaLink ni nextLink, l'état précédent est
+        conservé (nouvelle lecture depuis ce point au prochain sync), ou effacé
+        s'il n'est plus valide.
+        """
+        logger = logging.getLogger(__name__)
 
-                data = response.json()
-                messages = data.get("value", [])
-                collected.extend(messages)
+        state = (
+            self.db.query(OutlookDeltaState)
+            .filter(
+                OutlookDeltaState.user_id == user_id,
+                OutlookDeltaState.folder_id == folder["id"],
+            )
+            .first()
+        )
+        if state is None:
+            state = OutlookDeltaState(user_id=user_id, folder_id=folder["id"])
+            self.db.add(state)
 
-                if limit and len(collected) >= limit:
-                    return collected[:limit]
+        graph = GraphClient(access_token)
+        resynced = False
+        try:
+            page = await graph.delta_messages(
+                folder["id"],
+                state_link=state.state_link,
+                select=FOLDER_MESSAGE_SELECT,
+                start_date=start_date,
+                limit=limit,
+            )
+        except GraphSyncStateExpired:
+            logger.warning(f"Delta state expired for folder {folder.get('displayName')}, resyncing")
+            resynced = True
+            page = await graph.delta_messages(
+                folder["id"],
+                select=FOLDER_MESSAGE_SELECT,
+                start_date=start_date,
+                limit=limit,
+            )
 
-                url = data.get("@odata.nextLink")
-                params = None
+        if page.state_link:
+            state.folder_name = folder.get("displayName")
+            state.state_link = page.state_link
+            state.is_complete = page.complete
+            state.updated_at = datetime.now(timezone.utc)
+            self.db.commit()
+        elif state.id is None:
+            self.db.expunge(state)
+        elif resynced:
+            # Lien expiré et aucun lien de remplacement : resync complète au prochain passage
+            self.db.delete(state)
+            self.db.commit()
+        else:
+            logger.warning(
+                f"No delta/next link for folder {folder.get('displayName')}, keeping previous state"
+            )
 
-        return collected
+        return page.messages
 
     async def get_recent_messages_from_all_folders(
-        self, access_token: str, days: int = 90, limit: int = 0
+        self,
+        access_token: str,
+        days: int = 90,
+        limit: int = 0,
+        user_id: Optional[int] = None,
     ) -> List[Dict]:
         """
         Récupère messages de TOUS les dossiers primaires (sans archives)
 
         Stratégie:
-        1. Liste tous les dossiers (récursif)
+        1. Liste tous les dossiers (récursif, $batch par niveau, cache TTL)
         2. Priorise Inbox et SentItems
         3. Récupère messages dossier par dossier
+           (delta query si user_id fourni: seuls les changements depuis le dernier sync)
         4. Déduplique par ID
 
         Args:
             access_token: Token d'accès Microsoft
-            days: Nombre de jours dans le passé
+            days: Nombre de jours dans le passé (synchro initiale)
             limit: Limite (0 = illimité)
+            user_id: Active la synchro incrémentale (état delta persistant)
 
         Returns:
             Liste dédupliquée de messages
@@ -1042,7 +1131,9 @@ class OutlookIntegration:
 
         # 1. Lister tous les dossiers
         start_time = datetime.now()
-        folders = await self.list_all_primary_folders(access_token)
+        folders = await self.list_all_primary_folders(
+            access_token, cache_key=f"user:{user_id}" if user_id else None
+        )
         logger.info(f"Listed {len(folders)} folders in {(datetime.now() - start_time).total_seconds():.2f}s")
 
         # 2. Prioriser Inbox/Sent pour remplir vite
@@ -1068,9 +1159,15 @@ class OutlookIntegration:
             logger.info(f"Fetching messages from folder: {folder_name}")
 
             try:
-                messages = await self._fetch_folder_messages(
-                    access_token, folder["id"], start_date, limit=None
-                )
+                if user_id:
+                    remaining = limit - len(collected) if limit else None
+                    messages = await self._sync_folder_delta(
+                        access_token, user_id, folder, start_date, limit=remaining
+                    )
+                else:
+                    messages = await self._fetch_folder_messages(
+                        access_token, folder["id"], start_date, limit=None
+                    )
 
                 # Dédupliquer
                 for msg in messages:
@@ -1079,7 +1176,8 @@ class OutlookIntegration:
                         seen_ids.add(msg_id)
                         collected.append(msg)
 
-                        if limit and len(collected) >= limit:
+                        # En delta, l'état du dossier est déjà avancé : tout retourner
+                        if limit and len(collected) >= limit and not user_id:
                             logger.info(
                                 f"Reached limit of {limit} messages across {len(seen_ids)} unique"
                             )
@@ -1089,8 +1187,14 @@ class OutlookIntegration:
                     f"Folder {folder_name}: {len(messages)} messages, {len(collected)} total unique"
                 )
 
+                if limit and len(collected) >= limit:
+                    logger.info(f"Reached limit of {limit} messages ({len(collected)} delta messages)")
+                    return collected
+
             except Exception as e:
                 logger.error(f"Failed to fetch messages from {folder_name}: {e}")
+                if user_id:
+                    self.db.rollback()
                 continue
 
         logger.info(
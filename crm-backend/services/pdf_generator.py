@@ -7,11 +7,24 @@ Utilise ReportLab pour générer des PDFs professionnels avec:
 - Table des matières
 - Numérotation de pages
 - Headers/footers
+
+Cache de rendu (get_legal_document_pdf):
+- un PDF rendu par document, clé (type, hash du contenu, date du jour): le contenu
+  ne change qu'avec une nouvelle version (déploiement) ou la date affichée
+- ETag dérivé de la clé (stable entre workers), pour If-None-Match / 304
+- premières requêtes concurrentes coalescées (un seul rendu par document)
+- pré-rendu au démarrage puis chaque nuit (keep_legal_documents_rendered)
 """
 
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
 from io import BytesIO
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -28,6 +41,38 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 
+logger = logging.getLogger(__name__)
+
+LEGAL_DOCUMENTS_VERSION = "1.0"
+
+# Type de document → (méthode de rendu, méthode de contenu, nom de fichier, titre)
+LEGAL_DOCUMENTS = {
+    "cgu": (
+        "generate_cgu_pdf",
+        "_get_cgu_content",
+        "CGU_Alforis_Finance.pdf",
+        "Conditions Générales d'Utilisation",
+    ),
+    "cgv": (
+        "generate_cgv_pdf",
+        "_get_cgv_content",
+        "CGV_Alforis_Finance.pdf",
+        "Conditions Générales de Vente",
+    ),
+    "dpa": (
+        "generate_dpa_pdf",
+        "_get_dpa_content",
+        "DPA_Alforis_Finance.pdf",
+        "Data Processing Agreement",
+    ),
+    "privacy": (
+        "generate_privacy_pdf",
+        "_get_privacy_content",
+        "Privacy_Policy_Alforis_Finance.pdf",
+        "Politique de Confidentialité",
+    ),
+}
+
 
 class LegalDocumentPDFGenerator:
     """Générateur de PDFs pour documents légaux (CGU, CGV, DPA, Privacy)."""
@@ -774,3 +819,97 @@ class LegalDocumentPDFGenerator:
                 ],
             },
         ]
+
+
+# ============================================================================
+# Cache de rendu
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class RenderedLegalDocument:
+    """PDF rendu d'un document légal, servi tel quel par api/routes/legal.py"""
+
+    document_type: str
+    content: bytes
+    etag: str
+    filename: str
+    title: str
+    rendered_on: date
+
+
+_rendered: Dict[str, RenderedLegalDocument] = {}
+_render_locks = {document_type: threading.Lock() for document_type in LEGAL_DOCUMENTS}
+_content_source = None
+
+
+def _render_key(document_type: str, today: date) -> str:
+    """Clé de cache: type, hash du contenu structuré (+ version), date du jour"""
+    global _content_source
+    if _content_source is None:
+        _content_source = LegalDocumentPDFGenerator()
+    content = getattr(_content_source, LEGAL_DOCUMENTS[document_type][1])()
+    digest = hashlib.sha256(
+        json.dumps([LEGAL_DOCUMENTS_VERSION, content], ensure_ascii=False).encode()
+    ).hexdigest()
+    return f"{document_type}-{digest[:16]}-{today:%Y%m%d}"
+
+
+def get_legal_document_pdf(document_type: str) -> RenderedLegalDocument:
+    """
+    Retourne le PDF d'un document légal, rendu au plus une fois par clé
+
+    Les appels concurrents pour un document pas encore rendu attendent le rendu
+    en cours au lieu d'en lancer un autre.
+
+    Raises:
+        KeyError: type de document inconnu
+    """
+    _, _, filename, title = LEGAL_DOCUMENTS[document_type]
+    today = date.today()
+    etag = f'"{_render_key(document_type, today)}"'
+
+    cached = _rendered.get(document_type)
+    if cached is not None and cached.etag == etag:
+        return cached
+
+    with _render_locks[document_type]:
+        cached = _rendered.get(document_type)
+        if cached is not None and cached.etag == etag:
+            return cached
+
+        render = getattr(LegalDocumentPDFGenerator(), LEGAL_DOCUMENTS[document_type][0])
+        rendered = RenderedLegalDocument(
+            document_type=document_type,
+            content=render().getvalue(),
+            etag=etag,
+            filename=filename,
+            title=title,
+            rendered_on=today,
+        )
+        _rendered[document_type] = rendered  # remplace la version précédente
+        logger.info(f"Document légal rendu: {document_type} ({len(rendered.content)} octets)")
+        return rendered
+
+
+def prerender_legal_documents() -> None:
+    """Rend tous les documents légaux absents ou périmés du cache"""
+    for document_type in LEGAL_DOCUMENTS:
+        try:
+            get_legal_document_pdf(document_type)
+        except Exception as exc:
+            logger.error(f"Pré-rendu du document légal {document_type} échoué: {exc}")
+
+
+async def keep_legal_documents_rendered() -> None:
+    """
+    Pré-rend les documents au démarrage puis juste après chaque minuit
+
+    Tâche de fond lancée par le lifespan de l'application (rendu hors boucle
+    d'événements): la première requête de la journée trouve le PDF déjà prêt.
+    """
+    while True:
+        await asyncio.to_thread(prerender_legal_documents)
+        now = datetime.now()
+        next_day = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        await asyncio.sleep((next_day - now).total_seconds() + 5)
@@ -3,14 +3,32 @@ AI Quality Scoring Service
 Calculate quality scores for contacts and organizations based on data completeness
 """
 import logging
+import re
+import time
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert, select
 
-from models import Person, Organisation
+from models import DataQualityScore, Organisation, Person, PersonOrganizationLink, User
 
 logger = logging.getLogger(__name__)
 
+# Entities per streamed batch in refresh_quality_scores
+QUALITY_BATCH_SIZE = 5000
+# Minimum delay between two refreshes enqueued because no score was persisted yet
+REFRESH_ENQUEUE_INTERVAL_SECONDS = 600
+
+_refresh_enqueued_at: Optional[float] = None
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+PHONE_PATTERN = r'^(\+33|0)[0-9]{9}$'  # French format, after removing spaces/dots/dashes
+PHONE_SEPARATORS = r'[\s\.\-]'
+URL_PATTERN = r'^https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}.*$'
+
 
 class QualityScorer:
     """
@@ -125,7 +143,8 @@ class QualityScorer:
         if org.email and not self._is_valid_email(org.email):
             validity_issues.append("Invalid email format")
 
-        if org.siret and len(org.siret) != 14:
+        siret = getattr(org, "siret", None)
+        if siret and len(siret) != 14:
             validity_issues.append("Invalid SIRET (should be 14 digits)")
 
         # Check for potential duplicates
@@ -157,44 +176,44 @@ class QualityScorer:
         }
 
     def score_team_quality(self, team_id: int) -> Dict:
-        """Calculate overall quality metrics for a team"""
-
-        # Count persons and orgs
-        person_count = self.db.query(func.count(Person.id)).filter(
-            Person.team_id == team_id
-        ).scalar() or 0
-
-        org_count = self.db.query(func.count(Organisation.id)).filter(
-            Organisation.team_id == team_id
-        ).scalar() or 0
-
-        # Sample scoring (performance optimization: don't score everything)
-        sample_persons = self.db.query(Person).filter(
-            Person.team_id == team_id
-        ).limit(100).all()
-
-        sample_orgs = self.db.query(Organisation).filter(
-            Organisation.team_id == team_id
-        ).limit(100).all()
-
-        person_scores = [self.score_person(p.id)["score"] for p in sample_persons]
-        org_scores = [self.score_organisation(o.id)["score"] for o in sample_orgs]
-
-        avg_person_score = sum(person_scores) / len(person_scores) if person_scores else 0
-        avg_org_score = sum(org_scores) / len(org_scores) if org_scores else 0
-
-        # Calculate tiers
-        person_tiers = {"A": 0, "B": 0, "C": 0, "D": 0}
-        for score in person_scores:
-            person_tiers[self._get_quality_tier(score)] += 1
-
-        org_tiers = {"A": 0, "B": 0, "C": 0, "D": 0}
-        for score in org_scores:
-            org_tiers[self._get_quality_tier(score)] += 1
+        """
+        Calculate overall quality metrics for a team
+
+        Aggregates the persisted scores of every organisation owned by a team member
+        and every person linked to one of them (no sampling). If no score has been
+        persisted yet, the full refresh is enqueued (Celery) and an empty summary
+        flagged "pending" is returned instead of scoring inline.
+        """
+
+        if self.db.query(DataQualityScore.id).first() is None:
+            self._enqueue_refresh()
+            return {
+                "success": True,
+                "team_id": team_id,
+                "pending": True,
+                "total_persons": 0,
+                "total_organisations": 0,
+                "avg_person_score": 0.0,
+                "avg_org_score": 0.0,
+                "person_tiers": {"A": 0, "B": 0, "C": 0, "D": 0},
+                "org_tiers": {"A": 0, "B": 0, "C": 0, "D": 0},
+                "overall_health": None
+            }
+
+        team_orgs = select(Organisation.id).where(
+            Organisation.owner_id.in_(select(User.id).where(User.team_id == team_id))
+        )
+        team_persons = select(PersonOrganizationLink.person_id).where(
+            PersonOrganizationLink.organisation_id.in_(team_orgs)
+        )
+
+        person_count, avg_person_score, person_tiers = self._tier_summary("person", team_persons)
+        org_count, avg_org_score, org_tiers = self._tier_summary("organisation", team_orgs)
 
         return {
             "success": True,
             "team_id": team_id,
+            "pending": False,
             "total_persons": person_count,
             "total_organisations": org_count,
             "avg_person_score": round(avg_person_score, 1),
@@ -204,6 +223,225 @@ class QualityScorer:
             "overall_health": self._get_quality_tier((avg_person_score + avg_org_score) / 2)
         }
 
+    @staticmethod
+    def _enqueue_refresh() -> None:
+        """Enqueue the full-population refresh, at most once per interval per worker"""
+        global _refresh_enqueued_at
+
+        now = time.monotonic()
+        last = _refresh_enqueued_at
+        if last is not None and now - last < REFRESH_ENQUEUE_INTERVAL_SECONDS:
+            return
+        _refresh_enqueued_at = now
+
+        from tasks.quality_tasks import refresh_data_quality_scores
+
+        try:
+            refresh_data_quality_scores.delay()
+        except Exception as exc:
+            _refresh_enqueued_at = None
+            logger.error(f"Could not enqueue quality score refresh: {exc}")
+
+    def _tier_summary(self, entity_type: str, entity_ids) -> tuple:
+        """(count, average score, tier counts) of persisted scores, in one grouped query"""
+
+        rows = self.db.execute(
+            select(DataQualityScore.tier, func.count(), func.sum(DataQualityScore.score))
+            .where(
+                DataQualityScore.entity_type == entity_type,
+                DataQualityScore.entity_id.in_(entity_ids),
+            )
+            .group_by(DataQualityScore.tier)
+        ).all()
+
+        tiers = {"A": 0, "B": 0, "C": 0, "D": 0}
+        total_score = 0.0
+        for tier, count, score_sum in rows:
+            tiers[tier] = count
+            total_score += score_sum or 0
+        count = sum(tiers.values())
+        return count, (total_score / count if count else 0), tiers
+
+    # ========== Full-population scoring ==========
+
+    def refresh_quality_scores(self, batch_size: int = QUALITY_BATCH_SIZE) -> Dict:
+        """
+        Score every person and organisation and persist the results
+
+        Entities are streamed in column batches (no ORM objects); completeness,
+        validity and duplicate penalties are computed on whole batches with pandas.
+        Duplicates come from one grouped query per entity type. Scores of deleted
+        entities are removed.
+        """
+
+        computed_at = datetime.now(timezone.utc)
+        persons = self._refresh_entity_scores("person", computed_at, batch_size)
+        organisations = self._refresh_entity_scores("organisation", computed_at, batch_size)
+        self.db.commit()
+
+        logger.info(
+            f"Data quality scores refreshed: {persons} persons, {organisations} organisations"
+        )
+        return {"success": True, "persons": persons, "organisations": organisations}
+
+    def _entity_config(self, entity_type: str):
+        """(model, field weights, validity checks, duplicate key column)"""
+        if entity_type == "person":
+            return Person, self.PERSON_FIELDS, {"email": "email", "phone": "phone"}, "email"
+        return (
+            Organisation,
+            self.ORG_FIELDS,
+            {"website": "url", "email": "email", "siret": "siret"},
+            "name",
+        )
+
+    def _duplicate_counts(self, entity_type: str) -> Dict[str, int]:
+        """Duplicate key → number of entities sharing it (keys shared by 2+ only)"""
+        if entity_type == "person":
+            key = Person.email  # same email
+        else:
+            key = func.lower(Organisation.name)  # same name, case-insensitive
+
+        rows = self.db.execute(
+            select(key, func.count())
+            .where(key.isnot(None), key != "")
+            .group_by(key)
+            .having(func.count() > 1)
+        )
+        return {value: count for value, count in rows}
+
+    def _refresh_entity_scores(self, entity_type: str, computed_at: datetime, batch_size: int) -> int:
+        model, fields, checks, duplicate_key = self._entity_config(entity_type)
+        columns = model.__mapper__.column_attrs.keys()
+        names = ["id"] + [
+            name for name in dict.fromkeys([*fields, *checks, duplicate_key]) if name in columns
+        ]
+        duplicates = self._duplicate_counts(entity_type)
+
+        result = self.db.execute(
+            select(*(getattr(model, name).label(name) for name in names))
+            .order_by(model.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        scored = 0
+        for rows in result.partitions():
+            frame = pd.DataFrame.from_records(rows, columns=names)
+            scores = self._score_frame(frame, fields, checks, duplicate_key, duplicates)
+            self._save_scores(entity_type, scores, computed_at)
+            scored += len(scores)
+
+        # Entities deleted since the previous run
+        self.db.execute(
+            delete(DataQualityScore).where(
+                DataQualityScore.entity_type == entity_type,
+                DataQualityScore.computed_at != computed_at,
+            )
+        )
+        return scored
+
+    def _score_frame(
+        self,
+        frame: pd.DataFrame,
+        fields_config: Dict,
+        checks: Dict[str, str],
+        duplicate_key: str,
+        duplicate_counts: Dict[str, int],
+    ) -> pd.DataFrame:
+        """Vectorised equivalent of score_person / score_organisation for a batch"""
+
+        filled = {
+            name: frame[name].notna() & (frame[name].astype(str) != "")
+            for name in frame.columns
+        }
+        no_value = pd.Series(False, index=frame.index)
+
+        # Missing columns count as empty, like getattr(entity, field, None)
+        filled_weight = sum(
+            filled.get(field, no_value).astype(float) * weight
+            for field, weight in fields_config.items()
+        )
+        completeness = filled_weight / sum(fields_config.values()) * 100
+
+        issues = sum(
+            (filled[field] & ~self._valid_values(frame[field], kind)).astype(int)
+            for field, kind in checks.items()
+            if field in frame.columns
+        )
+
+        keys = frame[duplicate_key]
+        if duplicate_key == "name":
+            keys = keys.str.lower()
+        duplicates = (keys.map(duplicate_counts).fillna(0) - 1).clip(lower=0).astype(int)
+
+        score = (completeness - issues * 5 - (duplicates > 0) * 10).clip(0, 100)
+
+        return pd.DataFrame(
+            {
+                "entity_id": frame["id"],
+                "score": score.round(1),
+                "tier": np.select([score >= 85, score >= 70, score >= 50], ["A", "B", "C"], "D"),
+                "completeness": completeness.round(1),
+                "validity_issues": issues,
+                "potential_duplicates": duplicates,
+            }
+        )
+
+    @staticmethod
+    def _valid_values(values: pd.Series, kind: str) -> pd.Series:
+        values = values.fillna("").astype(str)
+        if kind == "email":
+            return values.str.match(EMAIL_PATTERN)
+        if kind == "phone":
+            return values.str.replace(PHONE_SEPARATORS, "", regex=True).str.match(PHONE_PATTERN)
+        if kind == "url":
+            return values.str.match(URL_PATTERN)
+        return values.str.len() == 14  # SIRET
+
+    def _save_scores(self, entity_type: str, scores: pd.DataFrame, computed_at: datetime):
+        """Upsert a batch of scores (one multi-row statement)"""
+
+        if scores.empty:
+            return
+        rows = [
+            {
+                "entity_type": entity_type,
+                "entity_id": int(row.entity_id),
+                "score": float(row.score),
+                "tier": str(row.tier),
+                "completeness": float(row.completeness),
+                "validity_issues": int(row.validity_issues),
+                "potential_duplicates": int(row.potential_duplicates),
+                "computed_at": computed_at,
+            }
+            for row in scores.itertuples(index=False)
+        ]
+
+        table = DataQualityScore.__table__
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            self.db.execute(
+                delete(table).where(
+                    table.c.entity_type == entity_type,
+                    table.c.entity_id.in_([row["entity_id"] for row in rows]),
+                )
+            )
+            self.db.execute(insert(table), rows)
+            return
+
+        stmt = dialect_insert(table).values(rows)
+        updated = ("score", "tier", "completeness", "validity_issues", "potential_duplicates",
+                   "computed_at")
+        set_ = {name: stmt.excluded[name] for name in updated}
+        set_["updated_at"] = func.now()
+        self.db.execute(
+            stmt.on_conflict_do_update(index_elements=["entity_type", "entity_id"], set_=set_)
+        )
+
     def _calculate_completeness(self, entity, fields_config: Dict) -> float:
         """Calculate completeness score based on filled fields"""
 
@@ -219,23 +457,18 @@ class QualityScorer:
 
     def _is_valid_email(self, email: str) -> bool:
         """Basic email validation"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(re.match(EMAIL_PATTERN, email))
 
     def _is_valid_phone(self, phone: str) -> bool:
         """Basic phone validation (French format)"""
-        import re
         # Remove spaces, dots, dashes
-        clean = re.sub(r'[\s\.\-]', '', phone)
+        clean = re.sub(PHONE_SEPARATORS, '', phone)
         # Check French format: +33... or 0...
-        return bool(re.match(r'^(\+33|0)[0-9]{9}$', clean))
+        return bool(re.match(PHONE_PATTERN, clean))
 
     def _is_valid_url(self, url: str) -> bool:
         """Basic URL validation"""
-        import re
-        pattern = r'^https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}.*$'
-        return bool(re.match(pattern, url))
+        return bool(re.match(URL_PATTERN, url))
 
     def _find_person_duplicates(self, person: Person) -> List[Person]:
         """Find potential duplicate persons"""
@@ -244,7 +477,6 @@ class QualityScorer:
             return []
 
         duplicates = self.db.query(Person).filter(
-            Person.team_id == person.team_id,
             Person.email == person.email,
             Person.id != person.id
         ).all()
@@ -258,8 +490,7 @@ class QualityScorer:
             return []
 
         duplicates = self.db.query(Organisation).filter(
-            Organisation.team_id == org.team_id,
-            Organisation.name.ilike(org.name),
+            func.lower(Organisation.name) == org.name.lower(),
             Organisation.id != org.id
         ).all()
 
@@ -316,7 +547,7 @@ class QualityScorer:
         if not org.website:
             recommendations.append("Ajouter le site web")
 
-        if not org.siret:
+        if not getattr(org, "siret", None):
             recommendations.append("Ajouter le SIRET")
 
         if not org.address:
@@ -0,0 +1,457 @@
+"""
+RGPD Anonymizer - Set-based, resumable anonymisation engine
+
+Anonymises rows with chunked `UPDATE ... WHERE id IN (batch)` statements instead of
+loading and modifying ORM objects one by one:
+- candidates are walked by increasing id (keyset), `batch_size` ids at a time
+- pseudonyms are computed by the database (md5 of entity/field/id), deterministic
+  across runs, so a batch never round-trips personal data through Python
+- each batch is committed together with its checkpoint: an interrupted run resumes
+  after the last committed id; the checkpoints of a run are deleted once all its
+  plans are done, so a later run with the same key starts over
+- between batches the engine backs off while replication lag or lock waits are
+  above their thresholds (PostgreSQL), and retries a batch that hit lock_timeout
+
+Used by RGPDService (user erasure, inactive users), scripts/gdpr_anonymize.py and
+the Celery retention tasks.
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import (
+    String,
+    and_,
+    cast,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+from models.anonymization_checkpoint import AnonymizationCheckpoint
+from models.audit_log import AuditLog
+from models.email_attachment import EmailAttachment
+from models.email_message import EmailMessage
+from models.interaction import Interaction
+from models.organisation import Organisation
+from models.person import Person, PersonOrganizationLink
+from models.task import Task
+from models.user import User
+from models.user_email_account import UserEmailAccount
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+# Throttling (PostgreSQL): pause while a replica lags or sessions wait on locks
+MAX_REPLICATION_LAG_SECONDS = 5.0
+MAX_LOCK_WAITERS = 10
+THROTTLE_SLEEP_SECONDS = 1.0
+MAX_THROTTLE_SLEEP_SECONDS = 30.0
+# Per-batch lock wait before giving up and retrying the batch later
+LOCK_TIMEOUT = "5s"
+MAX_BATCH_RETRIES = 5
+
+_LOAD_SQL = text(
+    """
+    SELECT
+        COALESCE((SELECT EXTRACT(EPOCH FROM MAX(replay_lag)) FROM pg_stat_replication), 0),
+        (SELECT COUNT(*) FROM pg_locks WHERE NOT granted)
+    """
+)
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+def pseudonym(
+    model: type, entity_type: str, field_name: str, prefix: str = "", suffix: str = ""
+) -> ColumnElement:
+    """
+    SQL expression of a deterministic pseudonym: prefix + 8 hex chars + suffix
+
+    The hash input is "<entity_type>:<field_name>:<id>", computed row by row by the
+    database (md5 is registered on SQLite connections by the engine).
+    """
+    seed = literal(f"{entity_type}:{field_name}:") + cast(model.id, String)
+    return literal(prefix) + func.substr(func.md5(seed), 1, 8) + literal(suffix)
+
+
+@dataclass
+class AnonymizationPlan:
+    """
+    One table to anonymise
+
+    Attributes:
+        name: checkpoint key within a run (ex: "people")
+        model: mapped class with an integer `id` primary key
+        where: eligibility predicate (re-checked by the UPDATE)
+        values: attribute name → value or SQL expression (see pseudonym())
+        audit_entity_type: if set, one audit_logs row per anonymised entity
+    """
+
+    name: str
+    model: type
+    where: ColumnElement
+    values: Dict[str, Any]
+    audit_entity_type: Optional[str] = None
+
+
+@dataclass
+class AnonymizationEngine:
+    """Runs anonymisation plans in committed, checkpointed, throttled batches"""
+
+    db: Session
+    batch_size: int = DEFAULT_BATCH_SIZE
+    max_replication_lag: float = MAX_REPLICATION_LAG_SECONDS
+    max_lock_waiters: int = MAX_LOCK_WAITERS
+    sleep: Callable[[float], None] = time.sleep
+    audit_user_agent: str = "RGPD_Anonymization_Engine"
+    stats: Dict[str, int] = field(default_factory=dict)
+
+    def count(self, plan: AnonymizationPlan) -> int:
+        """Rows currently eligible for a plan (dry runs)"""
+        return self.db.execute(
+            select(func.count()).select_from(plan.model).where(plan.where)
+        ).scalar_one()
+
+    def run(self, run_key: str, plans: List[AnonymizationPlan]) -> Dict[str, int]:
+        """
+        Run plans in order and return {plan name: rows anonymised}
+
+        Within an interrupted run, a plan already completed is skipped and the
+        interrupted one resumes after its checkpoint. Once every plan is done the
+        run's checkpoints are cleared: a new erasure request reusing the key must
+        still reach the rows created since.
+        """
+        for plan in plans:
+            self.stats[plan.name] = self._run_plan(run_key, plan)
+        self.db.query(AnonymizationCheckpoint).filter_by(run_key=run_key).delete(
+            synchronize_session=False
+        )
+        self.db.commit()
+        # Bulk UPDATEs bypass the identity map: reload objects already in the session
+        self.db.expire_all()
+        return dict(self.stats)
+
+    @property
+    def _is_postgresql(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _checkpoint(self, run_key: str, plan: AnonymizationPlan) -> AnonymizationCheckpoint:
+        checkpoint = (
+            self.db.query(AnonymizationCheckpoint)
+            .filter_by(run_key=run_key, plan=plan.name)
+            .one_or_none()
+        )
+        if checkpoint is None:
+            checkpoint = AnonymizationCheckpoint(
+                run_key=run_key, plan=plan.name, last_id=0, processed=0
+            )
+            self.db.add(checkpoint)
+            self.db.commit()
+        return checkpoint
+
+    def _run_plan(self, run_key: str, plan: AnonymizationPlan) -> int:
+        checkpoint = self._checkpoint(run_key, plan)
+        if checkpoint.completed_at is not None:
+            return checkpoint.processed
+
+        model = plan.model
+        while True:
+            self._throttle()
+            ids = self.db.execute(
+                select(model.id)
+                .where(plan.where, model.id > checkpoint.last_id)
+                .order_by(model.id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            updated = self._anonymize_batch(plan, ids)
+            checkpoint.last_id = ids[-1]
+            checkpoint.processed += updated
+            self.db.commit()
+            logger.info(
+                f"[{run_key}] {plan.name}: {updated} rows anonymised "
+                f"(total {checkpoint.processed}, up to id {checkpoint.last_id})"
+            )
+
+        checkpoint.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return checkpoint.processed
+
+    def _anonymize_batch(self, plan: AnonymizationPlan, ids: List[int]) -> int:
+        """UPDATE one batch (and its audit rows), retrying after lock timeouts"""
+        model = plan.model
+        for attempt in range(1, MAX_BATCH_RETRIES + 1):
+            self._prepare_connection()
+            try:
+                # plan.where is re-checked: audit only the rows actually updated
+                updated_ids = self.db.execute(
+                    update(model)
+                    .where(model.id.in_(ids), plan.where)
+                    .values(**plan.values)
+                    .returning(model.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+                if plan.audit_entity_type and updated_ids:
+                    self._audit(plan, updated_ids)
+                return len(updated_ids)
+            except OperationalError as exc:
+                if getattr(exc.orig, "pgcode", None) != _LOCK_NOT_AVAILABLE or (
+                    attempt == MAX_BATCH_RETRIES
+                ):
+                    raise
+                self.db.rollback()
+                logger.warning(f"{plan.name}: lock timeout on batch, retry {attempt}")
+                self.sleep(min(THROTTLE_SLEEP_SECONDS * 2**attempt, MAX_THROTTLE_SLEEP_SECONDS))
+        return 0
+
+    def _audit(self, plan: AnonymizationPlan, ids: List[int]) -> None:
+        now = datetime.utcnow()
+        self.db.execute(
+            insert(AuditLog),
+            [
+                {
+                    "entity_type": plan.audit_entity_type,
+                    "entity_id": entity_id,
+                    "action": "anonymize",
+                    "field_name": "gdpr_compliance",
+                    "old_value": "active",
+                    "new_value": "anonymized",
+                    "user_id": None,
+                    "ip_address": "127.0.0.1",
+                    "user_agent": self.audit_user_agent,
+                    "created_at": now,
+                }
+                for entity_id in ids
+            ],
+        )
+
+    def _prepare_connection(self) -> None:
+        """Per-transaction settings: lock_timeout (PostgreSQL), md5() (SQLite)"""
+        connection = self.db.connection()
+        if self._is_postgresql:
+            connection.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+        elif connection.dialect.name == "sqlite":
+            connection.connection.driver_connection.create_function(
+                "md5", 1, _md5, deterministic=True
+            )
+
+    def _throttle(self) -> None:
+        """Wait while replication lag or lock waits exceed their thresholds"""
+        if not self._is_postgresql:
+            return
+        delay = THROTTLE_SLEEP_SECONDS
+        while True:
+            lag, waiters = self.db.execute(_LOAD_SQL).one()
+            self.db.commit()  # do not hold a snapshot open while waiting
+            if float(lag or 0) <= self.max_replication_lag and waiters <= self.max_lock_waiters:
+                return
+            logger.info(f"Anonymisation throttled: replication lag {lag}s, {waiters} lock waiters")
+            self.sleep(delay)
+            delay = min(delay * 2, MAX_THROTTLE_SLEEP_SECONDS)
+
+
+# =========================================================================
+# Plans
+# =========================================================================
+
+ANONYMIZED_NOTES = "[Données anonymisées conformément au RGPD]"
+ANONYMIZED_PHONE = "00-00-00-00-00"
+
+
+def _person_values() -> Dict[str, Any]:
+    return {
+        "first_name": pseudonym(Person, "person", "first_name", "User_"),
+        "last_name": pseudonym(Person, "person", "last_name", "Anonymized_"),
+        "email": pseudonym(Person, "person", "email", "anonymized_", "@example.com"),
+        "personal_email": None,
+        "phone": ANONYMIZED_PHONE,
+        "personal_phone": None,
+        "mobile": None,
+        "linkedin_url": None,
+        "notes": ANONYMIZED_NOTES,
+        "job_title": None,
+        "role": None,
+        "is_anonymized": True,
+        "anonymized_at": func.now(),
+    }
+
+
+def _organisation_values() -> Dict[str, Any]:
+    return {
+        "name": pseudonym(Organisation, "organisation", "name", "Anonymized_"),
+        "email": pseudonym(Organisation, "organisation", "email", "anonymized_", "@example.com"),
+        "phone": ANONYMIZED_PHONE,
+        "address": "Adresse anonymisée",
+        "city": None,
+        "postal_code": None,
+        "website": None,
+        "notes": ANONYMIZED_NOTES,
+        "description": None,
+        "is_anonymized": True,
+        "anonymized_at": func.now(),
+    }
+
+
+def _inactive_since(column, cutoff: datetime) -> ColumnElement:
+    return or_(column < cutoff, column.is_(None))
+
+
+def inactive_people_plan(cutoff: datetime) -> AnonymizationPlan:
+    """Retention: people without activity since cutoff"""
+    return AnonymizationPlan(
+        name="people",
+        model=Person,
+        where=and_(
+            Person.is_anonymized == false(),
+            _inactive_since(Person.last_activity_date, cutoff),
+        ),
+        values=_person_values(),
+        audit_entity_type="person",
+    )
+
+
+def inactive_organisations_plan(cutoff: datetime) -> AnonymizationPlan:
+    """Retention: deactivated organisations without activity since cutoff"""
+    return AnonymizationPlan(
+        name="organisations",
+        model=Organisation,
+        where=and_(
+            Organisation.is_anonymized == false(),
+            Organisation.is_active == false(),
+            _inactive_since(Organisation.last_activity_date, cutoff),
+        ),
+        values=_organisation_values(),
+        audit_entity_type="organisation",
+    )
+
+
+def inactive_users(cutoff: datetime) -> Select:
+    """
+    Ids of users to erase for inactivity: no login since cutoff, account older than
+    cutoff, still active, not superuser, not already anonymised
+    """
+    return select(User.id).where(
+        _inactive_since(User.last_login_at, cutoff),
+        User.created_at < cutoff,
+        User.is_active == true(),
+        User.is_superuser == false(),
+        ~User.email.like("%@anonymized.local"),
+    )
+
+
+def user_data_plans(users: Select) -> List[AnonymizationPlan]:
+    """
+    Erasure (Article 17) of the users selected by `users` (a select of User.id)
+
+    Same scope as the RGPD export: organisations created or owned by the users,
+    people linked to them, interactions, tasks, mailboxes. The "user" plan runs
+    last, so that `users` still selects the same accounts if a run is resumed.
+    """
+    owned_orgs = select(Organisation.id).where(
+        or_(Organisation.created_by.in_(users), Organisation.owner_id.in_(users))
+    )
+    messages = select(EmailMessage.id).where(
+        EmailMessage.account_id.in_(
+            select(UserEmailAccount.id).where(UserEmailAccount.user_id.in_(users))
+        )
+    )
+    return [
+        AnonymizationPlan(
+            name="people",
+            model=Person,
+            where=and_(
+                Person.is_anonymized == false(),
+                Person.id.in_(
+                    select(PersonOrganizationLink.person_id).where(
+                        PersonOrganizationLink.organisation_id.in_(owned_orgs)
+                    )
+                ),
+            ),
+            values=_person_values(),
+            audit_entity_type="person",
+        ),
+        AnonymizationPlan(
+            name="organisations",
+            model=Organisation,
+            where=and_(Organisation.is_anonymized == false(), Organisation.id.in_(owned_orgs)),
+            values=_organisation_values(),
+            audit_entity_type="organisation",
+        ),
+        AnonymizationPlan(
+            name="interactions",
+            model=Interaction,
+            where=or_(Interaction.created_by.in_(users), Interaction.assignee_id.in_(users)),
+            values={"description": "[Anonymized]"},
+        ),
+        AnonymizationPlan(
+            name="tasks",
+            model=Task,
+            where=or_(Task.assigned_to.in_(users), Task.created_by.in_(users)),
+            values={"title": "Anonymized Task", "description": "[Anonymized]"},
+        ),
+        AnonymizationPlan(
+            name="email_messages",
+            model=EmailMessage,
+            where=EmailMessage.id.in_(messages),
+            values={
+                "subject": "[Anonymized]",
+                "snippet": None,
+                "body_text": "[Anonymized]",
+                "body_html": "[Anonymized]",
+                "sender_email": "anonymized@local",
+                "sender_name": None,
+                "recipients_to": [],
+                "recipients_cc": [],
+                "recipients_bcc": [],
+            },
+        ),
+        AnonymizationPlan(
+            name="email_attachments",
+            model=EmailAttachment,
+            where=EmailAttachment.email_message_id.in_(messages),
+            values={"filename": "anonymized.bin", "content_type": "application/octet-stream"},
+        ),
+        AnonymizationPlan(
+            name="user",
+            model=User,
+            where=User.id.in_(users),
+            values={
+                "email": pseudonym(User, "user", "email", "anonymized_", "@anonymized.local"),
+                "username": None,
+                "full_name": "Anonymized User",
+                "hashed_password": "ANONYMIZED",
+                "is_active": False,
+                "imap_email": None,
+                "encrypted_imap_password": None,
+                "encrypted_outlook_access_token": None,
+                "encrypted_outlook_refresh_token": None,
+                "encrypted_o365_access_token": None,
+                "encrypted_o365_refresh_token": None,
+                "totp_secret": None,
+                "reset_token": None,
+            },
+            audit_entity_type="user",
+        ),
+    ]
+
+
+def _md5(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return hashlib.md5(value.encode()).hexdigest()
@@ -3,29 +3,149 @@ RGPD Service - Data Export & Anonymization
 
 Handles:
 - Export of all user personal data (RGPD Article 20)
-- Deletion/Anonymization of user data (RGPD Article 17)
+- Streaming export (zip of JSON-lines sections + attachments) for large accounts
+- Deletion/Anonymization of user data (RGPD Article 17), set-based (services.rgpd_anonymizer)
 - Access logs tracking (CNIL compliance)
 """
 
+import enum
+import io
 import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-from sqlalchemy import and_, or_, update
+import time
+import zipfile
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 
+from core.cache import get_cache, set_cache
+from core.config import settings
 from models.data_access_log import DataAccessLog
 from models.email_attachment import EmailAttachment
 from models.email_message import EmailMessage
 from models.interaction import Interaction, InteractionParticipant
 from models.organisation import Organisation
-from models.person import Person
+from models.person import Person, PersonOrganizationLink
 from models.task import Task
 from models.user import User
+from models.user_email_account import UserEmailAccount
+from services.rgpd_anonymizer import AnonymizationEngine, inactive_users, user_data_plans
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round-trip while streaming an export (server-side cursor)
+EXPORT_BATCH_SIZE = 500
+# Email bodies can be large: smaller batches keep the memory ceiling bounded
+EMAIL_EXPORT_BATCH_SIZE = 50
+# Zip output is yielded once this many bytes are pending; attachment read size
+EXPORT_CHUNK_BYTES = 1024 * 1024
+# Legacy dict export (GET /rgpd/export) keeps only the most recent emails
+DICT_EXPORT_EMAIL_LIMIT = 100
+
+# progress(section, exported_rows, total_rows)
+ExportProgress = Callable[[str, int, int], None]
+
+# Background export jobs: archives on disk, status/progress in the cache
+EXPORT_DIR = Path(settings.upload_dir) / "rgpd_exports"
+EXPORT_JOB_TTL_SECONDS = 24 * 3600
+
+
+def export_file_path(user_id: int, job_id: str) -> Path:
+    """Archive path of a background export job"""
+    return EXPORT_DIR / str(user_id) / f"{job_id}.zip"
+
+
+def get_export_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status of a background export job (None if unknown or expired)"""
+    return get_cache(f"rgpd_export:{job_id}")
+
+
+def save_export_job(job: Dict[str, Any]) -> bool:
+    """Store a job's status (False if the job store, Redis, is unavailable)"""
+    return set_cache(f"rgpd_export:{job['job_id']}", job, ttl=EXPORT_JOB_TTL_SECONDS)
+
+
+def purge_expired_exports(
+    max_age_seconds: int = EXPORT_JOB_TTL_SECONDS, now: Optional[float] = None
+) -> int:
+    """
+    Delete export archives (and leftover partial files) older than `max_age_seconds`.
+
+    Past the job TTL the download link no longer resolves, so the archive is
+    personal data with no remaining purpose. Empty per-user directories are removed.
+
+    Returns:
+        Number of files deleted
+    """
+    if not EXPORT_DIR.exists():
+        return 0
+
+    cutoff = (now if now is not None else time.time()) - max_age_seconds
+    deleted = 0
+    for user_dir in EXPORT_DIR.iterdir():
+        if not user_dir.is_dir():
+            continue
+        for path in user_dir.iterdir():
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                deleted += 1
+        if not any(user_dir.iterdir()):
+            user_dir.rmdir()
+    return deleted
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoder for exported column values"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _ZipStream(io.RawIOBase):
+    """
+    Non-seekable sink for zipfile: written bytes are queued until drained.
+
+    zipfile falls back to data descriptors on non-seekable outputs, so the
+    archive can be produced front to back and sent while it is being written.
+    """
+
+    def __init__(self):
+        self._chunks: deque = deque()
+        self._pending = 0
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pending += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._pending = 0
+        return data
+
 
 class RGPDService:
     """
@@ -41,6 +161,9 @@ class RGPDService:
         """
         Export all personal data for a user (RGPD Article 20).
 
+        In-memory variant kept for the JSON endpoint; large accounts should use
+        stream_user_export() (email messages are limited to the most recent ones here).
+
         Args:
             user_id: User ID to export
             include_access_logs: Include access logs in export
@@ -56,19 +179,122 @@ class RGPDService:
             "export_date": datetime.utcnow().isoformat(),
             "user_id": user_id,
             "user": self._export_user_profile(user),
-            "people": self._export_people(user_id),
-            "organisations": self._export_organisations(user_id),
-            "interactions": self._export_interactions(user_id),
-            "tasks": self._export_tasks(user_id),
-            "email_messages": self._export_email_messages(user_id),
         }
-
-        if include_access_logs:
-            export_data["access_logs"] = self._export_access_logs(user_id)
+        for name, query, _ in self._export_sections(user_id, include_access_logs):
+            if name == "email_attachments":
+                continue
+            if name == "email_messages":
+                query = (
+                    query.order_by(None)
+                    .order_by(EmailMessage.received_at.desc())
+                    .limit(DICT_EXPORT_EMAIL_LIMIT)
+                )
+            export_data[name] = json.loads(
+                json.dumps(
+                    [dict(row._mapping) for row in self.db.execute(query)],
+                    default=_json_default,
+                )
+            )
 
         logger.info(f"Exported data for user {user_id}")
         return export_data
 
+    def stream_user_export(
+        self,
+        user_id: int,
+        include_access_logs: bool = False,
+        progress: Optional[ExportProgress] = None,
+    ) -> Iterator[bytes]:
+        """
+        Stream all personal data for a user as a zip archive (RGPD Article 20).
+
+        Archive layout:
+            user.json                  user profile
+            <section>.jsonl            one JSON object per line, section by section
+            attachments/<id>_<name>    stored attachment contents
+            manifest.json              export date and row counts (written last)
+
+        Rows are read as plain column tuples with a server-side cursor (yield_per),
+        never as ORM objects, and zip output is yielded as soon as
+        EXPORT_CHUNK_BYTES are pending: memory stays bounded by one batch of rows
+        plus one chunk, whatever the size of the account.
+
+        Args:
+            user_id: User ID to export
+            include_access_logs: Include access logs in export
+            progress: Called with (section, exported_rows, total_rows) after each batch
+        """
+        user = self.db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise ValueError(f"User {user_id} not found")
+
+        sections = self._export_sections(user_id, include_access_logs)
+        totals = {name: self._count(query) for name, query, _ in sections}
+        total_rows = sum(totals.values())
+        exported_rows = 0
+        counts: Dict[str, int] = {}
+
+        sink = _ZipStream()
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+        archive.writestr(
+            "user.json", json.dumps(self._export_user_profile(user), default=_json_default)
+        )
+
+        for name, query, batch_size in sections:
+            counts[name] = 0
+            with archive.open(f"{name}.jsonl", mode="w", force_zip64=True) as entry:
+                result = self.db.execute(query.execution_options(yield_per=batch_size))
+                for rows in result.partitions():
+                    for row in rows:
+                        record = dict(row._mapping)
+                        if name == "email_attachments":
+                            record["archive_path"] = self._attachment_archive_path(record)
+                            del record["storage_path"]
+                        entry.write(json.dumps(record, default=_json_default).encode() + b"\n")
+                        if sink.pending >= EXPORT_CHUNK_BYTES:
+                            yield sink.drain()
+                    counts[name] += len(rows)
+                    exported_rows += len(rows)
+                    if progress:
+                        progress(name, exported_rows, total_rows)
+            if sink.pending:
+                yield sink.drain()
+
+        # Attachment contents: second pass over the (small) attachment rows, one file at a time
+        attachments_included = 0
+        query = next(query for name, query, _ in sections if name == "email_attachments")
+        result = self.db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            record = dict(row._mapping)
+            archive_path = self._attachment_archive_path(record)
+            if not archive_path:
+                continue
+            with open(record["storage_path"], "rb") as source, archive.open(
+                archive_path, mode="w", force_zip64=True
+            ) as entry:
+                while chunk := source.read(EXPORT_CHUNK_BYTES):
+                    entry.write(chunk)
+                    if sink.pending >= EXPORT_CHUNK_BYTES:
+                        yield sink.drain()
+            attachments_included += 1
+
+        archive.writestr(
+            "manifest.json",
+            json.dumps(
+                {
+                    "export_date": datetime.utcnow().isoformat(),
+                    "user_id": user_id,
+                    "counts": counts,
+                    "attachments_included": attachments_included,
+                }
+            ),
+        )
+        archive.close()
+        yield sink.drain()
+
+        logger.info(f"Streamed data export for user {user_id}: {counts}")
+
     def anonymize_user_data(self, user_id: int, reason: str = "User request") -> Dict[str, int]:
         """
         Anonymize all personal data for a user (RGPD Article 17).
@@ -83,47 +309,36 @@ class RGPDService:
         Returns:
             Dictionary with counts of anonymized records
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
+        if not self.db.query(User.id).filter(User.id == user_id).first():
             raise ValueError(f"User {user_id} not found")
 
-        counts = {
-            "user": 0,
-            "people": 0,
-            "organisations": 0,
-            "interactions": 0,
-            "tasks": 0,
-            "email_messages": 0,
-            "email_attachments": 0,
-        }
-
-        # Log the anonymization request
+        # Log the anonymization request (committed with the first batch)
         self._log_anonymization(user_id, reason)
 
-        # Anonymize user profile
-        counts["user"] = self._anonymize_user_profile(user)
-
-        # Anonymize related people
-        counts["people"] = self._anonymize_people(user_id)
-
-        # Anonymize organisations created by user
-        counts["organisations"] = self._anonymize_organisations(user_id)
+        engine = AnonymizationEngine(self.db, audit_user_agent="RGPD_User_Erasure")
+        counts = engine.run(
+            f"user:{user_id}", user_data_plans(select(User.id).where(User.id == user_id))
+        )
+        logger.info(f"Anonymized user {user_id} data. Counts: {counts}. Reason: {reason}")
 
-        # Anonymize interactions
-        counts["interactions"] = self._anonymize_interactions(user_id)
+        return counts
 
-        # Anonymize tasks
-        counts["tasks"] = self._anonymize_tasks(user_id)
+    def anonymize_inactive_users(self, cutoff: datetime) -> Dict[str, int]:
+        """
+        Anonymize every user inactive since cutoff, with their data, in one set-based run.
 
-        # Anonymize email messages
-        counts["email_messages"] = self._anonymize_email_messages(user_id)
-        counts["email_attachments"] = self._anonymize_email_attachments(user_id)
+        The run is checkpointed per day: calling it again the same day resumes an
+        interrupted run instead of starting over; once completed, a new call
+        starts a fresh run.
 
-        self.db.commit()
-        logger.info(
-            f"Anonymized user {user_id} data. Counts: {counts}. Reason: {reason}"
+        Returns:
+            Dictionary with counts of anonymized records ("user": accounts erased)
+        """
+        engine = AnonymizationEngine(self.db, audit_user_agent="RGPD_Inactive_Users")
+        counts = engine.run(
+            f"inactive_users:{cutoff.date().isoformat()}", user_data_plans(inactive_users(cutoff))
         )
-
+        logger.info(f"Anonymized inactive users (cutoff {cutoff}). Counts: {counts}")
         return counts
 
     def get_access_logs(
@@ -172,214 +387,175 @@ class RGPDService:
         return {
             "id": user.id,
             "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "phone": user.phone,
+            "username": user.username,
+            "full_name": user.full_name,
             "created_at": user.created_at.isoformat() if user.created_at else None,
-            "last_login": user.last_login.isoformat() if user.last_login else None,
+            "last_login": user.last_login_at.isoformat() if user.last_login_at else None,
         }
 
-    def _export_people(self, user_id: int) -> List[Dict[str, Any]]:
-        """Export people created by user"""
-        people = (
-            self.db.query(Person)
-            .filter(or_(Person.created_by_id == user_id, Person.assigned_to_id == user_id))
-            .all()
-        )
-
-        return [
-            {
-                "id": p.id,
-                "first_name": p.first_name,
-                "last_name": p.last_name,
-                "email": p.email,
-                "phone": p.phone,
-                "job_title": p.job_title,
-                "created_at": p.created_at.isoformat() if p.created_at else None,
-            }
-            for p in people
-        ]
+    def _export_sections(self, user_id: int, include_access_logs: bool) -> List[Tuple[str, Any, int]]:
+        """
+        Export sections as (name, column select, batch size), in archive order
 
-    def _export_organisations(self, user_id: int) -> List[Dict[str, Any]]:
-        """Export organisations created by user"""
-        orgs = (
-            self.db.query(Organisation)
-            .filter(or_(Organisation.created_by_id == user_id, Organisation.owner_id == user_id))
-            .all()
+        - organisations created or owned by the user
+        - people linked to those organisations
+        - interactions created by or assigned to the user
+        - tasks assigned to or created by the user
+        - email messages (and attachments) of the user's mailboxes
+        """
+        owned_orgs = select(Organisation.id).where(
+            or_(Organisation.created_by == user_id, Organisation.owner_id == user_id)
         )
-
-        return [
-            {
-                "id": o.id,
-                "name": o.name,
-                "email": o.email,
-                "phone": o.phone,
-                "website": o.website,
-                "created_at": o.created_at.isoformat() if o.created_at else None,
-            }
-            for o in orgs
+        mailboxes = select(UserEmailAccount.id).where(UserEmailAccount.user_id == user_id)
+        messages = select(EmailMessage.id).where(EmailMessage.account_id.in_(mailboxes))
+
+        sections = [
+            (
+                "people",
+                select(
+                    Person.id,
+                    Person.first_name,
+                    Person.last_name,
+                    Person.email,
+                    Person.personal_email,
+                    Person.phone,
+                    Person.job_title,
+                    Person.created_at,
+                )
+                .where(
+                    Person.id.in_(
+                        select(PersonOrganizationLink.person_id).where(
+                            PersonOrganizationLink.organisation_id.in_(owned_orgs)
+                        )
+                    )
+                )
+                .order_by(Person.id),
+                EXPORT_BATCH_SIZE,
+            ),
+            (
+                "organisations",
+                select(
+                    Organisation.id,
+                    Organisation.name,
+                    Organisation.email,
+                    Organisation.phone,
+                    Organisation.website,
+                    Organisation.created_at,
+                )
+                .where(Organisation.id.in_(owned_orgs))
+                .order_by(Organisation.id),
+                EXPORT_BATCH_SIZE,
+            ),
+            (
+                "interactions",
+                select(
+                    Interaction.id,
+                    Interaction.type,
+                    Interaction.title,
+                    Interaction.description.label("notes"),
+                    Interaction.interaction_date.label("date"),
+                    Interaction.created_at,
+                )
+                .where(or_(Interaction.created_by == user_id, Interaction.assignee_id == user_id))
+                .order_by(Interaction.id),
+                EXPORT_BATCH_SIZE,
+            ),
+            (
+                "tasks",
+                select(
+                    Task.id,
+                    Task.title,
+                    Task.description,
+                    Task.status,
+                    Task.due_date,
+                    Task.created_at,
+                )
+                .where(or_(Task.assigned_to == user_id, Task.created_by == user_id))
+                .order_by(Task.id),
+                EXPORT_BATCH_SIZE,
+            ),
+            (
+                "email_messages",
+                select(
+                    EmailMessage.id,
+                    EmailMessage.subject,
+                    EmailMessage.sender_email,
+                    EmailMessage.sender_name,
+                    EmailMessage.recipients_to,
+                    EmailMessage.recipients_cc,
+                    EmailMessage.sent_at,
+                    EmailMessage.received_at,
+                    EmailMessage.snippet,
+                    EmailMessage.body_text,
+                )
+                .where(EmailMessage.id.in_(messages))
+                .order_by(EmailMessage.id),
+                EMAIL_EXPORT_BATCH_SIZE,
+            ),
+            (
+                "email_attachments",
+                select(
+                    EmailAttachment.id,
+                    EmailAttachment.email_message_id,
+                    EmailAttachment.filename,
+                    EmailAttachment.content_type,
+                    EmailAttachment.size_bytes,
+                    EmailAttachment.storage_path,
+                )
+                .where(EmailAttachment.email_message_id.in_(messages))
+                .order_by(EmailAttachment.id),
+                EXPORT_BATCH_SIZE,
+            ),
         ]
 
-    def _export_interactions(self, user_id: int) -> List[Dict[str, Any]]:
-        """Export interactions involving user"""
-        interactions = self.db.query(Interaction).filter(Interaction.owner_id == user_id).all()
-
-        return [
-            {
-                "id": i.id,
-                "type": i.interaction_type.value if i.interaction_type else None,
-                "subject": i.subject,
-                "notes": i.notes,
-                "date": i.date.isoformat() if i.date else None,
-                "created_at": i.created_at.isoformat() if i.created_at else None,
-            }
-            for i in interactions
-        ]
-
-    def _export_tasks(self, user_id: int) -> List[Dict[str, Any]]:
-        """Export tasks assigned to or created by user"""
-        tasks = (
-            self.db.query(Task)
-            .filter(or_(Task.assigned_to_id == user_id, Task.created_by_id == user_id))
-            .all()
-        )
+        if include_access_logs:
+            sections.append(
+                (
+                    "access_logs",
+                    select(
+                        DataAccessLog.id,
+                        DataAccessLog.entity_type,
+                        DataAccessLog.entity_id,
+                        DataAccessLog.access_type,
+                        DataAccessLog.endpoint,
+                        DataAccessLog.purpose,
+                        DataAccessLog.ip_address,
+                        DataAccessLog.accessed_at,
+                    )
+                    .where(DataAccessLog.user_id == user_id)
+                    .order_by(DataAccessLog.id),
+                    EXPORT_BATCH_SIZE,
+                )
+            )
 
-        return [
-            {
-                "id": t.id,
-                "title": t.title,
-                "description": t.description,
-                "status": t.status.value if t.status else None,
-                "due_date": t.due_date.isoformat() if t.due_date else None,
-                "created_at": t.created_at.isoformat() if t.created_at else None,
-            }
-            for t in tasks
-        ]
+        return sections
 
-    def _export_email_messages(self, user_id: int) -> List[Dict[str, Any]]:
-        """Export email messages for user"""
-        messages = (
-            self.db.query(EmailMessage).filter(EmailMessage.user_email_account_id == user_id).all()
-        )
+    def _count(self, query) -> int:
+        return self.db.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).scalar_one()
 
-        return [
-            {
-                "id": m.id,
-                "subject": m.subject,
-                "from_address": m.from_address,
-                "to_addresses": m.to_addresses,
-                "received_at": m.received_at.isoformat() if m.received_at else None,
-                "body_preview": m.body_preview[:200] if m.body_preview else None,
-            }
-            for m in messages[:100]  # Limit to 100 most recent
-        ]
+    @staticmethod
+    def _attachment_archive_path(record: Dict[str, Any]) -> Optional[str]:
+        """
+        Archive path of a stored attachment, None if its content is not available locally
 
-    def _export_access_logs(self, user_id: int) -> List[Dict[str, Any]]:
-        """Export access logs for user"""
-        return self.get_access_logs(user_id=user_id, limit=1000)
+        Only files under settings.upload_dir are read (remote storage such as s3://
+        is exported as metadata only).
+        """
+        storage_path = record.get("storage_path")
+        if not storage_path or "://" in storage_path:
+            return None
+        path = Path(storage_path).resolve()
+        if not path.is_file() or not path.is_relative_to(Path(settings.upload_dir).resolve()):
+            return None
+        filename = Path(record.get("filename") or "attachment").name
+        return f"attachments/{record['id']}_{filename}"
 
     # =========================================================================
     # Anonymization helpers
     # =========================================================================
 
-    def _anonymize_user_profile(self, user: User) -> int:
-        """Anonymize user profile"""
-        anon_id = f"anonymized_{user.id}_{int(datetime.utcnow().timestamp())}"
-
-        user.email = f"{anon_id}@anonymized.local"
-        user.first_name = "Anonymized"
-        user.last_name = "User"
-        user.phone = None
-        user.password_hash = "ANONYMIZED"
-        user.is_active = False
-
-        self.db.add(user)
-        return 1
-
-    def _anonymize_people(self, user_id: int) -> int:
-        """Anonymize people created by user"""
-        result = self.db.execute(
-            update(Person)
-            .where(or_(Person.created_by_id == user_id, Person.assigned_to_id == user_id))
-            .values(
-                first_name="Anonymized",
-                last_name="Person",
-                email=None,
-                personal_email=None,
-                phone=None,
-                personal_phone=None,
-                mobile=None,
-                notes=None,
-                linkedin_url=None,
-            )
-        )
-        return result.rowcount
-
-    def _anonymize_organisations(self, user_id: int) -> int:
-        """Anonymize organisations created by user"""
-        result = self.db.execute(
-            update(Organisation)
-            .where(or_(Organisation.created_by_id == user_id, Organisation.owner_id == user_id))
-            .values(
-                name="Anonymized Organisation",
-                email=None,
-                phone=None,
-                website=None,
-                address=None,
-                notes=None,
-            )
-        )
-        return result.rowcount
-
-    def _anonymize_interactions(self, user_id: int) -> int:
-        """Anonymize interactions"""
-        result = self.db.execute(
-            update(Interaction).where(Interaction.owner_id == user_id).values(notes="[Anonymized]")
-        )
-        return result.rowcount
-
-    def _anonymize_tasks(self, user_id: int) -> int:
-        """Anonymize tasks"""
-        result = self.db.execute(
-            update(Task)
-            .where(or_(Task.assigned_to_id == user_id, Task.created_by_id == user_id))
-            .values(title="Anonymized Task", description="[Anonymized]")
-        )
-        return result.rowcount
-
-    def _anonymize_email_messages(self, user_id: int) -> int:
-        """Anonymize email messages"""
-        result = self.db.execute(
-            update(EmailMessage)
-            .where(EmailMessage.user_email_account_id == user_id)
-            .values(
-                subject="[Anonymized]",
-                body_text="[Anonymized]",
-                body_html="[Anonymized]",
-                from_address="anonymized@local",
-                to_addresses=[],
-                cc_addresses=[],
-                bcc_addresses=[],
-            )
-        )
-        return result.rowcount
-
-    def _anonymize_email_attachments(self, user_id: int) -> int:
-        """Anonymize email attachments"""
-        # Find attachments for user's email messages
-        message_ids = (
-            self.db.query(EmailMessage.id)
-            .filter(EmailMessage.user_email_account_id == user_id)
-            .subquery()
-        )
-
-        result = self.db.execute(
-            update(EmailAttachment)
-            .where(EmailAttachment.email_message_id.in_(message_ids))
-            .values(filename="anonymized.bin", content_type="application/octet-stream")
-        )
-        return result.rowcount
-
     def _log_anonymization(self, user_id: int, reason: str) -> None:
         """Log the anonymization action"""
         log_entry = DataAccessLog(
@@ -12,7 +12,6 @@ Confidence scoring:
 - < 0.92 → HITL validation required
 """
 
-import hashlib
 import json
 import logging
 import os
@@ -27,6 +26,7 @@ from core.config import settings
 from models.ai_memory import AIMemory
 from models.autofill_suggestion import AutofillSuggestion
 from services.ai_config_loader import get_ai_config_loader
+from services.ai_parse_cache import content_key, get_parse_cache, normalise_text
 
 logger = logging.getLogger("crm-api")
 
@@ -43,9 +43,11 @@ class SignatureParserService:
 
     SAFE_FIELDS = {'email', 'phone', 'mobile', 'website', 'personal_email', 'personal_phone'}
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, rate_limiter=None):
         self.db = db
         self.config_loader = get_ai_config_loader(db)
+        # Limiteur partagé (async wait()), attendu avant chaque appel LLM
+        self.rate_limiter = rate_limiter
 
     async def parse_signature(
         self,
@@ -77,14 +79,7 @@ class SignatureParserService:
         """
         start_time = time.time()
 
-        # 1. Check cache
-        if use_cache:
-            cached = self._check_cache(email_body, team_id)
-            if cached:
-                logger.info(f"✅ Cache hit for signature parsing")
-                return cached
-
-        # 2. Extract signature zone (heuristic)
+        # 1. Extract signature zone (heuristic)
         signature_text = self._extract_signature_zone(email_body)
 
         if not signature_text or len(signature_text) < 10:
@@ -95,6 +90,14 @@ class SignatureParserService:
                 "processing_time_ms": int((time.time() - start_time) * 1000)
             }
 
+        # 2. Check cache (clé = zone de signature normalisée, pas le corps complet)
+        normalised_signature = normalise_text(signature_text)
+        if use_cache:
+            cached = self._check_cache(normalised_signature, team_id)
+            if cached:
+                logger.info(f"✅ Cache hit for signature parsing ({cached['cache_match']})")
+                return cached
+
         # 2.5. 🌐 Web enrichment (Acte V): Try to get company context
         web_context = None
         if os.getenv("AUTOFILL_USE_WEB_ENRICHMENT", "true").lower() == "true":
@@ -105,7 +108,9 @@ class SignatureParserService:
             except Exception as e:
                 logger.warning(f"⚠️ Web enrichment failed (non-blocking): {e}")
 
-        # 3. Try AI providers in order
+        # 3. Try AI providers in order (après le cache: un hit n'attend pas le limiteur)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.wait()
         result = None
 
         # Try Ollama local first
@@ -163,7 +168,7 @@ class SignatureParserService:
 
         self._save_to_cache(
             team_id=team_id,
-            email_body=email_body,
+            normalised_signature=normalised_signature,
             result=result,
             processing_time_ms=processing_time_ms,
             email_id=email_id
@@ -590,47 +595,136 @@ JSON output:"""
         confidence = score / max_score if max_score > 0 else 0.0
         return round(confidence, 3)
 
-    def _check_cache(self, email_body: str, team_id: int) -> Optional[Dict]:
-        """Check if we have a cached result for this prompt"""
-        prompt_hash = hashlib.sha256(email_body.encode()).hexdigest()
+    def _check_cache(self, normalised_signature: str, team_id: int) -> Optional[Dict]:
+        """
+        Check if we have a cached result for this signature
+
+        1. Cache mémoire partagé entre équipes (exact + quasi-doublon SimHash)
+        2. AIMemory par prompt_hash (toutes équipes confondues)
+        """
+        cache = get_parse_cache("signature_parse")
+        if not cache.warmed:
+            self._warm_cache(cache)
+
+        found = cache.lookup(
+            normalised_signature,
+            team_id,
+            accept=lambda entry: self._same_contact(entry.get("data") or {}, normalised_signature)
+        )
+        if found:
+            entry, exact = found
+            return self._cached_response(entry, "exact" if exact else "near_duplicate")
 
         cached = self.db.query(AIMemory).filter(
-            AIMemory.team_id == team_id,
-            AIMemory.prompt_hash == prompt_hash,
+            AIMemory.prompt_hash == content_key(normalised_signature),
             AIMemory.task_type == "signature_parse",
             AIMemory.success == True
         ).order_by(AIMemory.created_at.desc()).first()
 
         if cached:
-            return {
-                "success": True,
+            cache.record_backing_hit()
+            entry = {
                 "data": cached.response_json,  # response_json already contains the data dict
                 "confidence": cached.confidence_score,
-                "model_used": f"{cached.model_used} (cached)",
-                "processing_time_ms": 0,
-                "from_cache": True
+                "model_used": cached.model_used,
             }
+            cache.store(normalised_signature, team_id, entry)
+            return self._cached_response(entry, "exact")
 
+        cache.record_miss()
         return None
 
+    @staticmethod
+    def _same_contact(data: Dict, normalised_signature: str) -> bool:
+        """
+        Un quasi-doublon n'est réutilisé que si les identifiants de la personne
+        (email, nom) figurent dans la nouvelle signature: deux collègues d'une
+        même entreprise ont des signatures proches mais pas le même contact.
+
+        Tous les autres champs extraits (téléphones, poste, adresse...) doivent
+        aussi y figurer: une valeur modifiée est justement la mise à jour que
+        l'autofill doit détecter, le quasi-doublon est alors reparsé.
+        """
+        identifiers = [data.get("email"), data.get("last_name") or data.get("name")]
+        identifiers = [str(value).lower() for value in identifiers if value]
+        if not identifiers or not all(value in normalised_signature for value in identifiers):
+            return False
+
+        signature_digits = re.sub(r"\D", "", normalised_signature)
+        for field, value in data.items():
+            if not value or not isinstance(value, str):
+                continue
+            if field in ("phone", "mobile", "personal_phone"):
+                # Format libre ("+33 1 ..." / "01 ..."): comparaison sur les 9 derniers chiffres
+                digits = re.sub(r"\D", "", value)[-9:]
+                if digits not in signature_digits:
+                    return False
+                continue
+            text = normalise_text(value)
+            if field in ("website", "linkedin"):
+                text = re.sub(r"^(https?://)?(www\.)?", "", text).rstrip("/")
+            if text not in normalised_signature:
+                return False
+        return True
+
+    @staticmethod
+    def _cached_response(entry: Dict, cache_match: str) -> Dict:
+        return {
+            "success": True,
+            "data": entry["data"],
+            "confidence": entry["confidence"],
+            "model_used": f"{entry['model_used']} (cached)",
+            "processing_time_ms": 0,
+            "from_cache": True,
+            "cache_match": cache_match
+        }
+
+    def _warm_cache(self, cache, limit: int = 2000):
+        """Précharge les dernières signatures parsées (quasi-doublons inter-process)"""
+        try:
+            rows = self.db.query(
+                AIMemory.prompt_text,
+                AIMemory.team_id,
+                AIMemory.response_json,
+                AIMemory.confidence_score,
+                AIMemory.model_used
+            ).filter(
+                AIMemory.task_type == "signature_parse",
+                AIMemory.success == True
+            ).order_by(AIMemory.created_at.desc()).limit(limit).all()
+
+            cache.warm(
+                (
+                    normalise_text(row.prompt_text),
+                    row.team_id,
+                    {
+                        "data": row.response_json,
+                        "confidence": row.confidence_score,
+                        "model_used": row.model_used,
+                    },
+                )
+                for row in reversed(rows)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Signature cache warm-up failed: {e}")
+            cache.warmed = True
+
     def _save_to_cache(
         self,
         team_id: int,
-        email_body: str,
+        normalised_signature: str,
         result: Dict,
         processing_time_ms: int,
         email_id: Optional[int] = None
     ):
         """Save result to cache for future use"""
         try:
-            prompt_hash = hashlib.sha256(email_body.encode()).hexdigest()
-
             memory = AIMemory(
                 team_id=team_id,
                 model_used=result.get("model_used", "unknown"),
                 provider=result.get("provider", "unknown"),
-                prompt_hash=prompt_hash,
-                prompt_text=email_body[:1000],  # Truncate for storage
+                prompt_hash=content_key(normalised_signature),
+                prompt_text=normalised_signature[:1000],  # Truncate for storage
                 response_json=result.get("data", {}),
                 confidence_score=result.get("confidence"),
                 processing_time_ms=processing_time_ms,
@@ -643,6 +737,17 @@ JSON output:"""
             self.db.add(memory)
             self.db.commit()
 
+            if result.get("success"):
+                get_parse_cache("signature_parse").store(
+                    normalised_signature,
+                    team_id,
+                    {
+                        "data": result.get("data", {}),
+                        "confidence": result.get("confidence"),
+                        "model_used": result.get("model_used", "unknown"),
+                    },
+                )
+
         except Exception as e:
             logger.error(f"Failed to save AI memory: {e}")
             self.db.rollback()
@@ -6,6 +6,7 @@ from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session, joinedload
 
 from core.exceptions import ResourceNotFound, ValidationError
+from core.task_stats import due_day_bounds, get_task_stats
 from models.organisation_activity import OrganisationActivityType
 from models.task import Task, TaskCategory, TaskPriority, TaskStatus
 from schemas.task import TaskCreate, TaskFilterParams, TaskUpdate
@@ -126,15 +127,22 @@ class TaskService(BaseService[Task, TaskCreate, TaskUpdate]):
 
     def _apply_view_filter(self, query, view: str):
         """Applique les filtres de vue spéciale (overdue, today, next7)"""
-        today = date.today()
+        # Mêmes tranches que les statistiques (core.task_stats)
+        day_start, tomorrow, week_end = due_day_bounds(date.today())
         active_statuses = [TaskStatus.TODO, TaskStatus.DOING]
 
         view_conditions = {
-            "overdue": and_(self.model.due_date < today, self.model.status.in_(active_statuses)),
-            "today": and_(self.model.due_date == today, self.model.status.in_(active_statuses)),
+            "overdue": and_(
+                self.model.due_date < day_start, self.model.status.in_(active_statuses)
+            ),
+            "today": and_(
+                self.model.due_date >= day_start,
+                self.model.due_date < tomorrow,
+                self.model.status.in_(active_statuses),
+            ),
             "next7": and_(
-                self.model.due_date > today,
-                self.model.due_date <= today + timedelta(days=7),
+                self.model.due_date >= tomorrow,
+                self.model.due_date < week_end,
                 self.model.status.in_(active_statuses),
             ),
         }
@@ -408,74 +416,17 @@ class TaskService(BaseService[Task, TaskCreate, TaskUpdate]):
 
         return await actions_map[action]()
 
-    async def get_statistics(self) -> dict:
-        """Obtenir les statistiques des tâches"""
-        today = date.today()
-        next_7_days = today + timedelta(days=7)
-
-        total = self.db.query(func.count(self.model.id)).scalar()
-
-        overdue = (
-            self.db.query(func.count(self.model.id))
-            .filter(
-                and_(
-                    self.model.due_date < today,
-                    self.model.status.in_([TaskStatus.TODO, TaskStatus.DOING]),
-                )
-            )
-            .scalar()
-        )
-
-        today_count = (
-            self.db.query(func.count(self.model.id))
-            .filter(
-                and_(
-                    self.model.due_date == today,
-                    self.model.status.in_([TaskStatus.TODO, TaskStatus.DOING]),
-                )
-            )
-            .scalar()
-        )
-
-        next_7_count = (
-            self.db.query(func.count(self.model.id))
-            .filter(
-                and_(
-                    self.model.due_date > today,
-                    self.model.due_date <= next_7_days,
-                    self.model.status.in_([TaskStatus.TODO, TaskStatus.DOING]),
-                )
-            )
-            .scalar()
-        )
-
-        # Stats par statut
-        by_status = {}
-        for status in TaskStatus:
-            count = (
-                self.db.query(func.count(self.model.id))
-                .filter(self.model.status == status)
-                .scalar()
-            )
-            by_status[status.value] = count
-
-        # Stats par priorité
-        by_priority = {}
-        for priority in TaskPriority:
-            count = (
-                self.db.query(func.count(self.model.id))
-                .filter(self.model.priority == priority)
-                .scalar()
-            )
-            by_priority[priority.value] = count
-
+    async def get_statistics(
+        self,
+        *,
+        assigned_to: Optional[int] = None,
+        team_id: Optional[int] = None,
+    ) -> dict:
+        """Obtenir les statistiques des tâches (une requête, mises en cache)"""
+        stats = get_task_stats(self.db, assigned_to=assigned_to, team_id=team_id)
         return {
-            "total": total,
-            "overdue": overdue,
-            "today": today_count,
-            "next_7_days": next_7_count,
-            "by_status": by_status,
-            "by_priority": by_priority,
+            key: stats[key]
+            for key in ("total", "overdue", "today", "next_7_days", "by_status", "by_priority")
         }
 
     async def create_auto_task(
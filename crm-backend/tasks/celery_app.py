@@ -75,6 +75,9 @@ celery_app = Celery(
         "tasks.email_tasks",
         "tasks.email_sync",
         "tasks.rgpd_tasks",
+        "tasks.dashboard_tasks",
+        "tasks.quality_tasks",
+        "tasks.maintenance_tasks",
     ],
 )
 
@@ -98,6 +101,12 @@ celery_app.conf.update(
     task_reject_on_worker_lost=True,
     # Beat schedule (tâches planifiées)
     beat_schedule={
+        # Partitions mensuelles des tables de logs à venir (quotidien 0h15)
+        "ensure-log-partitions": {
+            "task": "tasks.maintenance_tasks.ensure_log_partitions",
+            "schedule": crontab(hour=0, minute=15),
+            "options": {"expires": 3600},
+        },
         # Vérification workflows d'inactivité (quotidien à 2h du matin)
         "check-inactivity-workflows": {
             "task": "tasks.workflow_tasks.check_inactivity_workflows",
@@ -131,6 +140,11 @@ celery_app.conf.update(
             "schedule": crontab(hour=1, minute=0, day_of_week=1),
             "kwargs": {"inactive_days": 730},  # 2 years
         },
+        # RGPD: Purge des archives d'export expirées (toutes les heures)
+        "purge-rgpd-exports": {
+            "task": "tasks.rgpd_tasks.purge_expired_exports",
+            "schedule": crontab(minute=20),
+        },
         # RGPD: Nettoyage des logs d'accès anciens (1er de chaque mois à 2h)
         "cleanup-access-logs": {
             "task": "tasks.rgpd_tasks.cleanup_old_access_logs",
@@ -153,6 +167,18 @@ celery_app.conf.update(
             "schedule": crontab(minute="*/10"),
             "options": {"expires": 600},
         },
+        # Réconciliation des statistiques dashboard matérialisées (quotidien 1h30)
+        "refresh-dashboard-stats": {
+            "task": "tasks.dashboard_tasks.refresh_dashboard_stats",
+            "schedule": crontab(hour=1, minute=30),
+            "options": {"expires": 3600},
+        },
+        # Scores qualité des données, toute la population (quotidien 2h30)
+        "refresh-data-quality-scores": {
+            "task": "tasks.quality_tasks.refresh_data_quality_scores",
+            "schedule": crontab(hour=2, minute=30),
+            "options": {"expires": 3600},
+        },
         # Nettoyage des anciennes interactions email (quotidien 3h)
         "cleanup-old-emails": {
             "task": "tasks.email_sync.cleanup_old_emails_task",
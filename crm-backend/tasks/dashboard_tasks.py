@@ -0,0 +1,33 @@
+"""
+Tâches Celery pour les statistiques dashboard matérialisées
+
+Les compteurs (dashboard_daily_stats, dashboard_stat_counters) sont maintenus
+incrémentalement à chaque écriture; la reconstruction nocturne corrige toute dérive
+(écritures SQL brutes, imports massifs hors ORM, ...).
+"""
+
+import logging
+
+from core.database import SessionLocal
+from core.dashboard_rollups import rebuild_dashboard_rollups
+from tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="tasks.dashboard_tasks.refresh_dashboard_stats")
+def refresh_dashboard_stats() -> dict:
+    """
+    Reconstruit les statistiques dashboard depuis les tables sources
+
+    Exécutée quotidiennement par Celery Beat (1h30)
+    """
+    db = SessionLocal()
+    try:
+        return rebuild_dashboard_rollups(db)
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Erreur reconstruction statistiques dashboard: {exc}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,33 @@
+"""
+Tâches Celery de maintenance de la base
+
+Crée à l'avance les partitions mensuelles des tables de logs (core.log_partitions).
+La rétention (suppression des partitions expirées) reste portée par les tâches de
+nettoyage de chaque table (rgpd_tasks, workflow_tasks, scripts/db_maintenance).
+"""
+
+import logging
+
+from core.database import SessionLocal
+from core.log_partitions import ensure_log_partitions
+from tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="tasks.maintenance_tasks.ensure_log_partitions")
+def ensure_log_partitions_task() -> dict:
+    """
+    Crée les partitions du mois courant et des mois suivants des tables de logs
+
+    Exécutée quotidiennement par Celery Beat (0h15), idempotente
+    """
+    db = SessionLocal()
+    try:
+        return {"created": ensure_log_partitions(db)}
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Erreur création partitions de logs: {exc}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,32 @@
+"""
+Tâches Celery pour les scores qualité des données
+
+Recalcule le score qualité de toutes les personnes et organisations
+(services.quality_scorer), lu ensuite par les indicateurs de santé d'équipe.
+"""
+
+import logging
+
+from core.database import SessionLocal
+from services.quality_scorer import QualityScorer
+from tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="tasks.quality_tasks.refresh_data_quality_scores")
+def refresh_data_quality_scores() -> dict:
+    """
+    Recalcule et persiste les scores qualité de toute la population
+
+    Exécutée quotidiennement par Celery Beat (2h30)
+    """
+    db = SessionLocal()
+    try:
+        return QualityScorer(db).refresh_quality_scores()
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Erreur recalcul scores qualité: {exc}")
+        raise
+    finally:
+        db.close()
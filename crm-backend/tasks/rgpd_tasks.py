@@ -2,6 +2,8 @@
 RGPD Celery Tasks - Automatic Data Anonymization
 
 Tasks for RGPD compliance:
+- Streaming subject-access exports (background job with progress)
+- Purge of expired export archives (24h)
 - Automatic anonymization of inactive users (2 years)
 - Cleanup of old access logs (3 years retention)
 - Regular compliance audits
@@ -10,18 +12,108 @@ Tasks for RGPD compliance:
 import logging
 from datetime import datetime, timedelta
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
+from core.log_partitions import (
+    drop_partitions_before,
+    estimated_rows,
+    expired_partitions,
+    is_partitioned,
+)
 from database import SessionLocal
 from models.data_access_log import DataAccessLog
 from models.user import User
-from services.rgpd_service import RGPDService
+from services.rgpd_anonymizer import inactive_users
+from services.rgpd_service import (
+    RGPDService,
+    export_file_path,
+    purge_expired_exports,
+    save_export_job,
+)
 from tasks.celery_app import celery_app
 
 logger = logging.getLogger(__name__)
 
 
+@celery_app.task(name="tasks.rgpd_tasks.export_user_data")
+def export_user_data(user_id: int, job_id: str, include_access_logs: bool = False) -> dict:
+    """
+    Write a user's streaming RGPD export (zip) to disk, reporting progress.
+
+    The archive is written chunk by chunk to a temporary file, renamed once complete.
+    Job status is kept in the cache (services.rgpd_service.get_export_job):
+    pending → running (section, exported_rows, total_rows) → completed | failed.
+
+    Args:
+        user_id: User ID to export
+        job_id: Job identifier chosen by the caller
+        include_access_logs: Include access logs in export
+
+    Returns:
+        dict: Final job status
+    """
+    job = {
+        "job_id": job_id,
+        "user_id": user_id,
+        "status": "running",
+        "section": None,
+        "exported_rows": 0,
+        "total_rows": 0,
+        "file_path": None,
+        "error": None,
+    }
+    save_export_job(job)
+
+    def progress(section: str, exported_rows: int, total_rows: int) -> None:
+        job.update(section=section, exported_rows=exported_rows, total_rows=total_rows)
+        save_export_job(job)
+
+    path = export_file_path(user_id, job_id)
+    partial = path.with_suffix(".part")
+    db: Session = SessionLocal()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        service = RGPDService(db)
+        with open(partial, "wb") as output:
+            for chunk in service.stream_user_export(
+                user_id, include_access_logs=include_access_logs, progress=progress
+            ):
+                output.write(chunk)
+        partial.replace(path)
+
+        job.update(status="completed", section=None, file_path=str(path))
+        logger.info(f"RGPD export {job_id} completed for user {user_id}: {job['total_rows']} rows")
+
+    except Exception as e:
+        logger.error(f"RGPD export {job_id} failed for user {user_id}: {e}", exc_info=True)
+        partial.unlink(missing_ok=True)
+        job.update(status="failed", error=str(e))
+    finally:
+        db.close()
+
+    save_export_job(job)
+    return job
+
+
+@celery_app.task(name="tasks.rgpd_tasks.purge_expired_exports")
+def purge_expired_exports_task() -> dict:
+    """
+    Delete subject-access export archives whose job has expired.
+
+    Returns:
+        dict: Number of archives deleted
+    """
+    deleted = purge_expired_exports()
+    if deleted:
+        logger.info(f"Purged {deleted} expired RGPD export archives")
+    return {
+        "task": "purge_expired_exports",
+        "execution_date": datetime.utcnow().isoformat(),
+        "deleted": deleted,
+    }
+
+
 @celery_app.task(name="tasks.rgpd_tasks.anonymize_inactive_users", bind=True)
 def anonymize_inactive_users(self, inactive_days: int = 730) -> dict:
     """
@@ -29,10 +121,14 @@ def anonymize_inactive_users(self, inactive_days: int = 730) -> dict:
 
     RGPD Compliance: Right to be forgotten (Article 17).
     Users are considered inactive if:
-    - last_login is older than inactive_days AND
-    - Account is not admin AND
+    - last_login_at is older than inactive_days AND
+    - Account is not superuser AND
     - Account is not already anonymized
 
+    All inactive users are anonymized together by set-based batches
+    (services.rgpd_anonymizer); a run interrupted the same day resumes from its
+    checkpoints.
+
     Args:
         inactive_days: Number of days of inactivity before anonymization (default: 730 = 2 years)
 
@@ -43,70 +139,42 @@ def anonymize_inactive_users(self, inactive_days: int = 730) -> dict:
     try:
         cutoff_date = datetime.utcnow() - timedelta(days=inactive_days)
 
-        # Find inactive users
-        inactive_users = (
-            db.query(User)
-            .filter(
-                and_(
-                    or_(
-                        User.last_login < cutoff_date,
-                        User.last_login.is_(None),  # Never logged in
-                    ),
-                    User.created_at < cutoff_date,  # Account older than cutoff
-                    User.is_active == True,  # Not already disabled
-                    User.is_admin == False,  # Don't anonymize admins
-                    ~User.email.like("%@anonymized.local"),  # Not already anonymized
-                )
-            )
+        inactive = inactive_users(cutoff_date).subquery()
+        found = db.query(func.count()).select_from(inactive).scalar()
+        sample = (
+            db.query(User.id, User.last_login_at)
+            .filter(User.id.in_(select(inactive.c.id)))
+            .order_by(User.id)
+            .limit(10)
             .all()
         )
 
-        anonymized_count = 0
-        failed_count = 0
-        results = []
-
-        for user in inactive_users:
-            try:
-                service = RGPDService(db)
-                counts = service.anonymize_user_data(
-                    user_id=user.id, reason=f"Automatic anonymization after {inactive_days} days inactivity"
-                )
-
-                results.append(
-                    {
-                        "user_id": user.id,
-                        "email": user.email,
-                        "last_login": user.last_login.isoformat() if user.last_login else None,
-                        "anonymized_records": counts,
-                    }
-                )
-
-                anonymized_count += 1
-                logger.info(f"Auto-anonymized user {user.id} ({user.email}) - inactive since {user.last_login}")
-
-            except Exception as e:
-                logger.error(f"Failed to anonymize user {user.id}: {e}", exc_info=True)
-                failed_count += 1
-                db.rollback()
+        counts = RGPDService(db).anonymize_inactive_users(cutoff_date)
 
         summary = {
             "task": "anonymize_inactive_users",
             "execution_date": datetime.utcnow().isoformat(),
             "inactive_days": inactive_days,
             "cutoff_date": cutoff_date.isoformat(),
-            "found": len(inactive_users),
-            "anonymized": anonymized_count,
-            "failed": failed_count,
-            "results": results[:10],  # Limit results to first 10
+            "found": found,
+            "anonymized": counts["user"],
+            "failed": 0,
+            "anonymized_records": counts,
+            "results": [  # Limit results to first 10
+                {
+                    "user_id": user_id,
+                    "last_login": last_login.isoformat() if last_login else None,
+                }
+                for user_id, last_login in sample
+            ],
         }
 
-        logger.info(
-            f"Anonymization task completed: {anonymized_count} users anonymized, {failed_count} failed"
-        )
+        logger.info(f"Anonymization task completed: {counts['user']} users anonymized ({counts})")
 
         return summary
 
     except Exception as e:
+        db.rollback()
         logger.error(f"Anonymization task failed: {e}", exc_info=True)
         return {
             "task": "anonymize_inactive_users",
@@ -136,6 +204,21 @@ def cleanup_old_access_logs(self, retention_days: int = 1095) -> dict:
     try:
         cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
 
+        # Partitioned by month: drop whole expired partitions (no DELETE, no bloat)
+        if is_partitioned(db, "data_access_logs"):
+            partitions = expired_partitions(db, "data_access_logs", cutoff_date)
+            deleted = estimated_rows(db, partitions)
+            drop_partitions_before(db, "data_access_logs", cutoff_date)
+            logger.info(f"Dropped {len(partitions)} access log partitions (~{deleted} rows)")
+            return {
+                "task": "cleanup_old_access_logs",
+                "execution_date": datetime.utcnow().isoformat(),
+                "retention_days": retention_days,
+                "cutoff_date": cutoff_date.isoformat(),
+                "deleted": deleted,
+                "dropped_partitions": partitions,
+            }
+
         # Count logs to delete
         old_logs_count = (
             db.query(func.count(DataAccessLog.id))
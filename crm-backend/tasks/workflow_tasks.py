@@ -31,6 +31,12 @@ from typing import Any, Dict, Optional
 from sqlalchemy.orm import Session
 
 from core.database import get_db
+from core.log_partitions import (
+    drop_partitions_before,
+    estimated_rows,
+    expired_partitions,
+    is_partitioned,
+)
 from models.workflow import (
     Workflow,
     WorkflowExecution,
@@ -351,6 +357,18 @@ def cleanup_old_executions(self, days_to_keep: int = 90):
 
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
 
+        # Table partitionnée par mois: suppression des partitions expirées
+        if is_partitioned(self.db, "workflow_executions"):
+            partitions = expired_partitions(self.db, "workflow_executions", cutoff_date)
+            count = estimated_rows(self.db, partitions)
+            drop_partitions_before(self.db, "workflow_executions", cutoff_date)
+            logger.info(f"Nettoyage terminé: {len(partitions)} partitions (~{count} exécutions)")
+            return {
+                "cutoff_date": cutoff_date.isoformat(),
+                "deleted_count": count,
+                "dropped_partitions": partitions,
+            }
+
         # Compter les exécutions à supprimer
         count = (
             self.db.query(WorkflowExecution)
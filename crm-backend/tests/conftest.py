@@ -8,7 +8,8 @@ import inspect
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import JSON, Column, MetaData, Table, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -16,6 +17,7 @@ from core.database import Base, get_db
 from core.permissions import init_default_permissions
 from core.security import get_password_hash
 from main import app
+from models.email_message import EmailMessage
 from models.organisation import Organisation, OrganisationCategory, OrganisationType
 from models.person import Person, PersonOrganizationLink
 from models.role import Role, UserRole
@@ -53,6 +55,70 @@ def test_db():
         engine.dispose()  # Ensure engine is properly disposed
 
 
+# Tables à colonnes JSONB, non compilables par SQLite
+JSONB_TABLES = {"ai_user_preferences", "email_messages", "ai_memory"}
+
+
+def _as_json_table(source: Table) -> Table:
+    """Copie d'une table JSONB avec JSON à la place (pour SQLite)"""
+    return Table(
+        source.name,
+        MetaData(),
+        *(
+            Column(
+                column.name,
+                JSON() if isinstance(column.type, JSONB) else column.type,
+                primary_key=column.primary_key,
+            )
+            for column in source.columns
+        ),
+    )
+
+
+@pytest.fixture
+def sqlite_db():
+    """
+    Fabrique de sessions SQLite minimales, avec les statements exécutés
+
+    sqlite_db(Team, User, ...): tables de ces modèles (ou Table) uniquement
+    sqlite_db(): toutes les tables hors JSONB, email_messages recréée en JSON
+    expire_on_commit: comme sessionmaker
+
+    La session exposée porte `statements` (SQL exécuté, à vider avant la partie mesurée).
+    """
+    engines, sessions = [], []
+
+    def _make(*tables, expire_on_commit: bool = True):
+        engine = create_engine("sqlite:///:memory:")
+        engines.append(engine)
+        if tables:
+            for table in tables:
+                getattr(table, "__table__", table).create(engine)
+        else:
+            Base.metadata.create_all(
+                engine,
+                tables=[t for t in Base.metadata.sorted_tables if t.name not in JSONB_TABLES],
+            )
+            _as_json_table(EmailMessage.__table__).create(engine)
+
+        db = sessionmaker(bind=engine, expire_on_commit=expire_on_commit)()
+        sessions.append(db)
+        statements = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        db.statements = statements
+        return db
+
+    yield _make
+    for db in sessions:
+        db.close()
+    for engine in engines:
+        engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def client(test_db):
     """
@@ -0,0 +1,76 @@
+"""
+Tests - Modèle de préférences utilisateur (services.ai_learning_service)
+
+Fenêtre glissante 90 jours, chargement unique par utilisateur, boost par lot.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import services.ai_learning_service as learning
+from services.ai_learning_service import (
+    AILearningService,
+    PreferenceModelCache,
+    UserPreferenceModel,
+)
+
+
+def test_accept_counts_follow_sliding_window():
+    now = datetime(2025, 11, 1, 12)
+    model = UserPreferenceModel(user_id=1)
+    model.record("role", "CFO", now - timedelta(days=95))
+    model.record("role", "CFO", now - timedelta(days=10))
+    model.record("role", "CFO", now - timedelta(days=40))
+    model.record("phone", "+33", now)
+
+    assert model.accept_count("role", "CFO", now) == 2
+    assert model.accept_count("role", "CEO", now) == 0
+    assert model.accept_count("role", "CFO", now + timedelta(days=60)) == 1
+    assert model.accept_count("phone", "+33", now + timedelta(days=91)) == 0
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Cache neuf; compte les chargements DB du modèle"""
+    calls = []
+    now = datetime.utcnow()
+
+    def load(cls, db, user_id, now_=None):
+        calls.append(user_id)
+        model = cls(user_id)
+        for days_ago in (1, 2, 3, 4, 5, 6):
+            model.record("role", "CFO", now - timedelta(days=days_ago))
+        model.record("country", "France", now - timedelta(days=1))
+        return model
+
+    monkeypatch.setattr(UserPreferenceModel, "load", classmethod(load))
+    monkeypatch.setattr(learning, "preference_models", PreferenceModelCache())
+    return calls
+
+
+def test_batch_boost_loads_user_model_once(loads):
+    service = AILearningService(db=None)
+
+    scores = service.boost_suggestion_scores(
+        7,
+        [("role", "CFO", 0.4), ("role", "CEO", 0.4), ("country", "France", 0.95)],
+    )
+    assert scores == pytest.approx([0.9, 0.4, 1.0])
+    assert service.boost_suggestion_score(7, "country", "France", 0.5) == pytest.approx(0.6)
+    assert loads == [7]
+
+
+def test_track_choice_updates_loaded_model(loads):
+    learning.preference_models.get(None, 7)
+    learning.preference_models.record(7, "country", "Belgique", datetime.utcnow())
+    learning.preference_models.record(8, "country", "Belgique", datetime.utcnow())
+
+    service = AILearningService(db=None)
+    assert service.boost_suggestion_score(7, "country", "Belgique", 0.5) == pytest.approx(0.6)
+    assert service.boost_suggestion_score(8, "country", "Belgique", 0.5) == 0.5
+    assert loads == [7, 8]
+
+    learning.preference_models.invalidate(7)
+    service.boost_suggestion_score(7, "country", "Belgique", 0.5)
+    assert loads == [7, 8, 7]
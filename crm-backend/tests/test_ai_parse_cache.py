@@ -0,0 +1,145 @@
+"""
+Tests du cache content-addressed des parsings IA (normalisation, SimHash, partage)
+"""
+
+from services.ai_parse_cache import (
+    ParseCache,
+    content_key,
+    get_parse_cache,
+    hamming_distance,
+    normalise_text,
+    simhash,
+)
+
+SIGNATURE = """Cordialement,
+Marie Dubois
+Responsable Marketing
+TechCorp France
+15 rue de Rivoli, 75001 Paris
++33 1 23 45 67 89
+marie.dubois@techcorp.fr"""
+
+
+def test_normalise_text_ignores_case_quotes_and_spacing():
+    quoted = "\n".join(f"> {line}   " for line in SIGNATURE.upper().splitlines())
+
+    assert normalise_text(quoted) == normalise_text(SIGNATURE)
+    assert content_key(normalise_text(quoted)) == content_key(normalise_text(SIGNATURE))
+
+
+def test_simhash_close_for_near_duplicates():
+    base = normalise_text(SIGNATURE)
+    variant = normalise_text(SIGNATURE.replace("Cordialement", "Bien cordialement"))
+    other = normalise_text("Best regards,\nJohn Smith\nSales Manager\nGlobal Solutions Inc.")
+
+    assert hamming_distance(simhash(base), simhash(variant)) <= 7
+    assert hamming_distance(simhash(base), simhash(other)) > 7
+
+
+def test_parse_cache_exact_near_and_miss():
+    cache = ParseCache("signature_parse", share_across_teams=True)
+    cache.store(normalise_text(SIGNATURE), team_id=1, result={"data": {"company": "TechCorp"}})
+
+    exact = cache.lookup(normalise_text(SIGNATURE), team_id=2)
+    assert exact == ({"data": {"company": "TechCorp"}}, True)
+
+    near = cache.lookup(normalise_text(SIGNATURE.replace("Cordialement", "Bien cordialement")), team_id=3)
+    assert near is not None and near[1] is False
+
+    assert cache.lookup(normalise_text("Kind regards,\nEmily Johnson\nCEO"), team_id=1) is None
+    cache.record_miss()
+
+    rejected = cache.lookup(
+        normalise_text(SIGNATURE.replace("Cordialement", "Bien cordialement")),
+        team_id=3,
+        accept=lambda result: False,
+    )
+    assert rejected is None
+
+    stats = cache.stats()
+    assert stats["exact_hits"] == 1
+    assert stats["near_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == round(2 / 3, 3)
+
+
+def test_parse_cache_team_scoped_when_not_shared():
+    cache = ParseCache("intent_detection", share_across_teams=False)
+    cache.store(normalise_text(SIGNATURE), team_id=1, result={"intent": "follow_up"})
+
+    assert cache.lookup(normalise_text(SIGNATURE), team_id=1) is not None
+    assert cache.lookup(normalise_text(SIGNATURE), team_id=2) is None
+
+
+def test_intent_cache_ignores_near_duplicates():
+    """Quasi-doublons de sens opposé: l'intention n'est jamais partagée"""
+    body = (
+        "Bonjour Madame, suite à notre échange de mardi concernant le mandat de gestion "
+        "du fonds obligataire et la documentation transmise par votre équipe juridique, "
+        "nous {} la proposition commerciale telle que présentée, y compris les conditions "
+        "tarifaires et le calendrier de mise en place. Bien cordialement, Jean Dupont"
+    )
+    accept = normalise_text(body.format("acceptons"))
+    refuse = normalise_text(body.format("n'acceptons pas"))
+    assert hamming_distance(simhash(accept), simhash(refuse)) <= 7
+
+    # Les signatures tolèrent le quasi-doublon...
+    signatures = ParseCache("signature_parse", share_across_teams=True)
+    signatures.store(accept, team_id=1, result={"n": 1})
+    assert signatures.lookup(refuse, team_id=1) == ({"n": 1}, False)
+
+    # ...pas les intentions
+    assert get_parse_cache("intent_detection").near_duplicates is False
+    intents = ParseCache("intent_detection", share_across_teams=False, near_duplicates=False)
+    intents.store(accept, team_id=1, result={"intent": "accepted"})
+    assert intents.lookup(accept, team_id=1) == ({"intent": "accepted"}, True)
+    assert intents.lookup(refuse, team_id=1) is None
+
+
+def test_parse_cache_lru_eviction_cleans_bands():
+    cache = ParseCache("signature_parse", share_across_teams=True, max_entries=1)
+    cache.store("first signature text", team_id=1, result={"n": 1})
+    cache.store("a completely different block of words", team_id=1, result={"n": 2})
+
+    assert cache.stats()["entries"] == 1
+    assert cache.lookup("first signature text", team_id=1) is None
+    assert all(len(members) == 1 for members in cache._bands.values())
+
+
+def test_signature_near_duplicate_requires_same_contact():
+    from services.signature_parser_service import SignatureParserService
+
+    data = {"email": "marie.dubois@techcorp.fr", "last_name": "Dubois"}
+    colleague = normalise_text(
+        SIGNATURE.replace("Marie Dubois", "Paul Martin").replace("marie.dubois", "paul.martin")
+    )
+
+    assert SignatureParserService._same_contact(data, normalise_text(SIGNATURE))
+    assert not SignatureParserService._same_contact(data, colleague)
+    assert not SignatureParserService._same_contact({}, normalise_text(SIGNATURE))
+
+
+def test_signature_near_duplicate_rejected_when_an_extracted_field_changed():
+    from services.signature_parser_service import SignatureParserService
+
+    data = {
+        "first_name": "Marie",
+        "last_name": "Dubois",
+        "job_title": "Responsable Marketing",
+        "company": "TechCorp France",
+        "address": "15 rue de Rivoli, 75001 Paris",
+        "phone": "01 23 45 67 89",
+        "email": "marie.dubois@techcorp.fr",
+        "website": "https://www.techcorp.fr/",
+        "linkedin": None,
+    }
+    same = normalise_text(SIGNATURE + "\nwww.techcorp.fr\nAvis de confidentialité: ...")
+    assert SignatureParserService._same_contact(data, same)
+
+    for old, new in (
+        ("+33 1 23 45 67 89", "+33 1 98 76 54 32"),
+        ("Responsable Marketing", "Directrice Marketing"),
+        ("15 rue de Rivoli", "8 avenue de l'Opéra"),
+    ):
+        changed = normalise_text(SIGNATURE.replace(old, new) + "\nwww.techcorp.fr")
+        assert not SignatureParserService._same_contact(data, changed), new
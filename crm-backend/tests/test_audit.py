@@ -0,0 +1,89 @@
+"""
+Tests du moteur d'audit par lots (core.audit.audit_changes)
+"""
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import event
+
+from core.audit import audit_changes
+from models.audit_log import AuditLog
+from models.user import User
+
+
+class _UserUpdate(BaseModel):
+    full_name: str | None = None
+    email: str | None = None
+    is_active: bool | None = None
+
+
+@pytest.fixture
+def audit_db(sqlite_db):
+    db = sqlite_db(User, AuditLog)
+    db.add(User(id=1, email="before@test.com", full_name="Before", hashed_password="x"))
+    db.commit()
+    db.statements.clear()
+    return db
+
+
+@audit_changes("user", action="update")
+async def _update_user(user_id: int, data: _UserUpdate, db=None, current_user=None):
+    user = db.query(User).filter(User.id == user_id).first()
+    for field, value in data.dict(exclude_unset=True).items():
+        setattr(user, field, value)
+    db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_update_writes_all_field_changes_in_one_commit(audit_db):
+    """Tous les champs modifiés sont écrits en un INSERT, dans le commit de la route"""
+    data = _UserUpdate(full_name="After", email="after@test.com", is_active=True)
+
+    await _update_user(1, data=data, db=audit_db)
+
+    logs = audit_db.query(AuditLog).order_by(AuditLog.field_name).all()
+    assert [(log.field_name, log.old_value, log.new_value) for log in logs] == [
+        ("email", "before@test.com", "after@test.com"),
+        ("full_name", "Before", "After"),
+    ]
+    audit_inserts = [s for s in audit_db.statements if s.startswith("INSERT INTO audit_logs")]
+    assert len(audit_inserts) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_update_writes_no_audit(audit_db):
+    """Une route qui échoue (rollback) ne laisse aucune ligne d'audit"""
+
+    @audit_changes("user", action="update")
+    async def failing_update(user_id: int, data: _UserUpdate, db=None):
+        db.rollback()
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await failing_update(1, data=_UserUpdate(full_name="Nope"), db=audit_db)
+
+    audit_db.commit()
+    assert audit_db.query(AuditLog).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_audit_listeners_only_on_sessions_with_staged_rows(audit_db):
+    """Les commits hors audit ne traversent aucun listener d'audit"""
+    from sqlalchemy.orm import Session
+
+    from core import audit
+
+    def listens(target):
+        return event.contains(target, "before_commit", audit._write_pending_audit_rows)
+
+    assert not listens(Session)
+    assert not listens(audit_db)
+
+    await _update_user(1, data=_UserUpdate(full_name="After"), db=audit_db)
+    assert listens(audit_db) and not listens(Session)
+
+    # Session réutilisée: listeners attachés une seule fois
+    await _update_user(1, data=_UserUpdate(full_name="Again"), db=audit_db)
+    assert list(audit_db.dispatch.before_commit).count(audit._write_pending_audit_rows) == 1
+    assert audit_db.query(AuditLog).count() == 2
@@ -0,0 +1,101 @@
+"""
+Tests des index mémoire de l'autofill (blacklist expéditeurs, known_companies, cache négatif)
+"""
+
+import pytest
+
+from models.email_blacklist import EmailBlacklist
+from models.known_company import KnownCompany
+from services.autofill_matchers import (
+    KnownCompanyIndex,
+    ProbeNegativeCache,
+    SenderBlacklistMatcher,
+)
+from services.email_autofill_pipeline import EmailAutofillPipeline
+
+SENDERS = [
+    "noreply@example.com",
+    "jean.dupont@mailchimp.com",
+    "jean.dupont@sub.mailchimp.com",
+    "contact@acme.fr",
+    "bot@acme.fr",
+    "alerts@spam.io",
+    "alerts@notspam.io",
+    "marie@tpm-finance.fr",
+    "",
+]
+
+
+@pytest.mark.parametrize("sender", SENDERS)
+def test_blacklist_matcher_matches_model_semantics(sender):
+    """Le matcher compilé doit donner le même résultat que EmailBlacklist.matches()"""
+    entries = [
+        ("bot@acme.fr", "email"),
+        ("spam.io", "domain"),
+        ("contact@*", "wildcard"),
+    ]
+    matcher = SenderBlacklistMatcher(entries)
+
+    expected = any(
+        EmailBlacklist(pattern=pattern, pattern_type=pattern_type).matches(sender)
+        for pattern, pattern_type in entries
+    )
+
+    assert matcher.is_blacklisted(sender) == expected
+
+
+@pytest.mark.parametrize("sender", SENDERS)
+def test_blacklist_matcher_bare_wildcard_matches_everything(sender):
+    """"*" bloque tout expéditeur, comme EmailBlacklist.matches()"""
+    matcher = SenderBlacklistMatcher([("*", "wildcard")])
+
+    assert EmailBlacklist(pattern="*", pattern_type="wildcard").matches(sender)
+    assert matcher.match(sender) == "wildcard *"
+
+
+def test_blacklist_matcher_static_patterns():
+    matcher = SenderBlacklistMatcher(static_patterns=EmailAutofillPipeline.STATIC_BLACKLIST)
+
+    assert matcher.is_blacklisted("NoReply@Example.com")
+    assert matcher.is_blacklisted("news@mailchimp.com")
+    assert not matcher.is_blacklisted("news@notmailchimp.io")
+    assert matcher.match("mailer-daemon@host.fr") == "static prefix mailer-daemon@"
+
+
+def test_known_company_index_lookup():
+    index = KnownCompanyIndex([
+        KnownCompany(
+            domain="Mandarine-Gestion.com",
+            company_name="Mandarine Gestion",
+            company_website="https://www.mandarine-gestion.com/",
+            confidence_score=1.0,
+            source="manual",
+        ),
+        KnownCompany(domain="gmail.com", company_name="Gmail", confidence_score=0.0, source="seed"),
+    ])
+
+    result = index.get("mandarine-gestion.com")
+    assert result["company_name"] == "Mandarine Gestion"
+    assert result["source"] == "known_companies_manual"
+
+    # Les appelants reçoivent une copie
+    result["company_name"] = "Autre"
+    assert index.get("mandarine-gestion.com")["company_name"] == "Mandarine Gestion"
+
+    assert index.get("gmail.com")["skip_company_autofill"] is True
+    assert index.get("unknown.fr") is None
+
+
+def test_probe_negative_cache_ttl_and_bound():
+    cache = ProbeNegativeCache(ttl_seconds=60, max_entries=2)
+    cache.add("a.fr")
+    cache.add("b.fr")
+    cache.add("c.fr")
+
+    assert "a.fr" not in cache  # évincé (taille bornée)
+    assert "B.FR" in cache
+    assert "c.fr" in cache
+
+    expired = ProbeNegativeCache(ttl_seconds=0)
+    expired.add("d.fr")
+    assert "d.fr" not in expired
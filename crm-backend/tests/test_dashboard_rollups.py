@@ -0,0 +1,257 @@
+"""
+Tests - Statistiques dashboard matérialisées (core.dashboard_rollups)
+
+Maintenance incrémentale au flush, lecture en une requête, reconstruction identique.
+Agrégation KPI mensuelle côté SQL (GROUP BY + FILTER).
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.dashboard_rollups import (
+    ORGANISATIONS_BY_CATEGORY,
+    ORGANISATIONS_TOTAL,
+    rebuild_dashboard_rollups,
+)
+from models.kpi import DashboardDailyStat, DashboardStatCounter
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.organisation_activity import OrganisationActivity, OrganisationActivityType
+from models.task import Task, TaskStatus
+from models.team import Team
+from models.user import User
+from services.dashboard_stats import DashboardStatsService
+
+@pytest.fixture
+def stats_db(sqlite_db):
+    """SQLite minimal: équipes, utilisateurs, organisations, activités, tâches, rollups"""
+    # Pas d'expiration au commit: recharger Organisation déclencherait ses relations selectin
+    return sqlite_db(
+        Team,
+        User,
+        Organisation,
+        OrganisationActivity,
+        Task,
+        DashboardDailyStat,
+        DashboardStatCounter,
+        expire_on_commit=False,
+    )
+
+
+def _snapshot(db: Session):
+    daily = db.execute(
+        select(
+            DashboardDailyStat.day,
+            DashboardDailyStat.organisation_id,
+            DashboardDailyStat.team_id,
+            DashboardDailyStat.metric,
+            DashboardDailyStat.value,
+        ).where(DashboardDailyStat.value != 0)
+    ).all()
+    counters = db.execute(
+        select(
+            DashboardStatCounter.metric, DashboardStatCounter.dimension, DashboardStatCounter.value
+        ).where(DashboardStatCounter.value != 0)
+    ).all()
+    return sorted(daily), sorted(counters)
+
+
+def _seed(db: Session):
+    now = datetime.now(timezone.utc)
+    db.add(Team(id=1, name="Team A"))
+    owner = User(id=1, email="owner@example.com", hashed_password="x", team_id=1)
+    org = Organisation(
+        id=1,
+        name="Alforis",
+        type=OrganisationType.CLIENT,
+        category=OrganisationCategory.WHOLESALE,
+        owner_id=1,
+    )
+    db.add_all([owner, org])
+    db.flush()
+    db.add_all(
+        [
+            OrganisationActivity(
+                organisation_id=1, type=OrganisationActivityType.REUNION, occurred_at=now
+            ),
+            OrganisationActivity(
+                organisation_id=1, type=OrganisationActivityType.REUNION, occurred_at=now
+            ),
+            OrganisationActivity(
+                organisation_id=1,
+                type=OrganisationActivityType.EMAIL,
+                occurred_at=now - timedelta(days=10),
+            ),
+            Task(title="Fait", status=TaskStatus.DONE, organisation_id=1),
+            Task(title="En retard", due_date=now - timedelta(days=3), organisation_id=1),
+            Task(title="Aujourd'hui", due_date=now),
+        ]
+    )
+    db.commit()
+    return org
+
+
+@pytest.mark.asyncio
+async def test_global_stats_read_incremental_counters_in_one_query(stats_db: Session):
+    _seed(stats_db)
+
+    stats_db.statements.clear()
+    stats = await DashboardStatsService(stats_db).get_global_stats()
+
+    assert len(stats_db.statements) == 1
+    assert stats.total_organisations == 1
+    assert stats.organisations_by_category == {"Wholesale": 1}
+    assert stats.organisations_by_pipeline == {"client": 1}
+    assert (stats.total_tasks, stats.completed_tasks) == (3, 1)
+    assert (stats.overdue_tasks, stats.tasks_due_today) == (1, 1)
+    assert (stats.activities_last_7_days, stats.activities_last_30_days) == (2, 3)
+
+
+@pytest.mark.asyncio
+async def test_updates_and_deletes_adjust_counters_and_match_rebuild(stats_db: Session):
+    org = _seed(stats_db)
+
+    overdue = stats_db.query(Task).filter(Task.title == "En retard").one()
+    overdue.status = TaskStatus.DONE
+    org.is_active = False
+    stats_db.delete(
+        stats_db.query(OrganisationActivity)
+        .filter(OrganisationActivity.type == OrganisationActivityType.EMAIL)
+        .one()
+    )
+    stats_db.commit()
+
+    stats = await DashboardStatsService(stats_db).get_global_stats()
+    assert stats.total_organisations == 0
+    assert stats.organisations_by_category == {}
+    assert (stats.completed_tasks, stats.overdue_tasks) == (2, 0)
+    assert stats.activities_last_30_days == 2
+
+    incremental = _snapshot(stats_db)
+    rebuild_dashboard_rollups(stats_db)
+    assert _snapshot(stats_db) == incremental
+
+
+def test_expired_instances_adjust_counters_from_previous_values(sqlite_db):
+    """expire_on_commit (défaut): l'ancienne contribution est rechargée avant modification"""
+    # Schéma complet (hors JSONB): recharger Organisation charge ses relations selectin
+    db = sqlite_db()
+    _seed(db)
+    org = db.get(Organisation, 1)
+    org.is_active = False
+    db.commit()
+    org.category = OrganisationCategory.INSTITUTION
+    db.commit()
+    org.is_active = True
+    db.commit()
+    org.category = OrganisationCategory.WHOLESALE
+    db.commit()
+    db.delete(db.query(Task).filter(Task.title == "En retard").one())
+    db.commit()
+
+    incremental = _snapshot(db)
+    assert (ORGANISATIONS_TOTAL, "", 1) in incremental[1]
+    assert (ORGANISATIONS_BY_CATEGORY, "Wholesale", 1) in incremental[1]
+    rebuild_dashboard_rollups(db)
+    assert _snapshot(db) == incremental
+
+
+def test_flush_without_rollup_tables_is_ignored(sqlite_db):
+    db = sqlite_db(Team, User)
+
+    db.add_all([Team(id=1, name="Team A"), User(email="a@example.com", hashed_password="x")])
+    db.commit()
+    assert db.query(User).count() == 1
+
+
+def test_rollup_tables_created_after_first_flush_are_picked_up(sqlite_db, monkeypatch):
+    """Migration appliquée après un premier flush: maintenance activée sans redémarrage"""
+    from core import dashboard_rollups
+
+    engine = sqlite_db(Team, User).get_bind()
+    with engine.connect() as conn:
+        assert dashboard_rollups._has_rollup_tables(conn) is False
+
+    for model in (DashboardDailyStat, DashboardStatCounter):
+        model.__table__.create(engine)
+    with engine.connect() as conn:
+        # Résultat négatif gardé pendant la fenêtre de revérification, puis revérifié
+        assert dashboard_rollups._has_rollup_tables(conn) is False
+        now = time.monotonic()
+        monkeypatch.setattr(
+            dashboard_rollups.time,
+            "monotonic",
+            lambda: now + dashboard_rollups.ROLLUP_TABLES_RECHECK_SECONDS + 1,
+        )
+        assert dashboard_rollups._has_rollup_tables(conn) is True
+
+
+@pytest.mark.asyncio
+async def test_activity_series_buckets_in_sql_and_follows_team_changes(stats_db: Session):
+    _seed(stats_db)
+    today = datetime.now(timezone.utc).date()
+    service = DashboardStatsService(stats_db)
+
+    series = await service.get_activity_series("year", today - timedelta(days=30), today)
+    assert sum(point.total for point in series.points) == 3
+    assert all(point.period.month == 1 and point.period.day == 1 for point in series.points)
+
+    stats_db.add(Team(id=2, name="Team B"))
+    stats_db.get(User, 1).team_id = 2
+    stats_db.commit()
+
+    series = await service.get_activity_series("day", today, today, team_id=2)
+    assert [(point.period, point.by_type) for point in series.points] == [
+        (today, {"reunion": 2})
+    ]
+    assert (await service.get_activity_series("day", today, today, team_id=1)).points == []
+
+
+@pytest.mark.asyncio
+async def test_kpi_aggregation_runs_in_one_grouped_query(stats_db: Session):
+    _seed(stats_db)
+    march = datetime(2025, 3, 15, 12, tzinfo=timezone.utc)
+
+    def activity(type_, metadata=None, occurred_at=march):
+        return OrganisationActivity(
+            organisation_id=1, type=type_, occurred_at=occurred_at, metadata=metadata
+        )
+
+    stats_db.add_all(
+        [
+            # Métadonnée explicite prioritaire sur le type
+            activity(OrganisationActivityType.EMAIL, {"kpi_category": " Closing "}),
+            activity(OrganisationActivityType.REUNION, {"montant": "1500.5", "revenue": "n/a"}),
+            activity(OrganisationActivityType.APPEL, {"commission_rate": 2}),
+            activity(OrganisationActivityType.NOTE, {"due_diligence": True, "amount": 500}),
+            activity(OrganisationActivityType.NOTE, {"commission": 4.0}),
+            activity(
+                OrganisationActivityType.MANDAT_SIGNED,
+                occurred_at=datetime(2025, 4, 1, tzinfo=timezone.utc),
+            ),
+        ]
+    )
+    stats_db.commit()
+
+    stats_db.statements.clear()
+    buckets = DashboardStatsService(stats_db)._aggregate_kpis_from_activities(year=2025)
+
+    assert len(stats_db.statements) == 1
+    assert buckets[(1, 2025, 3)] == {
+        "rdv_count": 1,
+        "pitchs": 1,
+        "due_diligences": 1,
+        "closings": 1,
+        "revenue": 2000.5,
+        "commission_rate": 3.0,
+    }
+    assert buckets[(1, 2025, 4)]["closings"] == 1
+    assert set(buckets) == {(1, 2025, 3), (1, 2025, 4)}
+
+    only_april = DashboardStatsService(stats_db)._aggregate_kpis_from_activities(
+        organisation_id=1, year=2025, month=4
+    )
+    assert set(only_april) == {(1, 2025, 4)}
@@ -0,0 +1,206 @@
+"""
+Tests - Pipeline autofill par stages (services.email_autofill_pipeline)
+
+Périmètre équipe des Organisation (owner_id → User.team_id), isolation des
+erreurs du stage persist, session dédiée au stage parse, rate limit global.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import JSON, Column, MetaData, Table, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import sessionmaker
+
+from models.autofill_suggestion import AutofillSuggestion
+from models.base import Base
+from models.email_message import EmailMessage
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.team import Team
+from models.user import User
+from services.email_autofill_pipeline import EmailAutofillPipeline, RateLimiter
+from services.signature_parser_service import SignatureParserService
+
+# Colonnes JSONB non compilables par SQLite
+JSONB_TABLES = {"ai_user_preferences", "email_messages", "ai_memory"}
+
+BODY = "Bonjour,\n\nMerci pour votre retour.\n\nJean Dupont\nDirecteur\nAcme Gestion\n"
+
+
+@pytest.fixture
+def pipeline_db(tmp_path, monkeypatch):
+    """SQLite fichier (plusieurs sessions), email_messages avec JSON à la place de JSONB"""
+    monkeypatch.setenv("AUTOFILL_USE_WEB_ENRICHMENT", "false")
+    monkeypatch.setenv("ENCRYPTION_KEY", Fernet.generate_key().decode())
+    engine = create_engine(f"sqlite:///{tmp_path / 'autofill.db'}")
+    Base.metadata.create_all(
+        engine,
+        tables=[table for table in Base.metadata.sorted_tables if table.name not in JSONB_TABLES],
+    )
+    source = EmailMessage.__table__
+    Table(
+        source.name,
+        MetaData(),
+        *(
+            Column(
+                column.name,
+                JSON() if isinstance(column.type, JSONB) else column.type,
+                primary_key=column.primary_key,
+            )
+            for column in source.columns
+        ),
+    ).create(engine)
+
+    db = sessionmaker(bind=engine)()
+    db.add_all([Team(id=1, name="Équipe 1"), Team(id=2, name="Équipe 2")])
+    db.add_all(
+        [
+            User(id=1, email="a@crm.fr", hashed_password="x", team_id=1),
+            User(id=2, email="b@crm.fr", hashed_password="x", team_id=2),
+        ]
+    )
+    db.add_all(
+        [
+            Organisation(
+                id=1,
+                name="Acme Gestion (autre équipe)",
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+                owner_id=2,
+            ),
+            Organisation(
+                id=2,
+                name="Acme Gestion",
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+                owner_id=1,
+            ),
+        ]
+    )
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        [
+            EmailMessage(
+                id=i,
+                team_id=1,
+                account_id=1,
+                external_message_id=f"<{i}@acme.fr>",
+                sender_email=f"jean{i}@acme-gestion.fr",
+                body_text=BODY,
+                received_at=now,
+                content_hash=f"hash-{i}",
+            )
+            for i in range(1, 7)
+        ]
+    )
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def parsed_signatures(monkeypatch):
+    """Parse LLM simulé : enregistre la session utilisée par le stage parse"""
+    sessions = []
+
+    async def parse_signature(self, email_body, team_id):
+        sessions.append(self.db)
+        return {
+            "success": True,
+            "data": {"first_name": "Jean", "company": "Acme Gestion"},
+            "confidence": 0.5,
+            "model_used": "test",
+        }
+
+    monkeypatch.setattr(SignatureParserService, "parse_signature", parse_signature)
+    return sessions
+
+
+@pytest.mark.asyncio
+async def test_pipeline_persists_suggestions_with_team_scoped_organisations(
+    pipeline_db, parsed_signatures
+):
+    pipeline = EmailAutofillPipeline(pipeline_db, rate_limit_seconds=0, queue_size=1)
+
+    result = await asyncio.wait_for(pipeline.run(team_id=1), timeout=10)
+
+    assert result["success"], result
+    assert result["metrics"]["errors"] == 0
+    assert result["metrics"]["manual_review"] == 12
+    assert pipeline_db.query(AutofillSuggestion).count() == 12
+
+    # Le stage parse a sa propre session (fermée en fin de run), distincte de persist
+    assert parsed_signatures and all(db is parsed_signatures[0] for db in parsed_signatures)
+    assert parsed_signatures[0] is not pipeline_db
+
+    persons, organisations = pipeline._prefetch_entities(
+        [(None, {"data": {"company": "Acme Gestion"}})], team_id=1
+    )
+    assert organisations["acme gestion"].id == 2
+
+
+@pytest.mark.asyncio
+async def test_persist_errors_do_not_block_upstream_stages(
+    pipeline_db, parsed_signatures, monkeypatch
+):
+    pipeline = EmailAutofillPipeline(
+        pipeline_db, rate_limit_seconds=0, queue_size=1, persist_batch_size=2
+    )
+
+    def broken_prefetch(batch, team_id):
+        raise RuntimeError("prefetch failed")
+
+    monkeypatch.setattr(pipeline, "_prefetch_entities", broken_prefetch)
+
+    result = await asyncio.wait_for(pipeline.run(team_id=1), timeout=10)
+
+    assert result["success"]
+    assert result["metrics"]["errors"] == 6
+    assert result["metrics"]["stages"]["parse"]["items"] == 6
+    assert pipeline_db.query(AutofillSuggestion).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_is_global_across_workers():
+    limiter = RateLimiter(0.05)
+    started = time.monotonic()
+
+    await asyncio.gather(*(limiter.wait() for _ in range(4)))
+
+    # 4 appels concurrents : espacés de 50 ms, et non autorisés simultanément
+    assert time.monotonic() - started >= 0.14
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_llm_calls_but_not_cache_hits(pipeline_db, monkeypatch):
+    calls = []
+
+    async def parse_with_ollama(self, signature_text, web_context=None):
+        calls.append(time.monotonic())
+        return {"success": True, "data": {"last_name": "Dupont"}, "model_used": "test"}
+
+    monkeypatch.setattr(SignatureParserService, "_parse_with_ollama", parse_with_ollama)
+    parser = SignatureParserService(pipeline_db, rate_limiter=RateLimiter(0.05))
+    bodies = [BODY.replace("Directeur", f"Directeur {i}") for i in range(3)]
+
+    # Les 3 premiers appels LLM sont espacés, pas seulement les suivants
+    await asyncio.gather(
+        *(parser.parse_signature(body, team_id=1, use_cache=False) for body in bodies)
+    )
+    assert len(calls) == 3
+    assert all(later - earlier >= 0.045 for earlier, later in zip(calls, calls[1:]))
+
+    # Hit cache: ni appel LLM ni attente du limiteur
+    waits = []
+    monkeypatch.setattr(RateLimiter, "wait", lambda self: waits.append(1))
+    monkeypatch.setattr(
+        SignatureParserService,
+        "_check_cache",
+        lambda self, normalised, team_id: {"from_cache": True, "cache_match": "exact"},
+    )
+    assert (await parser.parse_signature(bodies[0], team_id=1))["from_cache"]
+    assert waits == [] and len(calls) == 3
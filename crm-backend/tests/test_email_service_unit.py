@@ -1,10 +1,17 @@
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 from models.email import (
     EmailCampaign,
+    EmailCampaignEventRollup,
     EmailCampaignStatus,
+    EmailCampaignStep,
+    EmailEvent,
     EmailProvider,
     EmailScheduleType,
+    EmailSend,
+    EmailSendBatch,
     EmailTemplate,
     EmailTemplateCategory,
 )
@@ -12,6 +19,27 @@ from schemas.email import EmailCampaignUpdate
 from services.email_service import EmailCampaignService
 
 
+@pytest.fixture
+def email_db():
+    """SQLite minimal: tables des campagnes, envois, événements et rollups"""
+    engine = create_engine("sqlite:///:memory:")
+    for model in (
+        EmailTemplate,
+        EmailCampaign,
+        EmailCampaignStep,
+        EmailSendBatch,
+        EmailSend,
+        EmailEvent,
+        EmailCampaignEventRollup,
+    ):
+        model.__table__.create(engine)
+
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
 @pytest.mark.asyncio
 async def test_update_campaign_creates_default_step_when_missing(test_db):
     """Vérifie que la mise à jour crée un step si aucun n'existe."""
@@ -46,3 +74,73 @@ async def test_update_campaign_creates_default_step_when_missing(test_db):
     step = updated_campaign.steps[0]
     assert step.template_id == template.id
     assert step.order_index == 1
+
+
+def test_ingested_events_update_campaign_rollups(email_db):
+    """Les rollups maintenus à l'ingestion égalent une reconstruction complète."""
+    from models.email import EmailSend, EmailSendStatus, EmailVariant
+    from services.email_service import (
+        EmailAnalyticsService,
+        EmailEventIngestionService,
+        EmailEventRollupService,
+    )
+
+    campaign = EmailCampaign(
+        name="Rollup Campaign",
+        status=EmailCampaignStatus.RUNNING,
+        provider=EmailProvider.SENDGRID,
+        schedule_type=EmailScheduleType.MANUAL,
+        from_name="ALFORIS",
+        from_email="marketing@alforis.com",
+    )
+    email_db.add(campaign)
+    email_db.flush()
+
+    send_a = EmailSend(
+        campaign_id=campaign.id,
+        recipient_email="a@test.com",
+        variant=EmailVariant.A,
+        status=EmailSendStatus.SENT,
+    )
+    send_b = EmailSend(
+        campaign_id=campaign.id,
+        recipient_email="b@test.com",
+        variant=EmailVariant.B,
+        status=EmailSendStatus.SENT,
+    )
+    email_db.add_all([send_a, send_b])
+    email_db.commit()
+
+    ingestion = EmailEventIngestionService(email_db)
+    ingestion.ingest_sendgrid_events(
+        [
+            {"event": "delivered", "timestamp": 1700000000, "custom_args": {"send_id": send_a.id}},
+            {"event": "opened", "timestamp": 1700000100, "custom_args": {"send_id": send_a.id}},
+            {"event": "opened", "timestamp": 1700000200, "custom_args": {"send_id": send_a.id}},
+        ]
+    )
+    ingestion.ingest_sendgrid_events(
+        [
+            {"event": "opened", "timestamp": 1700000300, "custom_args": {"send_id": send_a.id}},
+            {"event": "opened", "timestamp": 1700000400, "custom_args": {"send_id": send_b.id}},
+            {"event": "clicked", "timestamp": 1700000500, "custom_args": {"send_id": send_b.id}},
+        ]
+    )
+
+    analytics = EmailAnalyticsService(email_db)
+    stats = analytics.get_campaign_stats(campaign.id)
+
+    assert stats.total_sent == 2
+    assert stats.delivered == 1
+    assert stats.opens == 4
+    assert stats.unique_opens == 2
+    assert stats.clicks == 1
+    assert stats.unique_clicks == 1
+    assert stats.open_rate == 100.0
+    assert [(v.variant, v.opens, v.clicks) for v in stats.per_variant] == [
+        (EmailVariant.A, 3, 0),
+        (EmailVariant.B, 1, 1),
+    ]
+
+    EmailEventRollupService(email_db).rebuild(campaign.id)
+    assert analytics.get_campaign_stats(campaign.id) == stats
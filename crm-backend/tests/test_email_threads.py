@@ -0,0 +1,106 @@
+"""
+Tests - Threading email (services.email_thread_service)
+
+Index Message-ID → thread: résolution en une requête IN, API batch, backfill.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models.email_thread import EmailThread, EmailThreadMessage
+from models.interaction import Interaction
+from models.team import Team
+from services.email_thread_service import EmailThreadService
+
+
+@pytest.fixture
+def thread_db(sqlite_db):
+    """SQLite minimal: équipes, interactions, threads, index Message-ID"""
+    db = sqlite_db(Team, Interaction, EmailThread, EmailThreadMessage, expire_on_commit=False)
+    db.add_all([Team(id=1, name="Team A"), Team(id=2, name="Team B")])
+    db.commit()
+    db.statements.clear()
+    return db
+
+
+def _email(subject, message_id, in_reply_to=None, references=None, sender="a@x.com"):
+    headers = {"Message-ID": f"<{message_id}>"}
+    if in_reply_to:
+        headers["In-Reply-To"] = f"<{in_reply_to}>"
+    if references:
+        headers["References"] = " ".join(f"<{ref}>" for ref in references)
+    return {"subject": subject, "from_email": sender, "to_email": "b@y.com", "headers": headers}
+
+
+def _index(db: Session):
+    return sorted(
+        db.query(
+            EmailThreadMessage.team_id, EmailThreadMessage.message_id, EmailThreadMessage.thread_id
+        ).all()
+    )
+
+
+def test_reply_finds_thread_through_index_despite_subject_change(thread_db: Session):
+    service = EmailThreadService(thread_db)
+    first = service.find_or_create_thread(1, **_email("Mandat Q4", "m1@x"))
+
+    thread_db.statements.clear()
+    found = service._find_thread_by_message_ids(1, ["m0@x"], "m1@x")
+    assert found.id == first.id
+    assert len(thread_db.statements) == 1
+    assert "IN" in thread_db.statements[0]
+
+    reply_email = _email("Autre sujet", "m2@x", in_reply_to="m1@x", references=["m1@x"])
+    reply = service.find_or_create_thread(1, **reply_email)
+    assert reply.id == first.id
+    assert reply.thread_metadata["message_ids"] == ["m1@x", "m2@x"]
+    # Index par équipe: le même Message-ID ne résout rien pour une autre équipe
+    assert service._find_thread_by_message_ids(2, [], "m1@x") is None
+
+
+def test_batch_threads_a_page_with_in_page_replies(thread_db: Session):
+    service = EmailThreadService(thread_db)
+    existing = service.find_or_create_thread(1, **_email("Existant", "old@x"))
+
+    thread_db.statements.clear()
+    threads = service.thread_emails(
+        1,
+        [
+            _email("Nouveau", "n1@x"),
+            _email("Re: Nouveau", "n2@x", in_reply_to="n1@x", sender="c@z.com"),
+            _email("Relance", "o2@x", references=["old@x"]),
+            _email("Re: Existant", "o3@x"),
+        ],
+    )
+
+    assert threads[0] is threads[1]
+    assert threads[2].id == threads[3].id == existing.id
+    selects = [s for s in thread_db.statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 2
+    assert {message_id for _, message_id, _ in _index(thread_db)} == {
+        "old@x",
+        "n1@x",
+        "n2@x",
+        "o2@x",
+        "o3@x",
+    }
+
+
+def test_rebuild_message_index_backfills_from_metadata(thread_db: Session):
+    thread_db.add(
+        EmailThread(
+            id=10,
+            team_id=1,
+            thread_id="legacy",
+            subject="Legacy",
+            participants=[],
+            thread_metadata={"message_ids": ["<l1@x>", "l2@x"]},
+        )
+    )
+    thread_db.commit()
+
+    service = EmailThreadService(thread_db)
+    assert service.rebuild_message_index(batch_size=1) == 2
+    # Idempotent
+    service.rebuild_message_index()
+    assert _index(thread_db) == [(1, "l1@x", 10), (1, "l2@x", 10)]
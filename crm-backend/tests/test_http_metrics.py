@@ -0,0 +1,43 @@
+"""
+Tests du middleware de métriques HTTP (labels = route template)
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from middleware.http_metrics import UNMATCHED_ROUTE, HTTPMetricsMiddleware
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_latency_recorded_per_route_template():
+    app = FastAPI()
+
+    @app.get("/metrics-test/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(HTTPMetricsMiddleware)
+    client = TestClient(app)
+
+    template = "/metrics-test/items/{item_id}"
+    before = _sample("http_requests_total", method="GET", endpoint=template, status="200")
+    before_unmatched = _sample(
+        "http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status="404"
+    )
+
+    for item_id in (1, 2, 3):
+        assert client.get(f"/metrics-test/items/{item_id}").status_code == 200
+    assert client.get("/metrics-test/does-not-exist/42").status_code == 404
+
+    assert _sample("http_requests_total", method="GET", endpoint=template, status="200") == before + 3
+    assert (
+        _sample("http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status="404")
+        == before_unmatched + 1
+    )
+    assert _sample("http_request_duration_seconds_count", method="GET", endpoint=template) >= 3
+    # Aucun label par chemin brut
+    assert _sample("http_requests_total", method="GET", endpoint="/metrics-test/items/1", status="200") == 0
@@ -0,0 +1,104 @@
+"""
+Tests - Cache de rendu des PDFs légaux (services.pdf_generator)
+
+Un rendu par (type, contenu, jour), premières requêtes concurrentes coalescées,
+ETag / If-None-Match sur la route de téléchargement.
+"""
+
+import threading
+import time
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import legal
+from services import pdf_generator
+from services.pdf_generator import LegalDocumentPDFGenerator, get_legal_document_pdf
+
+
+@pytest.fixture(autouse=True)
+def empty_render_cache(monkeypatch):
+    monkeypatch.setattr(pdf_generator, "_rendered", {})
+
+
+@pytest.fixture
+def counted_renders(monkeypatch):
+    """Compte les rendus CGU (rendu lent pour exposer la concurrence)"""
+    renders = []
+    original = LegalDocumentPDFGenerator.generate_cgu_pdf
+
+    def slow_render(self):
+        renders.append(threading.get_ident())
+        time.sleep(0.05)
+        return original(self)
+
+    monkeypatch.setattr(LegalDocumentPDFGenerator, "generate_cgu_pdf", slow_render)
+    return renders
+
+
+def test_concurrent_first_requests_render_once(counted_renders, monkeypatch):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_legal_document_pdf("cgu")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(counted_renders) == 1
+    assert len({id(result) for result in results}) == 1
+    assert results[0].content.startswith(b"%PDF")
+    assert get_legal_document_pdf("cgu") is results[0]
+
+    # Nouveau jour ou nouveau contenu: nouveau rendu, nouvel ETag
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date(2099, 1, 1)
+
+    monkeypatch.setattr(pdf_generator, "date", Tomorrow)
+    next_day = get_legal_document_pdf("cgu")
+    assert len(counted_renders) == 2 and next_day.etag != results[0].etag
+
+    monkeypatch.setattr(
+        LegalDocumentPDFGenerator,
+        "_get_cgu_content",
+        lambda self: [{"title": "1. Objet", "paragraphs": ["Nouvelle version"]}],
+    )
+    monkeypatch.setattr(pdf_generator, "_content_source", None)
+    assert get_legal_document_pdf("cgu").etag != next_day.etag
+    assert len(counted_renders) == 3
+
+    with pytest.raises(KeyError):
+        get_legal_document_pdf("unknown")
+
+
+def test_download_route_serves_cached_pdf_with_etag(monkeypatch):
+    renders = []
+    original = LegalDocumentPDFGenerator.generate_dpa_pdf
+    monkeypatch.setattr(
+        LegalDocumentPDFGenerator,
+        "generate_dpa_pdf",
+        lambda self: renders.append(1) or original(self),
+    )
+    app = FastAPI()
+    app.include_router(legal.router)
+    client = TestClient(app)
+
+    response = client.get("/legal/documents/dpa/pdf")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    etag = response.headers["etag"]
+
+    revalidated = client.get("/legal/documents/dpa/pdf", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    again = client.get("/legal/documents/dpa/pdf", headers={"If-None-Match": '"stale"'})
+    assert again.status_code == 200 and again.content == response.content
+    assert len(renders) == 1
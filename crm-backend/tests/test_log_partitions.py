@@ -0,0 +1,97 @@
+"""
+Tests - Partitionnement mensuel des tables de logs (core.log_partitions)
+
+Calendrier des partitions, rétention par partitions entières, repli sans
+partitionnement (SQLite) et fenêtre de l'audit trail (partition pruning).
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from core.audit import get_audit_history, get_user_activity
+from core.log_partitions import (
+    add_months,
+    drop_partitions_before,
+    ensure_log_partitions,
+    expired_partitions,
+    is_partitioned,
+    partition_name,
+)
+from models.audit_log import AuditLog
+
+
+@pytest.fixture
+def audit_db(sqlite_db):
+    return sqlite_db(AuditLog, expire_on_commit=False)
+
+
+def test_month_arithmetic_and_retention_by_partition():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name("audit_logs", date(2025, 2, 1)) == "audit_logs_p202502"
+
+    names = ["audit_logs_default"] + [
+        partition_name("audit_logs", add_months(date(2025, 1, 1), i)) for i in range(6)
+    ]
+
+    class FakeDB:
+        """Catalogue pg_inherits simulé, DDL enregistrés"""
+
+        def __init__(self):
+            self.executed = []
+            self.committed = False
+
+        def execute(self, statement, params=None):
+            self.executed.append(str(statement))
+            return self
+
+        def scalars(self):
+            return iter(names)
+
+        def commit(self):
+            self.committed = True
+
+    # Mois entièrement antérieurs à la coupure seulement; partition par défaut ignorée
+    assert expired_partitions(FakeDB(), "audit_logs", datetime(2025, 3, 15)) == [
+        "audit_logs_p202501",
+        "audit_logs_p202502",
+    ]
+    assert expired_partitions(FakeDB(), "audit_logs", datetime(2025, 1, 1)) == []
+
+    db = FakeDB()
+    assert drop_partitions_before(db, "audit_logs", datetime(2025, 2, 1)) == ["audit_logs_p202501"]
+    assert db.executed[-1] == "DROP TABLE IF EXISTS audit_logs_p202501" and db.committed
+
+
+def test_sqlite_is_not_partitioned(audit_db):
+    assert is_partitioned(audit_db, "audit_logs") is False
+    assert ensure_log_partitions(audit_db) == []
+
+
+def test_audit_history_bounded_to_recent_partitions(audit_db):
+    now = datetime.utcnow()
+    audit_db.add_all(
+        [
+            AuditLog(entity_type="person", entity_id=1, action="update", user_id=7, created_at=now),
+            AuditLog(
+                entity_type="person",
+                entity_id=1,
+                action="create",
+                user_id=7,
+                created_at=now - timedelta(days=800),
+            ),
+        ]
+    )
+    audit_db.commit()
+
+    audit_db.statements.clear()
+    assert [log.action for log in get_audit_history(audit_db, "person", 1)] == ["update"]
+    assert "audit_logs.created_at >=" in audit_db.statements[-1]
+
+    assert [log.action for log in get_audit_history(audit_db, "person", 1, days=None)] == [
+        "update",
+        "create",
+    ]
+    assert len(get_user_activity(audit_db, 7)) == 1
+    assert len(get_user_activity(audit_db, 7, days=1000)) == 2
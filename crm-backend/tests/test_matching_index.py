@@ -0,0 +1,167 @@
+"""
+Tests - Index mémoire des candidats (services.matching_index) et MatchingScorer
+
+Recherche par clés exactes / trigrammes sans requête, maintenance au commit,
+classement identique au scoring unitaire, une requête par clé primaire.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.person import Person
+from services import matching_index
+from services.matching_index import CandidateIndex, MatchEntry, get_person_index
+from services.matching_scorer import MatchingScorer
+
+@pytest.fixture
+def matching_db(sqlite_db):
+    """SQLite: toutes les tables (relations selectin de Person / Organisation)"""
+    db = sqlite_db(expire_on_commit=False)
+    matching_index.invalidate_matching_indexes()
+    yield db
+    matching_index.invalidate_matching_indexes()
+
+
+def _seed(db: Session):
+    db.add_all(
+        [
+            Person(
+                id=1,
+                first_name="Jean",
+                last_name="Dupont",
+                personal_email="jean.dupont@alforis.fr",
+                phone="+33 6 12 34 56 78",
+                job_title="CIO",
+            ),
+            Person(id=2, first_name="Jeanne", last_name="Dupond", job_title="Head of Sales"),
+            Person(id=3, first_name="Marie", last_name="Curie", phone="06 12 34 56 78"),
+            Person(id=4, first_name="Paul", last_name="Martin"),
+            Organisation(
+                id=1,
+                name="Alforis Finance",
+                email="contact@alforis.fr",
+                website="https://www.alforis.fr/",
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+            ),
+            Organisation(
+                id=2,
+                name="Alforys Finances",
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+            ),
+            Organisation(
+                id=3,
+                name="Other Corp",
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+            ),
+        ]
+    )
+    db.commit()
+
+
+def test_candidate_index_exact_keys_trigrams_and_substring():
+    index = CandidateIndex(
+        [
+            MatchEntry(id=1, email="a@x.fr", phone="33612345678", name="alforisfinance",
+                       name_lower="alforis finance"),
+            MatchEntry(id=2, email="b@x.fr", name="alforysfinances", name_lower="alforys finances"),
+            MatchEntry(id=3, name="othercorp", name_lower="other corp"),
+        ]
+    )
+
+    assert index.lookup("domain", "x.fr") == {1, 2}
+    assert index.lookup("phone_suffix", "12345678") == {1}
+    assert index.names_containing("Alforis") == {1}
+    assert index.similar_names("alforisfinances")[:2] == [1, 2]
+
+    index.upsert(MatchEntry(id=2, email="b@y.fr", name="bcorp", name_lower="b corp"))
+    index.remove(1)
+    assert index.lookup("domain", "x.fr") == set()
+    assert index.names_containing("finance") == set()
+    assert index.names_containing("corp") == {2, 3}
+
+
+def test_find_candidates_ranks_like_unit_scoring_with_one_fetch(matching_db: Session):
+    _seed(matching_db)
+    scorer = MatchingScorer(matching_db)
+    draft = {
+        "first_name": "Jean",
+        "last_name": "Dupont",
+        "personal_email": "jean.dupont@alforis.fr",
+        "phone": "0033 6 12 34 56 78",
+        "title": "CIO",
+    }
+    get_person_index(matching_db)
+
+    matching_db.statements.clear()
+    matches = scorer.find_person_candidates(draft, limit=3)
+
+    # Une seule requête sur people (les autres sont les relations selectin du modèle)
+    assert sum("FROM people" in statement for statement in matching_db.statements) == 1
+    assert [m["candidate"]["id"] for m in matches] == [1, 2, 3]
+    for match in matches:
+        expected = scorer.score_person_match(draft, matching_db.get(Person, match["candidate"]["id"]))
+        assert (match["score"], match["details"]) == (expected["score"], expected["details"])
+    assert matches[0]["action"] == "apply"
+    assert matches[1]["details"] == {"name_fuzzy": 50}
+
+    orgs = scorer.find_organisation_candidates(
+        {"nom": "Alforis Finance", "email": "info@alforis.fr", "website": "alforis.fr"}
+    )
+    assert [(m["candidate"]["id"], m["score"]) for m in orgs] == [(1, 40 + 75 + 30), (2, 50)]
+
+
+def test_committed_writes_update_loaded_index(matching_db: Session):
+    _seed(matching_db)
+    scorer = MatchingScorer(matching_db)
+    draft = {"first_name": "Lucie", "last_name": "Bernard", "personal_email": "lucie@b.fr"}
+    assert scorer.find_person_candidates(draft) == []
+
+    matching_db.add(Person(id=5, first_name="Lucie", last_name="Bernard", personal_email="lucie@b.fr"))
+    matching_db.get(Person, 4).personal_email = "lucie@b.fr"
+    matching_db.commit()
+
+    matches = scorer.find_person_candidates(draft)
+    assert [(m["candidate"]["id"], m["score"]) for m in matches] == [(5, 175), (4, 100)]
+
+    # Flush annulé: l'index garde la version commitée
+    matching_db.get(Person, 5).personal_email = "other@b.fr"
+    matching_db.flush()
+    matching_db.rollback()
+    assert get_person_index(matching_db).lookup("email", "lucie@b.fr") == {4, 5}
+
+
+def test_expired_index_reloaded_by_a_single_caller(matching_db: Session, monkeypatch):
+    """TTL expiré: un appelant recharge, les autres servent l'ancien index"""
+    import threading
+    import time
+
+    _seed(matching_db)
+    stale = get_person_index(matching_db)
+    now = time.monotonic()
+    monkeypatch.setattr(
+        matching_index.time,
+        "monotonic",
+        lambda: now + matching_index.MATCHING_INDEX_REFRESH_SECONDS + 1,
+    )
+
+    loads, served = [], []
+    original = CandidateIndex.__init__
+
+    def concurrent_init(self, entries=()):
+        # Appel concurrent pendant le rechargement (autre thread)
+        loads.append(1)
+        other = threading.Thread(target=lambda: served.append(get_person_index(matching_db)))
+        other.start()
+        other.join(5)
+        original(self, entries)
+
+    monkeypatch.setattr(CandidateIndex, "__init__", concurrent_init)
+    reloaded = get_person_index(matching_db)
+
+    assert len(loads) == 1
+    assert served == [stale]
+    assert reloaded is not stale and len(reloaded) == 4
@@ -0,0 +1,181 @@
+"""
+Tests du client Microsoft Graph ($batch, backoff Retry-After, delta queries)
+"""
+
+import json
+
+import httpx
+import pytest
+
+from services.outlook import graph_client as graph_module
+from services.outlook.graph_client import (
+    GRAPH_BASE_URL,
+    GraphClient,
+    GraphSyncStateExpired,
+    parse_retry_after,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def _sleep(_seconds):
+        return None
+
+    monkeypatch.setattr(graph_module.asyncio, "sleep", _sleep)
+
+
+def _client(handler) -> GraphClient:
+    transport = httpx.MockTransport(handler)
+    return GraphClient(
+        "token",
+        client=httpx.AsyncClient(base_url=GRAPH_BASE_URL, transport=transport),
+    )
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None, default=1.5) == 1.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage", default=3) == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_chunks_and_replays_throttled_sub_requests():
+    calls = []
+    throttled_once = set()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        calls.append(len(payload["requests"]))
+        responses = []
+        for sub in payload["requests"]:
+            if sub["id"] == "3" and "3" not in throttled_once:
+                throttled_once.add("3")
+                responses.append({"id": "3", "status": 429, "headers": {"Retry-After": "1"}})
+            else:
+                responses.append({"id": sub["id"], "status": 200, "body": {"id": sub["url"]}})
+        return httpx.Response(200, json={"responses": responses})
+
+    graph = _client(handler)
+    bodies = await graph.get_many({str(i): f"/me/messages/{i}" for i in range(25)})
+
+    assert len(bodies) == 25
+    assert bodies["3"] == {"id": "/me/messages/3"}
+    # 20 + 5, puis le rejeu de la sous-requête throttlée
+    assert calls == [20, 5, 1]
+
+
+@pytest.mark.asyncio
+async def test_request_retries_on_429():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url.path)
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "2"})
+        return httpx.Response(200, json={"value": [{"id": "a"}]})
+
+    graph = _client(handler)
+    assert await graph.get_all_pages("/me/mailFolders") == [{"id": "a"}]
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_delta_messages_follows_pages_and_expires():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "expired" in str(request.url):
+            return httpx.Response(410, json={"error": {"code": "SyncStateNotFound"}})
+        if "page2" in str(request.url):
+            return httpx.Response(
+                200,
+                json={
+                    "value": [{"id": "m2"}, {"id": "m0", "@removed": {"reason": "deleted"}}],
+                    "@odata.deltaLink": f"{GRAPH_BASE_URL}/delta?token=next",
+                },
+            )
+        assert request.headers["Prefer"] == "odata.maxpagesize=100"
+        return httpx.Response(
+            200,
+            json={"value": [{"id": "m1"}], "@odata.nextLink": f"{GRAPH_BASE_URL}/delta?page2"},
+        )
+
+    graph = _client(handler)
+    page = await graph.delta_messages("inbox", start_date="2025-01-01T00:00:00Z")
+
+    assert [msg["id"] for msg in page.messages] == ["m1", "m2"]
+    assert page.removed_ids == ["m0"]
+    assert page.complete
+    assert page.state_link.endswith("token=next")
+
+    with pytest.raises(GraphSyncStateExpired):
+        await graph.delta_messages("inbox", state_link=f"{GRAPH_BASE_URL}/delta?expired")
+
+
+@pytest.mark.asyncio
+async def test_folder_delta_sync_returns_every_message_behind_stored_link(monkeypatch):
+    """Le lien stocké pointe après la page lue : aucun message lu ne doit être tronqué"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from models.outlook_delta_state import OutlookDeltaState
+    from services import outlook_integration
+    from services.outlook.graph_client import DeltaPage
+
+    engine = create_engine("sqlite:///:memory:")
+    OutlookDeltaState.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+
+    pages = {
+        "inbox": DeltaPage(
+            messages=[{"id": f"m{i}"} for i in range(5)],
+            state_link=f"{GRAPH_BASE_URL}/delta?page2",
+        ),
+        # Ni deltaLink ni nextLink
+        "sent": DeltaPage(messages=[{"id": "s1"}]),
+    }
+
+    class FakeGraph:
+        def __init__(self, access_token):
+            pass
+
+        async def delta_messages(self, folder_id, **kwargs):
+            return pages[folder_id]
+
+    monkeypatch.setattr(outlook_integration, "GraphClient", FakeGraph)
+
+    async def folders(self, access_token, cache_key=None):
+        return [{"id": "inbox", "displayName": "Inbox"}, {"id": "sent", "displayName": "Sent"}]
+
+    monkeypatch.setattr(outlook_integration.OutlookIntegration, "list_all_primary_folders", folders)
+    service = outlook_integration.OutlookIntegration(db)
+
+    messages = await service.get_recent_messages_from_all_folders("token", limit=3, user_id=1)
+    assert [m["id"] for m in messages] == [f"m{i}" for i in range(5)]
+    assert db.query(OutlookDeltaState).one().state_link.endswith("?page2")
+
+    messages = await service._sync_folder_delta("token", 1, {"id": "sent"}, "2025-01-01T00:00:00Z")
+    assert [m["id"] for m in messages] == ["s1"]
+    assert db.query(OutlookDeltaState).count() == 1
+
+    db.close()
+    engine.dispose()
+
+
+def test_folder_cache_is_bounded_and_expires(monkeypatch):
+    import time
+
+    from services import outlook_integration
+
+    cache = outlook_integration.FolderCache(max_entries=2, ttl=60)
+    cache.put("token-a", [{"id": "inbox"}])
+    cache.put("token-b", [])
+    cache.get("token-a")
+    cache.put("token-c", [{"id": "sent"}])
+
+    # "token-b" était le moins récemment utilisé; un résultat vide reste un hit
+    assert len(cache) == 2 and cache.get("token-b") is None
+    assert cache.get("token-a") == [{"id": "inbox"}]
+
+    now = time.monotonic()
+    monkeypatch.setattr(outlook_integration.time, "monotonic", lambda: now + 61)
+    assert cache.get("token-c") is None and len(cache) == 1
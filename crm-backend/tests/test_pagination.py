@@ -0,0 +1,75 @@
+"""
+Tests de la pagination keyset (core.pagination, BaseService.get_page)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.exceptions import ValidationError
+from core.pagination import decode_cursor, encode_cursor, paginate_keyset
+from models.interaction import Interaction
+from models.user import User
+from services.base import BaseService
+
+
+@pytest.fixture
+def users_db(sqlite_db):
+    db = sqlite_db(User)
+    db.add_all(
+        [User(id=i, email=f"u{i}@test.com", full_name=f"U{i}", hashed_password="x") for i in range(1, 8)]
+    )
+    db.commit()
+    return db
+
+
+def test_cursor_roundtrip_restores_datetimes():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    cursor = encode_cursor([created_at, 42])
+
+    assert decode_cursor(cursor, [Interaction.created_at, Interaction.id]) == [created_at, 42]
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor", [Interaction.id])
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, [Interaction.id])
+
+
+@pytest.mark.asyncio
+async def test_get_page_walks_all_rows_without_offset(users_db):
+    service = BaseService(User, users_db)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await service.get_page(cursor=cursor, limit=3, total="exact")
+        seen.extend(user.id for user in page.items)
+        pages += 1
+        assert page.total == 7 and not page.total_is_estimate
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == list(range(1, 8))
+    assert pages == 3
+
+    items, total = await service.get_all(skip=0, limit=3)
+    assert service.cursor_after(items) == encode_cursor([3])
+    assert total == 7
+
+
+def test_paginate_keyset_descending_composite_key(users_db):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Deux lignes partagent le même created_at: départage par id
+    for user_id, offset in [(1, 0), (2, 1), (3, 1), (4, 2)]:
+        users_db.get(User, user_id).created_at = base + timedelta(days=offset)
+    users_db.query(User).filter(User.id > 4).delete()
+    users_db.commit()
+
+    keys = [User.created_at, User.id]
+    first = paginate_keyset(users_db.query(User), keys, limit=2, descending=True)
+    second = paginate_keyset(
+        users_db.query(User), keys, cursor=first.next_cursor, limit=2, descending=True
+    )
+
+    assert [u.id for u in first.items] == [4, 3]
+    assert [u.id for u in second.items] == [2, 1]
+    assert second.next_cursor is None
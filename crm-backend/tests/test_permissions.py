@@ -8,6 +8,8 @@ Tests pour:
 - Vérification des permissions
 """
 
+import time
+
 import pytest
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
@@ -16,9 +18,11 @@ from core.permissions import (
     can_access_organisation,
     check_role_level,
     filter_query_by_team,
+    get_permission_context,
     has_any_permission,
     has_permission,
     init_default_permissions,
+    invalidate_permission_context,
 )
 from models.permission import Permission, PermissionAction, PermissionResource
 from models.role import Role, UserRole
@@ -400,3 +404,111 @@ def test_bulk_permission_check(test_db: Session, admin_user: User):
     for resource in resources:
         for action in actions:
             assert has_permission(admin_user, resource, action, test_db) is True
+
+
+# ============================================
+# Tests Contexte de Permissions (cache)
+# ============================================
+
+@pytest.fixture
+def scoped_db(sqlite_db):
+    """SQLite minimal: équipes, rôles, permissions, utilisateurs, organisations"""
+    from models.organisation import Organisation
+    from models.role import role_permissions
+
+    db = sqlite_db(Team, Role, Permission, role_permissions, User, Organisation)
+    invalidate_permission_context()
+    yield db
+    invalidate_permission_context()
+
+
+def test_permission_context_scopes_with_owner_in_and_caches(scoped_db: Session):
+    """Manager: owner_id IN (membres de l'équipe), sans JOIN users, résolu une seule fois"""
+    from models.organisation import Organisation
+
+    team = Team(id=1, name="Team A")
+    role = Role(name=UserRole.MANAGER, display_name="Manager", level=2)
+    perm = Permission(
+        resource=PermissionResource.ORGANISATIONS,
+        action=PermissionAction.READ,
+        name="organisations:read",
+        display_name="Read orgs",
+    )
+    role.permissions.append(perm)
+    manager = User(id=1, email="m@test.com", hashed_password="x", role=role, team_id=1)
+    teammate = User(id=2, email="t@test.com", hashed_password="x", team_id=1)
+    outsider = User(id=3, email="o@test.com", hashed_password="x")
+    scoped_db.add_all([team, role, perm, manager, teammate, outsider])
+    scoped_db.add_all(
+        [
+            Organisation(id=1, name="Org 1", owner_id=1),
+            Organisation(id=2, name="Org 2", owner_id=2),
+            Organisation(id=3, name="Org 3", owner_id=3),
+        ]
+    )
+    scoped_db.commit()
+
+    token = {"sub": "1", "role": "manager", "team_id": 1}
+    query = filter_query_by_team(scoped_db.query(Organisation.id), token, Organisation)
+    assert sorted(row.id for row in query) == [1, 2]
+    assert "JOIN users" not in str(query.statement)
+
+    scoped_db.refresh(manager)
+    scoped_db.statements.clear()
+    assert has_permission(manager, "organisations", "read", scoped_db) is True
+    assert has_permission(manager, "organisations", "delete", scoped_db) is False
+    assert has_any_permission(manager, "organisations", scoped_db) is True
+    assert can_access_organisation(manager, 2, scoped_db) is True
+    assert can_access_organisation(manager, 3, scoped_db) is False
+    # Contexte en cache: seules les lectures owner_id ont touché la base
+    assert len(scoped_db.statements) == 2
+    assert get_permission_context(token, scoped_db).team_member_ids == frozenset({1, 2})
+
+    # Changement d'équipe: invalidation au commit
+    outsider.team_id = 1
+    scoped_db.commit()
+    assert get_permission_context(token, scoped_db).team_member_ids == frozenset({1, 2, 3})
+
+
+def test_permission_context_expires_role_bits_and_team_members(scoped_db: Session, monkeypatch):
+    """Changement fait par un autre worker (pas d'invalidation locale): visible après le TTL"""
+    from sqlalchemy import delete, update
+
+    from core import permissions
+    from models.role import role_permissions
+
+    perm = Permission(
+        resource=PermissionResource.ORGANISATIONS,
+        action=PermissionAction.READ,
+        name="organisations:read",
+        display_name="Read orgs",
+    )
+    role = Role(id=1, name=UserRole.MANAGER, display_name="Manager", level=2, permissions=[perm])
+    scoped_db.add_all(
+        [
+            Team(id=1, name="Team A"),
+            role,
+            User(id=1, email="m@test.com", hashed_password="x", role_id=1, team_id=1),
+            User(id=2, email="t@test.com", hashed_password="x", team_id=1),
+        ]
+    )
+    scoped_db.commit()
+
+    token = {"sub": "1", "role": "manager", "team_id": 1}
+    context = get_permission_context(token, scoped_db)
+    assert context.team_member_ids == frozenset({1, 2})
+    assert context.allows("organisations", "read")
+
+    # Écritures Core: aucun after_commit ne signale le changement
+    scoped_db.execute(update(User).where(User.id == 2).values(team_id=None))
+    scoped_db.execute(delete(role_permissions))
+    scoped_db.commit()
+    assert get_permission_context(token, scoped_db) is context
+
+    now = time.monotonic()
+    monkeypatch.setattr(
+        permissions.time, "monotonic", lambda: now + permissions.PERMISSION_CONTEXT_TTL + 1
+    )
+    context = get_permission_context(token, scoped_db)
+    assert context.team_member_ids == frozenset({1})
+    assert not context.allows("organisations", "read")
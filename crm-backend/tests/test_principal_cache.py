@@ -0,0 +1,117 @@
+"""
+Tests du cache de principals JWT (core.principal_cache, core.security.resolve_principal)
+
+authenticate_principal: état courant de l'utilisateur depuis le snapshot partagé,
+refus des utilisateurs désactivés dès l'invalidation.
+"""
+
+import json
+import time
+from datetime import timedelta
+
+import pytest
+from core import principal_cache as cache_module
+from core import security
+from core.exceptions import UnauthorizedError
+from core.permissions import get_permission_context
+from core.principal_cache import (
+    PrincipalCache,
+    handle_invalidation_message,
+    invalidate_principals,
+    principal_cache,
+)
+from core.security import authenticate_principal, create_access_token, resolve_principal
+from models.role import Role, UserRole
+from models.team import Team
+from models.user import User
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    invalidate_principals(broadcast=False)
+    yield
+    invalidate_principals(broadcast=False)
+
+
+@pytest.fixture
+def auth_db(sqlite_db):
+    """SQLite (toutes les tables), expire_on_commit par défaut"""
+    return sqlite_db()
+
+
+def test_resolve_principal_decodes_each_token_once(monkeypatch):
+    token = create_access_token({"sub": "7", "email": "a@test.com"})
+    calls = []
+    real_decode = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda t: calls.append(t) or real_decode(t))
+
+    first = resolve_principal(token)
+    first["mutated"] = True
+    second = resolve_principal(token)
+
+    assert second["user_id"] == "7" and "mutated" not in second
+    assert len(calls) == 1
+
+    with pytest.raises(UnauthorizedError):
+        resolve_principal("not-a-jwt")
+
+
+def test_cache_ttl_bounded_by_token_expiry_and_lru():
+    cache = PrincipalCache(max_size=2, ttl=300)
+    cache.put("expired", {"user_id": "1", "exp": time.time() - 1})
+    assert cache.get("expired") is None
+
+    cache.put("a", {"user_id": "1", "exp": time.time() + 60})
+    cache.put("b", {"user_id": "2"})
+    cache.get("a")
+    cache.put("c", {"user_id": "3"})
+    # "b" était le moins récemment utilisé
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    assert cache.invalidate_user(1) == 1
+    assert cache.get("a") is None
+
+
+def test_remote_invalidation_message_drops_user_principals():
+    token = create_access_token({"sub": "9"}, expires_delta=timedelta(minutes=5))
+    resolve_principal(token)
+    assert len(principal_cache) == 1
+
+    # Message émis par ce worker: ignoré
+    own = json.dumps({"origin": cache_module._INSTANCE_ID, "user_ids": [9]})
+    assert handle_invalidation_message(own) is False
+    assert len(principal_cache) == 1
+
+    remote = json.dumps({"origin": "other-worker", "user_ids": [9]})
+    assert handle_invalidation_message(remote) is True
+    assert len(principal_cache) == 0
+
+
+def test_authenticate_principal_uses_snapshot_and_rejects_deactivated_user(auth_db):
+    auth_db.add(Team(id=1, name="Team A"))
+    auth_db.add(Role(id=1, name=UserRole.MANAGER, display_name="Manager", level=2))
+    auth_db.add(User(id=1, email="m@test.com", hashed_password="x", team_id=1, role_id=1))
+    auth_db.commit()
+    # Claims du token périmés: le snapshot fait foi
+    token = create_access_token({"sub": "1", "role": {"name": "user"}, "team_id": 99})
+
+    principal = authenticate_principal(token, auth_db)
+    assert principal["team_id"] == 1
+    assert principal["role"] == {"name": "manager", "level": 2}
+    assert principal["is_admin"] is False
+    assert get_permission_context(principal, auth_db).team_id == 1
+
+    # Chemin chaud: ni décodage ni requête User
+    auth_db.statements.clear()
+    assert authenticate_principal(token, auth_db)["email"] == "m@test.com"
+    assert auth_db.statements == []
+
+    # Désactivation commitée: snapshot invalidé, token encore valide refusé
+    user = auth_db.get(User, 1)
+    user.is_active = False
+    auth_db.commit()
+    with pytest.raises(UnauthorizedError):
+        authenticate_principal(token, auth_db)
+
+    with pytest.raises(UnauthorizedError):
+        authenticate_principal(create_access_token({"sub": "404"}), auth_db)
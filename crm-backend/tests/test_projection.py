@@ -0,0 +1,41 @@
+"""
+Tests des sparse fieldsets (core.projection)
+"""
+
+import pytest
+
+from core.exceptions import ValidationError
+from core.projection import model_fields, parse_fields, projection_targets, row_to_dict
+from models.user import User
+
+
+@pytest.fixture
+def users_db(sqlite_db):
+    db = sqlite_db(User)
+    db.add(User(id=1, email="a@test.com", full_name="Alice", hashed_password="secret"))
+    db.commit()
+    db.statements.clear()
+    return db
+
+
+def test_parse_fields_validates_and_prepends_id():
+    available = model_fields(User)
+
+    assert parse_fields(None, available) is None
+    assert parse_fields("email, full_name,email", available) == ["id", "email", "full_name"]
+    with pytest.raises(ValidationError):
+        parse_fields("email,password_plain", available)
+
+
+def test_projection_selects_only_requested_columns(users_db):
+    fields = parse_fields("email", model_fields(User))
+    rows = users_db.query(*projection_targets(User, fields)).all()
+
+    assert [row_to_dict(row, fields) for row in rows] == [{"id": 1, "email": "a@test.com"}]
+    select_sql = users_db.statements[-1]
+    assert "hashed_password" not in select_sql and "full_name" not in select_sql
+    # Aucune entité hydratée dans la session
+    assert len(users_db.identity_map) == 0
+
+    full = users_db.query(*projection_targets(User, None)).all()
+    assert row_to_dict(full[0], None)["full_name"] == "Alice"
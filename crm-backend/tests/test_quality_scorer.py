@@ -0,0 +1,161 @@
+"""
+Tests - Scores qualité sur toute la population (services.quality_scorer)
+
+Calcul vectorisé par lots identique au scoring unitaire, doublons en une requête
+groupée, scores persistés et agrégés par équipe sans échantillonnage.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models.data_quality import DataQualityScore
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.person import Person, PersonOrganizationLink
+from models.team import Team
+from models.user import User
+from services.quality_scorer import QualityScorer
+
+@pytest.fixture
+def quality_db(sqlite_db):
+    """SQLite: toutes les tables (relations selectin de Person / Organisation)"""
+    return sqlite_db(expire_on_commit=False)
+
+
+def _organisation(id, name, owner_id, **fields):
+    return Organisation(
+        id=id,
+        name=name,
+        owner_id=owner_id,
+        type=OrganisationType.CLIENT,
+        category=OrganisationCategory.WHOLESALE,
+        **fields,
+    )
+
+
+def _seed(db: Session):
+    db.add_all([Team(id=1, name="Team A"), Team(id=2, name="Team B")])
+    db.add_all(
+        [
+            User(id=1, email="a@example.com", hashed_password="x", team_id=1),
+            User(id=2, email="b@example.com", hashed_password="x", team_id=2),
+        ]
+    )
+    db.add_all(
+        [
+            _organisation(
+                1,
+                "Alforis",
+                1,
+                website="https://alforis.fr",
+                email="contact@alforis.fr",
+                phone="01 23 45 67 89",
+                address="1 rue de Paris",
+                city="Paris",
+                postal_code="75001",
+                country="France",
+            ),
+            _organisation(2, "ALFORIS", 1, website="alforis.fr"),
+            _organisation(3, "Other", 2),
+        ]
+    )
+    db.add_all(
+        [
+            Person(
+                id=1,
+                first_name="Jean",
+                last_name="Dupont",
+                email="jean@alforis.fr",
+                phone="06 12 34 56 78",
+                mobile="0612345678",
+                job_title="CIO",
+                linkedin_url="https://linkedin.com/in/jean",
+                notes="VIP",
+            ),
+            Person(id=2, first_name="Jean", email="jean@alforis.fr", phone="12"),
+            Person(id=3, email="not-an-email"),
+            Person(id=4, first_name="Marie"),
+        ]
+    )
+    db.flush()
+    db.add_all(
+        [
+            PersonOrganizationLink(person_id=1, organisation_id=1),
+            PersonOrganizationLink(person_id=2, organisation_id=2),
+            PersonOrganizationLink(person_id=3, organisation_id=1),
+            PersonOrganizationLink(person_id=4, organisation_id=3),
+        ]
+    )
+    db.commit()
+
+
+def test_refresh_scores_whole_population_like_unit_scoring(quality_db: Session):
+    _seed(quality_db)
+    scorer = QualityScorer(quality_db)
+
+    quality_db.statements.clear()
+    result = scorer.refresh_quality_scores(batch_size=2)
+
+    assert (result["persons"], result["organisations"]) == (4, 3)
+    # Pas de chargement d'entité ni de requête de doublons par fiche
+    assert not any("FROM person_organization_links" in s for s in quality_db.statements)
+    assert sum("GROUP BY" in s for s in quality_db.statements) == 2
+
+    persisted = {
+        (row.entity_type, row.entity_id): row for row in quality_db.query(DataQualityScore)
+    }
+    assert len(persisted) == 7
+    for person_id in range(1, 5):
+        expected = scorer.score_person(person_id)
+        row = persisted[("person", person_id)]
+        assert (row.score, row.tier, row.completeness) == (
+            expected["score"],
+            expected["tier"],
+            expected["completeness"],
+        )
+        assert row.validity_issues == len(expected["validity_issues"])
+        assert row.potential_duplicates == expected["potential_duplicates"]
+    for org_id in range(1, 4):
+        expected = scorer.score_organisation(org_id)
+        row = persisted[("organisation", org_id)]
+        assert (row.score, row.potential_duplicates) == (
+            expected["score"],
+            expected["potential_duplicates"],
+        )
+    assert persisted[("person", 1)].potential_duplicates == 1
+    assert persisted[("organisation", 2)].validity_issues == 1
+
+
+def test_team_quality_aggregates_all_persisted_scores(quality_db: Session, monkeypatch):
+    from services import quality_scorer
+    from tasks.quality_tasks import refresh_data_quality_scores
+
+    _seed(quality_db)
+    scorer = QualityScorer(quality_db)
+
+    # Aucun score persisté: recalcul délégué à Celery (une seule fois), résumé "pending"
+    enqueued = []
+    monkeypatch.setattr(quality_scorer, "_refresh_enqueued_at", None)
+    monkeypatch.setattr(refresh_data_quality_scores, "delay", lambda: enqueued.append(1))
+    pending = scorer.score_team_quality(1)
+    assert pending["pending"] and pending["total_persons"] == 0
+    assert scorer.score_team_quality(1)["pending"]
+    assert enqueued == [1]
+    assert quality_db.query(DataQualityScore).count() == 0
+
+    scorer.refresh_quality_scores()
+    team = scorer.score_team_quality(1)
+
+    assert team["pending"] is False
+
+    assert (team["total_persons"], team["total_organisations"]) == (3, 2)
+    assert sum(team["person_tiers"].values()) == 3
+    expected_avg = sum(scorer.score_person(i)["score"] for i in (1, 2, 3)) / 3
+    assert team["avg_person_score"] == round(expected_avg, 1)
+
+    # Fiche supprimée: son score disparaît au recalcul suivant
+    quality_db.query(PersonOrganizationLink).filter_by(person_id=4).delete()
+    quality_db.query(Person).filter_by(id=4).delete()
+    quality_db.commit()
+    scorer.refresh_quality_scores()
+    assert quality_db.query(DataQualityScore).filter_by(entity_type="person").count() == 3
+    assert scorer.score_team_quality(2)["total_persons"] == 0
@@ -0,0 +1,73 @@
+"""
+Tests de l'instrumentation SQL (empreintes, compteurs par requête, N+1, Server-Timing)
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from core.query_profiler import (
+    end_request_profile,
+    fingerprint,
+    instrument_engine,
+    normalise_statement,
+    start_request_profile,
+)
+from middleware.query_profiling import QueryProfilingMiddleware
+
+
+def test_fingerprint_ignores_literals_and_in_list_size():
+    assert normalise_statement("SELECT * FROM people WHERE id = 42 AND name = 'Jo'") == (
+        "SELECT * FROM people WHERE id = ? AND name = ?"
+    )
+    assert fingerprint("SELECT id FROM t WHERE id IN (%(a_1)s, %(a_2)s)") == fingerprint(
+        "SELECT id FROM t WHERE id IN (%(a_1)s, %(a_2)s, %(a_3)s, %(a_4)s)"
+    )
+    assert fingerprint("SELECT id FROM t") != fingerprint("SELECT id FROM u")
+
+    # Mémorisé par texte: une requête répétée ne repasse pas par les regex
+    misses = fingerprint.cache_info().misses
+    fingerprint("SELECT id FROM t")
+    assert fingerprint.cache_info().misses == misses
+
+
+def _engine():
+    engine = create_engine("sqlite:///:memory:")
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    return engine
+
+
+def test_request_profile_counts_queries_and_flags_n_plus_one():
+    engine = _engine()
+    token = start_request_profile("GET /people")
+    with engine.connect() as conn:
+        for person_id in range(12):
+            conn.execute(text("SELECT :id AS id"), {"id": person_id})
+        conn.execute(text("SELECT 1"))
+    profile = end_request_profile(token)
+
+    assert profile.count == 13
+    assert profile.total_ms > 0
+    suspects = profile.n_plus_one(threshold=10)
+    assert len(suspects) == 1
+    assert suspects[0]["count"] == 12
+
+
+def test_middleware_sets_server_timing_header():
+    engine = _engine()
+    app = FastAPI()
+
+    @app.get("/profiled")
+    def profiled():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"ok": True}
+
+    app.add_middleware(QueryProfilingMiddleware)
+    response = TestClient(app).get("/profiled")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["server-timing"]
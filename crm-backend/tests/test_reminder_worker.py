@@ -0,0 +1,87 @@
+"""
+Tests - Worker de rappels (workers.reminder_worker)
+
+Réclamation ensembliste (UPDATE ... RETURNING), notifications insérées par lot,
+prochaine échéance pour l'ordonnancement.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models.interaction import Interaction
+from models.notification import Notification, NotificationType
+from models.team import Team
+from models.user import User
+from workers.reminder_worker import claim_due_reminders, dispatch_due_reminders, next_due_at
+
+NOW = datetime(2025, 11, 3, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def reminder_db(sqlite_db):
+    """SQLite minimal: utilisateurs, interactions, notifications"""
+    db = sqlite_db(Team, User, Interaction, Notification, expire_on_commit=False)
+    db.add_all(
+        [
+            User(id=1, email="a@example.com", hashed_password="x"),
+            User(id=2, email="b@example.com", hashed_password="x"),
+        ]
+    )
+    db.commit()
+    db.statements.clear()
+    return db
+
+
+def _interaction(db: Session, title, due, assignee_id=1, status="todo", notified_at=None):
+    interaction = Interaction(
+        org_id=1,
+        title=title,
+        created_by=1,
+        status=status,
+        assignee_id=assignee_id,
+        next_action_at=due,
+        notified_at=notified_at,
+    )
+    db.add(interaction)
+    return interaction
+
+
+def test_dispatch_claims_batches_and_notifies_once(reminder_db: Session):
+    for index in range(5):
+        _interaction(reminder_db, f"Relance {index}", NOW - timedelta(minutes=index), assignee_id=1)
+    _interaction(reminder_db, "Autre", NOW, assignee_id=2)
+    _interaction(reminder_db, "Assignee supprimé", NOW, assignee_id=99)
+    _interaction(reminder_db, "Terminée", NOW, status="done")
+    _interaction(reminder_db, "Déjà notifiée", NOW, notified_at=NOW - timedelta(days=1))
+    _interaction(reminder_db, "Future", NOW + timedelta(hours=2))
+    reminder_db.commit()
+
+    reminder_db.statements.clear()
+    assert dispatch_due_reminders(reminder_db, now=NOW, batch_size=4) == 6
+
+    # 2 lots pleins/partiels: UPDATE ... RETURNING + SELECT users + INSERT par lot
+    updates = [s for s in reminder_db.statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 2
+    assert all("RETURNING" in statement for statement in updates)
+
+    notifications = reminder_db.query(Notification).order_by(Notification.id).all()
+    assert {n.user_id for n in notifications} == {1, 2}
+    assert all(n.type == NotificationType.TASK_DUE for n in notifications)
+    assert notifications[0].link.startswith("/interactions/")
+
+    # Tout est réclamé, y compris l'assignee introuvable: rien à re-notifier
+    assert dispatch_due_reminders(reminder_db, now=NOW) == 0
+    assert claim_due_reminders(reminder_db, NOW + timedelta(hours=3)) != []
+
+
+def test_next_due_at_ignores_notified_and_closed(reminder_db: Session):
+    assert next_due_at(reminder_db) is None
+
+    _interaction(reminder_db, "Terminée", NOW - timedelta(hours=1), status="done")
+    _interaction(reminder_db, "Notifiée", NOW - timedelta(hours=1), notified_at=NOW)
+    _interaction(reminder_db, "Suivante", NOW + timedelta(minutes=30), status="in_progress")
+    reminder_db.commit()
+
+    assert next_due_at(reminder_db) == NOW + timedelta(minutes=30)
@@ -0,0 +1,210 @@
+"""
+Tests - Anonymisation RGPD ensembliste (services.rgpd_anonymizer)
+
+UPDATE par lots d'ids, pseudonymes déterministes calculés en SQL, journal d'audit
+par lot, reprise sur checkpoint après interruption, effacement d'un utilisateur.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models.anonymization_checkpoint import AnonymizationCheckpoint
+from models.audit_log import AuditLog
+from models.email_message import EmailMessage
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.person import Person, PersonOrganizationLink
+from models.task import Task
+from models.team import Team
+from models.user import User
+from models.user_email_account import UserEmailAccount
+from services.rgpd_anonymizer import (
+    AnonymizationEngine,
+    inactive_organisations_plan,
+    inactive_people_plan,
+)
+from services.rgpd_service import RGPDService
+
+CUTOFF = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def anon_db(sqlite_db):
+    """SQLite: toutes les tables, email_messages recréée avec JSON à la place de JSONB"""
+    return sqlite_db(expire_on_commit=False)
+
+
+def _pseudonym(seed: str) -> str:
+    return hashlib.md5(seed.encode()).hexdigest()[:8]
+
+
+def _organisation(id, name, **fields):
+    return Organisation(
+        id=id,
+        name=name,
+        type=OrganisationType.CLIENT,
+        category=OrganisationCategory.WHOLESALE,
+        **fields,
+    )
+
+
+def _seed_contacts(db: Session):
+    old = CUTOFF - timedelta(days=10)
+    db.add_all(
+        [Person(id=i, first_name=f"P{i}", last_name="Old", last_activity_date=old) for i in range(1, 6)]
+    )
+    db.add_all(
+        [
+            Person(id=6, first_name="Recent", last_activity_date=CUTOFF + timedelta(days=1)),
+            Person(id=7, first_name="Never"),  # jamais d'activité: éligible
+            Person(id=8, first_name="Done", is_anonymized=True, last_activity_date=old),
+            _organisation(1, "Inactive", is_active=False, last_activity_date=old),
+            _organisation(2, "Active", is_active=True, last_activity_date=old),
+        ]
+    )
+    db.commit()
+
+
+def test_retention_plans_update_by_batches_with_sql_pseudonyms(anon_db: Session):
+    _seed_contacts(anon_db)
+    engine = AnonymizationEngine(anon_db, batch_size=2)
+
+    anon_db.statements.clear()
+    counts = engine.run(
+        "retention:2024-01-01", [inactive_people_plan(CUTOFF), inactive_organisations_plan(CUTOFF)]
+    )
+
+    assert counts == {"people": 6, "organisations": 1}
+    updates = [s for s in anon_db.statements if s.startswith("UPDATE people")]
+    assert len(updates) == 3 and all(" IN (" in s for s in updates)
+
+    people = {p.id: p for p in anon_db.query(Person)}
+    assert people[1].first_name == f"User_{_pseudonym('person:first_name:1')}"
+    assert people[7].email == f"anonymized_{_pseudonym('person:email:7')}@example.com"
+    assert people[1].is_anonymized and people[1].anonymized_at is not None
+    assert people[1].mobile is None
+    assert people[6].first_name == "Recent" and people[8].first_name == "Done"
+
+    organisations = {o.id: o for o in anon_db.query(Organisation)}
+    assert organisations[1].name == f"Anonymized_{_pseudonym('organisation:name:1')}"
+    assert organisations[2].name == "Active"
+
+    audits = anon_db.query(AuditLog).filter_by(action="anonymize").all()
+    assert sorted((a.entity_type, a.entity_id) for a in audits) == [("organisation", 1)] + [
+        ("person", i) for i in (1, 2, 3, 4, 5, 7)
+    ]
+
+    # Passe terminée: checkpoints supprimés, une nouvelle passe voit les fiches créées depuis
+    assert anon_db.query(AnonymizationCheckpoint).count() == 0
+    anon_db.add(Person(id=9, first_name="New", last_activity_date=CUTOFF - timedelta(days=1)))
+    anon_db.commit()
+    assert AnonymizationEngine(anon_db).run(
+        "retention:2024-01-01", [inactive_people_plan(CUTOFF)]
+    ) == {"people": 1}
+    assert anon_db.get(Person, 9).is_anonymized
+
+
+def test_batch_audits_only_rows_still_eligible(anon_db: Session):
+    """Ids sélectionnés puis devenus inéligibles: ni mis à jour, ni audités"""
+    _seed_contacts(anon_db)
+    engine = AnonymizationEngine(anon_db)
+
+    assert engine._anonymize_batch(inactive_people_plan(CUTOFF), [1, 6, 8]) == 1
+    anon_db.commit()
+
+    audits = anon_db.query(AuditLog).filter_by(action="anonymize").all()
+    assert [(a.entity_type, a.entity_id) for a in audits] == [("person", 1)]
+
+
+def test_interrupted_run_resumes_from_checkpoint(anon_db: Session, monkeypatch):
+    _seed_contacts(anon_db)
+    engine = AnonymizationEngine(anon_db, batch_size=2)
+    batches = []
+    original = AnonymizationEngine._anonymize_batch
+
+    def failing_batch(self, plan, ids):
+        if len(batches) == 2:
+            raise RuntimeError("connection lost")
+        batches.append(ids)
+        return original(self, plan, ids)
+
+    monkeypatch.setattr(AnonymizationEngine, "_anonymize_batch", failing_batch)
+    with pytest.raises(RuntimeError):
+        engine.run("retention:2024-01-01", [inactive_people_plan(CUTOFF)])
+    anon_db.rollback()
+
+    checkpoint = anon_db.query(AnonymizationCheckpoint).one()
+    assert (checkpoint.last_id, checkpoint.processed, checkpoint.completed_at) == (4, 4, None)
+
+    monkeypatch.setattr(AnonymizationEngine, "_anonymize_batch", original)
+    counts = AnonymizationEngine(anon_db, batch_size=2).run(
+        "retention:2024-01-01", [inactive_people_plan(CUTOFF)]
+    )
+
+    assert counts == {"people": 6}
+    assert anon_db.query(Person).filter_by(is_anonymized=True).count() == 7
+    assert anon_db.query(AuditLog).count() == 6  # un seul audit par fiche
+
+
+def test_user_erasure_covers_owned_data_only(anon_db: Session):
+    anon_db.add(Team(id=1, name="Team A"))
+    anon_db.add_all(
+        [
+            User(id=1, email="me@example.com", username="me", hashed_password="x", team_id=1),
+            User(id=2, email="other@example.com", hashed_password="x", team_id=1),
+            _organisation(1, "Mine", owner_id=1),
+            _organisation(2, "Theirs", owner_id=2),
+            Person(id=1, first_name="Jean"),
+            Person(id=2, first_name="Marie"),
+            UserEmailAccount(id=1, team_id=1, user_id=1, email="me@example.com", provider="imap"),
+        ]
+    )
+    anon_db.flush()
+    anon_db.add_all(
+        [
+            PersonOrganizationLink(person_id=1, organisation_id=1),
+            PersonOrganizationLink(person_id=2, organisation_id=2),
+            Task(title="Appeler Jean", assigned_to=1),
+            Task(title="Autre", assigned_to=2),
+            EmailMessage(
+                id=1,
+                team_id=1,
+                account_id=1,
+                external_message_id="<1@example.com>",
+                sender_email="jean@client.fr",
+                subject="Contrat",
+                recipients_to=["me@example.com"],
+                content_hash="1",
+            ),
+        ]
+    )
+    anon_db.commit()
+
+    counts = RGPDService(anon_db).anonymize_user_data(1, reason="Test")
+
+    assert counts["user"] == 1
+    assert (counts["people"], counts["organisations"], counts["tasks"]) == (1, 1, 1)
+    assert counts["email_messages"] == 1
+    users = {u.id: u for u in anon_db.query(User)}
+    assert users[1].email == f"anonymized_{_pseudonym('user:email:1')}@anonymized.local"
+    assert (users[1].username, users[1].is_active) == (None, False)
+    assert users[2].email == "other@example.com"
+    assert anon_db.get(Person, 1).is_anonymized and not anon_db.get(Person, 2).is_anonymized
+    assert anon_db.get(Organisation, 2).name == "Theirs"
+    assert sorted(t.title for t in anon_db.query(Task)) == ["Anonymized Task", "Autre"]
+    message = anon_db.get(EmailMessage, 1)
+    assert (message.subject, message.recipients_to) == ("[Anonymized]", [])
+
+    # Utilisateurs inactifs: le compte déjà anonymisé n'est plus éligible
+    later = RGPDService(anon_db).anonymize_inactive_users(datetime.utcnow() + timedelta(days=1))
+    assert later["user"] == 1  # seul l'autre compte
+    assert anon_db.get(User, 2).is_active is False
+
+    # Nouvelle demande d'effacement: les données créées depuis sont anonymisées
+    anon_db.add(Task(title="Rappeler Marie", assigned_to=1))
+    anon_db.commit()
+    again = RGPDService(anon_db).anonymize_user_data(1, reason="Second request")
+    assert again["tasks"] == 2
+    assert anon_db.query(Task).filter_by(title="Rappeler Marie").count() == 0
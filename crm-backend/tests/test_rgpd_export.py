@@ -0,0 +1,274 @@
+"""
+Tests - Export RGPD en streaming (RGPDService.stream_user_export)
+
+Archive zip produite section par section (JSON-lines), pièces jointes stockées
+incluses, progression par lot, job Celery écrivant l'archive sur disque.
+"""
+
+import io
+import json
+import zipfile
+
+import pytest
+from sqlalchemy import JSON, Column, MetaData, Table, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.config import settings
+from models.base import Base
+from models.email_attachment import EmailAttachment
+from models.email_message import EmailMessage
+from models.interaction import Interaction, InteractionType
+from models.organisation import Organisation, OrganisationCategory, OrganisationType
+from models.person import Person, PersonOrganizationLink
+from models.task import Task
+from models.team import Team
+from models.user import User
+from models.user_email_account import UserEmailAccount
+from services import rgpd_service
+from services.rgpd_service import RGPDService
+from tasks import rgpd_tasks
+
+# Colonnes JSONB non compilables par SQLite
+JSONB_TABLES = {"ai_user_preferences", "email_messages", "ai_memory"}
+
+
+@pytest.fixture
+def rgpd_engine():
+    """SQLite: toutes les tables, email_messages recréée avec JSON à la place de JSONB"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine,
+        tables=[table for table in Base.metadata.sorted_tables if table.name not in JSONB_TABLES],
+    )
+    source = EmailMessage.__table__
+    Table(
+        source.name,
+        MetaData(),
+        *(
+            Column(
+                column.name,
+                JSON() if isinstance(column.type, JSONB) else column.type,
+                primary_key=column.primary_key,
+            )
+            for column in source.columns
+        ),
+    ).create(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def rgpd_db(rgpd_engine):
+    db = sessionmaker(bind=rgpd_engine, expire_on_commit=False)()
+    yield db
+    db.close()
+
+
+def _seed(db: Session, upload_dir):
+    stored = upload_dir / "team_1" / "contrat.pdf"
+    stored.parent.mkdir(parents=True)
+    stored.write_bytes(b"%PDF-1.4 " + b"x" * 5000)
+
+    db.add(Team(id=1, name="Team A"))
+    db.add_all(
+        [
+            User(id=1, email="me@example.com", hashed_password="x", full_name="Me", team_id=1),
+            User(id=2, email="other@example.com", hashed_password="x", team_id=1),
+        ]
+    )
+    db.add_all(
+        [
+            Organisation(
+                id=1,
+                name="Alforis",
+                owner_id=1,
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+            ),
+            Organisation(
+                id=2,
+                name="Autre",
+                owner_id=2,
+                type=OrganisationType.CLIENT,
+                category=OrganisationCategory.WHOLESALE,
+            ),
+            Person(id=1, first_name="Jean", last_name="Dupont"),
+            Person(id=2, first_name="Marie", last_name="Curie"),
+            UserEmailAccount(id=1, team_id=1, user_id=1, email="me@example.com", provider="imap"),
+            UserEmailAccount(id=2, team_id=1, user_id=2, email="other@example.com", provider="imap"),
+        ]
+    )
+    db.flush()
+    db.add_all(
+        [
+            PersonOrganizationLink(person_id=1, organisation_id=1),
+            PersonOrganizationLink(person_id=2, organisation_id=2),
+            Task(title="Relancer", assigned_to=1),
+            Interaction(type=InteractionType.CALL, title="Appel", org_id=1, created_by=1),
+        ]
+    )
+    for message_id in range(1, 5):
+        db.add(
+            EmailMessage(
+                id=message_id,
+                team_id=1,
+                account_id=1 if message_id < 4 else 2,
+                external_message_id=f"<{message_id}@example.com>",
+                sender_email="client@example.com",
+                subject=f"Message {message_id}",
+                body_text="Bonjour " * 200,
+                recipients_to=["me@example.com"],
+                content_hash=str(message_id),
+            )
+        )
+    db.flush()
+    db.add_all(
+        [
+            EmailAttachment(
+                id=1,
+                team_id=1,
+                email_message_id=1,
+                filename="contrat.pdf",
+                size_bytes=5009,
+                storage_path=str(stored),
+            ),
+            EmailAttachment(
+                id=2,
+                team_id=1,
+                email_message_id=2,
+                filename="remote.pdf",
+                size_bytes=10,
+                storage_path="s3://bucket/team_1/remote.pdf",
+            ),
+        ]
+    )
+    db.commit()
+    return stored
+
+
+@pytest.fixture
+def small_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    monkeypatch.setattr(rgpd_service, "EXPORT_CHUNK_BYTES", 512)
+    monkeypatch.setattr(rgpd_service, "EMAIL_EXPORT_BATCH_SIZE", 1)
+
+
+def test_stream_export_writes_sections_attachments_and_progress(rgpd_db, tmp_path, small_chunks):
+    stored = _seed(rgpd_db, tmp_path)
+    progress = []
+
+    chunks = list(
+        RGPDService(rgpd_db).stream_user_export(1, progress=lambda *args: progress.append(args))
+    )
+
+    assert len(chunks) > 3  # produit et envoyé au fil de l'eau
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def section(name):
+        return [json.loads(line) for line in archive.read(f"{name}.jsonl").splitlines()]
+
+    assert json.loads(archive.read("user.json"))["full_name"] == "Me"
+    assert [p["id"] for p in section("people")] == [1]
+    assert [o["name"] for o in section("organisations")] == ["Alforis"]
+    assert section("interactions")[0]["type"] == "call"
+    assert [t["title"] for t in section("tasks")] == ["Relancer"]
+    assert [m["subject"] for m in section("email_messages")] == [f"Message {i}" for i in (1, 2, 3)]
+
+    attachments = section("email_attachments")
+    assert [a["archive_path"] for a in attachments] == ["attachments/1_contrat.pdf", None]
+    assert all("storage_path" not in a for a in attachments)
+    assert archive.read("attachments/1_contrat.pdf") == stored.read_bytes()
+
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["counts"]["email_messages"] == 3
+    assert manifest["attachments_included"] == 1
+    assert "access_logs" not in manifest["counts"]
+
+    # Un appel par lot; les emails sont lus un par un (EMAIL_EXPORT_BATCH_SIZE = 1)
+    assert [p for p in progress if p[0] == "email_messages"] == [
+        ("email_messages", 5, 9),
+        ("email_messages", 6, 9),
+        ("email_messages", 7, 9),
+    ]
+    assert progress[-1] == ("email_attachments", 9, 9)
+
+
+def test_dict_export_uses_same_sections(rgpd_db, tmp_path, small_chunks):
+    _seed(rgpd_db, tmp_path)
+
+    data = RGPDService(rgpd_db).export_user_data(1)
+
+    assert data["user"]["email"] == "me@example.com"
+    assert [p["last_name"] for p in data["people"]] == ["Dupont"]
+    assert len(data["email_messages"]) == 3
+    assert "email_attachments" not in data
+    with pytest.raises(ValueError):
+        RGPDService(rgpd_db).export_user_data(99)
+
+
+def test_export_job_writes_archive_and_reports_status(
+    rgpd_engine, rgpd_db, tmp_path, small_chunks, monkeypatch
+):
+    _seed(rgpd_db, tmp_path)
+    statuses = []
+    monkeypatch.setattr(rgpd_tasks, "SessionLocal", sessionmaker(bind=rgpd_engine))
+    monkeypatch.setattr(rgpd_tasks, "save_export_job", lambda job: statuses.append(dict(job)))
+    monkeypatch.setattr(rgpd_service, "EXPORT_DIR", tmp_path / "exports")
+
+    job = rgpd_tasks.export_user_data(1, "job1")
+
+    assert job["status"] == "completed"
+    assert job["file_path"] == str(tmp_path / "exports" / "1" / "job1.zip")
+    assert zipfile.ZipFile(job["file_path"]).testzip() is None
+    assert statuses[0]["status"] == "running"
+    assert any(s["section"] == "email_messages" for s in statuses)
+    assert not list((tmp_path / "exports" / "1").glob("*.part"))
+
+    failed = rgpd_tasks.export_user_data(99, "job2")
+    assert failed["status"] == "failed"
+    assert not list((tmp_path / "exports").rglob("job2*"))
+
+
+def test_purge_deletes_expired_export_archives(tmp_path, monkeypatch):
+    import os
+
+    monkeypatch.setattr(rgpd_service, "EXPORT_DIR", tmp_path / "exports")
+    old_dir, recent_dir = tmp_path / "exports" / "1", tmp_path / "exports" / "2"
+    old_dir.mkdir(parents=True)
+    recent_dir.mkdir()
+    (old_dir / "job1.zip").write_bytes(b"zip")
+    (old_dir / "job2.zip.part").write_bytes(b"partial")
+    (recent_dir / "job3.zip").write_bytes(b"zip")
+    now = (recent_dir / "job3.zip").stat().st_mtime
+    for path in old_dir.iterdir():
+        os.utime(path, (now - 2 * rgpd_service.EXPORT_JOB_TTL_SECONDS,) * 2)
+
+    assert rgpd_tasks.purge_expired_exports_task()["deleted"] == 2
+    assert not old_dir.exists()
+    assert (recent_dir / "job3.zip").exists()
+
+
+def test_export_job_refused_when_job_store_unavailable(monkeypatch):
+    """Redis indisponible: 503 au lieu d'un job_id impossible à suivre"""
+    from types import SimpleNamespace
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from core.auth import get_current_user
+    from core.database import get_db
+    from routers import rgpd
+
+    enqueued = []
+    monkeypatch.setattr(rgpd, "save_export_job", lambda job: False)
+    monkeypatch.setattr(rgpd_tasks.export_user_data, "delay", lambda *args: enqueued.append(args))
+    app = FastAPI()
+    app.include_router(rgpd.router)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, is_admin=False)
+    app.dependency_overrides[get_db] = lambda: None
+
+    response = TestClient(app).post("/rgpd/export/jobs")
+
+    assert response.status_code == 503
+    assert enqueued == []
@@ -156,6 +156,165 @@ def test_mask_sensitive_value_database_url():
     assert masked.startswith("post")
 
 
+# ============================================================================
+# Tests Middleware ASGI + writer par lots
+# ============================================================================
+
+
+class _FakeWriter:
+    running = True
+
+    def __init__(self):
+        self.rows = []
+
+    def enqueue(self, row):
+        self.rows.append(row)
+        return True
+
+
+async def _call_middleware(path, method="GET", status=200, headers=None, writer=None):
+    from middleware.rgpd_logging import RGPDLoggingMiddleware
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"fields=email",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("10.0.0.1", 1234),
+        "state": {"user_id": 7},
+    }
+    await RGPDLoggingMiddleware(app, writer=writer)(scope, receive, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_asgi_middleware_enqueues_access_log():
+    """Le middleware met en file (sans écriture DB) un log par accès réussi"""
+    writer = _FakeWriter()
+    sent = await _call_middleware(
+        "/api/v1/people/12",
+        headers={"X-Forwarded-For": "203.0.113.195, 70.41.3.18", "User-Agent": "pytest"},
+        writer=writer,
+    )
+
+    assert sent[0]["status"] == 200
+    assert len(writer.rows) == 1
+    row = writer.rows[0]
+    assert (row["entity_type"], row["entity_id"], row["access_type"]) == ("person", 12, "read")
+    assert row["user_id"] == 7
+    assert row["ip_address"] == "203.0.113.195"
+    assert '"fields": "email"' in row["extra_data"]
+
+
+@pytest.mark.asyncio
+async def test_asgi_middleware_skips_errors_and_untracked_routes():
+    """Pas de log pour les erreurs ni pour les endpoints non suivis"""
+    writer = _FakeWriter()
+    await _call_middleware("/api/v1/people/12", status=404, writer=writer)
+    await _call_middleware("/api/v1/people", writer=writer)
+    await _call_middleware("/api/v1/people/12", method="PUT", writer=writer)
+    assert writer.rows == []
+
+
+def test_batch_writer_flushes_in_batches():
+    """Le writer insère la file par lots de max_batch lignes"""
+    from datetime import datetime
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.batch_writer import BatchedInsertWriter
+    from models.data_access_log import DataAccessLog
+
+    engine = create_engine("sqlite:///:memory:")
+    DataAccessLog.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    writer = BatchedInsertWriter(
+        "test_access_log", DataAccessLog.__table__, max_batch=2, session_factory=Session
+    )
+    for entity_id in range(5):
+        writer.enqueue(
+            {
+                "entity_type": "person",
+                "entity_id": entity_id,
+                "access_type": "read",
+                "accessed_at": datetime.utcnow(),
+            }
+        )
+
+    assert len(writer) == 5
+    assert writer.flush() == 5
+    stats = writer.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["flush_count"] == 3
+
+    with Session() as db:
+        assert db.query(DataAccessLog).count() == 5
+
+
+def test_batch_writer_isolates_and_dead_letters_poison_rows():
+    """Une ligne rejetée par la base ne bloque pas les autres: isolée puis dead-letter"""
+    from datetime import datetime
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.batch_writer import BatchedInsertWriter
+    from models.data_access_log import DataAccessLog
+
+    engine = create_engine("sqlite:///:memory:")
+    DataAccessLog.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    writer = BatchedInsertWriter(
+        "test_access_log",
+        DataAccessLog.__table__,
+        max_batch=8,
+        session_factory=Session,
+        max_attempts=2,
+    )
+
+    def row(entity_id, entity_type="person"):
+        return {
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "access_type": "read",
+            "accessed_at": datetime.utcnow(),
+        }
+
+    for entity_id in range(10):
+        # entity_type NOT NULL: ligne 3 rejetée par la base
+        writer.enqueue(row(entity_id, None if entity_id == 3 else "person"))
+
+    assert writer.flush() == 9
+    assert len(writer) == 1
+
+    writer.enqueue(row(10))
+    assert writer.flush() == 1
+    stats = writer.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["dead_lettered_total"] == 1
+    assert stats["rejected_total"] == 2
+    assert writer.dead_letters[0]["entity_id"] == 3
+
+    with Session() as db:
+        assert db.query(DataAccessLog).count() == 10
+
+
 # ============================================================================
 # Tests Integration avec Endpoints (via test client)
 # ============================================================================
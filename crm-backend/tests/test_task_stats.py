@@ -0,0 +1,141 @@
+"""
+Tests - Statistiques des tâches (core.task_stats)
+
+Toutes les tranches en un SELECT, périmètres utilisateur/équipe, cache versionné
+invalidé au commit.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+import core.task_stats as task_stats
+from core.cache import RedisClient
+from models.kpi import DashboardDailyStat, DashboardStatCounter
+from models.organisation import Organisation
+from models.task import Task, TaskPriority, TaskStatus
+from models.team import Team
+from models.user import User
+from services.task import TaskService
+
+TODAY = date.today()
+
+
+def _due(days: int) -> datetime:
+    return datetime.combine(TODAY + timedelta(days=days), datetime.min.time())
+
+
+@pytest.fixture
+def tasks_db(sqlite_db):
+    """SQLite minimal: équipes, utilisateurs, tâches (+ rollups dashboard)"""
+    db = sqlite_db(
+        Team,
+        User,
+        Organisation,
+        Task,
+        DashboardDailyStat,
+        DashboardStatCounter,
+        expire_on_commit=False,
+    )
+    db.add_all([Team(id=1, name="Team A"), Team(id=2, name="Team B")])
+    db.add_all(
+        [
+            User(id=1, email="a@example.com", hashed_password="x", team_id=1),
+            User(id=2, email="b@example.com", hashed_password="x", team_id=2),
+        ]
+    )
+    db.add_all(
+        [
+            Task(title="Retard", due_date=_due(-2), assigned_to=1),
+            Task(title="Aujourd'hui", due_date=_due(0), assigned_to=1, status=TaskStatus.DOING),
+            Task(title="Semaine", due_date=_due(3), assigned_to=2, priority=TaskPriority.HAUTE),
+            Task(title="Faite", due_date=_due(-1), assigned_to=2, status=TaskStatus.DONE),
+            Task(title="Sans assignee"),
+        ]
+    )
+    db.commit()
+    db.statements.clear()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_statistics_computed_in_one_select(tasks_db: Session):
+    tasks_db.statements.clear()
+    stats = await TaskService(tasks_db).get_statistics()
+
+    assert len(tasks_db.statements) == 1
+    assert (stats["total"], stats["overdue"], stats["today"], stats["next_7_days"]) == (5, 1, 1, 1)
+    assert stats["by_status"] == {status.value: 0 for status in TaskStatus} | {
+        TaskStatus.TODO.value: 3,
+        TaskStatus.DOING.value: 1,
+        TaskStatus.DONE.value: 1,
+    }
+    assert stats["by_priority"][TaskPriority.HAUTE.value] == 1
+    assert sum(stats["by_priority"].values()) == 5
+
+
+def test_scoped_statistics_and_24h_counters(tasks_db: Session):
+    mine = task_stats.compute_task_stats(tasks_db, assigned_to=1)
+    team = task_stats.compute_task_stats(tasks_db, team_id=2)
+
+    assert (mine["total"], mine["overdue"], mine["today"]) == (2, 1, 1)
+    assert (team["total"], team["next_7_days"], team["by_status"]["done"]) == (2, 1, 1)
+    assert mine["created_last_24h"] == 2
+    assert team["completed_last_24h"] == 1
+
+    in_two_days = datetime.now(timezone.utc) + timedelta(days=2)
+    later = task_stats.compute_task_stats(tasks_db, now=in_two_days)
+    assert later["created_last_24h"] == 0
+
+
+class FakeRedis:
+    """Sous-ensemble de redis.Redis utilisé par core.cache, commandes enregistrées"""
+
+    def __init__(self):
+        self.store = {}
+        self.commands = []
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        self.commands.append("GET")
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.commands.append(f"INCR {key}")
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+
+def test_cache_version_bumped_when_task_or_team_changes_commit(tasks_db: Session, monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(RedisClient, "_instance", fake)
+
+    assert task_stats.get_task_stats(tasks_db)["total"] == 5
+    tasks_db.statements.clear()
+    assert task_stats.get_task_stats(tasks_db)["total"] == 5
+    assert tasks_db.statements == []
+
+    # Invalidation: un seul INCR, aucun parcours des clés
+    fake.commands.clear()
+    tasks_db.add(Task(title="Nouvelle"))
+    tasks_db.commit()
+    assert fake.commands == [f"INCR {task_stats.VERSION_KEY}"]
+    assert task_stats.get_task_stats(tasks_db)["total"] == 6
+
+    # Rollback: pas d'invalidation
+    tasks_db.add(Task(title="Annulée"))
+    tasks_db.flush()
+    tasks_db.rollback()
+    assert fake.store[task_stats.VERSION_KEY] == 1
+
+    task_stats.get_task_stats(tasks_db, team_id=2)
+    tasks_db.get(User, 1).team_id = 2
+    tasks_db.commit()
+    assert fake.store[task_stats.VERSION_KEY] == 2
+    assert task_stats.get_task_stats(tasks_db, team_id=2)["total"] == 4
@@ -1,33 +1,40 @@
 """
 Worker de rappels pour Interactions V2
 
-Job périodique (5 minutes):
-- Sélectionne interactions WHERE status IN ('todo','in_progress') AND next_action_at <= now() AND notified_at IS NULL
-- Envoie notification (app + email simple)
-- Marque notified_at pour éviter re-notification
+Dispatcher ensembliste, ordonnancé sur la prochaine échéance:
+- Réclame les interactions dues par lots: UPDATE ... SET notified_at = now()
+  WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING ...
+  → plusieurs workers peuvent tourner en parallèle sans double notification
+- Charge les assignees du lot en une requête, insère les notifications en un
+  INSERT multi-lignes, un commit par lot (réclamation + notifications atomiques)
+- Dort jusqu'à la prochaine échéance (index partiel idx_interactions_pending_reminders),
+  bornée par un intervalle max pour les rappels créés entre-temps
 
 Usage:
-    python -m workers.reminder_worker
+    python -m workers.reminder_worker          # boucle (livraison à l'échéance)
+    python -m workers.reminder_worker --once   # un passage (cron)
 
 Déploiement:
-    Ajouter cron job ou supervisord task
+    supervisord (boucle) recommandé; le cron */5 --once reste supporté
 """
 
 import logging
 import os
 import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, sessionmaker
 
-from core.notifications import create_notification  # Assume exists
 from models.interaction import Interaction
+from models.notification import Notification, NotificationPriority, NotificationType
 from models.user import User
 
 # Configure logging
@@ -43,105 +50,160 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine)
 
 
-def send_notification(interaction: Interaction, user: User, db):
-    """
-    Envoie une notification à l'assignee.
+PENDING_STATUSES = ("todo", "in_progress")
+BATCH_SIZE = 500
+MAX_SLEEP_SECONDS = 60
 
-    Channels:
-    - In-app notification (table notifications)
-    - Email simple (optionnel)
-    """
-    title = f"Rappel: {interaction.title}"
-    message = f"Action prévue le {interaction.next_action_at.strftime('%d/%m/%Y à %H:%M')}"
 
-    try:
-        # Create in-app notification
-        create_notification(
-            db=db,
-            user_id=user.id,
-            title=title,
-            message=message,
-            type="reminder",
-            priority="high",
-            link=f"/interactions/{interaction.id}"
-        )
+def _pending_reminders():
+    """Filter matching idx_interactions_pending_reminders (partial index)."""
+    return (
+        Interaction.status.in_(PENDING_STATUSES),
+        Interaction.notified_at.is_(None),
+        Interaction.assignee_id.isnot(None),  # Must have assignee
+    )
 
-        # TODO: Send email via Resend (optional)
-        # send_email(
-        #     to=user.email,
-        #     subject=title,
-        #     body=message,
-        # )
 
-        logger.info(f"Notification sent to user {user.id} for interaction {interaction.id}")
-    except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+def claim_due_reminders(db: Session, now: datetime, batch_size: int = BATCH_SIZE) -> List[Row]:
+    """
+    Claim up to `batch_size` due reminders by setting notified_at.
 
+    Rows locked by another worker are skipped (FOR UPDATE SKIP LOCKED); the claim
+    becomes visible to others when the caller commits.
 
-def process_reminders():
+    Returns:
+        Rows (id, title, next_action_at, assignee_id) of the claimed interactions
     """
-    Process overdue reminders.
+    due_ids = (
+        select(Interaction.id)
+        .where(*_pending_reminders(), Interaction.next_action_at <= now)
+        .order_by(Interaction.next_action_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(Interaction)
+        .where(Interaction.id.in_(due_ids), *_pending_reminders())
+        .values(notified_at=now)
+        .returning(
+            Interaction.id,
+            Interaction.title,
+            Interaction.next_action_at,
+            Interaction.assignee_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).all()
+
+
+def _reminder_notification(reminder: Row) -> dict:
+    """In-app notification row for a claimed reminder."""
+    return {
+        "user_id": reminder.assignee_id,
+        "type": NotificationType.TASK_DUE,
+        "priority": NotificationPriority.HIGH,
+        "title": f"Rappel: {reminder.title}"[:255],
+        "message": f"Action prévue le {reminder.next_action_at.strftime('%d/%m/%Y à %H:%M')}",
+        "link": f"/interactions/{reminder.id}",
+        "resource_type": "interaction",
+        "resource_id": reminder.id,
+    }
+
+
+def dispatch_due_reminders(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Send every reminder due at `now`, batch by batch.
+
+    Per batch: one claiming UPDATE ... RETURNING, one assignee query, one
+    multi-row notification INSERT, one commit.
 
-    1. Find interactions with next_action_at <= now()
-    2. Filter: status IN ('todo', 'in_progress')
-    3. Filter: notified_at IS NULL (not already notified)
-    4. Send notification
-    5. Mark notified_at
+    Returns:
+        Number of notifications created
     """
-    db = SessionLocal()
-    now = datetime.utcnow()
+    now = now or datetime.now(timezone.utc)
+    sent = 0
 
-    try:
-        # Query overdue interactions
-        interactions = (
-            db.query(Interaction)
-            .filter(
-                Interaction.status.in_(['todo', 'in_progress']),
-                Interaction.next_action_at <= now,
-                Interaction.notified_at.is_(None),
-                Interaction.assignee_id.isnot(None),  # Must have assignee
-            )
-            .all()
-        )
+    while True:
+        reminders = claim_due_reminders(db, now, batch_size)
+        if not reminders:
+            break
+
+        assignee_ids = {reminder.assignee_id for reminder in reminders}
+        known_ids = set(db.scalars(select(User.id).where(User.id.in_(assignee_ids))))
+        for missing_id in assignee_ids - known_ids:
+            logger.warning(f"Assignee {missing_id} not found, reminders skipped")
+
+        notifications = [
+            _reminder_notification(reminder)
+            for reminder in reminders
+            if reminder.assignee_id in known_ids
+        ]
+        if notifications:
+            db.execute(insert(Notification), notifications)
+        db.commit()
 
-        logger.info(f"Found {len(interactions)} interactions needing reminders")
+        sent += len(notifications)
+        logger.info(f"Sent {len(notifications)} reminders ({len(reminders)} claimed)")
 
-        for interaction in interactions:
-            # Get assignee
-            user = db.query(User).filter(User.id == interaction.assignee_id).first()
-            if not user:
-                logger.warning(f"Assignee {interaction.assignee_id} not found for interaction {interaction.id}")
-                continue
+        if len(reminders) < batch_size:
+            break
 
-            # Send notification
-            send_notification(interaction, user, db)
+    return sent
 
-            # Mark as notified
-            interaction.notified_at = now
-            db.commit()
 
+def next_due_at(db: Session) -> Optional[datetime]:
+    """Earliest pending next_action_at (index lookup, no table scan)."""
+    due = db.scalar(select(func.min(Interaction.next_action_at)).where(*_pending_reminders()))
+    if due is not None and due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    return due
+
+
+def process_reminders() -> Optional[datetime]:
+    """
+    Process due reminders once.
+
+    Returns:
+        Next pending due time (None if no reminder is scheduled)
+    """
+    db = SessionLocal()
+
+    try:
+        dispatch_due_reminders(db)
+        return next_due_at(db)
     except Exception as e:
         logger.error(f"Error processing reminders: {e}")
         db.rollback()
+        return None
     finally:
         db.close()
 
 
-def run_worker(interval_seconds=300):
+def run_worker(max_sleep_seconds: float = MAX_SLEEP_SECONDS):
     """
     Run worker in loop.
 
-    interval_seconds: Sleep duration between runs (default: 300s = 5min)
+    Sleeps until the next due reminder, at most `max_sleep_seconds` so reminders
+    created or rescheduled in the meantime are picked up.
     """
-    logger.info(f"Starting reminder worker (interval: {interval_seconds}s)")
+    logger.info(f"Starting reminder worker (max sleep: {max_sleep_seconds}s)")
 
     while True:
+        next_due = None
         try:
-            process_reminders()
+            next_due = process_reminders()
         except Exception as e:
             logger.error(f"Worker error: {e}")
 
-        time.sleep(interval_seconds)
+        sleep_seconds = max_sleep_seconds
+        if next_due is not None:
+            until_due = (next_due - datetime.now(timezone.utc)).total_seconds()
+            sleep_seconds = min(max(until_due, 0.5), max_sleep_seconds)
+        time.sleep(sleep_seconds)
 
 
 if __name__ == "__main__":